@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+{
+    'name': 'Cabinet Portal - ISEB',
+    'version': '17.0.1.0.0',
+    'category': 'Accounting/Accounting',
+    'summary': 'Portail cabinet : vue d\'ensemble du portefeuille clients',
+    'description': """
+Cabinet Portal - ISEB Platform
+==============================
+
+Portail du cabinet d'expertise-comptable : suivi de l'ensemble des dossiers
+clients (une société Odoo par client).
+
+Fonctionnalités principales
+----------------------------
+* Dossiers clients du cabinet (société, comptable assigné, formule)
+* Vue d'ensemble du portefeuille : dernière TVA, dernier FEC, créances,
+  retards, trésorerie et anomalies FEC de chaque client
+* Synthèse précalculée par client, recalculée uniquement pour les dossiers
+  modifiés (écritures validées, lettrages, TVA, FEC)
+
+Auteur
+------
+ISEB Dev Team
+
+License
+-------
+AGPL-3
+    """,
+    'author': 'ISEB',
+    'website': 'https://www.iseb-accounting.fr',
+    'license': 'AGPL-3',
+    'depends': [
+        'base',
+        'account',
+        'french_accounting',
+    ],
+    'data': [
+        # Security
+        'security/ir.model.access.csv',
+
+        # Data
+        'data/ir_cron.xml',
+
+        # Views
+        'views/cabinet_client_views.xml',
+    ],
+    'installable': True,
+    'application': True,
+    'auto_install': False,
+}
@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+
+from . import cabinet_client
+from . import account_move
+from . import account_partial_reconcile
+from . import fec_export
+from . import tva_declaration
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models
+
+# Champs d'écriture dont la modification change une synthèse client
+# (créances, trésorerie, conformité FEC)
+SUMMARY_MOVE_FIELDS = {'state', 'name', 'date', 'journal_id', 'line_ids', 'invoice_date_due'}
+
+
+class AccountMove(models.Model):
+    _inherit = 'account.move'
+
+    def write(self, vals):
+        res = super(AccountMove, self).write(vals)
+        # Les brouillons ne comptent dans aucun indicateur : seuls les
+        # changements d'état et les écritures validées marquent le dossier
+        if 'state' in vals or (SUMMARY_MOVE_FIELDS.intersection(vals) and 'posted' in self.mapped('state')):
+            self.env['cabinet.client.summary']._mark_dirty(self.company_id.ids)
+        return res
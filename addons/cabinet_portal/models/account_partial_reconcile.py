@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, api
+
+
+class AccountPartialReconcile(models.Model):
+    _inherit = 'account.partial.reconcile'
+
+    def _get_summary_companies(self):
+        return (self.debit_move_id.company_id | self.credit_move_id.company_id).ids
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        partials = super(AccountPartialReconcile, self).create(vals_list)
+        self.env['cabinet.client.summary']._mark_dirty(partials._get_summary_companies())
+        return partials
+
+    def unlink(self):
+        company_ids = self._get_summary_companies()
+        res = super(AccountPartialReconcile, self).unlink()
+        self.env['cabinet.client.summary']._mark_dirty(company_ids)
+        return res
@@ -0,0 +1,411 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+import logging
+import time
+
+from odoo.addons.french_accounting.reporting import reporting_cursor
+
+_logger = logging.getLogger(__name__)
+
+# Synthèses recalculées par transaction dans le cron
+REFRESH_BATCH_SIZE = 100
+
+# Indicateurs recalculés par _refresh, à zéro pour un dossier sans écriture
+SUMMARY_METRICS = {
+    'receivable_amount': 0.0,
+    'overdue_amount': 0.0,
+    'cash_balance': 0.0,
+    'compliance_error_count': 0,
+    'last_tva_id': False,
+    'last_fec_id': False,
+}
+
+
+class CabinetClient(models.Model):
+    _name = 'cabinet.client'
+    _description = 'Dossier client du cabinet'
+    _order = 'name'
+
+    name = fields.Char(
+        string='Client',
+        related='company_id.name',
+        store=True
+    )
+
+    company_id = fields.Many2one(
+        'res.company',
+        string='Société',
+        required=True,
+        ondelete='cascade',
+        help="Société Odoo tenant la comptabilité du client"
+    )
+
+    partner_id = fields.Many2one(
+        related='company_id.partner_id',
+        string='Contact'
+    )
+
+    accountant_id = fields.Many2one(
+        'res.users',
+        string='Comptable assigné',
+        default=lambda self: self.env.user,
+        index=True
+    )
+
+    subscription_plan = fields.Selection([
+        ('essential', 'Essentiel'),
+        ('standard', 'Standard'),
+        ('premium', 'Premium'),
+    ], string='Formule', default='standard')
+
+    active = fields.Boolean(default=True)
+
+    summary_ids = fields.One2many(
+        'cabinet.client.summary',
+        'client_id',
+        string='Synthèse'
+    )
+
+    _sql_constraints = [
+        ('company_uniq', 'unique(company_id)', "Cette société a déjà un dossier client."),
+    ]
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        clients = super(CabinetClient, self).create(vals_list)
+        summaries = self.env['cabinet.client.summary'].sudo().create([
+            {'client_id': client.id, 'company_id': client.company_id.id} for client in clients
+        ])
+        summaries._refresh()
+        return clients
+
+    def write(self, vals):
+        res = super(CabinetClient, self).write(vals)
+        if 'company_id' in vals:
+            self.summary_ids.sudo().write({'company_id': vals['company_id']})
+            self.env['cabinet.client.summary']._mark_dirty([vals['company_id']])
+        return res
+
+    @api.model
+    def action_create_missing_clients(self):
+        """Crée un dossier pour chaque société qui n'en a pas"""
+        existing = self.with_context(active_test=False).search([]).company_id
+        companies = self.env['res.company'].sudo().search([('id', 'not in', existing.ids)])
+        self.create([{'company_id': company.id} for company in companies])
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Dossiers clients'),
+                'message': _('%s dossiers créés') % len(companies),
+                'type': 'success',
+                'sticky': False,
+                'next': {'type': 'ir.actions.client', 'tag': 'reload'},
+            }
+        }
+
+
+class CabinetClientSummary(models.Model):
+    """Synthèse précalculée d'un dossier client
+
+    Une ligne par client, lue telle quelle par la vue d'ensemble du
+    portefeuille (une requête indexée quel que soit le nombre de clients).
+    Les événements qui modifient un indicateur (validation ou annulation
+    d'écriture, lettrage, déclaration de TVA, export FEC) marquent la ligne
+    à recalculer (`dirty`) ; le cron recalcule les lignes marquées, une
+    requête par indicateur pour tout le lot.
+
+    Un marquage est une ligne de cabinet.client.summary.event insérée dans
+    la transaction qui modifie le dossier : aucun verrou sur la synthèse,
+    les validations concurrentes d'une même société ne s'attendent pas. Le
+    recalcul ne supprime que les marques qu'il a lues, donc validées avant
+    la lecture des indicateurs ; celles d'une transaction encore en cours
+    restent pour le passage suivant.
+    """
+    _name = 'cabinet.client.summary'
+    _description = 'Synthèse du dossier client'
+    _order = 'name'
+
+    client_id = fields.Many2one(
+        'cabinet.client',
+        string='Client',
+        required=True,
+        ondelete='cascade',
+        index=True
+    )
+
+    name = fields.Char(
+        related='client_id.name',
+        store=True
+    )
+
+    company_id = fields.Many2one(
+        'res.company',
+        string='Société',
+        required=True,
+        index=True
+    )
+
+    accountant_id = fields.Many2one(
+        related='client_id.accountant_id',
+        store=True,
+        index=True
+    )
+
+    active = fields.Boolean(
+        related='client_id.active',
+        store=True
+    )
+
+    currency_id = fields.Many2one(
+        related='company_id.currency_id',
+        string='Devise'
+    )
+
+    last_tva_id = fields.Many2one(
+        'tva.declaration',
+        string='Dernière TVA'
+    )
+
+    last_tva_period_end = fields.Date(
+        related='last_tva_id.period_end',
+        string='TVA au',
+        store=True
+    )
+
+    last_tva_state = fields.Selection(
+        related='last_tva_id.state',
+        string='État TVA',
+        store=True
+    )
+
+    last_fec_id = fields.Many2one(
+        'fec.export',
+        string='Dernier FEC'
+    )
+
+    last_fec_date_to = fields.Date(
+        related='last_fec_id.date_to',
+        string='FEC au',
+        store=True
+    )
+
+    last_fec_state = fields.Selection(
+        related='last_fec_id.state',
+        string='État FEC',
+        store=True
+    )
+
+    receivable_amount = fields.Monetary(
+        string='Créances',
+        currency_field='currency_id'
+    )
+
+    overdue_amount = fields.Monetary(
+        string='Créances échues',
+        currency_field='currency_id'
+    )
+
+    cash_balance = fields.Monetary(
+        string='Trésorerie',
+        currency_field='currency_id',
+        help="Solde des comptes de banque et de caisse"
+    )
+
+    compliance_error_count = fields.Integer(
+        string='Anomalies FEC',
+        help="Écritures validées non conformes au format FEC"
+    )
+
+    dirty = fields.Boolean(
+        string='À actualiser',
+        compute='_compute_dirty',
+        search='_search_dirty',
+        help="Un événement a modifié le dossier depuis le dernier calcul"
+    )
+
+    refresh_date = fields.Datetime(
+        string='Calculée le',
+        readonly=True
+    )
+
+    _sql_constraints = [
+        ('company_uniq', 'unique(company_id)', "Une seule synthèse par société."),
+    ]
+
+    def _get_dirty_company_ids(self):
+        self.env.cr.execute("SELECT DISTINCT company_id FROM cabinet_client_summary_event")
+        return [company_id for company_id, in self.env.cr.fetchall()]
+
+    def _compute_dirty(self):
+        dirty_company_ids = set(self._get_dirty_company_ids())
+        for summary in self:
+            summary.dirty = summary.company_id.id in dirty_company_ids
+
+    def _search_dirty(self, operator, value):
+        if operator not in ('=', '!='):
+            raise UserError(_("Opérateur non pris en charge: %s") % operator)
+        operator = 'in' if (operator == '=') == bool(value) else 'not in'
+        return [('company_id', operator, self._get_dirty_company_ids())]
+
+    @api.model
+    def _mark_dirty(self, company_ids):
+        """Marque à recalculer les synthèses des sociétés (INSERT, sans verrou)
+
+        Une seule marque par société et par transaction : les marques déjà
+        insérées par la transaction courante (xmin) sont ignorées.
+        """
+        if not company_ids:
+            return
+        self.flush_model(['company_id'])
+        self.env.cr.execute("""
+            INSERT INTO cabinet_client_summary_event (company_id)
+            SELECT summary.company_id
+              FROM cabinet_client_summary summary
+             WHERE summary.company_id = ANY(%s)
+               AND NOT EXISTS (
+                    SELECT 1
+                      FROM cabinet_client_summary_event event
+                     WHERE event.company_id = summary.company_id
+                       AND event.xmin = pg_current_xact_id()::xid
+               )
+        """, [list(company_ids)])
+        if self.env.cr.rowcount:
+            self.invalidate_model(['dirty'])
+
+    def _get_metrics(self):
+        """Indicateurs des sociétés de self : {company_id: valeurs de SUMMARY_METRICS}"""
+        companies = self.company_id
+        metrics = {company.id: dict(SUMMARY_METRICS) for company in companies}
+        Aging = self.env['account.aging']
+        Aging._flush_aging()
+        self.env['account.move'].flush_model(['fec_compliance_state'])
+        aging_query, aging_params = Aging._get_aging_sql(companies, by_partner=False)
+
+        with reporting_cursor(self.env) as cr:
+            cr.execute(aging_query, aging_params)
+            for row in cr.dictfetchall():
+                metrics[row['company_id']].update(
+                    receivable_amount=row['receivable_total'],
+                    overdue_amount=row['receivable_total'] - row['receivable_not_due'],
+                )
+
+            cr.execute("""
+                SELECT l.company_id, SUM(l.balance)
+                  FROM account_move_line l
+                  JOIN account_account a ON a.id = l.account_id
+                 WHERE l.company_id = ANY(%s) AND l.parent_state = 'posted' AND a.account_type = 'asset_cash'
+                 GROUP BY l.company_id
+            """, [companies.ids])
+            for company_id, balance in cr.fetchall():
+                metrics[company_id]['cash_balance'] = balance
+
+            cr.execute("""
+                SELECT company_id, COUNT(*)
+                  FROM account_move
+                 WHERE company_id = ANY(%s) AND state = 'posted' AND fec_compliance_state = 'non_compliant'
+                 GROUP BY company_id
+            """, [companies.ids])
+            for company_id, count in cr.fetchall():
+                metrics[company_id]['compliance_error_count'] = count
+
+            cr.execute("""
+                SELECT DISTINCT ON (company_id) company_id, id
+                  FROM tva_declaration
+                 WHERE company_id = ANY(%s) AND state != 'cancel'
+                 ORDER BY company_id, period_end DESC, id DESC
+            """, [companies.ids])
+            for company_id, declaration_id in cr.fetchall():
+                metrics[company_id]['last_tva_id'] = declaration_id
+
+            cr.execute("""
+                SELECT DISTINCT ON (company_id) company_id, id
+                  FROM fec_export
+                 WHERE company_id = ANY(%s)
+                 ORDER BY company_id, date_to DESC, id DESC
+            """, [companies.ids])
+            for company_id, export_id in cr.fetchall():
+                metrics[company_id]['last_fec_id'] = export_id
+
+        return metrics
+
+    def _refresh(self):
+        """Recalcule les synthèses de self (en lecture seule pour les utilisateurs)
+
+        Les marques sont lues avant les indicateurs : leurs transactions sont
+        validées et donc visibles du calcul. Seules ces marques sont
+        supprimées ; une marque validée entre-temps reste à traiter.
+        """
+        if not self:
+            return
+        self.env.cr.execute(
+            "SELECT id FROM cabinet_client_summary_event WHERE company_id = ANY(%s)", [self.company_id.ids]
+        )
+        event_ids = [event_id for event_id, in self.env.cr.fetchall()]
+        metrics = self._get_metrics()
+        now = fields.Datetime.now()
+        for summary in self.sudo():
+            summary.write(dict(metrics[summary.company_id.id], refresh_date=now))
+        self.env.cr.execute("DELETE FROM cabinet_client_summary_event WHERE id = ANY(%s)", [event_ids])
+        self.invalidate_model(['dirty'])
+
+    def action_refresh(self):
+        """Recalcule les synthèses sélectionnées, ou toutes celles à actualiser"""
+        summaries = self or self.search([('dirty', '=', True)])
+        summaries._refresh()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Portefeuille actualisé'),
+                'message': _('%s dossiers recalculés') % len(summaries),
+                'type': 'success',
+                'sticky': False,
+                'next': {'type': 'ir.actions.client', 'tag': 'reload'},
+            }
+        }
+
+    @api.model
+    def _cron_refresh_dirty(self, time_limit=240):
+        """Recalcule les synthèses marquées, par lots validés un à un"""
+        deadline = time.monotonic() + time_limit
+        while time.monotonic() < deadline:
+            summaries = self.with_context(active_test=False).search([('dirty', '=', True)], limit=REFRESH_BATCH_SIZE)
+            if not summaries:
+                return
+            summaries._refresh()
+            self.env.cr.commit()
+            _logger.info(f"Synthèses cabinet recalculées: {len(summaries)}")
+        self.env.ref('cabinet_portal.ir_cron_cabinet_summary_refresh')._trigger()
+
+    @api.model
+    def _cron_mark_all_dirty(self):
+        # Marques orphelines (dossier supprimé) : plus aucune synthèse à recalculer
+        self.env.cr.execute("""
+            DELETE FROM cabinet_client_summary_event event
+             WHERE NOT EXISTS (SELECT 1 FROM cabinet_client_summary summary WHERE summary.company_id = event.company_id)
+        """)
+        self.env.cr.execute("INSERT INTO cabinet_client_summary_event (company_id) SELECT company_id FROM cabinet_client_summary")
+        self.invalidate_model(['dirty'])
+        self.env.ref('cabinet_portal.ir_cron_cabinet_summary_refresh')._trigger()
+
+
+class CabinetClientSummaryEvent(models.Model):
+    """Marque « synthèse à recalculer », insérée par la transaction qui modifie le dossier
+
+    Table en ajout seul : les transactions concurrentes n'écrivent jamais la
+    même ligne. Vidée par cabinet.client.summary._refresh.
+    """
+    _name = 'cabinet.client.summary.event'
+    _description = 'Synthèse client à recalculer'
+    _log_access = False
+
+    company_id = fields.Many2one(
+        'res.company',
+        string='Société',
+        required=True,
+        ondelete='cascade',
+        index=True
+    )
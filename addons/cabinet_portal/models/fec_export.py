@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, api
+
+
+class FecExport(models.Model):
+    _inherit = 'fec.export'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        exports = super(FecExport, self).create(vals_list)
+        self.env['cabinet.client.summary']._mark_dirty(exports.company_id.ids)
+        return exports
+
+    def write(self, vals):
+        res = super(FecExport, self).write(vals)
+        if {'company_id', 'date_to'}.intersection(vals):
+            self.env['cabinet.client.summary']._mark_dirty(self.company_id.ids)
+        return res
+
+    def unlink(self):
+        company_ids = self.company_id.ids
+        res = super(FecExport, self).unlink()
+        self.env['cabinet.client.summary']._mark_dirty(company_ids)
+        return res
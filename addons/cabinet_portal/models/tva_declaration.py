@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, api
+
+
+class TvaDeclaration(models.Model):
+    _inherit = 'tva.declaration'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        declarations = super(TvaDeclaration, self).create(vals_list)
+        self.env['cabinet.client.summary']._mark_dirty(declarations.company_id.ids)
+        return declarations
+
+    def write(self, vals):
+        res = super(TvaDeclaration, self).write(vals)
+        # L'état de la dernière déclaration suit par le champ related stocké ;
+        # une annulation ou un changement de période peut changer la dernière
+        if {'state', 'company_id', 'period_end'}.intersection(vals):
+            self.env['cabinet.client.summary']._mark_dirty(self.company_id.ids)
+        return res
+
+    def unlink(self):
+        company_ids = self.company_id.ids
+        res = super(TvaDeclaration, self).unlink()
+        self.env['cabinet.client.summary']._mark_dirty(company_ids)
+        return res
@@ -31,6 +31,7 @@ Tableaux de bord
 * R�sultat net (mensuel, cumul�)
 * TVA � d�caisser
 * Indicateurs cl�s (CA/charges, taux de marge, BFR)
+* Balance âgée clients / fournisseurs par tranche et DSO / DPO
 
 Interface
 ---------
@@ -56,11 +57,16 @@ AGPL-3
         'portal',
         'mail',
         'web',
+        'french_accounting',
     ],
     'data': [
         # Security
         'security/security.xml',
         'security/ir.model.access.csv',
+
+        # Views
+        'views/expense_note_views.xml',
+        'views/menu_views.xml',
     ],
     'installable': True,
     'application': True,
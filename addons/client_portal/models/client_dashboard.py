@@ -6,6 +6,9 @@ from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
 import json
 
+from odoo.addons.french_accounting.models.account_aging import AGING_COLUMNS
+from odoo.addons.french_accounting.reporting import reporting_env
+
 
 class ClientDashboard(models.Model):
     _name = 'client.dashboard'
@@ -173,33 +176,47 @@ class ClientDashboard(models.Model):
     receivable_amount = fields.Monetary(
         string='Crances clients',
         currency_field='currency_id',
-        compute='_compute_receivables',
+        compute='_compute_aging',
         store=True,
-        help="Montant total des factures clients impayes"
+        help="Reste d total des comptes clients du partenaire"
     )
 
     payable_amount = fields.Monetary(
         string='Dettes fournisseurs',
         currency_field='currency_id',
-        compute='_compute_payables',
+        compute='_compute_aging',
         store=True,
-        help="Montant total des factures fournisseurs impayes"
+        help="Reste d total des comptes fournisseurs du partenaire"
     )
 
     overdue_receivable = fields.Monetary(
         string='Crances chues',
         currency_field='currency_id',
-        compute='_compute_overdue',
+        compute='_compute_aging',
         store=True
     )
 
     overdue_payable = fields.Monetary(
         string='Dettes chues',
         currency_field='currency_id',
-        compute='_compute_overdue',
+        compute='_compute_aging',
         store=True
     )
 
+    dso = fields.Float(
+        string='DSO (jours)',
+        compute='_compute_aging',
+        store=True,
+        help="Dlai moyen de rglement clients sur les 12 derniers mois"
+    )
+
+    dpo = fields.Float(
+        string='DPO (jours)',
+        compute='_compute_aging',
+        store=True,
+        help="Dlai moyen de rglement fournisseurs sur les 12 derniers mois"
+    )
+
     currency_id = fields.Many2one(
         'res.currency',
         related='company_id.currency_id',
@@ -230,145 +247,148 @@ class ClientDashboard(models.Model):
     @api.depends('partner_id', 'company_id', 'period_end')
     def _compute_cash_balance(self):
         """Calcule le solde de trsorerie"""
-        for record in self:
-            # Rcuprer tous les comptes bancaires (51xxxx)
-            domain = [
-                ('company_id', '=', record.company_id.id),
-                ('code', '=like', '51%'),
-                ('account_type', '=', 'asset_current'),
-            ]
-            bank_accounts = self.env['account.account'].search(domain)
+        with reporting_env(self.env) as env:
+            for record in self:
+                # Rcuprer tous les comptes bancaires (51xxxx)
+                domain = [
+                    ('company_id', '=', record.company_id.id),
+                    ('code', '=like', '51%'),
+                    ('account_type', '=', 'asset_current'),
+                ]
+                bank_accounts = env['account.account'].search(domain)
 
-            # Calculer le solde
-            balance = 0.0
-            for account in bank_accounts:
-                balance += account.current_balance
+                # Calculer le solde
+                balance = 0.0
+                for account in bank_accounts:
+                    balance += account.current_balance
 
-            record.cash_balance = balance
+                record.cash_balance = balance
 
     @api.depends('partner_id', 'company_id', 'period_start', 'period_end')
     def _compute_revenue(self):
         """Calcule le chiffre d'affaires"""
-        for record in self:
-            # CA mois en cours (MTD - Month To Date)
-            month_start = record.period_start
-            month_end = record.period_end
-
-            moves_mtd = self.env['account.move'].search([
-                ('company_id', '=', record.company_id.id),
-                ('partner_id', '=', record.partner_id.id),
-                ('move_type', 'in', ['out_invoice', 'out_refund']),
-                ('state', '=', 'posted'),
-                ('date', '>=', month_start),
-                ('date', '<=', month_end),
-            ])
-
-            revenue_mtd = sum(
-                move.amount_total_signed if move.move_type == 'out_invoice'
-                else -move.amount_total_signed
-                for move in moves_mtd
-            )
-            record.revenue_mtd = revenue_mtd
-
-            # CA anne en cours (YTD - Year To Date)
-            year_start = record.period_start.replace(month=1, day=1)
-
-            moves_ytd = self.env['account.move'].search([
-                ('company_id', '=', record.company_id.id),
-                ('partner_id', '=', record.partner_id.id),
-                ('move_type', 'in', ['out_invoice', 'out_refund']),
-                ('state', '=', 'posted'),
-                ('date', '>=', year_start),
-                ('date', '<=', record.period_end),
-            ])
-
-            revenue_ytd = sum(
-                move.amount_total_signed if move.move_type == 'out_invoice'
-                else -move.amount_total_signed
-                for move in moves_ytd
-            )
-            record.revenue_ytd = revenue_ytd
-
-            # CA mois dernier
-            last_month_start = (record.period_start - relativedelta(months=1)).replace(day=1)
-            last_month_end = record.period_start - timedelta(days=1)
-
-            moves_last_month = self.env['account.move'].search([
-                ('company_id', '=', record.company_id.id),
-                ('partner_id', '=', record.partner_id.id),
-                ('move_type', 'in', ['out_invoice', 'out_refund']),
-                ('state', '=', 'posted'),
-                ('date', '>=', last_month_start),
-                ('date', '<=', last_month_end),
-            ])
-
-            record.revenue_last_month = sum(
-                move.amount_total_signed if move.move_type == 'out_invoice'
-                else -move.amount_total_signed
-                for move in moves_last_month
-            )
-
-            # CA anne dernire
-            last_year_start = year_start - relativedelta(years=1)
-            last_year_end = record.period_end - relativedelta(years=1)
-
-            moves_last_year = self.env['account.move'].search([
-                ('company_id', '=', record.company_id.id),
-                ('partner_id', '=', record.partner_id.id),
-                ('move_type', 'in', ['out_invoice', 'out_refund']),
-                ('state', '=', 'posted'),
-                ('date', '>=', last_year_start),
-                ('date', '<=', last_year_end),
-            ])
-
-            record.revenue_last_year = sum(
-                move.amount_total_signed if move.move_type == 'out_invoice'
-                else -move.amount_total_signed
-                for move in moves_last_year
-            )
+        with reporting_env(self.env) as env:
+            for record in self:
+                # CA mois en cours (MTD - Month To Date)
+                month_start = record.period_start
+                month_end = record.period_end
+
+                moves_mtd = env['account.move'].search([
+                    ('company_id', '=', record.company_id.id),
+                    ('partner_id', '=', record.partner_id.id),
+                    ('move_type', 'in', ['out_invoice', 'out_refund']),
+                    ('state', '=', 'posted'),
+                    ('date', '>=', month_start),
+                    ('date', '<=', month_end),
+                ])
+
+                revenue_mtd = sum(
+                    move.amount_total_signed if move.move_type == 'out_invoice'
+                    else -move.amount_total_signed
+                    for move in moves_mtd
+                )
+                record.revenue_mtd = revenue_mtd
+
+                # CA anne en cours (YTD - Year To Date)
+                year_start = record.period_start.replace(month=1, day=1)
+
+                moves_ytd = env['account.move'].search([
+                    ('company_id', '=', record.company_id.id),
+                    ('partner_id', '=', record.partner_id.id),
+                    ('move_type', 'in', ['out_invoice', 'out_refund']),
+                    ('state', '=', 'posted'),
+                    ('date', '>=', year_start),
+                    ('date', '<=', record.period_end),
+                ])
+
+                revenue_ytd = sum(
+                    move.amount_total_signed if move.move_type == 'out_invoice'
+                    else -move.amount_total_signed
+                    for move in moves_ytd
+                )
+                record.revenue_ytd = revenue_ytd
+
+                # CA mois dernier
+                last_month_start = (record.period_start - relativedelta(months=1)).replace(day=1)
+                last_month_end = record.period_start - timedelta(days=1)
+
+                moves_last_month = env['account.move'].search([
+                    ('company_id', '=', record.company_id.id),
+                    ('partner_id', '=', record.partner_id.id),
+                    ('move_type', 'in', ['out_invoice', 'out_refund']),
+                    ('state', '=', 'posted'),
+                    ('date', '>=', last_month_start),
+                    ('date', '<=', last_month_end),
+                ])
+
+                record.revenue_last_month = sum(
+                    move.amount_total_signed if move.move_type == 'out_invoice'
+                    else -move.amount_total_signed
+                    for move in moves_last_month
+                )
+
+                # CA anne dernire
+                last_year_start = year_start - relativedelta(years=1)
+                last_year_end = record.period_end - relativedelta(years=1)
+
+                moves_last_year = env['account.move'].search([
+                    ('company_id', '=', record.company_id.id),
+                    ('partner_id', '=', record.partner_id.id),
+                    ('move_type', 'in', ['out_invoice', 'out_refund']),
+                    ('state', '=', 'posted'),
+                    ('date', '>=', last_year_start),
+                    ('date', '<=', last_year_end),
+                ])
+
+                record.revenue_last_year = sum(
+                    move.amount_total_signed if move.move_type == 'out_invoice'
+                    else -move.amount_total_signed
+                    for move in moves_last_year
+                )
 
     @api.depends('partner_id', 'company_id', 'period_start', 'period_end')
     def _compute_expenses(self):
         """Calcule les charges"""
-        for record in self:
-            # Charges mois en cours
-            month_start = record.period_start
-            month_end = record.period_end
-
-            moves_mtd = self.env['account.move'].search([
-                ('company_id', '=', record.company_id.id),
-                ('partner_id', '=', record.partner_id.id),
-                ('move_type', 'in', ['in_invoice', 'in_refund']),
-                ('state', '=', 'posted'),
-                ('date', '>=', month_start),
-                ('date', '<=', month_end),
-            ])
-
-            expenses_mtd = sum(
-                move.amount_total_signed if move.move_type == 'in_invoice'
-                else -move.amount_total_signed
-                for move in moves_mtd
-            )
-            record.expenses_mtd = abs(expenses_mtd)
-
-            # Charges anne en cours
-            year_start = record.period_start.replace(month=1, day=1)
-
-            moves_ytd = self.env['account.move'].search([
-                ('company_id', '=', record.company_id.id),
-                ('partner_id', '=', record.partner_id.id),
-                ('move_type', 'in', ['in_invoice', 'in_refund']),
-                ('state', '=', 'posted'),
-                ('date', '>=', year_start),
-                ('date', '<=', record.period_end),
-            ])
-
-            expenses_ytd = sum(
-                move.amount_total_signed if move.move_type == 'in_invoice'
-                else -move.amount_total_signed
-                for move in moves_ytd
-            )
-            record.expenses_ytd = abs(expenses_ytd)
+        with reporting_env(self.env) as env:
+            for record in self:
+                # Charges mois en cours
+                month_start = record.period_start
+                month_end = record.period_end
+
+                moves_mtd = env['account.move'].search([
+                    ('company_id', '=', record.company_id.id),
+                    ('partner_id', '=', record.partner_id.id),
+                    ('move_type', 'in', ['in_invoice', 'in_refund']),
+                    ('state', '=', 'posted'),
+                    ('date', '>=', month_start),
+                    ('date', '<=', month_end),
+                ])
+
+                expenses_mtd = sum(
+                    move.amount_total_signed if move.move_type == 'in_invoice'
+                    else -move.amount_total_signed
+                    for move in moves_mtd
+                )
+                record.expenses_mtd = abs(expenses_mtd)
+
+                # Charges anne en cours
+                year_start = record.period_start.replace(month=1, day=1)
+
+                moves_ytd = env['account.move'].search([
+                    ('company_id', '=', record.company_id.id),
+                    ('partner_id', '=', record.partner_id.id),
+                    ('move_type', 'in', ['in_invoice', 'in_refund']),
+                    ('state', '=', 'posted'),
+                    ('date', '>=', year_start),
+                    ('date', '<=', record.period_end),
+                ])
+
+                expenses_ytd = sum(
+                    move.amount_total_signed if move.move_type == 'in_invoice'
+                    else -move.amount_total_signed
+                    for move in moves_ytd
+                )
+                record.expenses_ytd = abs(expenses_ytd)
 
     @api.depends('revenue_mtd', 'revenue_last_month', 'revenue_ytd', 'revenue_last_year')
     def _compute_growth(self):
@@ -396,29 +416,30 @@ class ClientDashboard(models.Model):
     @api.depends('partner_id', 'company_id', 'period_start', 'period_end')
     def _compute_tva(self):
         """Calcule la TVA"""
-        for record in self:
-            # Rcuprer les lignes de TVA pour la priode
-            tva_lines = self.env['account.move.line'].search([
-                ('company_id', '=', record.company_id.id),
-                ('move_id.partner_id', '=', record.partner_id.id),
-                ('move_id.state', '=', 'posted'),
-                ('move_id.date', '>=', record.period_start),
-                ('move_id.date', '<=', record.period_end),
-                ('tax_line_id', '!=', False),
-            ])
-
-            tva_collectee = 0.0
-            tva_deductible = 0.0
-
-            for line in tva_lines:
-                if line.move_id.move_type in ['out_invoice', 'out_refund']:
-                    tva_collectee += abs(line.balance)
-                elif line.move_id.move_type in ['in_invoice', 'in_refund']:
-                    tva_deductible += abs(line.balance)
-
-            record.tva_collectee = tva_collectee
-            record.tva_deductible = tva_deductible
-            record.tva_due = tva_collectee - tva_deductible
+        with reporting_env(self.env) as env:
+            for record in self:
+                # Rcuprer les lignes de TVA pour la priode
+                tva_lines = env['account.move.line'].search([
+                    ('company_id', '=', record.company_id.id),
+                    ('move_id.partner_id', '=', record.partner_id.id),
+                    ('move_id.state', '=', 'posted'),
+                    ('move_id.date', '>=', record.period_start),
+                    ('move_id.date', '<=', record.period_end),
+                    ('tax_line_id', '!=', False),
+                ])
+
+                tva_collectee = 0.0
+                tva_deductible = 0.0
+
+                for line in tva_lines:
+                    if line.move_id.move_type in ['out_invoice', 'out_refund']:
+                        tva_collectee += abs(line.balance)
+                    elif line.move_id.move_type in ['in_invoice', 'in_refund']:
+                        tva_deductible += abs(line.balance)
+
+                record.tva_collectee = tva_collectee
+                record.tva_deductible = tva_deductible
+                record.tva_due = tva_collectee - tva_deductible
 
     @api.depends('revenue_mtd', 'expenses_mtd')
     def _compute_kpis(self):
@@ -430,58 +451,21 @@ class ClientDashboard(models.Model):
                 record.margin_rate = 0.0
 
     @api.depends('partner_id', 'company_id')
-    def _compute_receivables(self):
-        """Calcule les crances clients"""
-        for record in self:
-            receivables = self.env['account.move'].search([
-                ('company_id', '=', record.company_id.id),
-                ('partner_id', '=', record.partner_id.id),
-                ('move_type', '=', 'out_invoice'),
-                ('state', '=', 'posted'),
-                ('payment_state', 'in', ['not_paid', 'partial']),
-            ])
-            record.receivable_amount = sum(receivables.mapped('amount_residual'))
-
-    @api.depends('partner_id', 'company_id')
-    def _compute_payables(self):
-        """Calcule les dettes fournisseurs"""
-        for record in self:
-            payables = self.env['account.move'].search([
-                ('company_id', '=', record.company_id.id),
-                ('partner_id', '=', record.partner_id.id),
-                ('move_type', '=', 'in_invoice'),
-                ('state', '=', 'posted'),
-                ('payment_state', 'in', ['not_paid', 'partial']),
-            ])
-            record.payable_amount = sum(payables.mapped('amount_residual'))
-
-    @api.depends('partner_id', 'company_id')
-    def _compute_overdue(self):
-        """Calcule les factures chues"""
+    def _compute_aging(self):
+        """Crances, dettes, retards et DSO / DPO en une requte pour tous les dashboards"""
+        rows = self.env['account.aging']._get_aging(self.company_id, partners=self.partner_id)
+        aging = {
+            (row['company_id'], row['partner_id']): row
+            for row in rows if row['level'] == 'partner'
+        }
         for record in self:
-            today = fields.Date.today()
-
-            # Crances chues
-            overdue_receivables = self.env['account.move'].search([
-                ('company_id', '=', record.company_id.id),
-                ('partner_id', '=', record.partner_id.id),
-                ('move_type', '=', 'out_invoice'),
-                ('state', '=', 'posted'),
-                ('payment_state', 'in', ['not_paid', 'partial']),
-                ('invoice_date_due', '<', today),
-            ])
-            record.overdue_receivable = sum(overdue_receivables.mapped('amount_residual'))
-
-            # Dettes chues
-            overdue_payables = self.env['account.move'].search([
-                ('company_id', '=', record.company_id.id),
-                ('partner_id', '=', record.partner_id.id),
-                ('move_type', '=', 'in_invoice'),
-                ('state', '=', 'posted'),
-                ('payment_state', 'in', ['not_paid', 'partial']),
-                ('invoice_date_due', '<', today),
-            ])
-            record.overdue_payable = sum(overdue_payables.mapped('amount_residual'))
+            row = aging.get((record.company_id.id, record.partner_id.id)) or dict.fromkeys(AGING_COLUMNS, 0.0)
+            record.receivable_amount = row['receivable_total']
+            record.payable_amount = row['payable_total']
+            record.overdue_receivable = row['receivable_total'] - row['receivable_not_due']
+            record.overdue_payable = row['payable_total'] - row['payable_not_due']
+            record.dso = row['dso'] or 0.0
+            record.dpo = row['dpo'] or 0.0
 
     def _compute_cash_evolution(self):
         """Calcule l'volution de la trsorerie sur 12 mois"""
@@ -499,60 +483,61 @@ class ClientDashboard(models.Model):
 
     def _compute_chart_data(self):
         """Gnre les donnes pour les graphiques"""
-        for record in self:
-            # Donnes CA par mois (12 derniers mois)
-            revenue_data = []
-            expenses_data = []
-
-            for i in range(12, 0, -1):
-                month_date = fields.Date.today() - relativedelta(months=i)
-                month_start = month_date.replace(day=1)
-                month_end = (month_start + relativedelta(months=1)) - timedelta(days=1)
-
-                # CA du mois
-                moves_revenue = self.env['account.move'].search([
-                    ('company_id', '=', record.company_id.id),
-                    ('partner_id', '=', record.partner_id.id),
-                    ('move_type', 'in', ['out_invoice', 'out_refund']),
-                    ('state', '=', 'posted'),
-                    ('date', '>=', month_start),
-                    ('date', '<=', month_end),
-                ])
-
-                revenue = sum(
-                    move.amount_total_signed if move.move_type == 'out_invoice'
-                    else -move.amount_total_signed
-                    for move in moves_revenue
-                )
-
-                revenue_data.append({
-                    'month': month_start.strftime('%b %Y'),
-                    'amount': revenue
-                })
-
-                # Charges du mois
-                moves_expenses = self.env['account.move'].search([
-                    ('company_id', '=', record.company_id.id),
-                    ('partner_id', '=', record.partner_id.id),
-                    ('move_type', 'in', ['in_invoice', 'in_refund']),
-                    ('state', '=', 'posted'),
-                    ('date', '>=', month_start),
-                    ('date', '<=', month_end),
-                ])
-
-                expenses = abs(sum(
-                    move.amount_total_signed if move.move_type == 'in_invoice'
-                    else -move.amount_total_signed
-                    for move in moves_expenses
-                ))
-
-                expenses_data.append({
-                    'month': month_start.strftime('%b %Y'),
-                    'amount': expenses
-                })
-
-            record.revenue_chart_data = json.dumps(revenue_data)
-            record.expenses_chart_data = json.dumps(expenses_data)
+        with reporting_env(self.env) as env:
+            for record in self:
+                # Donnes CA par mois (12 derniers mois)
+                revenue_data = []
+                expenses_data = []
+
+                for i in range(12, 0, -1):
+                    month_date = fields.Date.today() - relativedelta(months=i)
+                    month_start = month_date.replace(day=1)
+                    month_end = (month_start + relativedelta(months=1)) - timedelta(days=1)
+
+                    # CA du mois
+                    moves_revenue = env['account.move'].search([
+                        ('company_id', '=', record.company_id.id),
+                        ('partner_id', '=', record.partner_id.id),
+                        ('move_type', 'in', ['out_invoice', 'out_refund']),
+                        ('state', '=', 'posted'),
+                        ('date', '>=', month_start),
+                        ('date', '<=', month_end),
+                    ])
+
+                    revenue = sum(
+                        move.amount_total_signed if move.move_type == 'out_invoice'
+                        else -move.amount_total_signed
+                        for move in moves_revenue
+                    )
+
+                    revenue_data.append({
+                        'month': month_start.strftime('%b %Y'),
+                        'amount': revenue
+                    })
+
+                    # Charges du mois
+                    moves_expenses = env['account.move'].search([
+                        ('company_id', '=', record.company_id.id),
+                        ('partner_id', '=', record.partner_id.id),
+                        ('move_type', 'in', ['in_invoice', 'in_refund']),
+                        ('state', '=', 'posted'),
+                        ('date', '>=', month_start),
+                        ('date', '<=', month_end),
+                    ])
+
+                    expenses = abs(sum(
+                        move.amount_total_signed if move.move_type == 'in_invoice'
+                        else -move.amount_total_signed
+                        for move in moves_expenses
+                    ))
+
+                    expenses_data.append({
+                        'month': month_start.strftime('%b %Y'),
+                        'amount': expenses
+                    })
+
+                record.revenue_chart_data = json.dumps(revenue_data)
+                record.expenses_chart_data = json.dumps(expenses_data)
 
     def action_refresh_dashboard(self):
         """Rafrachit le dashboard"""
@@ -1,6 +1,41 @@
 # -*- coding: utf-8 -*-
 
 from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from odoo.tools.image import image_process
+from odoo.tools.mimetypes import guess_mimetype
+from collections import defaultdict
+import base64
+import logging
+import mimetypes
+
+_logger = logging.getLogger(__name__)
+
+# Taille maximale et qualit JPEG des justificatifs stocks
+RECEIPT_MAX_SIZE = (2048, 2048)
+RECEIPT_JPEG_QUALITY = 80
+
+# Formats rencods par image_process (WebP et SVG sont renvoys tels quels)
+RECEIPT_IMAGE_MIMETYPES = {'image/jpeg', 'image/png', 'image/gif', 'image/bmp'}
+
+# Miniatures gnres au tlversement (champ -> taille)
+RECEIPT_THUMBNAIL_SIZES = {
+    'receipt_thumbnail_1024': (1024, 1024),
+    'receipt_thumbnail_256': (256, 256),
+    'receipt_thumbnail_128': (128, 128),
+}
+
+# Comptes PCG (prfixes) utiliss pour la comptabilisation des notes de frais
+EXPENSE_ACCOUNT_PREFIXES = {
+    'meal': '6257',           # Rceptions
+    'transport': '6251',      # Voyages et dplacements
+    'accommodation': '6256',  # Missions
+    'fuel': '6061',           # Fournitures non stockables (carburant)
+    'parking': '6251',        # Voyages et dplacements
+    'other': '628',           # Divers
+}
+TVA_DEDUCTIBLE_ACCOUNT_PREFIX = '44566'  # TVA sur autres biens et services
+EXPENSE_PAYABLE_ACCOUNT_PREFIX = '421'   # Personnel - rmunrations dues
 
 
 class ExpenseNote(models.Model):
@@ -25,6 +60,28 @@ class ExpenseNote(models.Model):
     tva_amount = fields.Monetary(string='Montant TVA', currency_field='currency_id')
     receipt_image = fields.Binary(string='Photo justificatif', attachment=True)
     receipt_filename = fields.Char(string='Nom fichier')
+    receipt_original = fields.Binary(
+        string='Justificatif original',
+        attachment=True,
+        readonly=True,
+        copy=False,
+        help="Fichier tel que tlvers, conserv avant recompression si l'option est active"
+    )
+    receipt_thumbnail_1024 = fields.Image(
+        string='Aperu justificatif',
+        compute='_compute_receipt_thumbnails',
+        store=True
+    )
+    receipt_thumbnail_256 = fields.Image(
+        string='Miniature justificatif',
+        compute='_compute_receipt_thumbnails',
+        store=True
+    )
+    receipt_thumbnail_128 = fields.Image(
+        string='Vignette justificatif',
+        compute='_compute_receipt_thumbnails',
+        store=True
+    )
     state = fields.Selection([
         ('draft', 'Brouillon'),
         ('submitted', 'Soumis'),
@@ -32,5 +89,284 @@ class ExpenseNote(models.Model):
         ('paid', 'Rembours'),
         ('rejected', 'Rejet'),
     ], default='draft', tracking=True)
+    move_id = fields.Many2one(
+        'account.move',
+        string='criture comptable',
+        readonly=True,
+        copy=False,
+        index=True,
+        help="criture regroupant les notes de frais du client pour la priode"
+    )
     currency_id = fields.Many2one('res.currency', related='company_id.currency_id', readonly=True)
     notes = fields.Text(string='Notes')
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        vals_list = [self._prepare_receipt_vals(vals) for vals in vals_list]
+        return super(ExpenseNote, self).create(vals_list)
+
+    def write(self, vals):
+        vals = self._prepare_receipt_vals(vals)
+        res = super(ExpenseNote, self).write(vals)
+        if vals.get('receipt_image') and 'receipt_filename' not in vals:
+            # Nom existant : extension aligne sur le nouveau contenu
+            for note in self.filtered('receipt_filename'):
+                super(ExpenseNote, note).write({
+                    'receipt_filename': self._get_receipt_filename(note.receipt_filename, vals['receipt_image']),
+                })
+        return res
+
+    @api.model
+    def _prepare_receipt_vals(self, vals):
+        """Recompresse la photo tlverse en JPEG et conserve l'original si demand
+
+        Tout nouveau justificatif remplace l'original conserv du prcdent,
+        et l'extension du nom de fichier suit le contenu stock.
+        """
+        if 'receipt_image' not in vals:
+            return vals
+
+        vals = dict(vals, receipt_original=False)
+        if not vals['receipt_image']:
+            return vals
+
+        raw = base64.b64decode(vals['receipt_image'])
+        processed = False
+        if guess_mimetype(raw) in RECEIPT_IMAGE_MIMETYPES:
+            try:
+                processed = image_process(
+                    raw,
+                    size=RECEIPT_MAX_SIZE,
+                    quality=RECEIPT_JPEG_QUALITY,
+                    output_format='JPEG',
+                )
+            except UserError:
+                _logger.debug("Justificatif illisible, stock tel quel")
+
+        # PDF, format non rencodable ou recompression sans gain : stock tel quel
+        if processed and len(processed) < len(raw):
+            keep_original = self.env['ir.config_parameter'].sudo().get_param(
+                'client_portal.receipt_keep_original'
+            )
+            if keep_original:
+                vals['receipt_original'] = vals['receipt_image']
+            vals['receipt_image'] = base64.b64encode(processed)
+        if vals.get('receipt_filename'):
+            vals['receipt_filename'] = self._get_receipt_filename(vals['receipt_filename'], vals['receipt_image'])
+        return vals
+
+    @api.model
+    def _get_receipt_filename(self, filename, receipt):
+        """Nom de fichier dont l'extension correspond au justificatif stock (base64)"""
+        mimetype = guess_mimetype(base64.b64decode(receipt))
+        extension = mimetypes.guess_extension(mimetype) if mimetype != 'application/octet-stream' else None
+        if not extension:
+            return filename
+        return filename.rsplit('.', 1)[0] + extension
+
+    @api.depends('receipt_image')
+    def _compute_receipt_thumbnails(self):
+        """Gnre les miniatures du justificatif (une seule fois, au tlversement)"""
+        for note in self:
+            raw = base64.b64decode(note.receipt_image) if note.receipt_image else False
+            if raw and guess_mimetype(raw) not in RECEIPT_IMAGE_MIMETYPES:
+                # PDF, WebP, SVG : image_process les renverrait en pleine taille
+                raw = False
+            for field_name, size in RECEIPT_THUMBNAIL_SIZES.items():
+                thumbnail = False
+                if raw:
+                    try:
+                        thumbnail = base64.b64encode(image_process(
+                            raw,
+                            size=size,
+                            quality=RECEIPT_JPEG_QUALITY,
+                            output_format='JPEG',
+                        ))
+                    except UserError:
+                        _logger.debug("Justificatif %s illisible, pas de miniature", note.id)
+                note[field_name] = thumbnail
+
+    def _get_receipt_url(self, size=None):
+        """URL du justificatif : miniature pour les listes, original charg  la demande"""
+        self.ensure_one()
+        unique = self.write_date.strftime('%Y%m%d%H%M%S') if self.write_date else ''
+        if size:
+            field_name = f'receipt_thumbnail_{size}'
+            if field_name not in RECEIPT_THUMBNAIL_SIZES:
+                raise UserError(_("Taille de miniature inconnue: %s") % size)
+            return f'/web/image/{self._name}/{self.id}/{field_name}?unique={unique}'
+        return f'/web/content/{self._name}/{self.id}/receipt_image?unique={unique}'
+
+    def action_submit(self):
+        """Soumet les notes de frais pour validation"""
+        if any(note.state != 'draft' for note in self):
+            raise UserError(_("Seules les notes de frais en brouillon peuvent tre soumises."))
+        self.write({'state': 'submitted'})
+        return True
+
+    def action_reject(self):
+        """Rejette les notes de frais soumises"""
+        if any(note.state != 'submitted' for note in self):
+            raise UserError(_("Seules les notes de frais soumises peuvent tre rejetes."))
+        self.write({'state': 'rejected'})
+        return True
+
+    def action_reset_to_draft(self):
+        """Remet en brouillon les notes de frais rejetes"""
+        if any(note.state != 'rejected' for note in self):
+            raise UserError(_("Seules les notes de frais rejetes peuvent tre remises en brouillon."))
+        self.write({'state': 'draft'})
+        return True
+
+    def action_mark_paid(self):
+        """Marque les notes de frais approuves comme rembourses"""
+        if any(note.state != 'approved' for note in self):
+            raise UserError(_("Seules les notes de frais approuves peuvent tre rembourses."))
+        self.write({'state': 'paid'})
+        return True
+
+    def action_approve(self):
+        """Approuve un lot de notes de frais et gnre les critures comptables
+
+        Les notes sont regroupes par socit, client et mois : une criture
+        par groupe, toutes cres en un seul appel  create puis valides
+        ensemble.
+        """
+        self._check_expense_approval()
+
+        groups = defaultdict(lambda: self.browse())
+        for note in self.sorted('expense_date'):
+            key = (note.company_id, note.partner_id, note.expense_date.strftime('%Y-%m'))
+            groups[key] |= note
+
+        accounts = {}
+        journals = {}
+        move_vals_list = []
+        for (company, partner, period), notes in groups.items():
+            if company not in journals:
+                journals[company] = self._get_expense_journal(company)
+            move_vals_list.append(notes._prepare_expense_move_vals(
+                journals[company], period, accounts
+            ))
+
+        moves = self.env['account.move'].create(move_vals_list)
+        moves.action_post()
+
+        for move, notes in zip(moves, groups.values()):
+            notes.write({'state': 'approved', 'move_id': move.id})
+
+        _logger.info(f"{len(self)} notes de frais approuves, {len(moves)} critures gnres")
+
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Notes de frais approuves'),
+                'message': _('%s notes de frais approuves, %s critures comptabilises') % (len(self), len(moves)),
+                'type': 'success',
+                'sticky': False,
+            }
+        }
+
+    def _check_expense_approval(self):
+        """Vrifie que les notes de frais peuvent tre approuves"""
+        errors = []
+
+        for note in self:
+            if note.state != 'submitted':
+                errors.append(f"{note.name}: la note doit tre soumise")
+            if note.amount <= 0:
+                errors.append(f"{note.name}: montant TTC invalide")
+            if note.tva_amount < 0 or note.tva_amount >= note.amount:
+                errors.append(f"{note.name}: montant de TVA incohrent")
+            if note.move_id:
+                errors.append(f"{note.name}: dj comptabilise ({note.move_id.name})")
+
+        if errors:
+            error_msg = "\n".join(errors[:10])  # Limiter  10 premires erreurs
+            if len(errors) > 10:
+                error_msg += f"\n... et {len(errors) - 10} autres erreurs"
+            raise UserError(_(
+                "Certaines notes de frais ne peuvent pas tre approuves:\n\n%s"
+            ) % error_msg)
+
+    @api.model
+    def _get_expense_journal(self, company):
+        """Retourne le journal d'achats de la socit"""
+        journal = self.env['account.journal'].search([
+            ('company_id', '=', company.id),
+            ('type', '=', 'purchase'),
+        ], limit=1)
+        if not journal:
+            raise UserError(_("Aucun journal d'achats trouv pour la socit %s.") % company.name)
+        return journal
+
+    @api.model
+    def _get_expense_account(self, company, prefix, cache):
+        """Retourne le premier compte PCG de la socit commenant par le prfixe"""
+        key = (company.id, prefix)
+        if key not in cache:
+            account = self.env['account.account'].search([
+                ('company_id', '=', company.id),
+                ('code', '=like', f'{prefix}%'),
+                ('deprecated', '=', False),
+            ], order='code', limit=1)
+            if not account:
+                raise UserError(_(
+                    "Aucun compte %s trouv dans le plan comptable de la socit %s."
+                ) % (prefix, company.name))
+            cache[key] = account
+        return cache[key]
+
+    def _prepare_expense_move_vals(self, journal, period, accounts):
+        """Prpare l'criture d'un groupe de notes (mme socit, client et mois)"""
+        company = self[0].company_id
+        partner = self[0].partner_id
+        currency = company.currency_id
+
+        tva_account = self._get_expense_account(company, TVA_DEDUCTIBLE_ACCOUNT_PREFIX, accounts)
+        payable_account = self._get_expense_account(company, EXPENSE_PAYABLE_ACCOUNT_PREFIX, accounts)
+
+        line_vals = []
+        total = 0.0
+        for note in self:
+            expense_account = self._get_expense_account(
+                company, EXPENSE_ACCOUNT_PREFIXES[note.category], accounts
+            )
+            amount = currency.round(note.amount)
+            tva_amount = currency.round(note.tva_amount or 0.0)
+            total += amount
+
+            line_vals.append((0, 0, {
+                'name': note.name,
+                'account_id': expense_account.id,
+                'partner_id': partner.id,
+                'debit': amount - tva_amount,
+                'credit': 0.0,
+            }))
+            if tva_amount:
+                line_vals.append((0, 0, {
+                    'name': _('TVA - %s') % note.name,
+                    'account_id': tva_account.id,
+                    'partner_id': partner.id,
+                    'debit': tva_amount,
+                    'credit': 0.0,
+                }))
+
+        line_vals.append((0, 0, {
+            'name': _('Notes de frais %s - %s') % (partner.name, period),
+            'account_id': payable_account.id,
+            'partner_id': partner.id,
+            'debit': 0.0,
+            'credit': currency.round(total),
+        }))
+
+        return {
+            'move_type': 'entry',
+            'company_id': company.id,
+            'journal_id': journal.id,
+            'date': max(self.mapped('expense_date')),
+            'ref': _('Notes de frais %s') % period,
+            'partner_id': partner.id,
+            'line_ids': line_vals,
+        }
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 {
     'name': 'French Accounting - ISEB',
-    'version': '17.0.1.0.0',
+    'version': '17.0.1.1.0',
     'category': 'Accounting/Localizations/Account Charts',
     'summary': 'Comptabilit� fran�aise compl�te pour cabinets d\'expertise-comptable',
     'description': """
@@ -14,8 +14,16 @@ Fonctionnalit�s principales
 ----------------------------
 * Plan Comptable G�n�ral (PCG) 2025 complet
 * D�clarations de TVA automatis�es (CA3, CA12)
-* Liasses fiscales (2033, 2035, 2050)
+* Liasses fiscales (2033, 2035, 2050) calculées depuis la balance, pour tout le portefeuille
 * Export FEC (Fichier des �critures Comptables)
+* Balance générale (par compte, classe et journal) et grand livre, exports CSV / XLSX
+* Balance âgée clients / fournisseurs (0-30, 31-60, 61-90, + 90 jours) et DSO / DPO du portefeuille
+* Conformité FEC de chaque écriture maintenue en continu (état stocké et indexé)
+* Index composites et partiels des requêtes FEC, TVA, dashboards et balance âgée, vérifiés par EXPLAIN
+* Rapports lourds (FEC, balances, dashboards) sur réplica de lecture, avec garde de fraîcheur et repli sur le primaire
+* Échéancier CA3 / CA12 / FEC par société, déclarations de TVA préparées la nuit avant l'échéance
+* Exercices décalés (début au 1er avril, juillet ou octobre) avec recalcul en arrière-plan
+* Clôture mensuelle / annuelle : verrouillage et soldes de clôture par compte
 * Gestion des immobilisations et amortissements
 * Conformit� l�gale fran�aise (Code de commerce)
 * R�gimes fiscaux fran�ais (r�el normal, r�el simplifi�, BNC)
@@ -52,14 +60,27 @@ AGPL-3
         'account',
         'mail',
     ],
+    'external_dependencies': {
+        'python': ['openpyxl'],
+    },
     'data': [
         # Security
         'security/security.xml',
         'security/ir.model.access.csv',
 
+        # Data
+        'data/ir_cron.xml',
+
         # Views
         'views/fec_export_views.xml',
         'views/tva_declaration_views.xml',
+        'views/liasse_fiscale_views.xml',
+        'views/accounting_report_views.xml',
+        'views/account_aging_views.xml',
+        'views/fiscal_year_recompute_views.xml',
+        'views/account_period_close_views.xml',
+        'views/fiscal_obligation_views.xml',
+        'views/res_company_views.xml',
         'views/menu_views.xml',
     ],
     'images': [
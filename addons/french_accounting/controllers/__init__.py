@@ -1,3 +1,3 @@
 # -*- coding: utf-8 -*-
 
-# Controllers will be added here
+from . import accounting_report
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+from odoo import api, http
+from odoo.http import request, content_disposition
+from werkzeug.wsgi import wrap_file
+
+EXPORT_MIMETYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+class AccountingReportController(http.Controller):
+
+    @http.route('/french_accounting/report/<int:report_id>/<string:file_format>', type='http', auth='user')
+    def export_report(self, report_id, file_format, **kwargs):
+        """Télécharge la balance générale ou le grand livre
+
+        Le CSV est envoyé au fil de la lecture des pages ; le XLSX est écrit
+        en mode write-only dans un fichier temporaire puis transmis par blocs.
+        """
+        report = request.env['french.accounting.report'].browse(report_id).exists()
+        if not report or file_format not in EXPORT_MIMETYPES:
+            return request.not_found()
+
+        headers = [
+            ('Content-Type', EXPORT_MIMETYPES[file_format]),
+            ('Content-Disposition', content_disposition(report._get_export_filename(file_format))),
+        ]
+        if file_format == 'xlsx':
+            body = wrap_file(request.httprequest.environ, report._write_xlsx())
+        else:
+            body = self._stream_csv(report)
+        return request.make_response(body, headers=headers)
+
+    def _stream_csv(self, report):
+        """Générateur consommé après la fin de la requête : il ouvre son propre curseur"""
+        registry, uid, context, report_id = report.pool, report.env.uid, report.env.context, report.id
+
+        def generate():
+            with registry.cursor() as cr:
+                env = api.Environment(cr, uid, context)
+                yield from env['french.accounting.report'].browse(report_id)._iter_csv()
+
+        return generate()
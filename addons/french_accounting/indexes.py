@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Index composites et partiels des requêtes ISEB les plus fréquentes
+
+Chaque index est déclaré avec les requêtes qu'il sert (HOT_QUERIES) ; les
+méthodes init() des modèles les créent à l'installation et à chaque mise à
+jour du module. check_hot_queries() vérifie par EXPLAIN que chaque requête
+les utilise : à relancer après toute modification des recherches
+concernées (voir benchmarks/explain.py).
+
+Les index partiels sur state = 'posted' ne contiennent que les écritures
+validées, qui sont les seules lues par les rapports, FEC, TVA et dashboards.
+"""
+
+import json
+
+from odoo import tools
+
+# (nom, table, colonnes, condition)
+INDEXES = [
+    # FEC, TVA, balance : écritures validées d'une société sur une période,
+    # dans l'ordre de l'export FEC
+    ('account_move_posted_company_date_idx', 'account_move',
+     ['company_id', 'date', 'name'], "state = 'posted'"),
+    # Dashboards clients : chiffre d'affaires / charges d'un partenaire par
+    # type de pièce et période ; le partenaire en tête sert aussi les sous-requêtes
+    # « move_id.partner_id = X » sans société
+    ('account_move_posted_partner_type_date_idx', 'account_move',
+     ['partner_id', 'company_id', 'move_type', 'date'], "state = 'posted'"),
+    # Factures ouvertes par échéance (retards, relances)
+    ('account_move_open_invoice_due_idx', 'account_move',
+     ['company_id', 'invoice_date_due'], "state = 'posted' AND payment_state IN ('not_paid', 'partial')"),
+    # Balance âgée : lignes validées non lettrées
+    ('account_move_line_open_item_idx', 'account_move_line',
+     ['company_id', 'partner_id'], "parent_state = 'posted' AND NOT reconciled AND amount_residual != 0"),
+]
+
+# Recherche de partenaires par nom (ilike '%...%'), si pg_trgm est disponible
+PARTNER_TRIGRAM_INDEX = 'res_partner_complete_name_trgm_idx'
+
+# (nom, index attendu, requête) - mêmes filtres que les recherches de l'ORM
+HOT_QUERIES = [
+    ('fec_export_moves', 'account_move_posted_company_date_idx', """
+        SELECT id FROM account_move
+         WHERE company_id = %(company_id)s AND date >= %(date_from)s AND date <= %(date_to)s
+           AND state = 'posted'
+         ORDER BY date, name
+    """),
+    ('tva_declaration_moves', 'account_move_posted_company_date_idx', """
+        SELECT id FROM account_move
+         WHERE company_id = %(company_id)s AND date >= %(date_from)s AND date <= %(date_to)s
+           AND state = 'posted'
+    """),
+    ('dashboard_revenue', 'account_move_posted_partner_type_date_idx', """
+        SELECT id FROM account_move
+         WHERE company_id = %(company_id)s AND partner_id = %(partner_id)s
+           AND move_type IN ('out_invoice', 'out_refund') AND state = 'posted'
+           AND date >= %(date_from)s AND date <= %(date_to)s
+    """),
+    ('dashboard_tva_lines', 'account_move_posted_partner_type_date_idx', """
+        SELECT id FROM account_move_line
+         WHERE company_id = %(company_id)s AND tax_line_id IS NOT NULL
+           AND move_id IN (
+                SELECT id FROM account_move
+                 WHERE partner_id = %(partner_id)s AND state = 'posted'
+                   AND date >= %(date_from)s AND date <= %(date_to)s
+           )
+    """),
+    ('open_invoices_due', 'account_move_open_invoice_due_idx', """
+        SELECT id FROM account_move
+         WHERE company_id = %(company_id)s AND state = 'posted'
+           AND payment_state IN ('not_paid', 'partial') AND invoice_date_due < %(date_to)s
+    """),
+    ('partner_name_search', PARTNER_TRIGRAM_INDEX, """
+        SELECT id FROM res_partner WHERE complete_name ILIKE %(partner_pattern)s
+    """),
+]
+
+
+def create_indexes(cr, table):
+    """Crée les index de INDEXES portant sur `table` (sans effet s'ils existent)"""
+    for name, index_table, columns, where in INDEXES:
+        if index_table == table:
+            tools.create_index(cr, name, table, columns, where=where)
+
+
+def _plan_indexes(plan):
+    names = set()
+    if 'Index Name' in plan:
+        names.add(plan['Index Name'])
+    for child in plan.get('Plans', []):
+        names |= _plan_indexes(child)
+    return names
+
+
+def explain_indexes(cr, query, params):
+    """Index utilisés par le plan de `query`, parcours séquentiels désactivés
+
+    Sans parcours séquentiel, le planificateur choisit un index dès qu'un
+    index compatible existe : le résultat ne dépend pas du volume de la base
+    mais de l'adéquation des index aux filtres.
+    """
+    cr.execute("SET enable_seqscan TO off")
+    try:
+        cr.execute(f"EXPLAIN (FORMAT JSON) {query}", params)
+        plan = cr.fetchone()[0]
+    finally:
+        cr.execute("RESET enable_seqscan")
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return _plan_indexes(plan[0]['Plan'])
+
+
+def check_hot_queries(env, company, partner, date_from, date_to):
+    """EXPLAIN de chaque requête de HOT_QUERIES et de la balance âgée
+
+    Retourne une liste de dictionnaires (query, index, used, ok).
+    """
+    params = {
+        'company_id': company.id,
+        'partner_id': partner.id,
+        'date_from': date_from,
+        'date_to': date_to,
+        'partner_pattern': f"%{(partner.name or '')[1:5]}%",
+    }
+    queries = [(name, index, query, params) for name, index, query in HOT_QUERIES]
+    aging_query, aging_params = env['account.aging']._get_aging_sql(company, date_to)
+    queries.append(('aging', 'account_move_line_open_item_idx', aging_query, aging_params))
+
+    results = []
+    for name, index, query, query_params in queries:
+        if index == PARTNER_TRIGRAM_INDEX and not env.registry.has_trigram:
+            continue
+        used = explain_indexes(env.cr, query, query_params)
+        results.append({'query': name, 'index': index, 'used': sorted(used), 'ok': index in used})
+    return results
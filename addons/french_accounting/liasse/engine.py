@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+Moteur de calcul des cases de liasse fiscale
+
+Chaque formulaire (voir forms.py) est une liste de cases :
+
+* cases « comptes » : plages de comptes PCG (préfixes), avec un sens (solde
+  débiteur ou créditeur) et éventuellement une condition sur le signe du
+  solde (ex. 512 débiteur en disponibilités, créditeur en emprunts) ;
+* cases « formule » : somme / différence d'autres cases.
+
+Les plages sont compilées en un index d'intervalles : les bornes de toutes
+les plages découpent l'espace des numéros de compte en segments, et chaque
+segment connaît les cases candidates (de la plus précise à la plus large).
+Un compte est placé par une recherche dichotomique ; la balance est donc
+parcourue une seule fois pour remplir toutes les cases.
+"""
+
+import bisect
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+Box = namedtuple('Box', ['code', 'label', 'section', 'ranges', 'sign', 'side', 'formula'])
+
+# Plage compilée : [low, high[ sur les numéros de compte, case et condition de solde
+Interval = namedtuple('Interval', ['low', 'high', 'box', 'side'])
+
+FORMULA_TOKEN = re.compile(r'\s*([+-])?\s*([A-Z0-9]+)')
+
+
+def accounts(code, label, section, ranges, sign=1, side=None):
+    """Case alimentée par des plages de comptes
+
+    `ranges` : préfixes ('411') ou plages de préfixes (('601', '602')).
+    `sign` : 1 pour un solde débiteur (actif, charges), -1 pour un solde
+    créditeur (passif, produits). `side` : 'debit' / 'credit' pour ne retenir
+    que les comptes dont le solde est de ce signe.
+    """
+    return Box(code, label, section, tuple(ranges), sign, side, None)
+
+
+def formula(code, label, section, expression):
+    """Case calculée : « 232 - 264 + 280 »"""
+    return Box(code, label, section, (), 1, None, expression)
+
+
+def _prefix_successor(prefix):
+    """Plus petite chaîne supérieure à toutes celles qui commencent par `prefix`"""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def _parse_formula(expression):
+    terms = []
+    position = 0
+    expression = expression.strip()
+    while position < len(expression):
+        match = FORMULA_TOKEN.match(expression, position)
+        if not match:
+            raise ValueError(f"Formule invalide : {expression}")
+        terms.append((-1 if match.group(1) == '-' else 1, match.group(2)))
+        position = match.end()
+    return tuple(terms)
+
+
+class CompiledForm:
+    """Formulaire compilé : index d'intervalles et formules ordonnées"""
+
+    def __init__(self, boxes):
+        self.boxes = list(boxes)
+        self.by_code = {box.code: box for box in self.boxes}
+        if len(self.by_code) != len(self.boxes):
+            raise ValueError("Code de case en double")
+
+        intervals = []
+        for box in self.boxes:
+            for item in box.ranges:
+                low, high = (item, item) if isinstance(item, str) else item
+                intervals.append(Interval(low, _prefix_successor(high), box, box.side))
+        self._build_index(intervals)
+
+        self.formulas = {
+            box.code: _parse_formula(box.formula)
+            for box in self.boxes if box.formula
+        }
+        for terms in self.formulas.values():
+            for _sign, code in terms:
+                if code not in self.by_code:
+                    raise ValueError(f"Case inconnue dans une formule : {code}")
+        self.formula_order = self._formula_order()
+
+    def _build_index(self, intervals):
+        """Balayage des bornes : segments élémentaires et leurs intervalles actifs"""
+        bounds = sorted({interval.low for interval in intervals} | {interval.high for interval in intervals})
+        starts = sorted(intervals, key=lambda i: i.low)
+        self.bounds = bounds
+        self.segments = []
+        active = []
+        next_start = 0
+        for index, bound in enumerate(bounds):
+            active = [interval for interval in active if interval.high > bound]
+            while next_start < len(starts) and starts[next_start].low == bound:
+                active.append(starts[next_start])
+                next_start += 1
+            # Intervalle le plus étroit d'abord (borne basse la plus haute, puis
+            # borne haute la plus basse) : la plage la plus précise l'emporte
+            candidates = sorted(active, key=lambda i: i.high)
+            candidates.sort(key=lambda i: i.low, reverse=True)
+            self.segments.append(tuple(candidates))
+
+    def lookup(self, account_code, balance):
+        """Case d'un compte pour un solde donné, ou None"""
+        index = bisect.bisect_right(self.bounds, account_code) - 1
+        if index < 0:
+            return None
+        side = 'debit' if balance >= 0 else 'credit'
+        for interval in self.segments[index]:
+            if interval.side is None or interval.side == side:
+                return interval.box
+        return None
+
+    def _formula_order(self):
+        order = []
+        state = {}
+
+        def visit(code):
+            if state.get(code) == 'done':
+                return
+            if state.get(code) == 'visiting':
+                raise ValueError(f"Référence circulaire dans la formule de la case {code}")
+            state[code] = 'visiting'
+            for _sign, dependency in self.formulas.get(code, ()):
+                visit(dependency)
+            state[code] = 'done'
+            if code in self.formulas:
+                order.append(code)
+
+        for code in self.formulas:
+            visit(code)
+        return order
+
+    def compute(self, balances):
+        """Montants de toutes les cases à partir de {compte: solde débiteur - créditeur}
+
+        Retourne (montants par case, comptes non affectés).
+        """
+        amounts = dict.fromkeys(self.by_code, 0.0)
+        unmapped = {}
+        for account_code, balance in balances.items():
+            if not balance:
+                continue
+            box = self.lookup(account_code, balance)
+            if box is None:
+                unmapped[account_code] = balance
+                continue
+            amounts[box.code] += box.sign * balance
+        for code in self.formula_order:
+            amounts[code] = sum(sign * amounts[dependency] for sign, dependency in self.formulas[code])
+        return {code: round(amount, 2) for code, amount in amounts.items()}, unmapped
+
+
+@lru_cache(maxsize=None)
+def get_compiled_form(form_type):
+    """Formulaire compilé une fois par processus"""
+    from .forms import FORMS
+    return CompiledForm(FORMS[form_type])
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+Tables de correspondance PCG -> cases des liasses 2033, 2050 et 2035
+
+Montants nets : les amortissements et dépréciations (28x, 29x, 39x, 49x) sont
+rattachés à la case de l'actif qu'ils corrigent. Quand plusieurs plages
+couvrent un compte, la plus précise l'emporte (ex. 4091 en avances versées
+plutôt qu'en autres créances) ; `side` répartit un même compte selon le
+signe de son solde (banques débitrices en disponibilités, créditrices en
+emprunts).
+"""
+
+from .engine import accounts, formula
+
+# Comptes de tiers et de trésorerie répartis selon le sens du solde
+THIRD_PARTY_DEBIT = [('40', '40'), ('42', '47')]
+THIRD_PARTY_CREDIT = [('40', '40'), ('45', '47'), '269', '279']
+CASH = [('51', '58')]
+
+INCOME_SALES_GOODS = ['707', '7097']
+INCOME_SALES_PRODUCTS = [('701', '703')]
+INCOME_SALES_SERVICES = [('704', '706'), '708']
+EXPENSE_GOODS = ['607', '6087', '6097']
+EXPENSE_MATERIALS = ['601', '602', '6081', '6082', '6091', '6092']
+EXPENSE_EXTERNAL = ['604', '605', '606', '6084', '6085', '6086', '6094', '6095', '6096', '61', '62']
+
+
+FORM_2033 = [
+    # 2033-A Bilan simplifié - Actif
+    accounts('010', "Fonds commercial", 'actif', ['206', '207', '2806', '2807', '2906', '2907']),
+    accounts('014', "Autres immobilisations incorporelles", 'actif',
+             ['201', '203', '205', '208', '232', '237', '2801', '2803', '2805', '2808', '2905', '2908', '2932']),
+    accounts('028', "Immobilisations corporelles", 'actif', ['21', '231', '238', '281', '291', '2931']),
+    accounts('040', "Immobilisations financières", 'actif', ['26', '27', '296', '297']),
+    accounts('050', "Stocks de matières premières et approvisionnements", 'actif', ['31', '32', '391', '392']),
+    accounts('060', "Stocks en cours de production", 'actif', ['33', '34', '393', '394']),
+    accounts('062', "Stocks de produits intermédiaires et finis", 'actif', ['35', '395']),
+    accounts('064', "Stocks de marchandises", 'actif', ['37', '397']),
+    accounts('068', "Avances et acomptes versés sur commandes", 'actif', ['4091']),
+    accounts('072', "Créances clients et comptes rattachés", 'actif', ['411', '413', '416', '417', '418', '491']),
+    accounts('074', "Autres créances", 'actif', THIRD_PARTY_DEBIT, side='debit'),
+    accounts('080', "Valeurs mobilières de placement", 'actif', ['50', '590']),
+    accounts('084', "Disponibilités", 'actif', CASH, side='debit'),
+    accounts('092', "Charges constatées d'avance", 'actif', ['486']),
+    formula('110', "Total actif", 'actif',
+            '010 + 014 + 028 + 040 + 050 + 060 + 062 + 064 + 068 + 072 + 074 + 080 + 084 + 092'),
+
+    # 2033-A Bilan simplifié - Passif
+    accounts('120', "Capital social ou individuel", 'passif', ['101', '108', '109'], sign=-1),
+    accounts('124', "Écarts de réévaluation", 'passif', ['105'], sign=-1),
+    accounts('126', "Réserve légale", 'passif', ['1061'], sign=-1),
+    accounts('130', "Réserves réglementées", 'passif', ['1062', '1064'], sign=-1),
+    accounts('132', "Autres réserves", 'passif', ['104', '1063', '1068'], sign=-1),
+    accounts('134', "Report à nouveau", 'passif', ['11'], sign=-1),
+    formula('136', "Résultat de l'exercice", 'passif', '310'),
+    accounts('140', "Provisions réglementées (dont subventions d'investissement)", 'passif', ['13', '14'], sign=-1),
+    accounts('154', "Provisions pour risques et charges", 'passif', ['15'], sign=-1),
+    accounts('156', "Emprunts et dettes assimilées", 'passif', ['16', '17'] + CASH, sign=-1, side='credit'),
+    accounts('164', "Avances et acomptes reçus sur commandes en cours", 'passif', ['4191'], sign=-1),
+    accounts('166', "Fournisseurs et comptes rattachés", 'passif', ['401', '403', '408'], sign=-1, side='credit'),
+    accounts('172', "Autres dettes", 'passif', THIRD_PARTY_CREDIT + [('42', '44')], sign=-1, side='credit'),
+    accounts('174', "Produits constatés d'avance", 'passif', ['487'], sign=-1),
+    formula('180', "Total passif", 'passif',
+            '120 + 124 + 126 + 130 + 132 + 134 + 136 + 140 + 154 + 156 + 164 + 166 + 172 + 174'),
+
+    # 2033-B Compte de résultat simplifié
+    accounts('210', "Ventes de marchandises", 'resultat', INCOME_SALES_GOODS, sign=-1),
+    accounts('214', "Production vendue (biens)", 'resultat', INCOME_SALES_PRODUCTS, sign=-1),
+    accounts('218', "Production vendue (services)", 'resultat', INCOME_SALES_SERVICES, sign=-1),
+    accounts('222', "Production stockée", 'resultat', ['713'], sign=-1),
+    accounts('224', "Production immobilisée", 'resultat', ['72'], sign=-1),
+    accounts('226', "Subventions d'exploitation reçues", 'resultat', ['74'], sign=-1),
+    accounts('230', "Autres produits", 'resultat', ['75', '781', '791'], sign=-1),
+    formula('232', "Total des produits d'exploitation", 'resultat', '210 + 214 + 218 + 222 + 224 + 226 + 230'),
+    accounts('234', "Achats de marchandises", 'resultat', EXPENSE_GOODS),
+    accounts('236', "Variation de stock (marchandises)", 'resultat', ['6037']),
+    accounts('238', "Achats de matières premières et autres approvisionnements", 'resultat', EXPENSE_MATERIALS),
+    accounts('240', "Variation de stock (matières premières et approvisionnements)", 'resultat', ['6031', '6032']),
+    accounts('242', "Autres charges externes", 'resultat', EXPENSE_EXTERNAL),
+    accounts('244', "Impôts, taxes et versements assimilés", 'resultat', ['63']),
+    accounts('250', "Rémunérations du personnel", 'resultat', ['641', '644']),
+    accounts('252', "Charges sociales", 'resultat', [('645', '648')]),
+    accounts('254', "Dotations aux amortissements", 'resultat', ['6811', '6812']),
+    accounts('256', "Dotations aux provisions", 'resultat', [('6815', '6817')]),
+    accounts('262', "Autres charges", 'resultat', ['65']),
+    formula('264', "Total des charges d'exploitation", 'resultat',
+            '234 + 236 + 238 + 240 + 242 + 244 + 250 + 252 + 254 + 256 + 262'),
+    formula('270', "Résultat d'exploitation", 'resultat', '232 - 264'),
+    accounts('280', "Produits financiers", 'resultat', ['76', '786', '796'], sign=-1),
+    accounts('290', "Produits exceptionnels", 'resultat', ['77', '787', '797'], sign=-1),
+    accounts('294', "Charges financières", 'resultat', ['66', '686']),
+    accounts('300', "Charges exceptionnelles", 'resultat', ['67', '687']),
+    accounts('306', "Impôts sur les bénéfices", 'resultat', [('695', '699')]),
+    formula('310', "Bénéfice ou perte", 'resultat', '270 + 280 + 290 - 294 - 300 - 306'),
+]
+
+
+FORM_2050 = [
+    # 2050 Bilan - Actif
+    accounts('AB', "Frais d'établissement", 'actif', ['201', '2801']),
+    accounts('CX', "Frais de développement", 'actif', ['203', '2803']),
+    accounts('AF', "Concessions, brevets et droits similaires", 'actif', ['205', '2805', '2905']),
+    accounts('AH', "Fonds commercial", 'actif', ['206', '207', '2806', '2807', '2906', '2907']),
+    accounts('AJ', "Autres immobilisations incorporelles", 'actif', ['208', '232', '2808', '2908', '2932']),
+    accounts('AL', "Avances et acomptes sur immobilisations incorporelles", 'actif', ['237']),
+    accounts('AN', "Terrains", 'actif', ['211', '212', '2811', '2812', '2911']),
+    accounts('AP', "Constructions", 'actif', ['213', '214', '2813', '2814']),
+    accounts('AR', "Installations techniques, matériel et outillage industriels", 'actif', ['215', '2815']),
+    accounts('AT', "Autres immobilisations corporelles", 'actif', ['218', '2818']),
+    accounts('AV', "Immobilisations en cours", 'actif', ['231', '2931']),
+    accounts('AX', "Avances et acomptes", 'actif', ['238']),
+    accounts('CS', "Participations", 'actif', ['261', '266', '2961', '2966']),
+    accounts('CU', "Créances rattachées à des participations", 'actif', ['267', '268', '2967', '2968']),
+    accounts('BB', "Autres titres immobilisés", 'actif', ['271', '272', '2971', '2972']),
+    accounts('BD', "Prêts", 'actif', ['274', '2974']),
+    accounts('BF', "Autres immobilisations financières", 'actif', ['275', '276', '2975', '2976']),
+    formula('BJ', "Total actif immobilisé (I)", 'actif',
+            'AB + CX + AF + AH + AJ + AL + AN + AP + AR + AT + AV + AX + CS + CU + BB + BD + BF'),
+    accounts('BL', "Matières premières, approvisionnements", 'actif', ['31', '32', '391', '392']),
+    accounts('BN', "En cours de production de biens", 'actif', ['33', '393']),
+    accounts('BP', "En cours de production de services", 'actif', ['34', '394']),
+    accounts('BR', "Produits intermédiaires et finis", 'actif', ['35', '395']),
+    accounts('BT', "Marchandises", 'actif', ['37', '397']),
+    accounts('BV', "Avances et acomptes versés sur commandes", 'actif', ['4091']),
+    accounts('BX', "Clients et comptes rattachés", 'actif', ['411', '413', '416', '417', '418', '491']),
+    accounts('BZ', "Autres créances", 'actif', THIRD_PARTY_DEBIT, side='debit'),
+    accounts('CB', "Capital souscrit et appelé, non versé", 'actif', ['4562']),
+    accounts('CD', "Valeurs mobilières de placement", 'actif', ['50', '590']),
+    accounts('CF', "Disponibilités", 'actif', CASH, side='debit'),
+    accounts('CH', "Charges constatées d'avance", 'actif', ['486']),
+    formula('CJ', "Total actif circulant (II)", 'actif',
+            'BL + BN + BP + BR + BT + BV + BX + BZ + CB + CD + CF + CH'),
+    formula('CO', "Total général actif", 'actif', 'BJ + CJ'),
+
+    # 2051 Bilan - Passif
+    accounts('DA', "Capital social ou individuel", 'passif', ['101', '108', '109'], sign=-1),
+    accounts('DB', "Primes d'émission, de fusion, d'apport", 'passif', ['104'], sign=-1),
+    accounts('DC', "Écarts de réévaluation", 'passif', ['105'], sign=-1),
+    accounts('DD', "Réserve légale", 'passif', ['1061'], sign=-1),
+    accounts('DE', "Réserves statutaires ou contractuelles", 'passif', ['1063'], sign=-1),
+    accounts('DF', "Réserves réglementées", 'passif', ['1062', '1064'], sign=-1),
+    accounts('DG', "Autres réserves", 'passif', ['1068'], sign=-1),
+    accounts('DH', "Report à nouveau", 'passif', ['11'], sign=-1),
+    formula('DI', "Résultat de l'exercice", 'passif', 'HN'),
+    accounts('DJ', "Subventions d'investissement", 'passif', ['13'], sign=-1),
+    accounts('DK', "Provisions réglementées", 'passif', ['14'], sign=-1),
+    formula('DL', "Total capitaux propres (I)", 'passif', 'DA + DB + DC + DD + DE + DF + DG + DH + DI + DJ + DK'),
+    accounts('DP', "Provisions pour risques", 'passif', ['151'], sign=-1),
+    accounts('DQ', "Provisions pour charges", 'passif', [('153', '158')], sign=-1),
+    formula('DR', "Total provisions (II)", 'passif', 'DP + DQ'),
+    accounts('DS', "Emprunts obligataires convertibles", 'passif', ['161'], sign=-1),
+    accounts('DT', "Autres emprunts obligataires", 'passif', ['163'], sign=-1),
+    accounts('DU', "Emprunts et dettes auprès des établissements de crédit", 'passif',
+             ['164'] + CASH, sign=-1, side='credit'),
+    accounts('DV', "Emprunts et dettes financières divers", 'passif', [('165', '168'), '17'], sign=-1),
+    accounts('DW', "Avances et acomptes reçus sur commandes en cours", 'passif', ['4191'], sign=-1),
+    accounts('DX', "Dettes fournisseurs et comptes rattachés", 'passif', ['401', '403', '408'], sign=-1, side='credit'),
+    accounts('DY', "Dettes fiscales et sociales", 'passif', [('42', '44')], sign=-1, side='credit'),
+    accounts('DZ', "Dettes sur immobilisations et comptes rattachés", 'passif', ['404', '405'], sign=-1, side='credit'),
+    accounts('EA', "Autres dettes", 'passif', THIRD_PARTY_CREDIT, sign=-1, side='credit'),
+    accounts('EB', "Produits constatés d'avance", 'passif', ['487'], sign=-1),
+    formula('EC', "Total dettes (III)", 'passif', 'DS + DT + DU + DV + DW + DX + DY + DZ + EA + EB'),
+    formula('EE', "Total général passif", 'passif', 'DL + DR + EC'),
+
+    # 2052 / 2053 Compte de résultat
+    accounts('FC', "Ventes de marchandises", 'resultat', INCOME_SALES_GOODS, sign=-1),
+    accounts('FF', "Production vendue (biens)", 'resultat', INCOME_SALES_PRODUCTS, sign=-1),
+    accounts('FI', "Production vendue (services)", 'resultat', INCOME_SALES_SERVICES, sign=-1),
+    formula('FL', "Chiffre d'affaires net", 'resultat', 'FC + FF + FI'),
+    accounts('FM', "Production stockée", 'resultat', ['713'], sign=-1),
+    accounts('FN', "Production immobilisée", 'resultat', ['72'], sign=-1),
+    accounts('FO', "Subventions d'exploitation", 'resultat', ['74'], sign=-1),
+    accounts('FP', "Reprises sur amortissements et provisions, transferts de charges", 'resultat',
+             ['781', '791'], sign=-1),
+    accounts('FQ', "Autres produits", 'resultat', ['75'], sign=-1),
+    formula('FR', "Total des produits d'exploitation (I)", 'resultat', 'FL + FM + FN + FO + FP + FQ'),
+    accounts('FS', "Achats de marchandises", 'resultat', EXPENSE_GOODS),
+    accounts('FT', "Variation de stock (marchandises)", 'resultat', ['6037']),
+    accounts('FU', "Achats de matières premières et autres approvisionnements", 'resultat', EXPENSE_MATERIALS),
+    accounts('FV', "Variation de stock (matières premières et approvisionnements)", 'resultat', ['6031', '6032']),
+    accounts('FW', "Autres achats et charges externes", 'resultat', EXPENSE_EXTERNAL),
+    accounts('FX', "Impôts, taxes et versements assimilés", 'resultat', ['63']),
+    accounts('FY', "Salaires et traitements", 'resultat', ['641', '644']),
+    accounts('FZ', "Charges sociales", 'resultat', [('645', '648')]),
+    accounts('GA', "Dotations aux amortissements sur immobilisations", 'resultat', ['6811', '6812']),
+    accounts('GB', "Dotations aux dépréciations sur immobilisations", 'resultat', ['6816']),
+    accounts('GC', "Dotations aux dépréciations sur actif circulant", 'resultat', ['6817']),
+    accounts('GD', "Dotations aux provisions", 'resultat', ['6815']),
+    accounts('GE', "Autres charges", 'resultat', ['65']),
+    formula('GF', "Total des charges d'exploitation (II)", 'resultat',
+            'FS + FT + FU + FV + FW + FX + FY + FZ + GA + GB + GC + GD + GE'),
+    formula('GG', "Résultat d'exploitation (I - II)", 'resultat', 'FR - GF'),
+    accounts('GP', "Total des produits financiers (V)", 'resultat', ['76', '786', '796'], sign=-1),
+    accounts('GU', "Total des charges financières (VI)", 'resultat', ['66', '686']),
+    formula('GV', "Résultat financier (V - VI)", 'resultat', 'GP - GU'),
+    formula('GW', "Résultat courant avant impôts", 'resultat', 'GG + GV'),
+    accounts('HD', "Total des produits exceptionnels (VII)", 'resultat', ['77', '787', '797'], sign=-1),
+    accounts('HH', "Total des charges exceptionnelles (VIII)", 'resultat', ['67', '687']),
+    formula('HI', "Résultat exceptionnel (VII - VIII)", 'resultat', 'HD - HH'),
+    accounts('HJ', "Participation des salariés aux résultats", 'resultat', ['691']),
+    accounts('HK', "Impôts sur les bénéfices", 'resultat', [('695', '699')]),
+    formula('HL', "Total des produits", 'resultat', 'FR + GP + HD'),
+    formula('HM', "Total des charges", 'resultat', 'GF + GU + HH + HJ + HK'),
+    formula('HN', "Bénéfice ou perte", 'resultat', 'HL - HM'),
+]
+
+
+FORM_2035 = [
+    # 2035-A Recettes
+    accounts('AA', "Recettes encaissées", 'recettes', ['70'], sign=-1),
+    accounts('AE', "Produits financiers", 'recettes', ['76'], sign=-1),
+    accounts('AF', "Gains divers", 'recettes', ['75', '77', '78', '79'], sign=-1),
+    formula('AG', "Total des recettes", 'recettes', 'AA + AE + AF'),
+
+    # 2035-A Dépenses
+    accounts('BA', "Achats", 'depenses', ['60']),
+    accounts('BB', "Salaires nets et avantages en nature", 'depenses', ['641', '644']),
+    accounts('BC', "Charges sociales sur salaires", 'depenses', ['645', '647', '648']),
+    accounts('JY', "Contribution économique territoriale", 'depenses', ['6351']),
+    accounts('BS', "Autres impôts", 'depenses', ['63']),
+    accounts('BF', "Loyers et charges locatives", 'depenses', ['6132']),
+    accounts('BG', "Location de matériel et de mobilier", 'depenses', ['6135']),
+    accounts('BH', "Entretien et réparations", 'depenses', ['615']),
+    accounts('BJ', "Personnel intérimaire", 'depenses', ['621']),
+    accounts('BK', "Petit outillage", 'depenses', ['6063']),
+    accounts('BL', "Chauffage, eau, gaz, électricité", 'depenses', ['6061']),
+    accounts('BM', "Honoraires ne constituant pas des rétrocessions", 'depenses', ['6226']),
+    accounts('BN', "Primes d'assurance", 'depenses', ['616']),
+    accounts('BR', "Frais de déplacements", 'depenses', ['625']),
+    accounts('BT', "Charges sociales personnelles de l'exploitant", 'depenses', ['646']),
+    accounts('BU', "Frais de réception, de représentation et de congrès", 'depenses', ['6257']),
+    accounts('BW', "Fournitures de bureau, documentation, PTT", 'depenses', ['6064', '618', '626']),
+    accounts('BX', "Frais d'actes et de contentieux", 'depenses', ['6227']),
+    accounts('BY', "Cotisations syndicales et professionnelles", 'depenses', ['6281']),
+    accounts('BZ', "Autres frais divers de gestion", 'depenses', ['61', '62', '65']),
+    accounts('CA', "Frais financiers", 'depenses', ['66']),
+    accounts('CB', "Pertes diverses", 'depenses', ['67']),
+    formula('CC', "Total des dépenses", 'depenses',
+            'BA + BB + BC + JY + BS + BF + BG + BH + BJ + BK + BL + BM + BN + BR + BT + BU + BW + BX + BY + BZ + CA + CB'),
+    accounts('CH', "Dotations aux amortissements", 'depenses', ['681']),
+    formula('CP', "Excédent (ou insuffisance si négatif)", 'depenses', 'AG - CC - CH'),
+]
+
+
+FORMS = {
+    '2033': FORM_2033,
+    '2050': FORM_2050,
+    '2035': FORM_2035,
+}
@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+"""Nouvelle empreinte FEC (contenu des lignes, sans le numéro d'écriture)"""
+
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env['account.move']._fill_fec_match_hash()
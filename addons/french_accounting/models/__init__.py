@@ -6,3 +6,9 @@ from . import tva_declaration
 from . import liasse_fiscale
 from . import res_company
 from . import account_journal
+from . import res_partner
+from . import fiscal_year_recompute
+from . import account_period_close
+from . import accounting_report
+from . import account_aging
+from . import fiscal_obligation
@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, _
+from odoo.exceptions import ValidationError
+import logging
+
+from ..reporting import insert_from_reporting, reporting_cursor
+
+_logger = logging.getLogger(__name__)
+
+# Tranches d'ancienneté en jours de retard après l'échéance : (suffixe, min, max)
+AGING_BUCKETS = [
+    ('not_due', None, 0),
+    ('1_30', 1, 30),
+    ('31_60', 31, 60),
+    ('61_90', 61, 90),
+    ('90_plus', 91, None),
+]
+
+# Côtés de la balance âgée : (préfixe, type de compte, signe appliqué au reste dû)
+AGING_SIDES = [
+    ('receivable', 'asset_receivable', 1),
+    ('payable', 'liability_payable', -1),
+]
+
+AGING_AMOUNT_COLUMNS = [
+    f'{side}_{suffix}'
+    for side, _account_type, _sign in AGING_SIDES
+    for suffix in ['total'] + [bucket[0] for bucket in AGING_BUCKETS]
+]
+
+AGING_COLUMNS = ['level', 'company_id', 'partner_id'] + AGING_AMOUNT_COLUMNS + ['sales', 'purchases', 'dso', 'dpo']
+
+
+def _bucket_condition(low, high):
+    conditions = []
+    if low is not None:
+        conditions.append(f"x.age >= {int(low)}")
+    if high is not None:
+        conditions.append(f"x.age <= {int(high)}")
+    return ' AND '.join(conditions)
+
+
+class AccountAging(models.AbstractModel):
+    _name = 'account.aging'
+    _description = 'Balance âgée clients et fournisseurs'
+
+    @api.model
+    def _get_aging_sql(self, companies, date=None, partners=None, by_partner=True, period_days=365):
+        """Requête de balance âgée : (sql, paramètres) produisant AGING_COLUMNS
+
+        Une seule agrégation sur les lignes non lettrées des comptes clients
+        et fournisseurs : chaque tranche est une somme conditionnelle (CASE)
+        sur le nombre de jours écoulés depuis l'échéance. Les factures de la
+        période `period_days` sont ajoutées à la même agrégation pour le
+        DSO / DPO. Avec `by_partner`, les lignes par partenaire et le total
+        par société sont produits ensemble (GROUPING SETS).
+
+        Les restes dus sont ceux du jour : `date` ne sert qu'à calculer
+        l'ancienneté.
+        """
+        date = date or fields.Date.context_today(self)
+        partner_clause = "AND {alias}.{field} = ANY(%s)" if partners is not None else ""
+        partner_params = [partners.ids] if partners is not None else []
+
+        amounts = []
+        for side, account_type, sign in AGING_SIDES:
+            amounts.append(
+                f"{sign} * SUM(CASE WHEN x.account_type = '{account_type}' "
+                f"THEN x.residual ELSE 0 END) AS {side}_total"
+            )
+            for suffix, low, high in AGING_BUCKETS:
+                amounts.append(
+                    f"{sign} * SUM(CASE WHEN x.account_type = '{account_type}' AND "
+                    f"{_bucket_condition(low, high)} THEN x.residual ELSE 0 END) AS {side}_{suffix}"
+                )
+
+        if by_partner:
+            level = "CASE WHEN GROUPING(x.partner_id) = 1 THEN 'company' ELSE 'partner' END"
+            grouping = "GROUPING SETS ((x.company_id, x.partner_id), (x.company_id))"
+            partner = "x.partner_id"
+        else:
+            level = "'company'"
+            grouping = "x.company_id"
+            partner = "NULL::integer"
+
+        query = """
+            SELECT g.*,
+                   CASE WHEN g.sales > 0 THEN ROUND((g.receivable_total / g.sales * %s)::numeric, 1) END AS dso,
+                   CASE WHEN g.purchases > 0 THEN ROUND((g.payable_total / g.purchases * %s)::numeric, 1) END AS dpo
+              FROM (
+                    SELECT {level} AS level,
+                           x.company_id,
+                           {partner} AS partner_id,
+                           {amounts},
+                           SUM(x.sales) AS sales,
+                           SUM(x.purchases) AS purchases
+                      FROM (
+                            SELECT l.company_id, l.partner_id, a.account_type,
+                                   %s::date - COALESCE(l.date_maturity, l.date) AS age,
+                                   l.amount_residual AS residual,
+                                   0.0 AS sales, 0.0 AS purchases
+                              FROM account_move_line l
+                              JOIN account_account a ON a.id = l.account_id
+                             WHERE l.company_id = ANY(%s)
+                               AND a.account_type IN ('asset_receivable', 'liability_payable')
+                               AND l.parent_state = 'posted'
+                               AND NOT l.reconciled
+                               AND l.amount_residual != 0
+                               {line_partner}
+                             UNION ALL
+                            SELECT m.company_id, m.commercial_partner_id, NULL, 0, 0.0,
+                                   CASE WHEN m.move_type IN ('out_invoice', 'out_refund')
+                                        THEN m.amount_total_signed ELSE 0.0 END,
+                                   CASE WHEN m.move_type IN ('in_invoice', 'in_refund')
+                                        THEN -m.amount_total_signed ELSE 0.0 END
+                              FROM account_move m
+                             WHERE m.company_id = ANY(%s)
+                               AND m.state = 'posted'
+                               AND m.move_type IN ('out_invoice', 'out_refund', 'in_invoice', 'in_refund')
+                               AND m.invoice_date > %s::date - %s
+                               AND m.invoice_date <= %s
+                               {move_partner}
+                           ) x
+                     GROUP BY {grouping}
+                   ) g
+        """.format(
+            level=level,
+            partner=partner,
+            amounts=',\n                           '.join(amounts),
+            grouping=grouping,
+            line_partner=partner_clause.format(alias='l', field='partner_id'),
+            move_partner=partner_clause.format(alias='m', field='commercial_partner_id'),
+        )
+        params = (
+            [period_days, period_days, date, companies.ids] + partner_params
+            + [companies.ids, date, period_days, date] + partner_params
+        )
+        return query, params
+
+    @api.model
+    def _flush_aging(self):
+        self.env['account.move.line'].flush_model(
+            ['account_id', 'partner_id', 'date', 'date_maturity', 'amount_residual', 'reconciled', 'parent_state']
+        )
+        self.env['account.move'].flush_model(
+            ['commercial_partner_id', 'move_type', 'state', 'invoice_date', 'amount_total_signed']
+        )
+
+    @api.model
+    def _get_aging(self, companies, date=None, partners=None, by_partner=True, period_days=365):
+        """Balance âgée en dictionnaires (une entrée par ligne de AGING_COLUMNS)"""
+        self._flush_aging()
+        query, params = self._get_aging_sql(companies, date, partners, by_partner, period_days)
+        with reporting_cursor(self.env) as cr:
+            cr.execute(query, params)
+            return cr.dictfetchall()
+
+
+class AccountAgingReport(models.TransientModel):
+    _name = 'account.aging.report'
+    _description = 'Balance âgée du portefeuille'
+
+    date = fields.Date(
+        string='Ancienneté au',
+        required=True,
+        default=fields.Date.context_today
+    )
+
+    company_ids = fields.Many2many(
+        'res.company',
+        string='Sociétés',
+        required=True,
+        default=lambda self: self.env.companies
+    )
+
+    by_partner = fields.Boolean(
+        string='Détail par partenaire',
+        default=True
+    )
+
+    period_days = fields.Integer(
+        string='Période DSO / DPO (jours)',
+        default=365,
+        help="Chiffre d'affaires et achats des N derniers jours utilisés pour le DSO et le DPO"
+    )
+
+    line_ids = fields.One2many(
+        'account.aging.report.line',
+        'report_id',
+        string='Lignes',
+        readonly=True
+    )
+
+    @api.constrains('period_days')
+    def _check_period_days(self):
+        for report in self:
+            if report.period_days <= 0:
+                raise ValidationError(_("La période DSO / DPO doit être positive."))
+
+    def action_compute(self):
+        """Balance âgée de toutes les sociétés sélectionnées en une requête
+
+        Le résultat est inséré directement dans les lignes du rapport
+        (INSERT ... SELECT) : rien ne transite par Python, quel que soit le
+        nombre de clients du cabinet. Avec un réplica de lecture, la requête
+        y est exécutée et ses lignes insérées par lots.
+        """
+        self.ensure_one()
+        Aging = self.env['account.aging']
+        Aging._flush_aging()
+        self.line_ids.unlink()
+
+        query, params = Aging._get_aging_sql(
+            self.company_ids, self.date, by_partner=self.by_partner, period_days=self.period_days
+        )
+        now = fields.Datetime.now()
+        count = insert_from_reporting(self.env, 'account_aging_report_line', AGING_COLUMNS, query, params, {
+            'report_id': self.id,
+            'create_uid': self.env.uid,
+            'create_date': now,
+            'write_uid': self.env.uid,
+            'write_date': now,
+        })
+        _logger.info(f"Balance âgée: {count} lignes pour {len(self.company_ids)} sociétés")
+        self.env['account.aging.report.line'].invalidate_model()
+
+        return {
+            'name': _('Balance âgée au %s') % self.date.strftime('%d/%m/%Y'),
+            'type': 'ir.actions.act_window',
+            'res_model': 'account.aging.report.line',
+            'view_mode': 'tree,pivot',
+            'domain': [('report_id', '=', self.id)],
+            'context': {'search_default_level_company': 1} if self.by_partner else {},
+        }
+
+
+class AccountAgingReportLine(models.TransientModel):
+    _name = 'account.aging.report.line'
+    _description = 'Ligne de balance âgée'
+    _order = 'company_id, level, receivable_total desc'
+
+    report_id = fields.Many2one(
+        'account.aging.report',
+        string='Rapport',
+        required=True,
+        ondelete='cascade',
+        index=True
+    )
+
+    level = fields.Selection([
+        ('company', 'Société'),
+        ('partner', 'Partenaire'),
+    ], string='Niveau')
+
+    company_id = fields.Many2one('res.company', string='Société')
+    partner_id = fields.Many2one('res.partner', string='Partenaire')
+    currency_id = fields.Many2one(related='company_id.currency_id', string='Devise')
+
+    receivable_total = fields.Monetary(string='Créances', currency_field='currency_id')
+    receivable_not_due = fields.Monetary(string='Créances non échues', currency_field='currency_id')
+    receivable_1_30 = fields.Monetary(string='Créances 0-30 j', currency_field='currency_id')
+    receivable_31_60 = fields.Monetary(string='Créances 31-60 j', currency_field='currency_id')
+    receivable_61_90 = fields.Monetary(string='Créances 61-90 j', currency_field='currency_id')
+    receivable_90_plus = fields.Monetary(string='Créances + 90 j', currency_field='currency_id')
+
+    payable_total = fields.Monetary(string='Dettes', currency_field='currency_id')
+    payable_not_due = fields.Monetary(string='Dettes non échues', currency_field='currency_id')
+    payable_1_30 = fields.Monetary(string='Dettes 0-30 j', currency_field='currency_id')
+    payable_31_60 = fields.Monetary(string='Dettes 31-60 j', currency_field='currency_id')
+    payable_61_90 = fields.Monetary(string='Dettes 61-90 j', currency_field='currency_id')
+    payable_90_plus = fields.Monetary(string='Dettes + 90 j', currency_field='currency_id')
+
+    sales = fields.Monetary(string='Ventes de la période', currency_field='currency_id')
+    purchases = fields.Monetary(string='Achats de la période', currency_field='currency_id')
+
+    dso = fields.Float(
+        string='DSO (jours)',
+        group_operator=False,
+        help="Délai moyen de règlement clients : créances / ventes de la période x jours"
+    )
+
+    dpo = fields.Float(
+        string='DPO (jours)',
+        group_operator=False,
+        help="Délai moyen de règlement fournisseurs : dettes / achats de la période x jours"
+    )
@@ -1,9 +1,48 @@
 # -*- coding: utf-8 -*-
 
-from odoo import models, fields, api, _
+from odoo import models, fields, api, tools, _
 from odoo.exceptions import UserError, ValidationError
+from odoo.tools.sql import column_exists, create_column
+from collections import defaultdict
+from ..indexes import create_indexes
+import hashlib
+import logging
 import re
 
+_logger = logging.getLogger(__name__)
+
+# Champs dont la modification sur une criture valide change les soldes
+PERIOD_CLOSE_MOVE_FIELDS = {'date', 'journal_id', 'company_id', 'line_ids', 'state'}
+PERIOD_CLOSE_LINE_FIELDS = {'account_id', 'debit', 'credit', 'balance'}
+
+# Anomalies bloquantes pour le FEC, dans l'ordre de contrle
+FEC_COMPLIANCE_ERRORS = [
+    ('name', "Numro d'criture manquant"),
+    ('date', "Date manquante"),
+    ('journal', "Journal ou code journal manquant"),
+    ('lines', "Aucune ligne d'criture"),
+    ('line_account', "Ligne sans compte"),
+    ('line_label', "Ligne sans libell"),
+    ('line_amount', "Ligne au dbit et au crdit"),
+    ('unbalanced', "criture dsquilibre"),
+]
+
+
+def fec_content_hash(journal_code, date, ref, lines):
+    """Empreinte de dduplication d'une criture (FEC import ou criture Odoo)
+
+    Porte sur le contenu comptable : code journal, date, rfrence de pice
+    et lignes (compte, dbit, crdit) tries, sans le numro d'criture qui
+    diffre d'un systme  l'autre. `lines` : itrable de (compte, dbit, crdit).
+    """
+    content = '|'.join([
+        journal_code or '',
+        date.isoformat() if date else '',
+        ref or '',
+        ';'.join(sorted(f"{code or ''}:{debit:.2f}:{credit:.2f}" for code, debit, credit in lines)),
+    ])
+    return hashlib.md5(content.encode()).hexdigest()
+
 
 class AccountMove(models.Model):
     _inherit = 'account.move'
@@ -41,7 +80,8 @@ class AccountMove(models.Model):
         string='Hash FEC',
         compute='_compute_fec_hash',
         store=True,
-        help="Hash pour dduplication FEC"
+        index=True,
+        help="Empreinte du contenu (journal, date, pice, lignes) pour la dduplication FEC"
     )
 
     is_fec_exported = fields.Boolean(
@@ -51,44 +91,209 @@ class AccountMove(models.Model):
         help="Indique si l'criture a t exporte dans un FEC"
     )
 
+    fec_compliance_state = fields.Selection([
+        ('compliant', 'Conforme'),
+        ('non_compliant', 'Non conforme'),
+    ], string='Conformit FEC',
+        compute='_compute_fec_compliance',
+        store=True,
+        help="Maintenue  chaque modification de l'criture ou de ses lignes"
+    )
+
+    fec_compliance_error = fields.Selection(
+        FEC_COMPLIANCE_ERRORS,
+        string='Anomalie FEC',
+        compute='_compute_fec_compliance',
+        store=True,
+        help="Premire anomalie qui bloque l'export FEC de l'criture"
+    )
+
+    def _auto_init(self):
+        """Calcule en SQL la conformit des critures existantes  l'installation
+
+        Sans cela, l'ORM recalculerait les deux champs criture par criture
+        sur toute la table.
+        """
+        if not column_exists(self.env.cr, 'account_move', 'fec_compliance_state'):
+            create_column(self.env.cr, 'account_move', 'fec_compliance_state', 'varchar')
+            create_column(self.env.cr, 'account_move', 'fec_compliance_error', 'varchar')
+            self._fill_fec_compliance()
+        return super(AccountMove, self)._auto_init()
+
+    def init(self):
+        super(AccountMove, self).init()
+        # Index partiel : seules les critures non conformes y figurent, le
+        # contrle d'une priode reste une seule lecture d'index
+        tools.create_index(
+            self._cr, 'account_move_fec_non_compliant_idx', self._table,
+            ['company_id', 'date'], where="fec_compliance_state = 'non_compliant'"
+        )
+        create_indexes(self._cr, self._table)
+
+    def _fill_fec_compliance(self):
+        """Mmes rgles que _get_fec_issues, appliques en une requte"""
+        self.env.cr.execute("""
+            WITH lines AS (
+                SELECT move_id,
+                       COUNT(*) FILTER (WHERE account_id IS NULL) AS missing_account,
+                       COUNT(*) FILTER (WHERE name IS NULL OR name = '') AS missing_label,
+                       COUNT(*) FILTER (WHERE debit > 0 AND credit > 0) AS debit_and_credit,
+                       SUM(debit) AS debit,
+                       SUM(credit) AS credit
+                  FROM account_move_line
+                 GROUP BY move_id
+            ), errors AS (
+                SELECT m.id,
+                       CASE
+                           WHEN m.name IS NULL OR m.name = '/' THEN 'name'
+                           WHEN m.date IS NULL THEN 'date'
+                           WHEN j.code IS NULL OR j.code = '' THEN 'journal'
+                           WHEN l.move_id IS NULL THEN 'lines'
+                           WHEN l.missing_account > 0 THEN 'line_account'
+                           WHEN l.missing_label > 0 THEN 'line_label'
+                           WHEN l.debit_and_credit > 0 THEN 'line_amount'
+                           WHEN ABS(l.debit - l.credit) > 0.01 THEN 'unbalanced'
+                       END AS error
+                  FROM account_move m
+                  LEFT JOIN account_journal j ON j.id = m.journal_id
+                  LEFT JOIN lines l ON l.move_id = m.id
+            )
+            UPDATE account_move m
+               SET fec_compliance_error = e.error,
+                   fec_compliance_state = CASE WHEN e.error IS NULL THEN 'compliant' ELSE 'non_compliant' END
+              FROM errors e
+             WHERE e.id = m.id
+        """)
+        _logger.info(f"Conformit FEC initialise pour {self.env.cr.rowcount} critures")
+
     def _get_fiscal_years(self):
         """Retourne les exercices fiscaux disponibles"""
         current_year = fields.Date.today().year
         years = []
-        for i in range(10):  # 10 dernires annes
+        # N+1 : l'exercice dcal en cours est nomm d'aprs son anne de clture
+        for i in range(-1, 10):  # 10 dernires annes
             year = current_year - i
             years.append((str(year), str(year)))
         return years
 
+    # Le changement de dbut d'exercice d'une socit ne passe pas par la
+    # dpendance 'company_id.french_fiscal_year_start' : il est appliqu en
+    # tche de fond par fiscal.year.recompute (voir res.company.write)
     @api.depends('date', 'company_id')
     def _compute_french_fiscal_year(self):
-        """Calcule l'exercice fiscal franais"""
+        """Calcule l'exercice fiscal franais selon le dbut d'exercice de la socit"""
         for move in self:
             if move.date:
-                # Par dfaut, exercice = anne civile
-                # TODO: Grer les exercices dcals depuis res.company
-                move.french_fiscal_year = str(move.date.year)
+                move.french_fiscal_year = move.company_id._get_french_fiscal_year(move.date)
             else:
                 move.french_fiscal_year = False
 
-    @api.depends('name', 'date', 'journal_id', 'line_ids')
+    @api.depends('date', 'ref', 'journal_id.code', 'line_ids.account_id.code',
+                 'line_ids.debit', 'line_ids.credit', 'line_ids.display_type')
     def _compute_fec_hash(self):
-        """Calcule un hash unique pour l'criture (FEC deduplication)"""
-        import hashlib
+        """Calcule l'empreinte de dduplication FEC (voir fec_content_hash)"""
+        # Lignes de toutes les critures lues en une fois
+        lines_by_move = defaultdict(list)
+        for line in self.line_ids:
+            if line.display_type not in ('line_section', 'line_note'):
+                lines_by_move[line.move_id.id].append((line.account_id.code, line.debit, line.credit))
         for move in self:
-            if move.name and move.date:
-                # Hash bas sur : nom + date + journal + montant total
-                hash_string = f"{move.name}_{move.date}_{move.journal_id.id}"
-                move.fec_match_hash = hashlib.md5(hash_string.encode()).hexdigest()
+            if move.date and lines_by_move[move.id]:
+                move.fec_match_hash = fec_content_hash(
+                    move.journal_id.code, move.date, move.ref, lines_by_move[move.id]
+                )
             else:
                 move.fec_match_hash = False
 
+    @api.model
+    def find_fec_duplicates(self, company_id, hashes):
+        """critures existantes par empreinte : {empreinte: [ids]}
+
+        Une lecture d'index par empreinte ;  utiliser avant l'import d'un
+        FEC externe ou d'critures bancaires (empreintes calcules avec
+        fec_content_hash).
+        """
+        hashes = list(set(filter(None, hashes)))
+        if not hashes:
+            return {}
+        self.flush_model(['fec_match_hash', 'company_id'])
+        self.env.cr.execute("""
+            SELECT fec_match_hash, ARRAY_AGG(id ORDER BY id)
+              FROM account_move
+             WHERE fec_match_hash = ANY(%s)
+               AND company_id = %s
+             GROUP BY fec_match_hash
+        """, [hashes, company_id])
+        return dict(self.env.cr.fetchall())
+
+    def _fill_fec_match_hash(self):
+        """Recalcule en SQL l'empreinte de toutes les critures (mme contenu que fec_content_hash)"""
+        self.env.cr.execute("""
+            WITH lines AS (
+                SELECT l.move_id,
+                       STRING_AGG(
+                           COALESCE(a.code, '') || ':' || ROUND(l.debit::numeric, 2) || ':' || ROUND(l.credit::numeric, 2),
+                           ';' ORDER BY (COALESCE(a.code, '') || ':' || ROUND(l.debit::numeric, 2) || ':'
+                                         || ROUND(l.credit::numeric, 2)) COLLATE "C"
+                       ) AS content
+                  FROM account_move_line l
+                  LEFT JOIN account_account a ON a.id = l.account_id
+                 WHERE COALESCE(l.display_type, '') NOT IN ('line_section', 'line_note')
+                 GROUP BY l.move_id
+            ), hashes AS (
+                SELECT m.id,
+                       CASE WHEN m.date IS NOT NULL AND lines.content IS NOT NULL THEN MD5(
+                           COALESCE(j.code, '') || '|' || TO_CHAR(m.date, 'YYYY-MM-DD') || '|'
+                           || COALESCE(m.ref, '') || '|' || lines.content
+                       ) END AS hash
+                  FROM account_move m
+                  JOIN account_journal j ON j.id = m.journal_id
+                  LEFT JOIN lines ON lines.move_id = m.id
+            )
+            UPDATE account_move m
+               SET fec_match_hash = hashes.hash
+              FROM hashes
+             WHERE hashes.id = m.id
+               AND m.fec_match_hash IS DISTINCT FROM hashes.hash
+        """)
+        _logger.info(f"Empreintes FEC recalcules pour {self.env.cr.rowcount} critures")
+
     @api.depends('fec_export_date')
     def _compute_is_fec_exported(self):
         """Vrifie si l'criture a t exporte"""
         for move in self:
             move.is_fec_exported = bool(move.fec_export_date)
 
+    @api.depends('name', 'date', 'journal_id.code',
+                 'line_ids.account_id', 'line_ids.name', 'line_ids.debit', 'line_ids.credit')
+    def _compute_fec_compliance(self):
+        """Conformit FEC maintenue au fil de l'eau (mmes rgles que l'export)"""
+        for move in self:
+            issues = move._get_fec_issues()
+            move.fec_compliance_state = 'non_compliant' if issues else 'compliant'
+            move.fec_compliance_error = issues[0][0] if issues else False
+
+    @api.model
+    def get_fec_compliance_summary(self, company_id, date_from, date_to, include_draft=False):
+        """critures non conformes d'une priode, par anomalie
+
+        Retourne {'non_compliant': nombre, 'errors': {code: nombre}}  partir
+        de l'tat stock, sans relire les lignes.
+        """
+        domain = [
+            ('company_id', '=', company_id),
+            ('date', '>=', date_from),
+            ('date', '<=', date_to),
+            ('fec_compliance_state', '=', 'non_compliant'),
+        ]
+        if not include_draft:
+            domain.append(('state', '=', 'posted'))
+        errors = {
+            error: count
+            for error, count in self._read_group(domain, ['fec_compliance_error'], ['__count'])
+        }
+        return {'non_compliant': sum(errors.values()), 'errors': errors}
+
     def action_post(self):
         """Override pour valider la conformit franaise avant validation"""
         # Vrifications spcifiques franaises
@@ -130,45 +335,88 @@ class AccountMove(models.Model):
 
         return super(AccountMove, self).button_draft()
 
+    def _post(self, soft=True):
+        posted = super(AccountMove, self)._post(soft=soft)
+        posted._check_period_close()
+        return posted
+
+    def write(self, vals):
+        # Contrle avant (ancienne date) et aprs (nouvelle date) la modification
+        posted = self.filtered(lambda m: m.state == 'posted') if PERIOD_CLOSE_MOVE_FIELDS & set(vals) else self.browse()
+        posted._check_period_close()
+        res = super(AccountMove, self).write(vals)
+        posted._check_period_close()
+        return res
+
+    def _check_period_close(self):
+        """Refuse les critures valides dates dans une priode clture
+
+        S'applique  tous les utilisateurs, conseillers compris : les soldes de
+        clture (account.period.close) servent de point de dpart aux rapports,
+        une criture passe aprs coup dans la priode en serait absente.
+        """
+        closes = self.env['account.period.close'].sudo()
+        for company in self.company_id:
+            close = closes._get_last_close(company)
+            if not close:
+                continue
+            moves = self.filtered(lambda m: m.company_id == company and m.date and m.date <= close.date_to)
+            if moves:
+                raise UserError(_(
+                    "L'criture %s est date du %s, dans une priode clture (%s).\n"
+                    "Datez-la aprs le %s ou faites rouvrir la clture par l'expert-comptable."
+                ) % (
+                    moves[0].name, moves[0].date.strftime('%d/%m/%Y'), close.name,
+                    close.date_to.strftime('%d/%m/%Y'),
+                ))
+
     def _check_fec_compliance(self):
         """Vrifie la conformit FEC de l'criture"""
         self.ensure_one()
+        return [message for _code, message in self._get_fec_issues()]
+
+    def _get_fec_issues(self):
+        """Anomalies FEC de l'criture : liste de (code, message)"""
+        self.ensure_one()
         errors = []
 
         # 1. Numro d'criture obligatoire
         if not self.name or self.name == '/':
-            errors.append("Numro d'criture manquant")
+            errors.append(('name', "Numro d'criture manquant"))
 
         # 2. Date obligatoire
         if not self.date:
-            errors.append("Date manquante")
+            errors.append(('date', "Date manquante"))
 
         # 3. Journal obligatoire avec code
         if not self.journal_id or not self.journal_id.code:
-            errors.append("Journal ou code journal manquant")
+            errors.append(('journal', "Journal ou code journal manquant"))
 
         # 4. Lignes d'criture
         if not self.line_ids:
-            errors.append("Aucune ligne d'criture")
+            errors.append(('lines', "Aucune ligne d'criture"))
 
+        line_errors = {'line_account': [], 'line_label': [], 'line_amount': []}
         for line in self.line_ids:
             # Compte obligatoire
             if not line.account_id:
-                errors.append(f"Ligne {line.id}: compte manquant")
+                line_errors['line_account'].append(f"Ligne {line.id}: compte manquant")
 
             # Libell obligatoire
             if not line.name:
-                errors.append(f"Ligne {line.id}: libell manquant")
+                line_errors['line_label'].append(f"Ligne {line.id}: libell manquant")
 
             # Montant dbit OU crdit (pas les deux)
             if line.debit > 0 and line.credit > 0:
-                errors.append(f"Ligne {line.id}: dbit et crdit simultans")
+                line_errors['line_amount'].append(f"Ligne {line.id}: dbit et crdit simultans")
+        for code, messages in line_errors.items():
+            errors += [(code, message) for message in messages]
 
         # 5. quilibre dbit/crdit
         total_debit = sum(self.line_ids.mapped('debit'))
         total_credit = sum(self.line_ids.mapped('credit'))
         if abs(total_debit - total_credit) > 0.01:
-            errors.append(f"criture dsquilibre: dbit={total_debit}, crdit={total_credit}")
+            errors.append(('unbalanced', f"criture dsquilibre: dbit={total_debit}, crdit={total_credit}"))
 
         return errors
 
@@ -212,6 +460,15 @@ class AccountMoveLine(models.Model):
         help="Numro squentiel de la ligne dans l'export FEC"
     )
 
+    def init(self):
+        super(AccountMoveLine, self).init()
+        create_indexes(self._cr, self._table)
+
+    def write(self, vals):
+        if PERIOD_CLOSE_LINE_FIELDS & set(vals):
+            self.move_id.filtered(lambda m: m.state == 'posted')._check_period_close()
+        return super(AccountMoveLine, self).write(vals)
+
     def _check_fec_line_compliance(self):
         """Vrifie la conformit FEC d'une ligne d'criture"""
         self.ensure_one()
@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, tools, _
+from odoo.exceptions import UserError, ValidationError
+from dateutil.relativedelta import relativedelta
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class AccountPeriodClose(models.Model):
+    _name = 'account.period.close'
+    _description = 'Clôture de période comptable'
+    _order = 'company_id, date_to desc'
+
+    name = fields.Char(
+        string='Nom',
+        compute='_compute_name',
+        store=True
+    )
+
+    company_id = fields.Many2one(
+        'res.company',
+        string='Société',
+        required=True,
+        default=lambda self: self.env.company
+    )
+
+    period_type = fields.Selection([
+        ('month', 'Mois'),
+        ('fiscal_year', 'Exercice'),
+    ], string='Type de clôture', default='month', required=True)
+
+    date_from = fields.Date(
+        string='Du',
+        required=True
+    )
+
+    date_to = fields.Date(
+        string='Au',
+        required=True
+    )
+
+    state = fields.Selection([
+        ('draft', 'Brouillon'),
+        ('closed', 'Clôturée'),
+    ], string='État', default='draft', required=True, readonly=True)
+
+    close_date = fields.Datetime(
+        string='Clôturée le',
+        readonly=True
+    )
+
+    closed_by_id = fields.Many2one(
+        'res.users',
+        string='Clôturée par',
+        readonly=True
+    )
+
+    balance_ids = fields.One2many(
+        'account.period.close.balance',
+        'close_id',
+        string='Soldes de clôture',
+        readonly=True
+    )
+
+    account_count = fields.Integer(
+        string='Comptes',
+        readonly=True,
+        help="Nombre de comptes dont le solde de clôture est enregistré"
+    )
+
+    @api.depends('company_id', 'period_type', 'date_to')
+    def _compute_name(self):
+        for record in self:
+            if not record.date_to:
+                record.name = _('Clôture')
+            elif record.period_type == 'fiscal_year':
+                record.name = _('Clôture exercice %s') % record.company_id._get_french_fiscal_year(record.date_to)
+            else:
+                record.name = _('Clôture %s') % record.date_to.strftime('%m/%Y')
+
+    @api.onchange('period_type', 'date_to')
+    def _onchange_period(self):
+        if not self.date_to:
+            return
+        if self.period_type == 'month':
+            self.date_from = self.date_to.replace(day=1)
+        else:
+            self.date_from = self.date_to + relativedelta(days=1, years=-1)
+
+    @api.constrains('date_from', 'date_to')
+    def _check_dates(self):
+        for record in self:
+            if record.date_from > record.date_to:
+                raise ValidationError(_("La date de début doit être antérieure à la date de fin."))
+
+    def action_close(self):
+        """Clôture la période : soldes figés puis verrouillage des écritures"""
+        for record in self.filtered(lambda r: r.state == 'draft'):
+            previous = self._get_last_close(record.company_id)
+            # La clôture d'exercice suit celle de son dernier mois, à la même
+            # date : elle repart de ses soldes (aucune ligne entre les deux)
+            follows_month = (
+                record.period_type == 'fiscal_year'
+                and previous.period_type == 'month'
+                and previous.date_to == record.date_to
+            )
+            if previous and previous.date_to >= record.date_to and not follows_month:
+                raise UserError(_(
+                    "La période est déjà couverte par la clôture « %s »."
+                ) % previous.name)
+            if self.env['account.move'].search_count([
+                ('company_id', '=', record.company_id.id),
+                ('state', '=', 'draft'),
+                ('date', '<=', record.date_to),
+            ], limit=1):
+                raise UserError(_(
+                    "Des écritures en brouillon existent jusqu'au %s : "
+                    "validez-les ou supprimez-les avant de clôturer."
+                ) % record.date_to.strftime('%d/%m/%Y'))
+
+            record._snapshot_balances(previous)
+            record.write({
+                'state': 'closed',
+                'close_date': fields.Datetime.now(),
+                'closed_by_id': self.env.user.id,
+            })
+            record._apply_lock_date()
+            _logger.info(f"Clôture {record.name} ({record.company_id.name}): {record.account_count} comptes")
+        return True
+
+    def action_reopen(self):
+        """Rouvre la dernière clôture d'une société (expert-comptable)"""
+        if not self.env.user.has_group('french_accounting.group_french_accounting_manager'):
+            raise UserError(_("Seul un expert-comptable peut rouvrir une période clôturée."))
+        for record in self.filtered(lambda r: r.state == 'closed'):
+            if record != self._get_last_close(record.company_id):
+                raise UserError(_("Seule la dernière clôture de la société peut être rouverte."))
+            self.env.cr.execute(
+                "DELETE FROM account_period_close_balance WHERE close_id = %s", [record.id]
+            )
+            record.write({
+                'state': 'draft',
+                'close_date': False,
+                'closed_by_id': False,
+                'account_count': 0,
+            })
+            record._restore_lock_date()
+        self.env['account.period.close.balance'].invalidate_model()
+        return True
+
+    def unlink(self):
+        if any(record.state == 'closed' for record in self):
+            raise UserError(_("Rouvrez la période avant de supprimer sa clôture."))
+        return super(AccountPeriodClose, self).unlink()
+
+    @api.model
+    def _get_last_close(self, company, before=None):
+        """Dernière clôture validée de la société (antérieure à `before` si fourni)
+
+        À date égale, la clôture d'exercice passe avant celle du mois.
+        """
+        domain = [('company_id', '=', company.id), ('state', '=', 'closed')]
+        if before:
+            domain.append(('date_to', '<', before))
+        return self.search(domain, order='date_to desc, period_type, id desc', limit=1)
+
+    def _snapshot_balances(self, previous):
+        """Soldes cumulés par compte à la date de fin, en une requête INSERT ... SELECT
+
+        Seules les lignes postérieures à la clôture précédente sont lues : ses
+        soldes servent de point de départ.
+        """
+        self.ensure_one()
+        self.env['account.move.line'].flush_model(['account_id', 'date', 'debit', 'credit', 'parent_state'])
+        self.env.cr.execute("""
+            INSERT INTO account_period_close_balance
+                        (close_id, company_id, account_id, date, debit, credit, balance)
+            SELECT %(close_id)s, %(company_id)s, account_id, %(date_to)s,
+                   SUM(debit), SUM(credit), SUM(debit) - SUM(credit)
+              FROM (
+                    SELECT account_id, debit, credit
+                      FROM account_period_close_balance
+                     WHERE close_id = %(previous_id)s
+                     UNION ALL
+                    SELECT account_id, debit, credit
+                      FROM account_move_line
+                     WHERE company_id = %(company_id)s
+                       AND account_id IS NOT NULL
+                       AND parent_state = 'posted'
+                       AND date <= %(date_to)s
+                       AND date > %(previous_date)s
+                   ) lines
+             GROUP BY account_id
+        """, {
+            'close_id': self.id,
+            'company_id': self.company_id.id,
+            'date_to': self.date_to,
+            'previous_id': previous.id or 0,
+            'previous_date': previous.date_to or '0001-01-01',
+        })
+        self.account_count = self.env.cr.rowcount
+        self.env['account.period.close.balance'].invalidate_model()
+
+    def _apply_lock_date(self):
+        """Verrouille la période : toutes les écritures pour un exercice, hors conseillers pour un mois
+
+        Les conseillers restent bloqués dans une période clôturée par
+        account.move._check_period_close.
+        """
+        self.ensure_one()
+        field = 'fiscalyear_lock_date' if self.period_type == 'fiscal_year' else 'period_lock_date'
+        company = self.company_id.sudo()
+        if not company[field] or company[field] < self.date_to:
+            company.write({field: self.date_to})
+
+    def _restore_lock_date(self):
+        """Ramène le verrouillage à la clôture précédente du même type"""
+        self.ensure_one()
+        field = 'fiscalyear_lock_date' if self.period_type == 'fiscal_year' else 'period_lock_date'
+        company = self.company_id.sudo()
+        if company[field] != self.date_to:
+            return
+        previous = self.search([
+            ('company_id', '=', self.company_id.id),
+            ('state', '=', 'closed'),
+            ('period_type', '=', self.period_type),
+            ('date_to', '<', self.date_to),
+        ], order='date_to desc', limit=1)
+        company.write({field: previous.date_to or False})
+
+    @api.model
+    def _get_opening_balances(self, company, date):
+        """Point de départ des rapports à la date `date`
+
+        Retourne (date de la clôture, {compte: (débit, crédit, solde)}) pour la
+        dernière clôture antérieure à `date`, ou (False, {}) s'il n'y en a pas :
+        les rapports ne lisent alors que les lignes postérieures à cette date.
+        """
+        close = self._get_last_close(company, before=date)
+        if not close:
+            return False, {}
+        self.env.cr.execute("""
+            SELECT account_id, debit, credit, balance
+              FROM account_period_close_balance
+             WHERE close_id = %s
+        """, [close.id])
+        return close.date_to, {
+            account_id: (debit, credit, balance)
+            for account_id, debit, credit, balance in self.env.cr.fetchall()
+        }
+
+    @api.model
+    def _get_balances_sql(self, company, date_to):
+        """Sous-requête des soldes cumulés par compte à `date_to`
+
+        Retourne (sql, paramètres) produisant (account_id, debit, credit) :
+        soldes de la dernière clôture + lignes validées postérieures. À
+        réutiliser par les rapports qui agrègent en SQL.
+        """
+        close = self._get_last_close(company, before=date_to + relativedelta(days=1))
+        query = """
+            SELECT account_id, debit, credit
+              FROM account_period_close_balance
+             WHERE close_id = %s
+             UNION ALL
+            SELECT account_id, debit, credit
+              FROM account_move_line
+             WHERE company_id = %s
+               AND account_id IS NOT NULL
+               AND parent_state = 'posted'
+               AND date <= %s
+               AND date > %s
+        """
+        return query, [close.id or 0, company.id, date_to, close.date_to or '0001-01-01']
+
+
+class AccountPeriodCloseBalance(models.Model):
+    _name = 'account.period.close.balance'
+    _description = 'Solde de clôture par compte'
+    _order = 'date desc, account_id'
+    _log_access = False
+
+    close_id = fields.Many2one(
+        'account.period.close',
+        string='Clôture',
+        required=True,
+        ondelete='cascade'
+    )
+
+    company_id = fields.Many2one(
+        'res.company',
+        string='Société',
+        required=True
+    )
+
+    account_id = fields.Many2one(
+        'account.account',
+        string='Compte',
+        required=True
+    )
+
+    date = fields.Date(
+        string='Date de clôture',
+        required=True
+    )
+
+    debit = fields.Float(
+        string='Débit cumulé',
+        digits='Account'
+    )
+
+    credit = fields.Float(
+        string='Crédit cumulé',
+        digits='Account'
+    )
+
+    balance = fields.Float(
+        string='Solde',
+        digits='Account'
+    )
+
+    def init(self):
+        tools.create_index(
+            self._cr, 'account_period_close_balance_close_account_idx', self._table, ['close_id', 'account_id']
+        )
@@ -0,0 +1,504 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError, ValidationError
+from dateutil.relativedelta import relativedelta
+import csv
+import io
+import logging
+import tempfile
+
+import openpyxl
+
+from ..reporting import insert_from_reporting, reporting_cursor
+
+_logger = logging.getLogger(__name__)
+
+# Lignes du grand livre lues par requête (pagination par clé)
+LEDGER_PAGE_SIZE = 5000
+
+LEDGER_COLUMNS = [
+    'Compte', 'Intitulé', 'Date', 'Journal', 'Pièce', 'Libellé', 'Partenaire',
+    'Débit', 'Crédit', 'Solde',
+]
+
+TRIAL_BALANCE_COLUMNS = [
+    'Niveau', 'Compte / regroupement', 'Solde à nouveau', 'Débit', 'Crédit', 'Solde de clôture',
+]
+
+
+# Colonnes de french_trial_balance_line calculées par la requête de la balance
+TRIAL_BALANCE_LINE_COLUMNS = [
+    'level', 'level_sequence', 'account_id', 'account_code', 'account_class', 'journal_id',
+    'opening_balance', 'debit', 'credit', 'closing_balance',
+]
+
+
+class FrenchAccountingReport(models.TransientModel):
+    _name = 'french.accounting.report'
+    _description = 'Balance générale et grand livre'
+
+    report_type = fields.Selection([
+        ('trial_balance', 'Balance générale'),
+        ('general_ledger', 'Grand livre'),
+    ], string='Rapport', required=True, default='trial_balance')
+
+    company_id = fields.Many2one(
+        'res.company',
+        string='Société',
+        required=True,
+        default=lambda self: self.env.company
+    )
+
+    date_from = fields.Date(
+        string='Du',
+        required=True,
+        default=lambda self: fields.Date.today().replace(month=1, day=1)
+    )
+
+    date_to = fields.Date(
+        string='Au',
+        required=True,
+        default=fields.Date.today
+    )
+
+    journal_ids = fields.Many2many(
+        'account.journal',
+        string='Journaux',
+        help="Vide : tous les journaux"
+    )
+
+    line_ids = fields.One2many(
+        'french.trial.balance.line',
+        'report_id',
+        string='Balance',
+        readonly=True
+    )
+
+    @api.constrains('date_from', 'date_to')
+    def _check_dates(self):
+        for report in self:
+            if report.date_from > report.date_to:
+                raise ValidationError(_("La date de début doit être antérieure à la date de fin."))
+
+    # ------------------------------------------------------------------
+    # Soldes d'ouverture
+    # ------------------------------------------------------------------
+
+    def _get_opening_sql(self):
+        """Sous-requête des soldes à nouveau : (account_id, debit, credit)
+
+        Comptes de bilan : soldes cumulés la veille de `date_from` (dernière
+        clôture + lignes postérieures). Comptes de gestion : mouvements de
+        l'exercice antérieurs à `date_from` ; ceux des exercices précédents,
+        qu'Odoo ne solde pas, sont portés sur le compte de résultat non
+        affecté de la société.
+        """
+        self.ensure_one()
+        company = self.company_id
+        Close = self.env['account.period.close']
+        fiscal_year_start = company._get_french_fiscal_year_dates(
+            company._get_french_fiscal_year(self.date_from)
+        )[0]
+        unaffected = self.env['account.account'].search([
+            ('company_id', '=', company.id),
+            ('account_type', '=', 'equity_unaffected'),
+        ], limit=1)
+
+        balance_sheet, balance_sheet_params = Close._get_balances_sql(company, self.date_from - relativedelta(days=1))
+        previous_years, previous_years_params = Close._get_balances_sql(company, fiscal_year_start - relativedelta(days=1))
+        query = """
+            SELECT b.account_id, b.debit, b.credit
+              FROM ({balance_sheet}) b
+              JOIN account_account a ON a.id = b.account_id
+             WHERE LEFT(a.code, 1) NOT IN ('6', '7')
+             UNION ALL
+            SELECT %s, p.debit, p.credit
+              FROM ({previous_years}) p
+              JOIN account_account a ON a.id = p.account_id
+             WHERE LEFT(a.code, 1) IN ('6', '7')
+               AND %s IS NOT NULL
+             UNION ALL
+            SELECT l.account_id, l.debit, l.credit
+              FROM account_move_line l
+              JOIN account_account a ON a.id = l.account_id
+             WHERE l.company_id = %s
+               AND l.parent_state = 'posted'
+               AND l.date >= %s
+               AND l.date < %s
+               AND LEFT(a.code, 1) IN ('6', '7')
+        """.format(balance_sheet=balance_sheet, previous_years=previous_years)
+        params = (
+            balance_sheet_params
+            + [unaffected.id or None] + previous_years_params + [unaffected.id or None]
+            + [company.id, fiscal_year_start, self.date_from]
+        )
+        return query, params
+
+    def _get_period_filter(self, alias='l'):
+        """Clause WHERE des lignes de la période (journaux éventuellement filtrés)"""
+        clause = f"""
+            {alias}.company_id = %s
+            AND {alias}.account_id IS NOT NULL
+            AND {alias}.parent_state = 'posted'
+            AND {alias}.date BETWEEN %s AND %s
+        """
+        params = [self.company_id.id, self.date_from, self.date_to]
+        if self.journal_ids:
+            clause += f" AND {alias}.journal_id = ANY(%s)"
+            params.append(self.journal_ids.ids)
+        return clause, params
+
+    # ------------------------------------------------------------------
+    # Balance générale
+    # ------------------------------------------------------------------
+
+    def action_compute_trial_balance(self):
+        """Balance par compte, par classe, par journal et total en une requête
+
+        Les regroupements sont calculés par GROUPING SETS et insérés
+        directement dans les lignes de la balance : aucune ligne d'écriture
+        ne transite par Python. Avec un réplica de lecture, la requête y est
+        exécutée et seuls les regroupements sont insérés sur le primaire.
+        """
+        self.ensure_one()
+        self.env['account.move.line'].flush_model(
+            ['account_id', 'journal_id', 'date', 'debit', 'credit', 'parent_state']
+        )
+        self.line_ids.unlink()
+
+        opening, opening_params = self._get_opening_sql()
+        period_filter, period_params = self._get_period_filter()
+        query = """
+            SELECT CASE WHEN GROUPING(m.account_id) = 0 THEN 'account'
+                        WHEN GROUPING(m.account_class) = 0 THEN 'class'
+                        WHEN GROUPING(m.journal_id) = 0 THEN 'journal'
+                        ELSE 'total'
+                   END AS level,
+                   CASE WHEN GROUPING(m.account_id) = 0 THEN 1
+                        WHEN GROUPING(m.account_class) = 0 THEN 2
+                        WHEN GROUPING(m.journal_id) = 0 THEN 3
+                        ELSE 4
+                   END AS level_sequence,
+                   m.account_id, m.account_code, m.account_class, m.journal_id,
+                   SUM(m.opening) AS opening_balance, SUM(m.debit) AS debit, SUM(m.credit) AS credit,
+                   SUM(m.opening) + SUM(m.debit) - SUM(m.credit) AS closing_balance
+              FROM (
+                    SELECT movements.*, a.code AS account_code, LEFT(a.code, 1) AS account_class
+                      FROM (
+                            SELECT o.account_id, NULL::integer AS journal_id,
+                                   o.debit - o.credit AS opening, 0.0 AS debit, 0.0 AS credit
+                              FROM ({opening}) o
+                             UNION ALL
+                            SELECT l.account_id, l.journal_id, 0.0, l.debit, l.credit
+                              FROM account_move_line l
+                             WHERE {period_filter}
+                           ) movements
+                      JOIN account_account a ON a.id = movements.account_id
+                   ) m
+             GROUP BY GROUPING SETS (
+                   (m.account_class, m.account_id, m.account_code),
+                   (m.account_class),
+                   (m.journal_id),
+                   ()
+             )
+        """.format(opening=opening, period_filter=period_filter)
+        now = fields.Datetime.now()
+        count = insert_from_reporting(
+            self.env, 'french_trial_balance_line', TRIAL_BALANCE_LINE_COLUMNS, query, opening_params + period_params, {
+                'report_id': self.id,
+                'create_uid': self.env.uid,
+                'create_date': now,
+                'write_uid': self.env.uid,
+                'write_date': now,
+            }
+        )
+        _logger.info(f"Balance générale {self.company_id.name}: {count} lignes")
+        self.env['french.trial.balance.line'].invalidate_model()
+
+        return {
+            'name': _('Balance générale %s - %s') % (
+                self.date_from.strftime('%d/%m/%Y'), self.date_to.strftime('%d/%m/%Y')
+            ),
+            'type': 'ir.actions.act_window',
+            'res_model': 'french.trial.balance.line',
+            'view_mode': 'tree',
+            'domain': [('report_id', '=', self.id)],
+            'context': {'search_default_level_account': 1},
+        }
+
+    # ------------------------------------------------------------------
+    # Grand livre
+    # ------------------------------------------------------------------
+
+    def action_view_general_ledger(self):
+        """Grand livre paginé : lignes d'écritures groupées par compte"""
+        self.ensure_one()
+        domain = [
+            ('company_id', '=', self.company_id.id),
+            ('parent_state', '=', 'posted'),
+            ('date', '>=', self.date_from),
+            ('date', '<=', self.date_to),
+        ]
+        if self.journal_ids:
+            domain.append(('journal_id', 'in', self.journal_ids.ids))
+        return {
+            'name': _('Grand livre'),
+            'type': 'ir.actions.act_window',
+            'res_model': 'account.move.line',
+            'view_mode': 'tree,form',
+            'domain': domain,
+            'context': {'group_by': ['account_id'], 'create': False},
+        }
+
+    def _get_ledger_openings(self, cr):
+        """Soldes à nouveau non nuls par compte : [(code, account_id, intitulé, solde)] triés par code"""
+        opening, params = self._get_opening_sql()
+        lang = self.env.lang or 'en_US'
+        cr.execute("""
+            SELECT a.code, a.id, COALESCE(a.name->>%s, a.name->>'en_US'), SUM(o.debit) - SUM(o.credit)
+              FROM ({opening}) o
+              JOIN account_account a ON a.id = o.account_id
+             GROUP BY a.id
+            HAVING ROUND(SUM(o.debit) - SUM(o.credit), 2) != 0
+             ORDER BY a.code COLLATE "C"
+        """.format(opening=opening), [lang] + params)
+        return cr.fetchall()
+
+    def _iter_ledger_lines(self, cr):
+        """Lignes de la période par pages, triées par compte, date et pièce
+
+        Pagination par clé (code, date, écriture, ligne) : chaque page est
+        une requête indépendante, seule la page courante est en mémoire.
+        """
+        period_filter, params = self._get_period_filter()
+        lang = self.env.lang or 'en_US'
+        last_key = ('', '0001-01-01', 0, 0)
+        while True:
+            cr.execute("""
+                SELECT a.code, l.date, l.move_id, l.id,
+                       l.account_id, COALESCE(a.name->>%s, a.name->>'en_US'),
+                       j.code, m.name, l.name, p.name, l.debit, l.credit
+                  FROM account_move_line l
+                  JOIN account_account a ON a.id = l.account_id
+                  JOIN account_journal j ON j.id = l.journal_id
+                  JOIN account_move m ON m.id = l.move_id
+                  LEFT JOIN res_partner p ON p.id = l.partner_id
+                 WHERE {period_filter}
+                   AND (a.code COLLATE "C", l.date, l.move_id, l.id) > (%s, %s, %s, %s)
+                 ORDER BY a.code COLLATE "C", l.date, l.move_id, l.id
+                 LIMIT %s
+            """.format(period_filter=period_filter), [lang] + params + list(last_key) + [LEDGER_PAGE_SIZE])
+            rows = cr.fetchall()
+            if not rows:
+                return
+            yield from rows
+            if len(rows) < LEDGER_PAGE_SIZE:
+                return
+            last_key = rows[-1][:4]
+
+    def _iter_general_ledger(self):
+        """Lignes du grand livre (voir LEDGER_COLUMNS) avec solde progressif
+
+        Chaque compte commence par son solde à nouveau et se termine par son
+        total ; les comptes sans mouvement mais avec un solde à nouveau sont
+        intercalés à leur place dans l'ordre des codes. Les soldes et les
+        lignes sont lus sur le même curseur de reporting (même instantané).
+        """
+        self.ensure_one()
+        with reporting_cursor(self.env) as cr:
+            yield from self._iter_general_ledger_rows(cr)
+
+    def _iter_general_ledger_rows(self, cr):
+        openings = iter(self._get_ledger_openings(cr))
+        next_opening = next(openings, None)
+        current = None
+
+        for code, date, _move_id, _line_id, account_id, account_name, journal, move, label, partner, debit, credit in self._iter_ledger_lines(cr):
+            if current is None or current['account_id'] != account_id:
+                if current:
+                    yield self._ledger_total_row(current)
+                while next_opening and next_opening[0] < code:
+                    yield from self._ledger_opening_only(next_opening)
+                    next_opening = next(openings, None)
+                balance = 0.0
+                if next_opening and next_opening[1] == account_id:
+                    balance = next_opening[3]
+                    next_opening = next(openings, None)
+                current = {
+                    'account_id': account_id, 'code': code, 'name': account_name,
+                    'debit': 0.0, 'credit': 0.0, 'balance': balance,
+                }
+                yield self._ledger_opening_row(current)
+            current['debit'] += debit
+            current['credit'] += credit
+            current['balance'] += debit - credit
+            yield (code, account_name, date, journal, move, label, partner or '', debit, credit, current['balance'])
+
+        if current:
+            yield self._ledger_total_row(current)
+        while next_opening:
+            yield from self._ledger_opening_only(next_opening)
+            next_opening = next(openings, None)
+
+    def _ledger_opening_row(self, account):
+        return (account['code'], account['name'], self.date_from, '', '', _('Solde à nouveau'), '',
+                None, None, account['balance'])
+
+    def _ledger_total_row(self, account):
+        return (account['code'], account['name'], None, '', '', _('Total compte %s') % account['code'], '',
+                account['debit'], account['credit'], account['balance'])
+
+    def _ledger_opening_only(self, opening):
+        code, account_id, name, balance = opening
+        account = {'account_id': account_id, 'code': code, 'name': name, 'debit': 0.0, 'credit': 0.0, 'balance': balance}
+        yield self._ledger_opening_row(account)
+        yield self._ledger_total_row(account)
+
+    # ------------------------------------------------------------------
+    # Exports
+    # ------------------------------------------------------------------
+
+    def _iter_trial_balance_rows(self):
+        self.ensure_one()
+        if not self.line_ids:
+            self.action_compute_trial_balance()
+        levels = dict(self.env['french.trial.balance.line']._fields['level'].selection)
+        for line in self.line_ids:
+            yield (levels[line.level], line.name, line.opening_balance, line.debit, line.credit, line.closing_balance)
+
+    def _get_export(self):
+        """(colonnes, itérateur de lignes) du rapport demandé"""
+        if self.report_type == 'general_ledger':
+            return LEDGER_COLUMNS, self._iter_general_ledger()
+        return TRIAL_BALANCE_COLUMNS, self._iter_trial_balance_rows()
+
+    def _get_export_filename(self, extension):
+        prefix = 'GrandLivre' if self.report_type == 'general_ledger' else 'Balance'
+        return f"{prefix}_{self.company_id.name}_{self.date_from:%Y%m%d}_{self.date_to:%Y%m%d}.{extension}"
+
+    def _iter_csv(self):
+        """Export CSV (séparateur ';') produit page par page"""
+        columns, rows = self._get_export()
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, delimiter=';')
+        writer.writerow(columns)
+        for count, row in enumerate(rows, 1):
+            writer.writerow([
+                f"{value:.2f}" if isinstance(value, float) else value if value is not None else ''
+                for value in row
+            ])
+            if count % LEDGER_PAGE_SIZE == 0:
+                yield buffer.getvalue().encode('utf-8')
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue().encode('utf-8')
+
+    def _write_xlsx(self):
+        """Export XLSX en mode write-only dans un fichier temporaire (rembobiné)
+
+        Le classeur n'est jamais entièrement en mémoire : openpyxl écrit les
+        lignes au fil de l'eau.
+        """
+        columns, rows = self._get_export()
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet(
+            _('Grand livre') if self.report_type == 'general_ledger' else _('Balance')
+        )
+        sheet.append(columns)
+        for row in rows:
+            sheet.append(row)
+        output = tempfile.TemporaryFile()
+        workbook.save(output)
+        output.seek(0)
+        return output
+
+    def action_export(self, file_format='xlsx'):
+        self.ensure_one()
+        if file_format not in ('csv', 'xlsx'):
+            raise UserError(_("Format d'export non supporté : %s") % file_format)
+        return {
+            'type': 'ir.actions.act_url',
+            'url': f'/french_accounting/report/{self.id}/{file_format}',
+            'target': 'self',
+        }
+
+    def action_export_csv(self):
+        return self.action_export('csv')
+
+    def action_export_xlsx(self):
+        return self.action_export('xlsx')
+
+
+class FrenchTrialBalanceLine(models.TransientModel):
+    _name = 'french.trial.balance.line'
+    _description = 'Ligne de balance générale'
+    _order = 'level_sequence, account_class, account_code, journal_id'
+
+    report_id = fields.Many2one(
+        'french.accounting.report',
+        string='Rapport',
+        required=True,
+        ondelete='cascade',
+        index=True
+    )
+
+    level = fields.Selection([
+        ('account', 'Compte'),
+        ('class', 'Classe'),
+        ('journal', 'Journal'),
+        ('total', 'Total'),
+    ], string='Niveau', required=True)
+
+    level_sequence = fields.Integer(string='Ordre du niveau')
+
+    account_id = fields.Many2one(
+        'account.account',
+        string='Compte'
+    )
+
+    account_code = fields.Char(string='Code')
+
+    account_class = fields.Char(string='Classe')
+
+    journal_id = fields.Many2one(
+        'account.journal',
+        string='Journal'
+    )
+
+    name = fields.Char(
+        string='Libellé',
+        compute='_compute_name'
+    )
+
+    opening_balance = fields.Float(
+        string='Solde à nouveau',
+        digits='Account'
+    )
+
+    debit = fields.Float(
+        string='Débit',
+        digits='Account'
+    )
+
+    credit = fields.Float(
+        string='Crédit',
+        digits='Account'
+    )
+
+    closing_balance = fields.Float(
+        string='Solde de clôture',
+        digits='Account'
+    )
+
+    @api.depends('level', 'account_id', 'account_class', 'journal_id')
+    def _compute_name(self):
+        for line in self:
+            if line.level == 'account':
+                line.name = f"{line.account_id.code} {line.account_id.name}"
+            elif line.level == 'class':
+                line.name = _('Classe %s') % line.account_class
+            elif line.level == 'journal':
+                line.name = line.journal_id.display_name if line.journal_id else _('Soldes à nouveau')
+            else:
+                line.name = _('Total général')
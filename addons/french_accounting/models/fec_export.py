@@ -8,6 +8,8 @@ import csv
 import io
 import logging
 
+from ..reporting import reporting_env
+
 _logger = logging.getLogger(__name__)
 
 
@@ -139,6 +141,12 @@ class FecExport(models.Model):
         readonly=True
     )
 
+    non_compliant_count = fields.Integer(
+        string='critures non conformes',
+        compute='_compute_non_compliant_count',
+        help="critures de la priode qui bloqueront la gnration du FEC"
+    )
+
     def _default_name(self):
         return f"FEC {fields.Date.today().strftime('%Y')}"
 
@@ -186,6 +194,18 @@ class FecExport(models.Model):
             else:
                 record.file_size = 0
 
+    @api.depends('company_id', 'date_from', 'date_to', 'include_draft')
+    def _compute_non_compliant_count(self):
+        Move = self.env['account.move']
+        for record in self:
+            if record.company_id and record.date_from and record.date_to:
+                summary = Move.get_fec_compliance_summary(
+                    record.company_id.id, record.date_from, record.date_to, record.include_draft
+                )
+                record.non_compliant_count = summary['non_compliant']
+            else:
+                record.non_compliant_count = 0
+
     @api.constrains('date_from', 'date_to')
     def _check_dates(self):
         for record in self:
@@ -208,23 +228,24 @@ class FecExport(models.Model):
             # 2. Vrifier la conformit FEC
             self._check_moves_compliance(moves)
 
-            # 3. Gnrer le fichier
-            file_content = self._generate_fec_content(moves)
+            # 3. Gnrer le fichier et calculer les totaux (rplica de lecture si configur)
+            with reporting_env(self.env) as env:
+                report_moves = moves.with_env(env)
+                file_content = self._generate_fec_content(report_moves)
+                line_count = sum(len(move.line_ids) for move in report_moves)
+                self._compute_totals(report_moves)
 
             # 4. Enregistrer le fichier
             self.write({
                 'file_data': base64.b64encode(file_content.encode('utf-8')),
                 'state': 'done',
                 'move_count': len(moves),
-                'line_count': sum(len(move.line_ids) for move in moves),
+                'line_count': line_count,
             })
 
             # 5. Marquer les critures comme exportes
             moves.write({'fec_export_date': fields.Datetime.now()})
 
-            # 6. Calculer les totaux
-            self._compute_totals(moves)
-
             _logger.info(f"FEC gnr avec succs: {self.file_name} ({self.line_count} lignes)")
 
             return {
@@ -266,10 +287,15 @@ class FecExport(models.Model):
         return moves
 
     def _check_moves_compliance(self, moves):
-        """Vrifie la conformit FEC des critures"""
+        """Vrifie la conformit FEC des critures
+
+        Seules les critures dont l'tat stock n'est pas  conforme  sont
+        revrifies en dtail pour produire les messages.
+        """
         errors = []
 
-        for move in moves:
+        moves.flush_recordset(['fec_compliance_state'])
+        for move in moves.filtered(lambda m: m.fec_compliance_state != 'compliant'):
             move_errors = move._check_fec_compliance()
             if move_errors:
                 errors.append(f"criture {move.name}: {', '.join(move_errors)}")
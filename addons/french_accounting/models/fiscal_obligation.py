@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, tools, _
+from dateutil.relativedelta import relativedelta
+import logging
+import time
+
+_logger = logging.getLogger(__name__)
+
+# Type de déclaration de TVA et périodicité de chaque obligation de TVA
+TVA_OBLIGATIONS = {
+    'ca3': ('ca3', 'monthly'),
+    'ca12': ('ca12', 'annual'),
+}
+
+# Jours réservés entre la préparation automatique et l'échéance
+PREPARE_MARGIN_DAYS = 5
+
+
+class FiscalObligation(models.Model):
+    """Échéancier des obligations déclaratives (CA3, CA12, FEC)
+
+    Les échéances de chaque société sont matérialisées à l'avance depuis son
+    régime de TVA et son début d'exercice (res.company._get_fiscal_obligations).
+    Les déclarations de TVA sont créées et calculées par le cron de nuit à
+    `prepare_date`, répartie entre la fin de période et l'échéance selon la
+    société : la charge ne se concentre pas sur les jours d'échéance.
+    """
+    _name = 'fiscal.obligation'
+    _description = 'Échéance fiscale'
+    _order = 'due_date, company_id, obligation_type'
+
+    name = fields.Char(
+        string='Échéance',
+        compute='_compute_name',
+        store=True
+    )
+
+    company_id = fields.Many2one(
+        'res.company',
+        string='Société',
+        required=True,
+        ondelete='cascade'
+    )
+
+    obligation_type = fields.Selection([
+        ('ca3', 'CA3'),
+        ('ca12', 'CA12'),
+        ('fec', 'FEC'),
+    ], string='Obligation', required=True)
+
+    period_start = fields.Date(
+        string='Début période',
+        required=True
+    )
+
+    period_end = fields.Date(
+        string='Fin période',
+        required=True
+    )
+
+    due_date = fields.Date(
+        string='Échéance',
+        required=True
+    )
+
+    prepare_date = fields.Date(
+        string='Préparation prévue',
+        help="Nuit où la déclaration de TVA est créée et calculée automatiquement"
+    )
+
+    tva_declaration_id = fields.Many2one(
+        'tva.declaration',
+        string='Déclaration de TVA',
+        ondelete='set null'
+    )
+
+    fec_export_id = fields.Many2one(
+        'fec.export',
+        string='Export FEC',
+        ondelete='set null'
+    )
+
+    state = fields.Selection([
+        ('todo', 'À faire'),
+        ('prepared', 'Préparée'),
+        ('done', 'Déposée'),
+    ], string='État', compute='_compute_state', store=True)
+
+    _sql_constraints = [
+        ('period_uniq', 'unique(company_id, obligation_type, period_start)',
+         "Cette obligation existe déjà pour la période."),
+    ]
+
+    def init(self):
+        super(FiscalObligation, self).init()
+        # Calendrier : échéances ouvertes par date, préparations en attente
+        tools.create_index(
+            self._cr, 'fiscal_obligation_open_due_idx', self._table,
+            ['due_date', 'company_id'], where="state != 'done'"
+        )
+        tools.create_index(
+            self._cr, 'fiscal_obligation_prepare_idx', self._table,
+            ['prepare_date'], where="state = 'todo' AND obligation_type != 'fec'"
+        )
+
+    @api.depends('obligation_type', 'period_start', 'period_end', 'company_id.name')
+    def _compute_name(self):
+        labels = dict(self._fields['obligation_type'].selection)
+        for obligation in self:
+            if obligation.obligation_type == 'ca3':
+                period = obligation.period_start.strftime('%m/%Y')
+            else:
+                period = f"{obligation.period_start.strftime('%d/%m/%Y')} - {obligation.period_end.strftime('%d/%m/%Y')}"
+            obligation.name = f"{labels[obligation.obligation_type]} {period} - {obligation.company_id.name}"
+
+    @api.depends('tva_declaration_id.state', 'fec_export_id.state')
+    def _compute_state(self):
+        for obligation in self:
+            if obligation.obligation_type == 'fec':
+                obligation.state = 'done' if obligation.fec_export_id.state == 'done' else 'todo'
+            elif obligation.tva_declaration_id.state in ('submitted', 'paid'):
+                obligation.state = 'done'
+            elif obligation.tva_declaration_id.state in ('draft', 'computed'):
+                obligation.state = 'prepared'
+            else:
+                obligation.state = 'todo'
+
+    @api.model
+    def _get_prepare_date(self, company, period_end, due_date):
+        """Nuit de préparation : entre la fin de période et l'échéance moins la marge, selon la société"""
+        window_start = period_end + relativedelta(days=1)
+        window_days = (due_date - window_start).days - PREPARE_MARGIN_DAYS
+        if window_days <= 0:
+            return window_start
+        return window_start + relativedelta(days=company.id % (window_days + 1))
+
+    # ------------------------------------------------------------------
+    # Matérialisation du calendrier
+    # ------------------------------------------------------------------
+
+    @api.model
+    def _schedule(self, companies=None):
+        """Crée les échéances manquantes jusqu'à l'horizon (paramètre, en mois)"""
+        companies = companies or self.env['res.company'].search([])
+        horizon = int(self.env['ir.config_parameter'].sudo().get_param(
+            'french_accounting.obligation_horizon_months', '12'
+        ))
+        date_from = fields.Date.context_today(self)
+        date_to = date_from + relativedelta(months=horizon)
+
+        # Toutes les échéances, passées comprises : un changement de jour limite
+        # peut ramener après aujourd'hui une échéance déjà dépassée et conservée
+        existing = {
+            (obligation['company_id'][0], obligation['obligation_type'], obligation['period_start'])
+            for obligation in self.search_read(
+                [('company_id', 'in', companies.ids)],
+                ['company_id', 'obligation_type', 'period_start'],
+            )
+        }
+        vals_list = []
+        for company in companies:
+            for values in company._get_fiscal_obligations(date_from, date_to):
+                if (company.id, values['obligation_type'], values['period_start']) in existing:
+                    continue
+                if values['obligation_type'] in TVA_OBLIGATIONS:
+                    values['prepare_date'] = self._get_prepare_date(company, values['period_end'], values['due_date'])
+                vals_list.append(dict(values, company_id=company.id))
+        obligations = self.create(vals_list)
+        if obligations:
+            _logger.info(f"Échéancier fiscal: {len(obligations)} échéances créées pour {len(companies)} sociétés")
+        return obligations
+
+    @api.model
+    def _reschedule(self, companies):
+        """Après un changement de régime ou d'exercice : remplace les échéances futures non commencées"""
+        self.search([
+            ('company_id', 'in', companies.ids),
+            ('state', '=', 'todo'),
+            ('due_date', '>=', fields.Date.context_today(self)),
+            ('tva_declaration_id', '=', False),
+            ('fec_export_id', '=', False),
+        ]).unlink()
+        self._schedule(companies)
+
+    # ------------------------------------------------------------------
+    # Préparation de nuit
+    # ------------------------------------------------------------------
+
+    def _prepare_tva_declaration(self):
+        """Crée la déclaration de TVA brouillon de l'échéance et la calcule
+
+        Une déclaration déjà saisie pour la période est rattachée telle quelle.
+        """
+        self.ensure_one()
+        declaration_type, period_type = TVA_OBLIGATIONS[self.obligation_type]
+        existing = self.env['tva.declaration'].search([
+            ('company_id', '=', self.company_id.id),
+            ('declaration_type', '=', declaration_type),
+            ('period_start', '=', self.period_start),
+            ('state', '!=', 'cancel'),
+        ], limit=1)
+        if existing:
+            self.tva_declaration_id = existing
+            return
+        declaration = self.env['tva.declaration'].with_company(self.company_id).create({
+            'company_id': self.company_id.id,
+            'regime_tva': self.company_id.french_regime_tva,
+            'declaration_type': declaration_type,
+            'period_type': period_type,
+            'period_start': self.period_start,
+            'period_end': self.period_end,
+            'due_date': self.due_date,
+        })
+        self.tva_declaration_id = declaration
+        declaration.action_compute_tva()
+
+    def _get_outdated_declarations(self):
+        """Déclarations préparées dont la période a reçu des écritures validées depuis le calcul"""
+        outdated = self.env['tva.declaration']
+        for obligation in self:
+            declaration = obligation.tva_declaration_id
+            self.env.cr.execute("""
+                SELECT 1
+                  FROM account_move
+                 WHERE company_id = %s AND state = 'posted'
+                   AND date >= %s AND date <= %s AND write_date > %s
+                 LIMIT 1
+            """, [obligation.company_id.id, obligation.period_start, obligation.period_end, declaration.write_date])
+            if self.env.cr.fetchone():
+                outdated |= declaration
+        return outdated
+
+    def _link_fec_exports(self):
+        """Rattache aux échéances FEC les exports terminés couvrant l'exercice"""
+        for obligation in self:
+            obligation.fec_export_id = self.env['fec.export'].search([
+                ('company_id', '=', obligation.company_id.id),
+                ('state', '=', 'done'),
+                ('date_from', '<=', obligation.period_start),
+                ('date_to', '>=', obligation.period_end),
+            ], order='create_date desc', limit=1)
+
+    @api.model
+    def _cron_run_scheduler(self, time_limit=7200):
+        """Cron de nuit : calendrier, préparation des déclarations, recalculs, exports FEC
+
+        Chaque déclaration est validée séparément ; ce qui reste à
+        l'expiration du temps imparti est repris la nuit suivante (la
+        marge avant échéance couvre plusieurs nuits).
+        """
+        deadline = time.monotonic() + time_limit
+        today = fields.Date.context_today(self)
+        self._schedule()
+        self.env.cr.commit()
+
+        to_prepare = self.search([
+            ('state', '=', 'todo'),
+            ('obligation_type', 'in', list(TVA_OBLIGATIONS)),
+            ('prepare_date', '<=', today),
+            ('period_end', '<', today),
+        ], order='due_date, prepare_date')
+        to_refresh = self.search([
+            ('state', '=', 'prepared'),
+            ('tva_declaration_id.state', '=', 'computed'),
+            ('due_date', '>=', today),
+        ], order='due_date')._get_outdated_declarations()
+
+        jobs = [(obligation, obligation._prepare_tva_declaration) for obligation in to_prepare]
+        jobs += [(declaration, declaration.action_compute_tva) for declaration in to_refresh]
+        for record, job in jobs:
+            if time.monotonic() > deadline:
+                _logger.info("Échéancier fiscal: temps imparti écoulé, reprise la nuit prochaine")
+                return
+            try:
+                job()
+                self.env.cr.commit()
+            except Exception:
+                self.env.cr.rollback()
+                _logger.exception(f"Échéancier fiscal: échec de la préparation de {record.display_name}")
+
+        self.search([
+            ('obligation_type', '=', 'fec'),
+            ('state', '=', 'todo'),
+            ('period_end', '<', today),
+        ])._link_fec_exports()
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, _
+import logging
+import time
+
+_logger = logging.getLogger(__name__)
+
+# Écritures mises à jour par transaction
+RECOMPUTE_CHUNK_SIZE = 20000
+
+# Exercice nommé d'après l'année de clôture (res.company._get_french_fiscal_year)
+FISCAL_YEAR_SQL = """
+    CASE
+        WHEN m.date IS NULL THEN NULL
+        WHEN %(start)s != '01-01' AND TO_CHAR(m.date, 'MM-DD') >= %(start)s
+            THEN (EXTRACT(YEAR FROM m.date)::int + 1)::varchar
+        ELSE EXTRACT(YEAR FROM m.date)::int::varchar
+    END
+"""
+
+
+class FiscalYearRecompute(models.Model):
+    _name = 'fiscal.year.recompute'
+    _description = "Recalcul de l'exercice fiscal des écritures"
+    _order = 'id desc'
+
+    company_id = fields.Many2one(
+        'res.company',
+        string='Société',
+        required=True,
+        readonly=True
+    )
+
+    fiscal_year_start = fields.Char(
+        string='Début exercice appliqué',
+        required=True,
+        readonly=True,
+        help="Début d'exercice (MM-JJ) de la société au moment de la demande"
+    )
+
+    state = fields.Selection([
+        ('queued', 'En file'),
+        ('running', 'En cours'),
+        ('done', 'Terminé'),
+        ('cancelled', 'Annulé'),
+        ('failed', 'Échec'),
+    ], string='État', default='queued', required=True, readonly=True)
+
+    total_count = fields.Integer(
+        string='Écritures',
+        readonly=True
+    )
+
+    processed_count = fields.Integer(
+        string='Écritures traitées',
+        readonly=True
+    )
+
+    updated_count = fields.Integer(
+        string='Écritures modifiées',
+        readonly=True,
+        help="Écritures dont l'exercice a changé"
+    )
+
+    last_move_id = fields.Integer(
+        string='Dernière écriture traitée',
+        readonly=True,
+        help="Curseur de reprise : le recalcul reprend après cet identifiant"
+    )
+
+    progress = fields.Float(
+        string='Progression (%)',
+        compute='_compute_progress'
+    )
+
+    date_start = fields.Datetime(
+        string='Début',
+        readonly=True
+    )
+
+    date_end = fields.Datetime(
+        string='Fin',
+        readonly=True
+    )
+
+    error_message = fields.Text(
+        string="Message d'erreur",
+        readonly=True
+    )
+
+    @api.depends('total_count', 'processed_count')
+    def _compute_progress(self):
+        for job in self:
+            job.progress = min(100.0, 100.0 * job.processed_count / job.total_count) if job.total_count else 0.0
+
+    @api.model
+    def _enqueue(self, companies):
+        """Planifie le recalcul des sociétés dont le début d'exercice a changé"""
+        self.search([
+            ('company_id', 'in', companies.ids),
+            ('state', 'in', ('queued', 'running')),
+        ]).write({'state': 'cancelled'})
+        Move = self.env['account.move'].sudo()
+        jobs = self.create([{
+            'company_id': company.id,
+            'fiscal_year_start': company.french_fiscal_year_start or '01-01',
+            'total_count': Move.search_count([('company_id', '=', company.id)]),
+        } for company in companies])
+        self.env.ref('french_accounting.ir_cron_fiscal_year_recompute')._trigger()
+        return jobs
+
+    @api.model
+    def _cron_run_jobs(self, time_limit=600):
+        """Traite les recalculs en file, tranche par tranche, jusqu'au temps imparti"""
+        deadline = time.monotonic() + time_limit
+        for job in self.search([('state', 'in', ('queued', 'running'))], order='id'):
+            if not job._run(deadline):
+                self.env.ref('french_accounting.ir_cron_fiscal_year_recompute')._trigger()
+                return
+
+    def _run(self, deadline):
+        """Recalcule par tranches validées une à une ; retourne False si le temps est écoulé
+
+        Chaque tranche est une seule requête UPDATE sur un intervalle
+        d'identifiants : les verrous ne portent que sur la tranche en cours
+        et un recalcul interrompu reprend après `last_move_id`.
+        """
+        self.ensure_one()
+        if self.state == 'queued':
+            self.write({'state': 'running', 'date_start': fields.Datetime.now()})
+            self.env.cr.commit()
+        self.env['account.move'].flush_model(['date', 'company_id', 'french_fiscal_year'])
+        try:
+            while time.monotonic() < deadline:
+                # Annulé entre deux tranches (nouveau changement de début d'exercice)
+                self.invalidate_recordset(['state'])
+                if self.state == 'cancelled':
+                    return True
+                last_id, processed, updated = self._recompute_chunk()
+                if not processed:
+                    self.write({'state': 'done', 'date_end': fields.Datetime.now()})
+                    self.env.cr.commit()
+                    _logger.info(
+                        f"Exercices recalculés pour {self.company_id.name}: "
+                        f"{self.updated_count} écritures modifiées sur {self.processed_count}"
+                    )
+                    return True
+                self.write({
+                    'last_move_id': last_id,
+                    'processed_count': self.processed_count + processed,
+                    'updated_count': self.updated_count + updated,
+                })
+                self.env.cr.commit()
+        except Exception as e:
+            self.env.cr.rollback()
+            _logger.error(f"Recalcul des exercices en échec: {str(e)}", exc_info=True)
+            self.write({'state': 'failed', 'error_message': str(e)})
+            self.env.cr.commit()
+            return True
+        finally:
+            self.env['account.move'].invalidate_model(['french_fiscal_year'])
+        return False
+
+    def _recompute_chunk(self):
+        """Une tranche : retourne (dernier id, écritures lues, écritures modifiées)"""
+        self.env.cr.execute("""
+            WITH chunk AS (
+                SELECT id
+                  FROM account_move
+                 WHERE company_id = %(company_id)s
+                   AND id > %(last_id)s
+                 ORDER BY id
+                 LIMIT %(limit)s
+            ), updated AS (
+                UPDATE account_move m
+                   SET french_fiscal_year = {year}
+                  FROM chunk
+                 WHERE m.id = chunk.id
+                   AND m.french_fiscal_year IS DISTINCT FROM {year}
+             RETURNING m.id
+            )
+            SELECT (SELECT MAX(id) FROM chunk),
+                   (SELECT COUNT(*) FROM chunk),
+                   (SELECT COUNT(*) FROM updated)
+        """.format(year=FISCAL_YEAR_SQL), {
+            'company_id': self.company_id.id,
+            'last_id': self.last_move_id,
+            'limit': RECOMPUTE_CHUNK_SIZE,
+            'start': self.fiscal_year_start,
+        })
+        last_id, processed, updated = self.env.cr.fetchone()
+        return last_id or self.last_move_id, processed, updated
+
+    def action_cancel(self):
+        self.filtered(lambda j: j.state in ('queued', 'running')).write({'state': 'cancelled'})
+        return True
@@ -2,6 +2,17 @@
 
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import time
+
+from ..liasse.engine import get_compiled_form
+
+_logger = logging.getLogger(__name__)
+
+# Prfixe sous lequel les rsultats des exercices antrieurs non affects
+# (comptes 6/7 non solds dans Odoo) sont ports en report  nouveau
+CARRIED_RESULT_CODE = '11'
 
 
 class LiasseFiscale(models.Model):
@@ -23,3 +34,281 @@ class LiasseFiscale(models.Model):
     ], default='draft')
     file = fields.Binary(string='Fichier PDF', attachment=True)
     filename = fields.Char(string='Nom du fichier')
+
+    date_from = fields.Date(
+        string='Dbut exercice',
+        compute='_compute_dates',
+        store=True,
+        readonly=False
+    )
+
+    date_to = fields.Date(
+        string='Fin exercice',
+        compute='_compute_dates',
+        store=True,
+        readonly=False
+    )
+
+    line_ids = fields.One2many(
+        'liasse.fiscale.line',
+        'liasse_id',
+        string='Cases',
+        readonly=True
+    )
+
+    compute_date = fields.Datetime(
+        string='Calcule le',
+        readonly=True
+    )
+
+    unmapped_count = fields.Integer(
+        string='Comptes non affects',
+        readonly=True,
+        help="Comptes avec un solde qui ne correspondent  aucune case du formulaire"
+    )
+
+    unmapped_accounts = fields.Text(
+        string='Dtail des comptes non affects',
+        readonly=True
+    )
+
+    @api.depends('company_id', 'fiscal_year')
+    def _compute_dates(self):
+        for liasse in self:
+            if liasse.company_id and liasse.fiscal_year and liasse.fiscal_year.isdigit():
+                liasse.date_from, liasse.date_to = liasse.company_id._get_french_fiscal_year_dates(liasse.fiscal_year)
+            else:
+                liasse.date_from = liasse.date_to = False
+
+    def action_compute(self):
+        """Calcule toutes les cases  partir de la balance de l'exercice
+
+        Plusieurs liasses (portefeuille du cabinet) sont calcules en
+        parallle : chaque worker lit la balance d'une socit avec son
+        propre curseur, les cases sont ensuite crites dans la transaction
+        courante.
+        """
+        liasses = self.filtered(lambda l: l.state == 'draft')
+        for liasse in liasses:
+            if not liasse.date_from or not liasse.date_to:
+                raise UserError(_("Renseignez les dates de l'exercice de la liasse  %s .") % liasse.name)
+        if not liasses:
+            return True
+
+        start = time.monotonic()
+        tasks = [
+            (liasse.id, liasse.company_id.id, liasse.type, liasse.date_from, liasse.date_to)
+            for liasse in liasses
+        ]
+        if len(tasks) == 1:
+            results = [self._compute_task(self.env, tasks[0])]
+        else:
+            workers = int(self.env['ir.config_parameter'].sudo().get_param('french_accounting.liasse_workers', '4'))
+            with ThreadPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+                results = list(executor.map(self._compute_task_with_cursor, tasks))
+
+        for liasse_id, amounts, unmapped in results:
+            self.browse(liasse_id)._store_results(amounts, unmapped)
+        _logger.info(f"Liasses fiscales: {len(tasks)} calcules en {time.monotonic() - start:.1f}s")
+
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Liasses calcules'),
+                'message': _('%s liasse(s) calcule(s) depuis la balance.') % len(tasks),
+                'type': 'success',
+            }
+        }
+
+    def _compute_task_with_cursor(self, task):
+        with self.pool.cursor() as cr:
+            env = api.Environment(cr, self.env.uid, self.env.context)
+            return self._compute_task(env, task)
+
+    @api.model
+    def _compute_task(self, env, task):
+        """Calcul d'une liasse : retourne (id, montants par case, comptes non affects)
+
+        Ne lit que des donnes valides en base : la liasse elle-mme peut ne
+        pas encore tre visible du curseur du worker.
+        """
+        liasse_id, company_id, form_type, date_from, date_to = task
+        balances = env['liasse.fiscale']._get_trial_balance(
+            env['res.company'].browse(company_id), date_from, date_to,
+            balance_sheet=form_type != '2035',
+        )
+        amounts, unmapped = get_compiled_form(form_type).compute(balances)
+        return liasse_id, amounts, unmapped
+
+    @api.model
+    def _get_trial_balance(self, company, date_from, date_to, balance_sheet=True):
+        """Soldes (dbit - crdit) par numro de compte pour l'exercice
+
+        Classes 1  5 : soldes cumuls  la fin de l'exercice (dernire
+        clture + lignes postrieures). Classes 6 et 7 : mouvements de
+        l'exercice ; ceux des exercices antrieurs, qu'Odoo ne solde pas,
+        sont ports en report  nouveau.
+        """
+        self.env['account.move.line'].flush_model(['account_id', 'date', 'debit', 'credit', 'parent_state'])
+        balances = {}
+        if balance_sheet:
+            query, params = self.env['account.period.close']._get_balances_sql(company, date_to)
+            self.env.cr.execute("""
+                SELECT a.code,
+                       SUM(b.debit) - SUM(b.credit)
+                  FROM ({query}) b
+                  JOIN account_account a ON a.id = b.account_id
+                 GROUP BY a.code
+            """.format(query=query), params)
+            carried = 0.0
+            for code, balance in self.env.cr.fetchall():
+                if code[:1] in ('6', '7'):
+                    carried += balance
+                else:
+                    balances[code] = balance
+        else:
+            carried = 0.0
+
+        self.env.cr.execute("""
+            SELECT a.code,
+                   SUM(l.debit) - SUM(l.credit)
+              FROM account_move_line l
+              JOIN account_account a ON a.id = l.account_id
+             WHERE l.company_id = %s
+               AND l.parent_state = 'posted'
+               AND l.date BETWEEN %s AND %s
+               AND LEFT(a.code, 1) IN ('6', '7')
+             GROUP BY a.code
+        """, [company.id, date_from, date_to])
+        for code, balance in self.env.cr.fetchall():
+            balances[code] = balance
+            carried -= balance
+
+        if balance_sheet and round(carried, 2):
+            balances[CARRIED_RESULT_CODE] = balances.get(CARRIED_RESULT_CODE, 0.0) + carried
+        return balances
+
+    def _store_results(self, amounts, unmapped):
+        self.ensure_one()
+        form = get_compiled_form(self.type)
+        self.line_ids.unlink()
+        self.env['liasse.fiscale.line'].create([{
+            'liasse_id': self.id,
+            'sequence': sequence,
+            'code': box.code,
+            'label': box.label,
+            'section': box.section,
+            'amount': amounts[box.code],
+            'is_formula': bool(box.formula),
+        } for sequence, box in enumerate(form.boxes)])
+        self.write({
+            'compute_date': fields.Datetime.now(),
+            'unmapped_count': len(unmapped),
+            'unmapped_accounts': '\n'.join(
+                f"{code} : {balance:.2f}" for code, balance in sorted(unmapped.items())
+            ) or False,
+        })
+
+    @api.model
+    def _get_portfolio_type(self, company):
+        """Formulaire par dfaut d'une socit : rel normal -> 2050, sinon 2033"""
+        return '2050' if company.french_regime_tva == 'reel_normal' else '2033'
+
+    @api.model
+    def compute_portfolio(self, fiscal_year, companies, form_type=False):
+        """Cre les liasses manquantes de l'exercice et calcule tout le portefeuille"""
+        existing = self.search([
+            ('fiscal_year', '=', fiscal_year),
+            ('company_id', 'in', companies.ids),
+        ])
+        missing = companies - existing.company_id
+        created = self.create([{
+            'name': _('Liasse %s - %s') % (fiscal_year, company.name),
+            'company_id': company.id,
+            'fiscal_year': fiscal_year,
+            'type': form_type or self._get_portfolio_type(company),
+        } for company in missing])
+        liasses = existing | created
+        if form_type:
+            liasses.filtered(lambda l: l.state == 'draft' and l.type != form_type).write({'type': form_type})
+        liasses.action_compute()
+        return liasses
+
+
+class LiasseFiscaleLine(models.Model):
+    _name = 'liasse.fiscale.line'
+    _description = 'Case de liasse fiscale'
+    _order = 'liasse_id, sequence'
+
+    liasse_id = fields.Many2one(
+        'liasse.fiscale',
+        string='Liasse',
+        required=True,
+        ondelete='cascade',
+        index=True
+    )
+
+    sequence = fields.Integer(string='Squence')
+
+    code = fields.Char(
+        string='Case',
+        required=True
+    )
+
+    label = fields.Char(string='Libell')
+
+    section = fields.Selection([
+        ('actif', 'Bilan - Actif'),
+        ('passif', 'Bilan - Passif'),
+        ('resultat', 'Compte de rsultat'),
+        ('recettes', 'Recettes'),
+        ('depenses', 'Dpenses'),
+    ], string='Section')
+
+    amount = fields.Float(
+        string='Montant',
+        digits='Account'
+    )
+
+    is_formula = fields.Boolean(
+        string='Total',
+        help="Case calcule  partir d'autres cases"
+    )
+
+
+class LiasseFiscalePortfolioWizard(models.TransientModel):
+    _name = 'liasse.fiscale.portfolio.wizard'
+    _description = 'Calcul des liasses du portefeuille'
+
+    fiscal_year = fields.Char(
+        string='Exercice fiscal',
+        required=True,
+        default=lambda self: str(fields.Date.today().year - 1)
+    )
+
+    company_ids = fields.Many2many(
+        'res.company',
+        string='Socits',
+        required=True,
+        default=lambda self: self.env.companies
+    )
+
+    type = fields.Selection([
+        ('2033', '2033 - BIC Rel simplifi'),
+        ('2035', '2035 - BNC'),
+        ('2050', '2050 - BIC Rel normal'),
+    ], string='Type', help="Vide : 2050 pour le rel normal, 2033 sinon")
+
+    def action_compute(self):
+        self.ensure_one()
+        if not self.fiscal_year.isdigit():
+            raise UserError(_("L'exercice fiscal doit tre une anne (anne de clture)."))
+        liasses = self.env['liasse.fiscale'].compute_portfolio(self.fiscal_year, self.company_ids, self.type)
+        return {
+            'name': _('Liasses %s') % self.fiscal_year,
+            'type': 'ir.actions.act_window',
+            'res_model': 'liasse.fiscale',
+            'view_mode': 'tree,form',
+            'domain': [('id', 'in', liasses.ids)],
+        }
@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
 
-from odoo import models, fields
+from odoo import models, fields, api, _
+from odoo.exceptions import ValidationError
+import datetime
+from dateutil.relativedelta import relativedelta
 
 
 class ResCompany(models.Model):
@@ -18,3 +21,120 @@ class ResCompany(models.Model):
         ('07-01', '1er juillet'),
         ('10-01', '1er octobre'),
     ], string='Dbut exercice fiscal', default='01-01')
+
+    french_tva_due_day = fields.Integer(
+        string='Jour limite de dpt CA3',
+        default=19,
+        help="Jour du mois suivant la priode (15  24 selon la socit, voir l'espace professionnel impots.gouv.fr)"
+    )
+
+    @api.constrains('french_tva_due_day')
+    def _check_french_tva_due_day(self):
+        for company in self:
+            if not 15 <= company.french_tva_due_day <= 24:
+                raise ValidationError(_("Le jour limite de dpt de la CA3 est compris entre le 15 et le 24."))
+
+    def _get_french_fiscal_year(self, date):
+        """Exercice d'une date, nomm d'aprs l'anne de clture
+
+        Avec un dbut au 1er avril, le 15/05/2024 appartient  l'exercice
+        2024-2025, not '2025'.
+        """
+        start = self.french_fiscal_year_start or '01-01'
+        if start != '01-01' and date.strftime('%m-%d') >= start:
+            return str(date.year + 1)
+        return str(date.year)
+
+    def _get_french_fiscal_year_dates(self, fiscal_year):
+        """Dates de dbut et de fin de l'exercice not `fiscal_year` (anne de clture)"""
+        year = int(fiscal_year)
+        start = self.french_fiscal_year_start or '01-01'
+        month, day = (int(part) for part in start.split('-'))
+        if start == '01-01':
+            return datetime.date(year, 1, 1), datetime.date(year, 12, 31)
+        date_from = datetime.date(year - 1, month, day)
+        return date_from, date_from + relativedelta(years=1, days=-1)
+
+    def _get_annual_due_date(self, fiscal_year_end):
+        """chance des obligations annuelles (CA12, liasse et FEC) d'un exercice
+
+        Exercice civil : deuxime jour ouvr suivant le 1er mai. Exercice
+        dcal : dernier jour du troisime mois suivant la clture.
+        """
+        if fiscal_year_end.month == 12 and fiscal_year_end.day == 31:
+            due_date = datetime.date(fiscal_year_end.year + 1, 5, 1)
+            business_days = 0
+            while business_days < 2:
+                due_date += relativedelta(days=1)
+                if due_date.weekday() < 5:
+                    business_days += 1
+            return due_date
+        return fiscal_year_end + relativedelta(months=3, day=31)
+
+    def _get_tva_due_date(self, declaration_type, period_end):
+        """chance de dpt d'une dclaration de TVA se terminant le `period_end`"""
+        self.ensure_one()
+        if declaration_type == 'ca3':
+            return period_end + relativedelta(months=1, day=self.french_tva_due_day or 19)
+        return self._get_annual_due_date(period_end)
+
+    def _get_fiscal_obligations(self, date_from, date_to):
+        """Obligations dclaratives dont l'chance tombe entre `date_from` et `date_to`
+
+        Selon le rgime de TVA : CA3 mensuelles (rel normal), CA12 annuelle
+        sur l'exercice (rel simplifi), rien en franchise ; FEC de chaque
+        exercice pour tous les rgimes. Retourne des dictionnaires
+        (obligation_type, period_start, period_end, due_date).
+        """
+        self.ensure_one()
+        obligations = []
+
+        if self.french_regime_tva == 'reel_normal':
+            month = date_from.replace(day=1) - relativedelta(months=2)
+            while True:
+                period_end = month + relativedelta(day=31)
+                due_date = self._get_tva_due_date('ca3', period_end)
+                if due_date > date_to:
+                    break
+                if due_date >= date_from:
+                    obligations.append({
+                        'obligation_type': 'ca3',
+                        'period_start': month,
+                        'period_end': period_end,
+                        'due_date': due_date,
+                    })
+                month += relativedelta(months=1)
+
+        fiscal_year = int(self._get_french_fiscal_year(date_from)) - 2
+        while True:
+            period_start, period_end = self._get_french_fiscal_year_dates(fiscal_year)
+            due_date = self._get_annual_due_date(period_end)
+            if due_date > date_to:
+                break
+            if due_date >= date_from:
+                types = ['ca12', 'fec'] if self.french_regime_tva == 'reel_simplifie' else ['fec']
+                for obligation_type in types:
+                    obligations.append({
+                        'obligation_type': obligation_type,
+                        'period_start': period_start,
+                        'period_end': period_end,
+                        'due_date': due_date,
+                    })
+            fiscal_year += 1
+
+        return obligations
+
+    def write(self, vals):
+        changed = self.env['res.company']
+        if 'french_fiscal_year_start' in vals:
+            changed = self.filtered(lambda c: c.french_fiscal_year_start != vals['french_fiscal_year_start'])
+        rescheduled = self.env['res.company']
+        if {'french_regime_tva', 'french_fiscal_year_start', 'french_tva_due_day'}.intersection(vals):
+            rescheduled = self.filtered(lambda c: any(c[key] != vals[key] for key in (
+                'french_regime_tva', 'french_fiscal_year_start', 'french_tva_due_day') if key in vals))
+        res = super(ResCompany, self).write(vals)
+        if changed:
+            self.env['fiscal.year.recompute']._enqueue(changed)
+        if rescheduled:
+            self.env['fiscal.obligation']._reschedule(rescheduled)
+        return res
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, tools
+import logging
+
+from ..indexes import PARTNER_TRIGRAM_INDEX
+
+_logger = logging.getLogger(__name__)
+
+
+class ResPartner(models.Model):
+    _inherit = 'res.partner'
+
+    def init(self):
+        super(ResPartner, self).init()
+        # Recherche par nom (ilike '%...%') : index trigramme, pg_trgm étant
+        # activé par docker/postgres/init.sql
+        if self.env.registry.has_trigram:
+            tools.create_index(
+                self._cr, PARTNER_TRIGRAM_INDEX, self._table, ['complete_name gin_trgm_ops'], method='gin'
+            )
+        else:
+            _logger.warning("Extension pg_trgm absente : pas d'index trigramme sur le nom des partenaires")
@@ -2,7 +2,6 @@
 
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError, ValidationError
-from dateutil.relativedelta import relativedelta
 import logging
 
 _logger = logging.getLogger(__name__)
@@ -391,7 +390,7 @@ class TvaDeclaration(models.Model):
 
         self.write({
             'state': 'submitted',
-            'due_date': self.period_end + relativedelta(days=30),  # chance 30j aprs fin priode
+            'due_date': self.due_date or self.company_id._get_tva_due_date(self.declaration_type, self.period_end),
         })
 
         return True
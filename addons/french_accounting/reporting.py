@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+Curseur de reporting : lectures lourdes sur un réplica de lecture
+
+Les rapports (dashboards, extraction FEC, balance générale, balance âgée)
+lisent sur le serveur `reporting_db_host` du fichier de configuration Odoo
+(réplica en streaming, ou primaire avec un pool de connexions dédié), pour
+que les exports de fin d'exercice ne ralentissent pas la saisie :
+
+    reporting_db_host = postgres-replica
+    reporting_db_port = 5432
+    reporting_db_user = odoo
+    reporting_db_password = odoo
+    reporting_db_maxconn = 8
+    reporting_max_lag = 5
+
+Garde de fraîcheur : avant chaque lecture, le réplica doit avoir rejoué le
+WAL du primaire jusqu'à la position courante (pg_current_wal_lsn), donc
+toutes les écritures validées visibles de la transaction appelante. Au-delà
+de `reporting_max_lag` secondes d'attente, ou si le réplica est injoignable
+ou son pool plein, la lecture se fait sur le curseur du primaire. Un réplica
+en échec n'est pas retenté avant RETRY_DELAY secondes.
+
+Les écritures non validées de la transaction appelante ne sont pas visibles
+sur le réplica : réservé aux lectures de données comptabilisées.
+"""
+
+from contextlib import contextmanager
+import logging
+import time
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+from odoo import api, sql_db
+from odoo.tools import config
+
+_logger = logging.getLogger(__name__)
+
+# Délai avant de retenter un réplica injoignable ou en retard (secondes)
+RETRY_DELAY = 60
+
+# Intervalle de vérification du rejeu du WAL (secondes)
+POLL_INTERVAL = 0.1
+
+# Lignes insérées par lot dans insert_from_reporting
+INSERT_BATCH_SIZE = 1000
+
+_pool = None
+_unavailable_until = 0
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        _pool = sql_db.ConnectionPool(int(config.get('reporting_db_maxconn') or 8))
+    return _pool
+
+
+def _connection_info(dbname):
+    """Paramètres de connexion du primaire, serveur et identifiants remplacés par ceux du reporting"""
+    _dbname, info = sql_db.connection_info_for(dbname)
+    info = dict(info, host=config['reporting_db_host'])
+    for key in ('port', 'user', 'password'):
+        if config.get(f'reporting_db_{key}'):
+            info[key] = config[f'reporting_db_{key}']
+    info['application_name'] = f"{info.get('application_name') or 'odoo'}-reporting"
+    return info
+
+
+def _wait_for_replay(cr, lsn, max_lag):
+    """Attend que `cr` ait rejoué le WAL jusqu'à `lsn` ; False au-delà de `max_lag` secondes
+
+    Chaque vérification est faite dans sa propre transaction : l'instantané
+    des lectures suivantes est pris après le rejeu.
+    """
+    deadline = time.monotonic() + max_lag
+    while True:
+        cr.execute("SELECT NOT pg_is_in_recovery() OR pg_last_wal_replay_lsn() >= %s::pg_lsn", [lsn])
+        replayed = cr.fetchone()[0]
+        cr.rollback()
+        if replayed:
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(POLL_INTERVAL)
+
+
+def _open_reporting_cursor(env):
+    """Curseur en lecture seule sur le serveur de reporting, ou None s'il ne peut pas servir"""
+    global _unavailable_until
+    if not config.get('reporting_db_host') or time.monotonic() < _unavailable_until:
+        return None
+
+    env.cr.execute("SELECT pg_current_wal_lsn()")
+    lsn = env.cr.fetchone()[0]
+    max_lag = float(config.get('reporting_max_lag') or 5)
+    try:
+        cr = sql_db.Connection(_get_pool(), env.cr.dbname, _connection_info(env.cr.dbname)).cursor()
+    except sql_db.PoolError:
+        _logger.info("Pool de reporting plein : lecture sur le primaire")
+        return None
+    except psycopg2.Error as e:
+        _logger.warning(f"Serveur de reporting injoignable, lecture sur le primaire: {e}")
+        _unavailable_until = time.monotonic() + RETRY_DELAY
+        return None
+
+    try:
+        if not _wait_for_replay(cr, lsn, max_lag):
+            _logger.warning(f"Réplica en retard de plus de {max_lag:g} s sur le primaire, lecture sur le primaire")
+            _unavailable_until = time.monotonic() + RETRY_DELAY
+            cr.close()
+            return None
+        cr.execute("SET TRANSACTION READ ONLY")
+    except psycopg2.Error as e:
+        _logger.warning(f"Serveur de reporting en erreur, lecture sur le primaire: {e}")
+        _unavailable_until = time.monotonic() + RETRY_DELAY
+        cr.close()
+        return None
+    return cr
+
+
+@contextmanager
+def reporting_cursor(env):
+    """Curseur pour les lectures lourdes : réplica si disponible et à jour, sinon env.cr"""
+    cr = _open_reporting_cursor(env)
+    if cr is None:
+        yield env.cr
+        return
+    try:
+        yield cr
+    finally:
+        cr.close()
+
+
+@contextmanager
+def reporting_env(env):
+    """Environnement ORM sur le curseur de reporting (enregistrements à ne pas modifier)"""
+    with reporting_cursor(env) as cr:
+        if cr is env.cr:
+            yield env
+        else:
+            cr.transaction = api.Transaction(env.registry)
+            yield env(cr=cr)
+
+
+def insert_from_reporting(env, table, columns, query, params, values):
+    """INSERT INTO `table` des lignes de `query` (colonnes `columns`) complétées par `values`
+
+    Sur le primaire : INSERT ... SELECT en une requête. Sur le réplica : la
+    requête est lue par lots et insérée sur le primaire. Retourne le nombre
+    de lignes insérées.
+    """
+    names = ', '.join(list(columns) + list(values))
+    with reporting_cursor(env) as cr:
+        if cr is env.cr:
+            env.cr.execute("""
+                INSERT INTO {table} ({names})
+                SELECT {columns}, {placeholders} FROM ({query}) reporting
+            """.format(
+                table=table, names=names, columns=', '.join(columns),
+                placeholders=', '.join(['%s'] * len(values)), query=query,
+            ), list(values.values()) + list(params))
+            return env.cr.rowcount
+
+        constants = tuple(values.values())
+        count = 0
+        cr.execute("SELECT {columns} FROM ({query}) reporting".format(columns=', '.join(columns), query=query), params)
+        while True:
+            rows = cr.fetchmany(INSERT_BATCH_SIZE)
+            if not rows:
+                return count
+            execute_values(
+                env.cr._obj, f"INSERT INTO {table} ({names}) VALUES %s",
+                [tuple(row) + constants for row in rows], page_size=INSERT_BATCH_SIZE,
+            )
+            count += len(rows)
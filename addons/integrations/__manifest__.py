@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+{
+    'name': 'Integrations - ISEB',
+    'version': '17.0.1.0.0',
+    'category': 'Accounting/Accounting',
+    'summary': 'Connecteurs externes : banques, facturation électronique, paie',
+    'description': """
+Integrations - ISEB Platform
+============================
+
+Connecteurs entre la plateforme ISEB et les services externes.
+
+Fonctionnalités principales
+----------------------------
+* Import de relevés bancaires (CAMT.053, OFX, CSV) en flux
+* Déduplication des opérations par empreinte (unique_import_id)
+* Création des lignes de relevé par lots
+* Rapprochement automatique avec les factures ouvertes (index montant / référence / partenaire)
+* Catégorisation des opérations par règles cabinet / client (compte PCG et taux de TVA proposés)
+* Réception des webhooks des agrégateurs bancaires avec file de traitement persistante
+* Synchronisation Budget Insight / Bridge : client HTTP asynchrone mutualisé
+  (pool de connexions, quotas, nouvelles tentatives, disjoncteur)
+* Facturation électronique Factur-X : génération par lots (XML CII EN 16931 en flux,
+  PDF/A-3 par pool de processus) et import des factures fournisseurs reçues
+
+Auteur
+------
+ISEB Dev Team
+
+License
+-------
+AGPL-3
+    """,
+    'author': 'ISEB',
+    'website': 'https://www.iseb-accounting.fr',
+    'license': 'AGPL-3',
+    'depends': [
+        'base',
+        'account',
+        'mail',
+        'french_accounting',
+    ],
+    'external_dependencies': {
+        'python': ['lxml', 'httpx'],
+    },
+    'data': [
+        # Security
+        'security/security.xml',
+        'security/ir.model.access.csv',
+
+        # Data
+        'data/ir_cron.xml',
+
+        # Views
+        'views/bank_statement_import_views.xml',
+        'views/bank_reconcile_proposal_views.xml',
+        'views/bank_categorization_rule_views.xml',
+        'views/bank_webhook_event_views.xml',
+        'views/bank_connection_views.xml',
+        'views/facturx_views.xml',
+        'views/menu_views.xml',
+    ],
+    'installable': True,
+    'application': False,
+    'auto_install': False,
+}
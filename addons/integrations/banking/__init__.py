@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+
+from . import statement_parsers
+from . import reconciliation
+from . import categorization
+from . import budget_insight
+from . import bridge
+from . import sync
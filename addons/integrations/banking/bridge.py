@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Connecteur Bridge (API v2), fournisseur de secours
+
+Chaque utilisateur final s'authentifie par e-mail / mot de passe Bridge ;
+le jeton obtenu (valable 2 heures) est conservé dans le cache partagé.
+"""
+
+from datetime import datetime
+
+from ..common.http_client import ProviderClient
+
+BRIDGE_VERSION = '2021-06-01'
+PAGE_SIZE = 500
+
+
+class BridgeClient(ProviderClient):
+    name = 'bridge'
+    base_url = 'https://api.bridgeapi.io'
+    rate_limit = 10
+    burst = 20
+    max_concurrency = 8
+
+    def _app_headers(self):
+        return {
+            'Client-Id': self.credentials.get('client_id') or '',
+            'Client-Secret': self.credentials.get('client_secret') or '',
+            'Bridge-Version': BRIDGE_VERSION,
+        }
+
+    def _auth_headers(self, token):
+        return dict(self._app_headers(), Authorization=f'Bearer {token}')
+
+    async def _fetch_token(self, user):
+        data = await self.post(
+            '/v2/authenticate',
+            authenticated=False,
+            headers=self._app_headers(),
+            json={'email': user.get('id'), 'password': user.get('token')},
+        )
+        expires_in = 2 * 3600
+        if data.get('expires_at'):
+            expires_at = datetime.fromisoformat(data['expires_at'].replace('Z', '+00:00'))
+            expires_in = expires_at.timestamp() - datetime.now(expires_at.tzinfo).timestamp()
+        return data['access_token'], expires_in
+
+    async def get_transactions(self, user, account_id, date_from, date_to=None):
+        """Opérations d'un compte depuis `date_from`, en suivant la pagination Bridge"""
+        path = f'/v2/accounts/{account_id}/transactions'
+        params = {'since': date_from.isoformat(), 'limit': PAGE_SIZE}
+        if date_to:
+            params['until'] = date_to.isoformat()
+
+        transactions = []
+        while path:
+            data = await self.get(path, user=user, params=params)
+            transactions.extend(
+                self._normalize(transaction)
+                for transaction in data.get('resources', [])
+                if not transaction.get('is_future')
+            )
+            # next_uri contient déjà les paramètres de la page suivante
+            path = (data.get('pagination') or {}).get('next_uri')
+            params = None
+        return transactions
+
+    def _normalize(self, transaction):
+        """Même format que les parseurs de relevés (banking/statement_parsers.py)"""
+        return {
+            'date': datetime.strptime(transaction['date'], '%Y-%m-%d').date(),
+            'amount': float(transaction.get('amount') or 0.0),
+            'payment_ref': transaction.get('bank_description') or transaction.get('clean_description') or '/',
+            'partner_name': '',
+            'account_number': '',
+            'ref': '',
+            'transaction_id': str(transaction['id']),
+            'currency': transaction.get('currency_code') or '',
+        }
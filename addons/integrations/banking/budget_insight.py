@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Connecteur Budget Insight (API 2.0)
+
+Les appels se font avec le jeton permanent de l'utilisateur final, obtenu
+lors de la connexion de sa banque (voir docs/integration/plan-integration-bancaire.md).
+"""
+
+from datetime import datetime
+
+from ..common.http_client import AuthenticationError, ProviderClient
+
+PAGE_SIZE = 1000
+
+
+class BudgetInsightClient(ProviderClient):
+    name = 'budget_insight'
+    base_url = 'https://api.budgetinsight.com/2.0'
+    rate_limit = 20
+    burst = 40
+    max_concurrency = 16
+
+    async def _fetch_token(self, user):
+        # Jeton utilisateur permanent : rien à renouveler côté client
+        if not user or not user.get('token'):
+            raise AuthenticationError(f"{self.name}: jeton utilisateur manquant")
+        return user['token'], 365 * 24 * 3600
+
+    async def get_accounts(self, user):
+        data = await self.get('/users/me/accounts', user=user)
+        return data.get('accounts', [])
+
+    async def get_transactions(self, user, account_id, date_from, date_to=None):
+        """Opérations d'un compte depuis `date_from`, toutes pages confondues"""
+        params = {'min_date': date_from.isoformat(), 'limit': PAGE_SIZE, 'offset': 0}
+        if date_to:
+            params['max_date'] = date_to.isoformat()
+
+        transactions = []
+        while True:
+            data = await self.get(f'/users/me/accounts/{account_id}/transactions', user=user, params=params)
+            page = data.get('transactions', [])
+            transactions.extend(
+                self._normalize(transaction) for transaction in page if not transaction.get('coming')
+            )
+            if len(page) < PAGE_SIZE:
+                return transactions
+            params['offset'] += PAGE_SIZE
+
+    def _normalize(self, transaction):
+        """Même format que les parseurs de relevés (banking/statement_parsers.py)"""
+        return {
+            'date': datetime.strptime(transaction['date'], '%Y-%m-%d').date(),
+            'amount': float(transaction.get('value') or 0.0),
+            'payment_ref': transaction.get('original_wording') or transaction.get('wording') or '/',
+            'partner_name': '',
+            'account_number': '',
+            'ref': '',
+            'transaction_id': str(transaction['id']),
+            'currency': '',
+        }
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Moteur de catégorisation des opérations bancaires par règles compilées
+
+Un jeu de règles (cabinet + client) est compilé une seule fois :
+
+* les règles « mot-clé » sont indexées par leur premier mot : chaque libellé
+  n'est parcouru qu'une fois, mot par mot, quel que soit le nombre de règles ;
+* pour les règles « expression régulière », le plus long littéral obligatoire
+  de chaque motif est extrait et l'ensemble de ces littéraux est compilé en
+  une seule expression factorisée en arbre de préfixes (équivalent d'un
+  automate d'Aho-Corasick exécuté par le moteur C de ``re``) : les expressions
+  individuelles ne sont évaluées que sur les libellés qu'elle reconnaît.
+
+La règle retenue est celle de plus haute priorité (position dans la liste
+fournie) parmi toutes les règles qui reconnaissent le libellé.
+"""
+
+import re
+import unicodedata
+from collections import namedtuple
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+Rule = namedtuple('Rule', ['id', 'match_type', 'pattern', 'amount_type', 'account_code', 'tva_rate', 'specific'])
+Categorization = namedtuple('Categorization', ['rule_id', 'account_code', 'tva_rate', 'confidence'])
+
+LABEL_CLEAN_RE = re.compile(r'[^0-9A-Z]+')
+
+# Confiance selon l'origine de la règle et les conflits éventuels
+CONFIDENCE_SPECIFIC = 1.0
+CONFIDENCE_SHARED = 0.8
+CONFLICT_FACTOR = 0.6
+
+# Longueur minimale d'un littéral pour servir de pré-filtre
+MIN_LITERAL_LENGTH = 3
+
+
+def normalize_label(text):
+    """Libellé normalisé : majuscules, sans accents ni ponctuation"""
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode()
+    return LABEL_CLEAN_RE.sub(' ', text.upper()).strip()
+
+
+def required_literal(pattern):
+    """Plus longue suite de caractères littéraux obligatoire d'une expression (en majuscules)
+
+    Seul le niveau principal du motif est examiné : une alternative ou un
+    groupe interrompt la suite. Retourne '' si aucun littéral n'est garanti.
+    """
+    best = current = ''
+    for op, av in sre_parse.parse(pattern):
+        if op is sre_parse.LITERAL:
+            current += chr(av)
+            if len(current) > len(best):
+                best = current
+        else:
+            current = ''
+    return best.upper()
+
+
+def literal_trie_regex(literals):
+    """Compile des littéraux en une expression factorisée par préfixes communs"""
+    trie = {}
+    for literal in literals:
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        # Un littéral plus court suffit : ses prolongements sont inutiles au pré-filtre
+        if '' in node:
+            return ''
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items())]
+        return branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+
+    return re.compile(build(trie))
+
+
+class CompiledRuleSet:
+    """Jeu de règles compilé, immuable, partagé via le cache de l'ORM"""
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self.keywords = {}
+        self.regexes = []
+
+        for priority, rule in enumerate(self.rules):
+            if rule.match_type == 'keyword':
+                words = tuple(normalize_label(rule.pattern).split())
+                if words:
+                    self.keywords.setdefault(words[0], []).append((priority, words))
+            else:
+                self.regexes.append((priority, re.compile(rule.pattern, re.IGNORECASE)))
+
+        # Pré-filtre des expressions : littéraux obligatoires, sinon évaluation systématique
+        literals = set()
+        self.unfiltered = False
+        for _priority, regex in self.regexes:
+            literal = required_literal(regex.pattern)
+            if len(literal) >= MIN_LITERAL_LENGTH:
+                literals.add(literal)
+            else:
+                self.unfiltered = True
+        self.prefilter = literal_trie_regex(literals) if literals else None
+
+    def _matching_priorities(self, label):
+        label = label or ''
+        priorities = set()
+        words = normalize_label(label).split()
+        for position, word in enumerate(words):
+            for priority, keyword in self.keywords.get(word, ()):
+                if len(keyword) == 1 or tuple(words[position:position + len(keyword)]) == keyword:
+                    priorities.add(priority)
+
+        if self.regexes and (self.unfiltered or self.prefilter.search(label.upper())):
+            for priority, regex in self.regexes:
+                if regex.search(label):
+                    priorities.add(priority)
+        return priorities
+
+    def classify(self, label, amount):
+        """Retourne la catégorisation (Categorization) d'une opération, ou None"""
+        hits = []
+        for priority in sorted(self._matching_priorities(label)):
+            rule = self.rules[priority]
+            if rule.amount_type == 'inbound' and amount < 0:
+                continue
+            if rule.amount_type == 'outbound' and amount > 0:
+                continue
+            hits.append(rule)
+        if not hits:
+            return None
+
+        best = hits[0]
+        confidence = CONFIDENCE_SPECIFIC if best.specific else CONFIDENCE_SHARED
+        if any((rule.account_code, rule.tva_rate) != (best.account_code, best.tva_rate) for rule in hits[1:]):
+            confidence *= CONFLICT_FACTOR
+        return Categorization(best.id, best.account_code, best.tva_rate, round(confidence, 2))
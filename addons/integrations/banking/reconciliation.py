@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Moteur de rapprochement bancaire par index en mémoire
+
+Les pièces ouvertes (lignes clients/fournisseurs non lettrées) sont indexées
+une seule fois par montant, par jeton de référence et par partenaire. Chaque
+ligne de relevé est ensuite rapprochée en temps quasi constant :
+
+1. montant exact (table de hachage en centimes) ;
+2. référence de facture présente dans le libellé ;
+3. fenêtre de tolérance sur les montants triés (recherche dichotomique).
+
+Les montants sont signés comme l'écriture bancaire : un encaissement client
+(montant positif) correspond à un résiduel débiteur positif.
+"""
+
+import bisect
+import re
+from collections import defaultdict, namedtuple
+
+OpenItem = namedtuple('OpenItem', ['id', 'partner_id', 'amount', 'tokens'])
+StatementItem = namedtuple('StatementItem', ['id', 'partner_id', 'amount', 'label'])
+Match = namedtuple('Match', ['statement_id', 'item_id', 'method', 'score'])
+
+TOKEN_SPLIT_RE = re.compile(r'[\s,;:()\[\]]+')
+TOKEN_CLEAN_RE = re.compile(r'[^0-9A-Z]')
+
+# Scores de confiance par méthode
+SCORE_AMOUNT_PARTNER = 1.0
+SCORE_AMOUNT_REFERENCE = 1.0
+SCORE_REFERENCE = 0.95
+SCORE_AMOUNT_ONLY = 0.8
+SCORE_REFERENCE_PARTIAL = 0.6
+SCORE_TOLERANCE = 0.5
+
+
+def to_cents(amount):
+    return int(round(amount * 100))
+
+
+def extract_tokens(*texts):
+    """Jetons de référence : mots normalisés d'au moins 5 caractères contenant un chiffre"""
+    tokens = set()
+    for text in texts:
+        if not text:
+            continue
+        for word in TOKEN_SPLIT_RE.split(text.upper()):
+            token = TOKEN_CLEAN_RE.sub('', word)
+            if len(token) >= 5 and any(char.isdigit() for char in token):
+                tokens.add(token)
+    return tokens
+
+
+class OpenItemIndex:
+    """Index des pièces ouvertes par montant, jeton de référence et partenaire"""
+
+    def __init__(self, items, tolerance_cents=0):
+        self.items = {}
+        self.by_amount = defaultdict(list)
+        self.by_token = defaultdict(list)
+        self.by_partner = defaultdict(list)
+        self.tolerance_cents = tolerance_cents
+        self.used = set()
+
+        for item in items:
+            self.items[item.id] = item
+            self.by_amount[to_cents(item.amount)].append(item)
+            for token in item.tokens:
+                self.by_token[token].append(item)
+            if item.partner_id:
+                self.by_partner[item.partner_id].append(item)
+
+        self.sorted_amounts = sorted(
+            (to_cents(item.amount), item.id) for item in self.items.values()
+        )
+        self.sorted_keys = [amount for amount, _item_id in self.sorted_amounts]
+
+    def _available(self, candidates, partner_id=None):
+        candidates = [item for item in candidates if item.id not in self.used]
+        if partner_id:
+            candidates = [item for item in candidates if item.partner_id in (partner_id, None)]
+        return candidates
+
+    def match(self, line):
+        """Retourne le meilleur rapprochement (Match) pour une ligne de relevé, ou None"""
+        cents = to_cents(line.amount)
+        tokens = extract_tokens(line.label)
+
+        # 1. Montant exact
+        candidates = self._available(self.by_amount.get(cents, ()), line.partner_id)
+        if len(candidates) > 1 and tokens:
+            by_reference = [item for item in candidates if item.tokens & tokens]
+            if len(by_reference) == 1:
+                return self._accept(line, by_reference[0], 'amount', SCORE_AMOUNT_REFERENCE)
+        if len(candidates) == 1:
+            score = SCORE_AMOUNT_PARTNER if line.partner_id else SCORE_AMOUNT_ONLY
+            if candidates[0].tokens & tokens:
+                score = SCORE_AMOUNT_REFERENCE
+            return self._accept(line, candidates[0], 'amount', score)
+
+        # 2. Référence de facture dans le libellé
+        referenced = {}
+        for token in tokens:
+            for item in self._available(self.by_token.get(token, ()), line.partner_id):
+                referenced[item.id] = item
+        if len(referenced) == 1:
+            item = next(iter(referenced.values()))
+            same_sign = (item.amount > 0) == (line.amount > 0)
+            if same_sign:
+                score = SCORE_REFERENCE if to_cents(item.amount) == cents else SCORE_REFERENCE_PARTIAL
+                return self._accept(line, item, 'reference', score)
+
+        # 3. Fenêtre de tolérance sur les montants triés
+        if self.tolerance_cents:
+            start = bisect.bisect_left(self.sorted_keys, cents - self.tolerance_cents)
+            end = bisect.bisect_right(self.sorted_keys, cents + self.tolerance_cents)
+            window = [self.items[item_id] for _amount, item_id in self.sorted_amounts[start:end]]
+            window = self._available(window, line.partner_id)
+            if line.partner_id:
+                window = [item for item in window if item.partner_id == line.partner_id]
+            if window:
+                item = min(window, key=lambda candidate: abs(to_cents(candidate.amount) - cents))
+                return self._accept(line, item, 'tolerance', SCORE_TOLERANCE)
+
+        return None
+
+    def _accept(self, line, item, method, score):
+        self.used.add(item.id)
+        return Match(line.id, item.id, method, score)
+
+
+def match_statement_lines(open_items, statement_lines, tolerance_cents=0):
+    """Rapproche un lot de lignes de relevé contre les pièces ouvertes
+
+    Les lignes avec partenaire connu sont traitées en premier pour que les
+    correspondances les plus sûres réservent leurs pièces.
+    """
+    index = OpenItemIndex(open_items, tolerance_cents=tolerance_cents)
+    ordered = sorted(statement_lines, key=lambda line: not line.partner_id)
+    matches = []
+    for line in ordered:
+        match = index.match(line)
+        if match:
+            matches.append(match)
+    return matches
@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+"""
+Parseurs de relevés bancaires en flux (CAMT.053, OFX, CSV)
+
+Chaque parseur lit un flux binaire et produit des dictionnaires normalisés
+au fil de l'eau, sans charger le fichier complet en mémoire :
+
+    {
+        'date': datetime.date,
+        'amount': float,          # positif = crédit, négatif = débit
+        'payment_ref': str,       # libellé de l'opération
+        'partner_name': str,
+        'account_number': str,    # IBAN / compte de la contrepartie
+        'ref': str,               # référence de bout en bout
+        'transaction_id': str,    # identifiant fourni par la banque
+        'currency': str,
+    }
+"""
+
+import codecs
+import csv
+import io
+import re
+import unicodedata
+from datetime import datetime
+
+from lxml import etree
+
+OFX_CHUNK_SIZE = 64 * 1024
+CSV_SNIFF_SIZE = 64 * 1024
+
+CSV_DATE_FORMATS = ('%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y', '%d/%m/%y', '%d.%m.%Y')
+
+# En-têtes CSV reconnus (normalisés : minuscules, sans accents)
+CSV_COLUMNS = {
+    'date': ('date', 'date operation', 'date comptable', 'date de comptabilisation'),
+    'value_date': ('date valeur', 'date de valeur'),
+    'label': ('libelle', 'libelle operation', 'libelle simplifie', 'description', 'operation'),
+    'amount': ('montant', 'amount', 'montant eur', 'montant(eur)'),
+    'debit': ('debit', 'debit eur', 'debit(eur)'),
+    'credit': ('credit', 'credit eur', 'credit(eur)'),
+    'ref': ('reference', 'ref', 'reference operation'),
+    'partner': ('tiers', 'beneficiaire', 'contrepartie'),
+}
+
+
+def detect_format(filename, head):
+    """Détermine le format du relevé à partir du nom et des premiers octets"""
+    name = (filename or '').lower()
+    if name.endswith('.xml') or b'camt.053' in head:
+        return 'camt053'
+    if name.endswith(('.ofx', '.qfx')) or b'OFXHEADER' in head or b'<OFX>' in head.upper():
+        return 'ofx'
+    if name.endswith(('.csv', '.txt')):
+        return 'csv'
+    return False
+
+
+def parse_statement(stream, file_format):
+    """Retourne un générateur de lignes de relevé pour le format donné"""
+    parsers = {
+        'camt053': parse_camt053,
+        'ofx': parse_ofx,
+        'csv': parse_csv,
+    }
+    if file_format not in parsers:
+        raise ValueError(f"Format de relevé non supporté: {file_format}")
+    return parsers[file_format](stream)
+
+
+def _parse_amount(value):
+    """Convertit un montant bancaire ('1 234,56', '-1.234,56', '1234.56') en float"""
+    value = (value or '').strip().replace('\xa0', '').replace(' ', '').replace('+', '')
+    if not value:
+        return 0.0
+    if ',' in value and '.' in value:
+        # Le dernier séparateur est le séparateur décimal
+        if value.rfind(',') > value.rfind('.'):
+            value = value.replace('.', '').replace(',', '.')
+        else:
+            value = value.replace(',', '')
+    else:
+        value = value.replace(',', '.')
+    return float(value)
+
+
+def _normalize_header(value):
+    value = unicodedata.normalize('NFKD', value or '').encode('ascii', 'ignore').decode()
+    return ' '.join(value.lower().replace('_', ' ').split())
+
+
+# ---------------------------------------------------------------------------
+# CAMT.053 (ISO 20022)
+# ---------------------------------------------------------------------------
+
+def _camt_text(element, ns, path):
+    found = element.find('/'.join(f'{ns}{tag}' for tag in path.split('/')))
+    return found.text.strip() if found is not None and found.text else ''
+
+
+def parse_camt053(stream):
+    """Parse un relevé CAMT.053 entrée par entrée (iterparse + libération des nœuds)"""
+    currency = ''
+    context = etree.iterparse(
+        stream,
+        events=('end',),
+        tag=('{*}Ccy', '{*}Ntry'),
+        huge_tree=True,
+        resolve_entities=False,
+        no_network=True,
+    )
+    for _event, element in context:
+        ns = element.tag[:element.tag.index('}') + 1] if element.tag.startswith('{') else ''
+        if element.tag == f'{ns}Ccy':
+            # Devise du compte du relevé (Stmt/Acct/Ccy), précède les entrées
+            parent = element.getparent()
+            if parent.tag == f'{ns}Acct' and parent.getparent().tag == f'{ns}Stmt':
+                currency = (element.text or '').strip() or currency
+            continue
+
+        amount_node = element.find(f'{ns}Amt')
+        amount = float(amount_node.text) if amount_node is not None else 0.0
+        if _camt_text(element, ns, 'CdtDbtInd') == 'DBIT':
+            amount = -amount
+
+        date_str = (
+            _camt_text(element, ns, 'BookgDt/Dt')
+            or _camt_text(element, ns, 'BookgDt/DtTm')[:10]
+            or _camt_text(element, ns, 'ValDt/Dt')
+        )
+
+        details = element.find(f'{ns}NtryDtls/{ns}TxDtls')
+        payment_ref = ref = partner_name = account_number = ''
+        if details is not None:
+            payment_ref = ' '.join(
+                node.text.strip()
+                for node in details.iterfind(f'{ns}RmtInf/{ns}Ustrd')
+                if node.text
+            )
+            ref = _camt_text(details, ns, 'Refs/EndToEndId')
+            if ref == 'NOTPROVIDED':
+                ref = ''
+            party = 'Dbtr' if amount > 0 else 'Cdtr'
+            partner_name = _camt_text(details, ns, f'RltdPties/{party}/Nm')
+            account_number = _camt_text(details, ns, f'RltdPties/{party}Acct/Id/IBAN')
+
+        yield {
+            'date': datetime.strptime(date_str, '%Y-%m-%d').date(),
+            'amount': amount,
+            'payment_ref': payment_ref or _camt_text(element, ns, 'AddtlNtryInf') or '/',
+            'partner_name': partner_name,
+            'account_number': account_number,
+            'ref': ref,
+            'transaction_id': _camt_text(element, ns, 'AcctSvcrRef') or _camt_text(element, ns, 'NtryRef'),
+            'currency': amount_node.get('Ccy', currency) if amount_node is not None else currency,
+        }
+
+        # Libérer la mémoire : l'entrée et les nœuds frères déjà traités
+        element.clear()
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+    del context
+
+
+# ---------------------------------------------------------------------------
+# OFX (SGML v1 et XML v2)
+# ---------------------------------------------------------------------------
+
+def _iter_ofx_tags(stream):
+    """Découpe un flux OFX en couples (balise, valeur) par blocs de taille fixe"""
+    reader = codecs.getreader('cp1252')(stream, errors='replace')
+    buffer = ''
+    while True:
+        chunk = reader.read(OFX_CHUNK_SIZE)
+        if not chunk:
+            break
+        buffer += chunk
+        parts = buffer.split('<')
+        buffer = parts.pop()
+        for part in parts:
+            tag, sep, value = part.partition('>')
+            if sep:
+                yield tag.strip().upper(), value.strip()
+    tag, sep, value = buffer.partition('>')
+    if sep:
+        yield tag.strip().upper(), value.strip()
+
+
+def _parse_ofx_date(value):
+    return datetime.strptime(value[:8], '%Y%m%d').date()
+
+
+def parse_ofx(stream):
+    """Parse un relevé OFX transaction par transaction"""
+    currency = ''
+    transaction = None
+    for tag, value in _iter_ofx_tags(stream):
+        if tag == 'CURDEF':
+            currency = value
+        elif tag == 'STMTTRN':
+            transaction = {}
+        elif tag == '/STMTTRN' and transaction is not None:
+            label = transaction.get('NAME', '')
+            memo = transaction.get('MEMO', '')
+            if memo and memo != label:
+                label = f"{label} {memo}".strip()
+            yield {
+                'date': _parse_ofx_date(transaction.get('DTPOSTED') or transaction.get('DTUSER')),
+                'amount': _parse_amount(transaction.get('TRNAMT')),
+                'payment_ref': label or '/',
+                'partner_name': transaction.get('PAYEEID', ''),
+                'account_number': transaction.get('BANKACCTTO', ''),
+                'ref': transaction.get('REFNUM') or transaction.get('CHECKNUM', ''),
+                'transaction_id': transaction.get('FITID', ''),
+                'currency': transaction.get('CURRENCY') or currency,
+            }
+            transaction = None
+        elif transaction is not None and not tag.startswith('/') and value:
+            transaction[tag] = value
+
+
+# ---------------------------------------------------------------------------
+# CSV bancaire
+# ---------------------------------------------------------------------------
+
+def _open_csv_text(stream):
+    """Ouvre le flux binaire en texte en détectant l'encodage sur les premiers octets"""
+    head = stream.read(CSV_SNIFF_SIZE)
+    stream.seek(0)
+    encoding = 'utf-8-sig'
+    try:
+        head.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # Un caractère multi-octets coupé en fin de bloc reste de l'UTF-8
+        if e.start < len(head) - 3:
+            encoding = 'cp1252'
+    return io.TextIOWrapper(stream, encoding=encoding, errors='replace', newline='')
+
+
+def _map_csv_columns(header):
+    mapping = {}
+    for index, name in enumerate(header):
+        normalized = _normalize_header(name)
+        for role, aliases in CSV_COLUMNS.items():
+            if normalized in aliases and role not in mapping:
+                mapping[role] = index
+    if 'date' not in mapping or 'label' not in mapping:
+        raise ValueError("Colonnes 'Date' et 'Libellé' introuvables dans l'en-tête CSV")
+    if 'amount' not in mapping and not ('debit' in mapping or 'credit' in mapping):
+        raise ValueError("Colonne 'Montant' ou 'Débit'/'Crédit' introuvable dans l'en-tête CSV")
+    return mapping
+
+
+def _parse_csv_date(value):
+    value = value.strip()
+    for date_format in CSV_DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Date non reconnue: {value}")
+
+
+def parse_csv(stream):
+    """Parse un export CSV bancaire ligne par ligne (séparateur détecté sur l'en-tête)"""
+    text = _open_csv_text(stream)
+    header_line = text.readline()
+    delimiter = max((';', ',', '\t', '|'), key=header_line.count)
+    header = next(csv.reader([header_line], delimiter=delimiter))
+    columns = _map_csv_columns(header)
+
+    def cell(row, role):
+        index = columns.get(role)
+        return row[index].strip() if index is not None and index < len(row) else ''
+
+    for row in csv.reader(text, delimiter=delimiter):
+        if not row or not any(row) or not cell(row, 'date'):
+            continue
+        if 'amount' in columns:
+            amount = _parse_amount(cell(row, 'amount'))
+        else:
+            amount = _parse_amount(cell(row, 'credit')) - abs(_parse_amount(cell(row, 'debit')))
+        yield {
+            'date': _parse_csv_date(cell(row, 'date')),
+            'amount': amount,
+            'payment_ref': re.sub(r'\s+', ' ', cell(row, 'label')) or '/',
+            'partner_name': cell(row, 'partner'),
+            'account_number': '',
+            'ref': cell(row, 'ref'),
+            'transaction_id': '',
+            'currency': '',
+        }
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+Récupération concurrente des opérations de nombreuses connexions bancaires
+
+Les connexions sont réparties par fournisseur : un seul client (pool de
+connexions, quota et disjoncteur communs) par fournisseur, et un sémaphore
+global borne le nombre de comptes synchronisés simultanément. Aucun accès à
+l'ORM ici : les résultats sont écrits ensuite par le modèle bank.connection.
+"""
+
+import asyncio
+from collections import namedtuple
+
+from .bridge import BridgeClient
+from .budget_insight import BudgetInsightClient
+
+PROVIDER_CLIENTS = {
+    'budget_insight': BudgetInsightClient,
+    'bridge': BridgeClient,
+}
+
+SyncJob = namedtuple('SyncJob', ['connection_id', 'provider', 'user', 'account_id', 'date_from'])
+
+
+async def fetch_all(jobs, credentials, concurrency=20, transport=None, base_urls=None):
+    """Retourne, dans l'ordre des `jobs`, la liste des opérations ou l'exception levée"""
+    base_urls = base_urls or {}
+    semaphore = asyncio.Semaphore(concurrency)
+    results = [None] * len(jobs)
+
+    async def run(client, index, job):
+        async with semaphore:
+            try:
+                results[index] = await client.get_transactions(job.user, job.account_id, job.date_from)
+            except Exception as e:
+                results[index] = e
+
+    async def run_provider(provider, indexed_jobs):
+        client_class = PROVIDER_CLIENTS[provider]
+        client = client_class(credentials.get(provider, {}), base_url=base_urls.get(provider), transport=transport)
+        async with client:
+            await asyncio.gather(*(run(client, index, job) for index, job in indexed_jobs))
+
+    by_provider = {}
+    for index, job in enumerate(jobs):
+        by_provider.setdefault(job.provider, []).append((index, job))
+    await asyncio.gather(*(
+        run_provider(provider, indexed_jobs) for provider, indexed_jobs in by_provider.items()
+    ))
+    return results
@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""
+Client HTTP asynchrone partagé par les connecteurs externes
+
+Chaque fournisseur (Budget Insight, Bridge, paie, facturation électronique)
+dérive de ProviderClient et bénéficie de :
+
+* un pool de connexions httpx.AsyncClient (keep-alive) par session de synchronisation ;
+* un cache de jetons d'accès par fournisseur et par identifiants ;
+* une limitation de débit par seau à jetons (quota du fournisseur) ;
+* un plafond de requêtes simultanées ;
+* des nouvelles tentatives avec backoff exponentiel et gigue (429, 5xx, erreurs réseau) ;
+* un disjoncteur qui coupe les appels vers un fournisseur défaillant.
+
+Le seau à jetons, le disjoncteur et le cache de jetons sont partagés par
+tout le processus (d'une synchronisation à l'autre) ; ils ne dépendent pas
+de la boucle asyncio et sont protégés par des verrous de threads.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+
+import httpx
+
+_logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class IntegrationError(Exception):
+    """Erreur d'appel à un service externe"""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class AuthenticationError(IntegrationError):
+    """Identifiants refusés par le fournisseur"""
+
+
+class CircuitOpenError(IntegrationError):
+    """Appels suspendus : le fournisseur a échoué trop souvent"""
+
+
+class TokenBucket:
+    """Limiteur de débit : `rate` requêtes par seconde, rafales jusqu'à `capacity`"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        """Réserve un jeton et retourne l'attente nécessaire (secondes)"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    async def acquire(self):
+        wait = self._reserve()
+        if wait:
+            await asyncio.sleep(wait)
+
+
+class CircuitBreaker:
+    """Disjoncteur : ouvert après `failure_threshold` échecs consécutifs
+
+    Une fois `reset_timeout` écoulé, un seul appel d'essai est autorisé
+    (semi-ouvert) et le délai est réarmé pour les autres : le succès de
+    l'essai referme le circuit, son échec le laisse ouvert.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=60):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def before_call(self, name):
+        with self._lock:
+            state = self.state
+            if state == 'open':
+                raise CircuitOpenError(f"{name}: appels suspendus (disjoncteur ouvert)")
+            if state == 'half_open':
+                self.opened_at = time.monotonic()
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class TokenCache:
+    """Cache des jetons d'accès : clé -> (jeton, expiration)"""
+
+    def __init__(self):
+        self._tokens = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            token, expires_at = self._tokens.get(key, (None, 0))
+        return token if expires_at > time.time() else None
+
+    def set(self, key, token, expires_in):
+        # Marge de 60 s pour ne jamais envoyer un jeton sur le point d'expirer
+        with self._lock:
+            self._tokens[key] = (token, time.time() + max(expires_in - 60, 0))
+
+    def invalidate(self, key):
+        with self._lock:
+            self._tokens.pop(key, None)
+
+
+# État partagé par fournisseur pour tout le processus
+_buckets = {}
+_breakers = {}
+_state_lock = threading.Lock()
+token_cache = TokenCache()
+
+
+def backoff_delay(attempt, base=0.5, cap=30.0):
+    """Backoff exponentiel avec gigue complète (« full jitter »)"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class ProviderClient:
+    """Client asynchrone d'un fournisseur externe
+
+    Une instance (et donc un pool de connexions) est partagée par toutes les
+    connexions bancaires d'un fournisseur pendant une synchronisation ; les
+    identifiants applicatifs sont dans `credentials`, ceux de l'utilisateur
+    final sont passés à chaque appel (`user`). À utiliser comme gestionnaire
+    de contexte asynchrone ::
+
+        async with BudgetInsightClient(credentials) as client:
+            transactions = await client.get_transactions(user, account_id, date_from)
+
+    `transport` permet de substituer un httpx.MockTransport (voir mock_server).
+    """
+
+    name = 'provider'
+    base_url = ''
+    rate_limit = 10             # requêtes par seconde
+    burst = 20                  # rafale maximale
+    max_concurrency = 10        # requêtes simultanées
+    max_retries = 4
+    timeout = 30.0
+    failure_threshold = 5
+    reset_timeout = 60
+
+    def __init__(self, credentials, base_url=None, transport=None):
+        self.credentials = credentials
+        self.base_url = base_url or self.base_url
+        self.transport = transport
+        self.client = None
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        with _state_lock:
+            self.bucket = _buckets.setdefault(self.name, TokenBucket(self.rate_limit, self.burst))
+            self.breaker = _breakers.setdefault(
+                self.name, CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            )
+
+    async def __aenter__(self):
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+            ),
+            transport=self.transport,
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.client.aclose()
+        self.client = None
+
+    # -- Authentification ---------------------------------------------------
+
+    def _token_key(self, user):
+        return (self.name, self.credentials.get('client_id'), (user or {}).get('id'))
+
+    async def _fetch_token(self, user):
+        """Retourne (jeton, durée de validité en secondes) ; à surcharger"""
+        raise NotImplementedError()
+
+    def _auth_headers(self, token):
+        return {'Authorization': f'Bearer {token}'}
+
+    async def _get_token(self, user, refresh=False):
+        key = self._token_key(user)
+        token = None if refresh else token_cache.get(key)
+        if not token:
+            token, expires_in = await self._fetch_token(user)
+            token_cache.set(key, token, expires_in)
+        return token
+
+    # -- Requêtes -----------------------------------------------------------
+
+    async def request(self, method, path, user=None, authenticated=True, **kwargs):
+        """Requête avec limitation, nouvelles tentatives et disjoncteur ; retourne le JSON"""
+        extra_headers = kwargs.pop('headers', None) or {}
+        refreshed = False
+        for attempt in range(self.max_retries + 1):
+            self.breaker.before_call(self.name)
+            headers = dict(extra_headers)
+            if authenticated:
+                headers.update(self._auth_headers(await self._get_token(user, refresh=refreshed)))
+
+            try:
+                async with self.semaphore:
+                    await self.bucket.acquire()
+                    response = await self.client.request(method, path, headers=headers, **kwargs)
+            except httpx.TransportError as e:
+                self.breaker.record_failure()
+                if attempt == self.max_retries:
+                    raise IntegrationError(f"{self.name}: {e}") from e
+                await asyncio.sleep(backoff_delay(attempt))
+                continue
+
+            if response.status_code == 401 and authenticated and not refreshed:
+                # Jeton révoqué ou expiré côté fournisseur : un seul renouvellement
+                token_cache.invalidate(self._token_key(user))
+                refreshed = True
+                continue
+
+            if response.status_code in RETRY_STATUSES:
+                if response.status_code >= 500:
+                    self.breaker.record_failure()
+                if attempt == self.max_retries:
+                    raise IntegrationError(
+                        f"{self.name}: {method} {path} -> HTTP {response.status_code}",
+                        response.status_code,
+                    )
+                await asyncio.sleep(self._retry_delay(response, attempt))
+                continue
+
+            self.breaker.record_success()
+            if response.status_code in (401, 403):
+                raise AuthenticationError(f"{self.name}: accès refusé", response.status_code)
+            if response.is_error:
+                raise IntegrationError(
+                    f"{self.name}: {method} {path} -> HTTP {response.status_code}: {response.text[:200]}",
+                    response.status_code,
+                )
+            return response.json() if response.content else {}
+
+        raise IntegrationError(f"{self.name}: {method} {path} abandonné après {self.max_retries} essais")
+
+    def _retry_delay(self, response, attempt):
+        retry_after = response.headers.get('Retry-After')
+        if retry_after and retry_after.isdigit():
+            return int(retry_after) + random.uniform(0, 1)
+        return backoff_delay(attempt)
+
+    async def get(self, path, **kwargs):
+        return await self.request('GET', path, **kwargs)
+
+    async def post(self, path, **kwargs):
+        return await self.request('POST', path, **kwargs)
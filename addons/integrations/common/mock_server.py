@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Faux fournisseurs (Budget Insight, Bridge) pour les essais des connecteurs
+
+MockAggregator produit un httpx.MockTransport à passer aux clients : aucune
+requête ne quitte la machine. Latence, erreurs 5xx et quota (429) sont
+paramétrables pour vérifier les nouvelles tentatives, le disjoncteur et la
+limitation de débit ::
+
+    mock = MockAggregator(transactions_per_account=200, latency=0.05, error_rate=0.1)
+    async with BridgeClient(credentials, transport=mock.transport()) as client:
+        ...
+
+La synchronisation des connexions bancaires l'utilise lorsque le paramètre
+système `integrations.bank_sync_mock` vaut 1.
+"""
+
+import asyncio
+import random
+import time
+from datetime import date, timedelta
+
+import httpx
+
+WORDINGS = [
+    'CB AMAZON EU SARL', 'PRLV SEPA EDF', 'VIR URSSAF', 'CB SNCF INTERNET',
+    'PRLV SEPA ORANGE', 'CB TOTAL ENERGIES', 'LOYER BUREAU', 'VIR CLIENT FACTURE',
+]
+
+
+class MockAggregator:
+
+    def __init__(self, transactions_per_account=50, latency=0.0, error_rate=0.0,
+                 quota_per_second=None, seed=42):
+        self.transactions_per_account = transactions_per_account
+        self.latency = latency
+        self.error_rate = error_rate
+        self.quota_per_second = quota_per_second
+        self.random = random.Random(seed)
+        self.calls = []
+        self._window = (0, 0)
+
+    def transport(self):
+        return httpx.MockTransport(self.handle)
+
+    async def handle(self, request):
+        self.calls.append((request.method, request.url.path))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if self.quota_per_second and self._over_quota():
+            return httpx.Response(429, headers={'Retry-After': '1'})
+        if self.error_rate and self.random.random() < self.error_rate:
+            return httpx.Response(503)
+
+        path = request.url.path
+        if path.endswith('/v2/authenticate'):
+            return httpx.Response(200, json={'access_token': 'mock-bridge-token', 'expires_at': None})
+        if not request.headers.get('Authorization'):
+            return httpx.Response(401)
+        if '/v2/accounts/' in path:
+            return self._bridge_transactions(request)
+        if '/users/me/accounts/' in path:
+            return self._budget_insight_transactions(request)
+        return httpx.Response(404)
+
+    def _over_quota(self):
+        second = int(time.monotonic())
+        start, count = self._window
+        count = count + 1 if start == second else 1
+        self._window = (second, count)
+        return count > self.quota_per_second
+
+    def _account_id(self, request):
+        return request.url.path.split('/accounts/')[1].split('/')[0]
+
+    def _transactions(self, account_id):
+        rng = random.Random(f'{account_id}')
+        today = date.today()
+        return [{
+            'id': f'{account_id}-{index}',
+            'date': (today - timedelta(days=rng.randint(0, 6))).isoformat(),
+            'value': round(rng.uniform(-1500, 1500), 2),
+            'original_wording': f'{rng.choice(WORDINGS)} {index:05d}',
+        } for index in range(self.transactions_per_account)]
+
+    def _budget_insight_transactions(self, request):
+        account_id = self._account_id(request)
+        limit = int(request.url.params.get('limit', 1000))
+        offset = int(request.url.params.get('offset', 0))
+        page = self._transactions(account_id)[offset:offset + limit]
+        return httpx.Response(200, json={'transactions': page, 'total': self.transactions_per_account})
+
+    def _bridge_transactions(self, request):
+        account_id = self._account_id(request)
+        limit = int(request.url.params.get('limit', 500))
+        after = int(request.url.params.get('after', 0))
+        page = self._transactions(account_id)[after:after + limit]
+        next_uri = None
+        if after + limit < self.transactions_per_account:
+            next_uri = f'/v2/accounts/{account_id}/transactions?limit={limit}&after={after + limit}'
+        return httpx.Response(200, json={
+            'resources': [{
+                'id': transaction['id'],
+                'date': transaction['date'],
+                'amount': transaction['value'],
+                'bank_description': transaction['original_wording'],
+                'currency_code': 'EUR',
+            } for transaction in page],
+            'pagination': {'next_uri': next_uri},
+        })
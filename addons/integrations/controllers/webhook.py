@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+import odoo
+from odoo import api, http, SUPERUSER_ID
+from odoo.http import request
+from odoo.tools import config
+import hashlib
+import hmac
+import logging
+import re
+
+_logger = logging.getLogger(__name__)
+
+# Taille maximale acceptée pour un événement (octets)
+WEBHOOK_MAX_PAYLOAD = 1024 * 1024
+
+PROVIDER_RE = re.compile(r'^[a-z0-9_]{1,32}$')
+
+
+class BankWebhookController(http.Controller):
+
+    @http.route('/webhook/bank/<string:provider>', type='http', auth='none',
+                methods=['POST'], csrf=False, save_session=False)
+    def bank_webhook(self, provider, **kwargs):
+        """Reçoit les notifications des agrégateurs bancaires (base unique)
+
+        L'événement est vérifié (signature HMAC-SHA256 du corps brut) puis
+        stocké tel quel dans la file bank.webhook.event : aucun décodage ni
+        accès aux modèles comptables pendant la requête, le traitement est
+        fait par le cron de la file.
+        """
+        if not request.db or not PROVIDER_RE.match(provider):
+            return request.make_json_response({'error': 'unknown provider'}, status=404)
+        return self._receive(request.env, provider)
+
+    @http.route('/webhook/bank/<string:provider>/<string:dbname>', type='http', auth='none',
+                methods=['POST'], csrf=False, save_session=False)
+    def bank_webhook_tenant(self, provider, dbname, **kwargs):
+        """Même réception, base cliente désignée dans l'URL (déploiement multi-bases)
+
+        L'agrégateur n'a pas de session : la base vient de l'URL et doit être
+        servie par cette instance (db_filter et, si `tenants_file` est
+        configuré, registre des tenants). Route disponible sans base
+        sélectionnée si `integrations` figure dans server_wide_modules.
+        """
+        if not PROVIDER_RE.match(provider) or dbname not in http.db_list(force=True, host=request.httprequest.host):
+            return request.make_json_response({'error': 'unknown provider'}, status=404)
+        try:
+            registry = odoo.registry(dbname)
+        except Exception:
+            _logger.exception(f"Webhook {provider}: base {dbname} indisponible")
+            return request.make_json_response({'error': 'unavailable'}, status=503)
+        if 'bank.webhook.event' not in registry:
+            return request.make_json_response({'error': 'unknown provider'}, status=404)
+        with registry.cursor() as cr:
+            return self._receive(api.Environment(cr, SUPERUSER_ID, {}), provider)
+
+    def _receive(self, env, provider):
+        """Vérifie et met en file l'événement dans la base de `env`"""
+        httprequest = request.httprequest
+        if (httprequest.content_length or 0) > WEBHOOK_MAX_PAYLOAD:
+            return request.make_json_response({'error': 'payload too large'}, status=413)
+        body = httprequest.get_data(cache=False)
+
+        secret = self._get_webhook_secret(env, provider)
+        if not secret:
+            return request.make_json_response({'error': 'unknown provider'}, status=404)
+        if not self._verify_signature(secret, body, httprequest.headers.get('X-Webhook-Signature', '')):
+            _logger.warning(f"Webhook {provider}: signature invalide depuis {httprequest.remote_addr}")
+            return request.make_json_response({'error': 'invalid signature'}, status=401)
+
+        idempotency_key = (
+            httprequest.headers.get('Idempotency-Key')
+            or httprequest.headers.get('X-Event-Id')
+            or hashlib.sha256(body).hexdigest()
+        )
+        created = env['bank.webhook.event'].sudo()._enqueue(
+            provider,
+            idempotency_key[:255],
+            httprequest.headers.get('X-Event-Type'),
+            body.decode('utf-8', errors='replace'),
+        )
+        return request.make_json_response(
+            {'status': 'queued' if created else 'duplicate'},
+            status=202 if created else 200,
+        )
+
+    def _get_webhook_secret(self, env, provider):
+        """Secret partagé : fichier de configuration Odoo, sinon paramètre système de la base"""
+        return (
+            config.get(f'bank_webhook_secret_{provider}')
+            or env['ir.config_parameter'].sudo().get_param(f'integrations.webhook_secret.{provider}')
+        )
+
+    def _verify_signature(self, secret, body, signature):
+        signature = signature.strip()
+        if signature.startswith('sha256='):
+            signature = signature[len('sha256='):]
+        expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(expected, signature.lower())
@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+"""
+Génération et lecture du XML Factur-X (UN/CEFACT CII D16B, profil EN 16931)
+
+Le générateur travaille sur des dictionnaires simples (voir
+`account.move._get_facturx_values`) afin de pouvoir être utilisé hors ORM et
+en lots. Le XML est écrit en flux avec `etree.xmlfile` : aucun arbre complet
+n'est construit, même pour une facture de plusieurs milliers de lignes.
+
+Les blocs répétés d'une facture à l'autre (contexte du document, vendeur,
+acheteurs récurrents) sont compilés une seule fois en gabarits et rejoués
+dans le flux.
+"""
+
+from datetime import datetime
+
+from lxml import etree
+
+NS_RSM = 'urn:un:unece:uncefact:data:standard:CrossIndustryInvoice:100'
+NS_RAM = 'urn:un:unece:uncefact:data:standard:ReusableAggregateBusinessInformationEntity:100'
+NS_UDT = 'urn:un:unece:uncefact:data:standard:UnqualifiedDataType:100'
+NS_QDT = 'urn:un:unece:uncefact:data:standard:QualifiedDataType:100'
+
+NSMAP = {'rsm': NS_RSM, 'ram': NS_RAM, 'udt': NS_UDT, 'qdt': NS_QDT}
+
+PROFILES = {
+    'basic': 'urn:cen.eu:en16931:2017#compliant#urn:factur-x.eu:1p0:basic',
+    'en16931': 'urn:cen.eu:en16931:2017',
+}
+
+# Nom du profil dans les métadonnées XMP du PDF
+PROFILE_XMP_NAMES = {
+    'basic': 'BASIC',
+    'en16931': 'EN 16931',
+}
+
+TYPE_INVOICE = '380'
+TYPE_CREDIT_NOTE = '381'
+
+TEMPLATE_CACHE_SIZE = 10000
+
+
+def rsm(tag):
+    return f'{{{NS_RSM}}}{tag}'
+
+
+def ram(tag):
+    return f'{{{NS_RAM}}}{tag}'
+
+
+def udt(tag):
+    return f'{{{NS_UDT}}}{tag}'
+
+
+def format_amount(value):
+    return f'{value:.2f}'
+
+
+def format_quantity(value):
+    return f'{value:.4f}'.rstrip('0').rstrip('.') or '0'
+
+
+def format_date(value):
+    return value.strftime('%Y%m%d')
+
+
+def tax_category(rate):
+    """Catégorie de TVA EN 16931 : S (taux normal / réduit) ou E (exonéré)"""
+    return 'S' if rate else 'E'
+
+
+# ---------------------------------------------------------------------------
+# Gabarits : arbres de tuples (balise, attributs, texte, enfants) rejoués dans le flux
+# ---------------------------------------------------------------------------
+
+def _node(tag, text=None, children=(), **attrib):
+    return (tag, attrib, text, tuple(child for child in children if child))
+
+
+def _write_template(xf, node):
+    tag, attrib, text, children = node
+    with xf.element(tag, attrib):
+        if text is not None:
+            xf.write(text)
+        for child in children:
+            _write_template(xf, child)
+
+
+def _party_template(tag, party):
+    address = _node(ram('PostalTradeAddress'), children=[
+        party.get('zip') and _node(ram('PostcodeCode'), party['zip']),
+        party.get('street') and _node(ram('LineOne'), party['street']),
+        party.get('city') and _node(ram('CityName'), party['city']),
+        _node(ram('CountryID'), party.get('country') or 'FR'),
+    ])
+    return _node(tag, children=[
+        _node(ram('Name'), party['name']),
+        party.get('siren') and _node(ram('SpecifiedLegalOrganization'), children=[
+            _node(ram('ID'), party['siren'], schemeID='0002'),
+        ]),
+        address,
+        party.get('vat') and _node(ram('SpecifiedTaxRegistration'), children=[
+            _node(ram('ID'), party['vat'], schemeID='VA'),
+        ]),
+    ])
+
+
+class CIIWriter:
+    """Écrit des factures CII en flux en réutilisant les gabarits compilés"""
+
+    def __init__(self, profile='en16931'):
+        self.profile = profile
+        self.context_template = _node(rsm('ExchangedDocumentContext'), children=[
+            _node(ram('GuidelineSpecifiedDocumentContextParameter'), children=[
+                _node(ram('ID'), PROFILES[profile]),
+            ]),
+        ])
+        self.party_templates = {}
+
+    def _party(self, tag, party):
+        key = (tag, party.get('key'))
+        if party.get('key') is None:
+            return _party_template(tag, party)
+        template = self.party_templates.get(key)
+        if template is None:
+            if len(self.party_templates) >= TEMPLATE_CACHE_SIZE:
+                self.party_templates.clear()
+            template = self.party_templates[key] = _party_template(tag, party)
+        return template
+
+    def write(self, output, invoice):
+        """Écrit le XML Factur-X d'une facture dans `output` (fichier binaire)"""
+        currency = invoice['currency']
+        with etree.xmlfile(output, encoding='utf-8') as xf:
+            xf.write_declaration()
+            with xf.element(rsm('CrossIndustryInvoice'), nsmap=NSMAP):
+                _write_template(xf, self.context_template)
+                _write_template(xf, _node(rsm('ExchangedDocument'), children=[
+                    _node(ram('ID'), invoice['number']),
+                    _node(ram('TypeCode'), invoice['type_code']),
+                    _node(ram('IssueDateTime'), children=[
+                        _node(udt('DateTimeString'), format_date(invoice['issue_date']), format='102'),
+                    ]),
+                ]))
+
+                with xf.element(rsm('SupplyChainTradeTransaction')):
+                    for line in invoice['lines']:
+                        self._write_line(xf, line)
+
+                    with xf.element(ram('ApplicableHeaderTradeAgreement')):
+                        if invoice.get('buyer_reference'):
+                            _write_template(xf, _node(ram('BuyerReference'), invoice['buyer_reference']))
+                        _write_template(xf, self._party(ram('SellerTradeParty'), invoice['seller']))
+                        _write_template(xf, self._party(ram('BuyerTradeParty'), invoice['buyer']))
+                    _write_template(xf, _node(ram('ApplicableHeaderTradeDelivery')))
+                    self._write_settlement(xf, invoice, currency)
+
+    def _write_line(self, xf, line):
+        rate = line['tax_rate']
+        quantity = line['quantity'] or 1.0
+        _write_template(xf, _node(ram('IncludedSupplyChainTradeLineItem'), children=[
+            _node(ram('AssociatedDocumentLineDocument'), children=[
+                _node(ram('LineID'), str(line['sequence'])),
+            ]),
+            _node(ram('SpecifiedTradeProduct'), children=[
+                _node(ram('Name'), line['name']),
+            ]),
+            _node(ram('SpecifiedLineTradeAgreement'), children=[
+                _node(ram('NetPriceProductTradePrice'), children=[
+                    _node(ram('ChargeAmount'), f"{line['subtotal'] / quantity:.4f}"),
+                ]),
+            ]),
+            _node(ram('SpecifiedLineTradeDelivery'), children=[
+                _node(ram('BilledQuantity'), format_quantity(quantity), unitCode=line.get('uom') or 'C62'),
+            ]),
+            _node(ram('SpecifiedLineTradeSettlement'), children=[
+                _node(ram('ApplicableTradeTax'), children=[
+                    _node(ram('TypeCode'), 'VAT'),
+                    _node(ram('CategoryCode'), tax_category(rate)),
+                    _node(ram('RateApplicablePercent'), format_quantity(rate)),
+                ]),
+                _node(ram('SpecifiedTradeSettlementLineMonetarySummation'), children=[
+                    _node(ram('LineTotalAmount'), format_amount(line['subtotal'])),
+                ]),
+            ]),
+        ]))
+
+    def _write_settlement(self, xf, invoice, currency):
+        totals = invoice['totals']
+        _write_template(xf, _node(ram('ApplicableHeaderTradeSettlement'), children=[
+            _node(ram('InvoiceCurrencyCode'), currency),
+            *[_node(ram('ApplicableTradeTax'), children=[
+                _node(ram('CalculatedAmount'), format_amount(tax['amount'])),
+                _node(ram('TypeCode'), 'VAT'),
+                not tax['rate'] and _node(ram('ExemptionReason'), 'Exonération de TVA'),
+                _node(ram('BasisAmount'), format_amount(tax['base'])),
+                _node(ram('CategoryCode'), tax_category(tax['rate'])),
+                _node(ram('RateApplicablePercent'), format_quantity(tax['rate'])),
+            ]) for tax in invoice['taxes']],
+            invoice.get('due_date') and _node(ram('SpecifiedTradePaymentTerms'), children=[
+                _node(ram('DueDateDateTime'), children=[
+                    _node(udt('DateTimeString'), format_date(invoice['due_date']), format='102'),
+                ]),
+            ]),
+            _node(ram('SpecifiedTradeSettlementHeaderMonetarySummation'), children=[
+                _node(ram('LineTotalAmount'), format_amount(totals['untaxed'])),
+                _node(ram('TaxBasisTotalAmount'), format_amount(totals['untaxed'])),
+                _node(ram('TaxTotalAmount'), format_amount(totals['tax']), currencyID=currency),
+                _node(ram('GrandTotalAmount'), format_amount(totals['total'])),
+                _node(ram('DuePayableAmount'), format_amount(totals['residual'])),
+            ]),
+        ]))
+
+
+# ---------------------------------------------------------------------------
+# Lecture des factures fournisseurs reçues
+# ---------------------------------------------------------------------------
+
+def _text(element, path):
+    found = element.find(path, NSMAP)
+    return found.text.strip() if found is not None and found.text else ''
+
+
+def _amount(element, path):
+    value = _text(element, path)
+    return float(value) if value else 0.0
+
+
+def _date(element, path):
+    value = _text(element, path)
+    return datetime.strptime(value[:8], '%Y%m%d').date() if value else False
+
+
+def _read_party(element):
+    if element is None:
+        return {}
+    return {
+        'name': _text(element, 'ram:Name'),
+        'siren': _text(element, 'ram:SpecifiedLegalOrganization/ram:ID'),
+        'vat': _text(element, "ram:SpecifiedTaxRegistration/ram:ID[@schemeID='VA']"),
+        'street': _text(element, 'ram:PostalTradeAddress/ram:LineOne'),
+        'zip': _text(element, 'ram:PostalTradeAddress/ram:PostcodeCode'),
+        'city': _text(element, 'ram:PostalTradeAddress/ram:CityName'),
+        'country': _text(element, 'ram:PostalTradeAddress/ram:CountryID'),
+    }
+
+
+def parse_cii(xml_content):
+    """Lit un XML Factur-X / CII et retourne un dictionnaire au format du générateur"""
+    parser = etree.XMLParser(resolve_entities=False, no_network=True, huge_tree=True)
+    root = etree.fromstring(xml_content, parser)
+    if root.tag != rsm('CrossIndustryInvoice'):
+        raise ValueError("Le document n'est pas une facture CII (Factur-X)")
+
+    transaction = root.find('rsm:SupplyChainTradeTransaction', NSMAP)
+    agreement = transaction.find('ram:ApplicableHeaderTradeAgreement', NSMAP)
+    settlement = transaction.find('ram:ApplicableHeaderTradeSettlement', NSMAP)
+    summation = 'ram:SpecifiedTradeSettlementHeaderMonetarySummation/ram:'
+
+    lines = []
+    for index, item in enumerate(transaction.iterfind('ram:IncludedSupplyChainTradeLineItem', NSMAP), start=1):
+        lines.append({
+            'sequence': _text(item, 'ram:AssociatedDocumentLineDocument/ram:LineID') or str(index),
+            'name': _text(item, 'ram:SpecifiedTradeProduct/ram:Name') or '/',
+            'quantity': _amount(item, 'ram:SpecifiedLineTradeDelivery/ram:BilledQuantity') or 1.0,
+            'subtotal': _amount(
+                item, 'ram:SpecifiedLineTradeSettlement/'
+                      'ram:SpecifiedTradeSettlementLineMonetarySummation/ram:LineTotalAmount'),
+            'tax_rate': _amount(
+                item, 'ram:SpecifiedLineTradeSettlement/ram:ApplicableTradeTax/ram:RateApplicablePercent'),
+        })
+
+    return {
+        'number': _text(root, 'rsm:ExchangedDocument/ram:ID'),
+        'type_code': _text(root, 'rsm:ExchangedDocument/ram:TypeCode') or TYPE_INVOICE,
+        'issue_date': _date(root, 'rsm:ExchangedDocument/ram:IssueDateTime/udt:DateTimeString'),
+        'due_date': _date(settlement, 'ram:SpecifiedTradePaymentTerms/ram:DueDateDateTime/udt:DateTimeString'),
+        'currency': _text(settlement, 'ram:InvoiceCurrencyCode'),
+        'buyer_reference': _text(agreement, 'ram:BuyerReference'),
+        'seller': _read_party(agreement.find('ram:SellerTradeParty', NSMAP)),
+        'buyer': _read_party(agreement.find('ram:BuyerTradeParty', NSMAP)),
+        'lines': lines,
+        'totals': {
+            'untaxed': _amount(settlement, summation + 'TaxBasisTotalAmount'),
+            'tax': _amount(settlement, summation + 'TaxTotalAmount'),
+            'total': _amount(settlement, summation + 'GrandTotalAmount'),
+            'residual': _amount(settlement, summation + 'DuePayableAmount'),
+        },
+    }
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+Intégration du XML Factur-X dans le PDF de la facture (PDF/A-3)
+
+`embed_facturx` est une fonction de module sans état ni accès à l'ORM : elle
+peut être exécutée dans un pool de processus (voir `embed_many`) pour
+répartir la réécriture des PDF sur plusieurs cœurs lors des lots de fin de
+mois.
+"""
+
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import odoo.addons
+from odoo.tools.pdf import OdooPdfFileReader, OdooPdfFileWriter
+
+from .facturx import PROFILE_XMP_NAMES
+
+FACTURX_FILENAME = 'factur-x.xml'
+
+XMP_TEMPLATE = """<?xpacket begin="﻿" id="W5M0MpCehiHzreSzNTczkc9d"?>
+<x:xmpmeta xmlns:x="adobe:ns:meta/">
+ <rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#">
+  <rdf:Description xmlns:pdfaid="http://www.aiim.org/pdfa/ns/id/" rdf:about="">
+   <pdfaid:part>3</pdfaid:part>
+   <pdfaid:conformance>B</pdfaid:conformance>
+  </rdf:Description>
+  <rdf:Description xmlns:dc="http://purl.org/dc/elements/1.1/" rdf:about="">
+   <dc:title><rdf:Alt><rdf:li xml:lang="x-default">{title}</rdf:li></rdf:Alt></dc:title>
+  </rdf:Description>
+  <rdf:Description xmlns:pdfaExtension="http://www.aiim.org/pdfa/ns/extension/"
+                   xmlns:pdfaSchema="http://www.aiim.org/pdfa/ns/schema#"
+                   xmlns:pdfaProperty="http://www.aiim.org/pdfa/ns/property#" rdf:about="">
+   <pdfaExtension:schemas>
+    <rdf:Bag>
+     <rdf:li rdf:parseType="Resource">
+      <pdfaSchema:schema>Factur-X PDFA Extension Schema</pdfaSchema:schema>
+      <pdfaSchema:namespaceURI>urn:factur-x:pdfa:CrossIndustryDocument:invoice:1p0#</pdfaSchema:namespaceURI>
+      <pdfaSchema:prefix>fx</pdfaSchema:prefix>
+      <pdfaSchema:property>
+       <rdf:Seq>
+        <rdf:li rdf:parseType="Resource">
+         <pdfaProperty:name>DocumentFileName</pdfaProperty:name>
+         <pdfaProperty:valueType>Text</pdfaProperty:valueType>
+         <pdfaProperty:category>external</pdfaProperty:category>
+         <pdfaProperty:description>Nom du fichier XML intégré</pdfaProperty:description>
+        </rdf:li>
+        <rdf:li rdf:parseType="Resource">
+         <pdfaProperty:name>DocumentType</pdfaProperty:name>
+         <pdfaProperty:valueType>Text</pdfaProperty:valueType>
+         <pdfaProperty:category>external</pdfaProperty:category>
+         <pdfaProperty:description>INVOICE</pdfaProperty:description>
+        </rdf:li>
+        <rdf:li rdf:parseType="Resource">
+         <pdfaProperty:name>Version</pdfaProperty:name>
+         <pdfaProperty:valueType>Text</pdfaProperty:valueType>
+         <pdfaProperty:category>external</pdfaProperty:category>
+         <pdfaProperty:description>Version du XML Factur-X</pdfaProperty:description>
+        </rdf:li>
+        <rdf:li rdf:parseType="Resource">
+         <pdfaProperty:name>ConformanceLevel</pdfaProperty:name>
+         <pdfaProperty:valueType>Text</pdfaProperty:valueType>
+         <pdfaProperty:category>external</pdfaProperty:category>
+         <pdfaProperty:description>Profil Factur-X</pdfaProperty:description>
+        </rdf:li>
+       </rdf:Seq>
+      </pdfaSchema:property>
+     </rdf:li>
+    </rdf:Bag>
+   </pdfaExtension:schemas>
+  </rdf:Description>
+  <rdf:Description xmlns:fx="urn:factur-x:pdfa:CrossIndustryDocument:invoice:1p0#" rdf:about="">
+   <fx:DocumentType>INVOICE</fx:DocumentType>
+   <fx:DocumentFileName>{filename}</fx:DocumentFileName>
+   <fx:Version>1.0</fx:Version>
+   <fx:ConformanceLevel>{profile}</fx:ConformanceLevel>
+  </rdf:Description>
+ </rdf:RDF>
+</x:xmpmeta>
+<?xpacket end="w"?>"""
+
+
+@lru_cache(maxsize=8)
+def _xmp_metadata(profile):
+    """Métadonnées XMP, identiques pour toutes les factures d'un même profil"""
+    return XMP_TEMPLATE.format(
+        title='Factur-X',
+        filename=FACTURX_FILENAME,
+        profile=PROFILE_XMP_NAMES[profile],
+    ).encode('utf-8')
+
+
+def embed_facturx(pdf_content, xml_content, profile='en16931'):
+    """Retourne le PDF/A-3 contenant `xml_content` sous le nom factur-x.xml"""
+    reader = OdooPdfFileReader(io.BytesIO(pdf_content), strict=False)
+    writer = OdooPdfFileWriter()
+    writer.cloneReaderDocumentRoot(reader)
+    writer.addAttachment(FACTURX_FILENAME, xml_content, subtype='text/xml')
+    writer.convert_to_pdfa()
+    writer.add_file_metadata(_xmp_metadata(profile))
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+def _embed_item(item):
+    key, pdf_content, xml_content, profile = item
+    try:
+        return key, embed_facturx(pdf_content, xml_content, profile), None
+    except Exception as e:
+        return key, None, str(e)
+
+
+# Exécuté au démarrage de chaque processus : un processus « spawn » ne connaît
+# pas les chemins d'addons, nécessaires pour retrouver _embed_item
+WORKER_BOOTSTRAP = """
+import odoo.addons
+for path in {paths!r}:
+    if path not in odoo.addons.__path__:
+        odoo.addons.__path__.append(path)
+"""
+
+
+def create_pool(workers):
+    """Pool de processus « spawn » pour `embed_many`, ou None pour travailler sur place
+
+    Pas de fork d'un processus Odoo qui détient des connexions à la base ; le
+    pool est créé une fois par lot car le démarrage d'un processus coûte
+    l'import d'Odoo.
+    """
+    if workers <= 1:
+        return None
+    bootstrap = WORKER_BOOTSTRAP.format(paths=list(odoo.addons.__path__))
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=exec,
+        initargs=(bootstrap,),
+    )
+
+
+def embed_many(items, executor=None):
+    """Intègre le XML dans une série de PDF
+
+    `items` : itérable de (clé, pdf, xml, profil). Retourne une liste de
+    (clé, pdf Factur-X ou None, erreur ou None) dans l'ordre d'entrée.
+    """
+    items = list(items)
+    if executor is None or len(items) < 2:
+        return [_embed_item(item) for item in items]
+    chunksize = max(1, len(items) // (executor._max_workers * 4))
+    return list(executor.map(_embed_item, items, chunksize=chunksize))
+
+
+def extract_facturx(pdf_content):
+    """Retourne le XML Factur-X (ou ZUGFeRD / XRechnung) intégré au PDF, sinon None"""
+    reader = OdooPdfFileReader(io.BytesIO(pdf_content), strict=False)
+    for filename, content in reader.getAttachments():
+        if filename in (FACTURX_FILENAME, 'zugferd-invoice.xml', 'xrechnung.xml'):
+            return content
+    return None
@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+
+from . import bank_statement_import
+from . import account_bank_statement_line
+from . import bank_reconcile_proposal
+from . import bank_categorization_rule
+from . import account_journal
+from . import bank_webhook_event
+from . import bank_connection
+from . import account_move
+from . import facturx_batch
+from . import facturx_import
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields
+from .bank_categorization_rule import TVA_RATES
+
+
+class AccountBankStatementLine(models.Model):
+    _inherit = 'account.bank.statement.line'
+
+    statement_import_id = fields.Many2one(
+        'bank.statement.import',
+        string='Import relevé',
+        readonly=True,
+        index='btree_not_null',
+        ondelete='set null',
+        help="Import de fichier à l'origine de cette opération"
+    )
+
+    categorization_rule_id = fields.Many2one(
+        'bank.categorization.rule',
+        string='Règle de catégorisation',
+        readonly=True,
+        index='btree_not_null',
+        ondelete='set null'
+    )
+
+    proposed_account_code = fields.Char(
+        string='Compte proposé',
+        readonly=True,
+        help="Compte PCG proposé par les règles de catégorisation"
+    )
+
+    proposed_tva_rate = fields.Selection(
+        TVA_RATES,
+        string='TVA proposée',
+        readonly=True
+    )
+
+    categorization_confidence = fields.Float(
+        string='Confiance catégorisation',
+        readonly=True,
+        help="1.0 = règle propre au client sans conflit"
+    )
+
+    auto_categorized = fields.Boolean(
+        string='Catégorisé automatiquement',
+        compute='_compute_auto_categorized',
+        search='_search_auto_categorized'
+    )
+
+    def _compute_auto_categorized(self):
+        for line in self:
+            line.auto_categorized = bool(line.categorization_rule_id)
+
+    def _search_auto_categorized(self, operator, value):
+        if operator not in ('=', '!='):
+            raise NotImplementedError()
+        positive = (operator == '=') == bool(value)
+        return [('categorization_rule_id', '!=' if positive else '=', False)]
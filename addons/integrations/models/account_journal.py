@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields
+
+
+class AccountJournal(models.Model):
+    _inherit = 'account.journal'
+
+    bank_aggregator_account_id = fields.Char(
+        string='ID compte agrégateur',
+        index='btree_not_null',
+        copy=False,
+        help="Identifiant du compte chez l'agrégateur bancaire (Budget Insight, Bridge) "
+             "utilisé pour rattacher les opérations reçues par webhook"
+    )
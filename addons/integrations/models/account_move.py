@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, _
+from ..einvoicing.facturx import TYPE_CREDIT_NOTE, TYPE_INVOICE
+from collections import defaultdict
+
+
+class AccountMove(models.Model):
+    _inherit = 'account.move'
+
+    facturx_attachment_id = fields.Many2one(
+        'ir.attachment',
+        string='Facture Factur-X',
+        readonly=True,
+        copy=False,
+        help="PDF/A-3 contenant le XML Factur-X, généré par lot"
+    )
+
+    def _get_facturx_party(self, partner):
+        """Données d'une partie (vendeur / acheteur) ; `key` permet la mise en cache du gabarit"""
+        registry = (partner.company_registry or '').replace(' ', '')
+        return {
+            'key': partner.id,
+            'name': partner.name,
+            'siren': registry[:9] if len(registry) >= 9 else '',
+            'vat': partner.vat or '',
+            'street': partner.street or '',
+            'zip': partner.zip or '',
+            'city': partner.city or '',
+            'country': partner.country_id.code or 'FR',
+        }
+
+    def _get_facturx_values(self):
+        """Retourne {id facture: données Factur-X} pour toutes les factures de `self`
+
+        Conçu pour des lots : les lignes, taxes et partenaires de toutes les
+        factures sont préchargés ensemble, et les parties déjà vues ne sont
+        lues qu'une fois.
+        """
+        parties = {}
+
+        def party(partner):
+            if partner.id not in parties:
+                parties[partner.id] = self._get_facturx_party(partner)
+            return parties[partner.id]
+
+        values = {}
+        for move in self:
+            lines = []
+            bases = defaultdict(float)
+            for line in move.invoice_line_ids:
+                if line.display_type != 'product':
+                    continue
+                rate = sum(line.tax_ids.filtered(lambda t: t.amount_type == 'percent').mapped('amount'))
+                bases[rate] += line.price_subtotal
+                lines.append({
+                    'sequence': len(lines) + 1,
+                    'name': (line.name or line.product_id.display_name or '/').split('\n')[0],
+                    'quantity': line.quantity,
+                    'subtotal': line.price_subtotal,
+                    'tax_rate': rate,
+                })
+
+            tax_amounts = defaultdict(float)
+            for line in move.line_ids:
+                if line.display_type == 'tax' and line.tax_line_id.amount_type == 'percent':
+                    tax_amounts[line.tax_line_id.amount] += line.amount_currency * move.direction_sign
+
+            values[move.id] = {
+                'number': move.name,
+                'type_code': TYPE_CREDIT_NOTE if move.move_type == 'out_refund' else TYPE_INVOICE,
+                'issue_date': move.invoice_date or move.date,
+                'due_date': move.invoice_date_due,
+                'currency': move.currency_id.name,
+                'buyer_reference': move.ref or '',
+                'seller': party(move.company_id.partner_id),
+                'buyer': party(move.commercial_partner_id),
+                'lines': lines,
+                'taxes': [{
+                    'rate': rate,
+                    'base': base,
+                    'amount': tax_amounts.get(rate, 0.0),
+                } for rate, base in sorted(bases.items())],
+                'totals': {
+                    'untaxed': move.amount_untaxed,
+                    'tax': move.amount_tax,
+                    'total': move.amount_total,
+                    'residual': move.amount_residual,
+                },
+            }
+        return values
+
+    def action_view_facturx(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_url',
+            'url': f'/web/content/{self.facturx_attachment_id.id}?download=true',
+            'target': 'self',
+        }
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, tools, _
+from odoo.exceptions import ValidationError
+from ..banking.categorization import Categorization, CompiledRuleSet, Rule
+import logging
+import re
+
+_logger = logging.getLogger(__name__)
+
+# Lignes de relevé catégorisées par requête
+CATEGORIZATION_BATCH_SIZE = 50000
+
+UNCATEGORIZED = Categorization(None, None, None, None)
+
+TVA_RATES = [
+    ('20', '20 %'),
+    ('10', '10 %'),
+    ('5.5', '5,5 %'),
+    ('2.1', '2,1 %'),
+    ('0', 'Exonéré / hors champ'),
+]
+
+
+class BankCategorizationRule(models.Model):
+    _name = 'bank.categorization.rule'
+    _description = 'Règle de catégorisation bancaire'
+    _order = 'sequence, id'
+
+    name = fields.Char(
+        string='Nom',
+        required=True
+    )
+
+    sequence = fields.Integer(
+        string='Séquence',
+        default=10,
+        help="Les règles de plus petite séquence sont prioritaires"
+    )
+
+    active = fields.Boolean(
+        string='Actif',
+        default=True
+    )
+
+    company_id = fields.Many2one(
+        'res.company',
+        string='Client',
+        index=True,
+        help="Vide : règle du cabinet, appliquée à tous les clients. "
+             "Les règles propres à un client sont prioritaires sur celles du cabinet."
+    )
+
+    match_type = fields.Selection([
+        ('keyword', 'Mot-clé'),
+        ('regex', 'Expression régulière'),
+    ], string='Type', default='keyword', required=True)
+
+    pattern = fields.Char(
+        string='Motif',
+        required=True,
+        help="Mot-clé : mots recherchés dans le libellé (casse, accents et ponctuation ignorés). "
+             "Expression régulière : recherchée dans le libellé brut, sans tenir compte de la casse."
+    )
+
+    amount_type = fields.Selection([
+        ('any', 'Tous'),
+        ('inbound', 'Encaissements'),
+        ('outbound', 'Décaissements'),
+    ], string='Sens', default='any', required=True)
+
+    account_code = fields.Char(
+        string='Compte PCG',
+        required=True,
+        help="Compte (ou préfixe) du plan comptable proposé, ex : 6061, 6251"
+    )
+
+    tva_rate = fields.Selection(
+        TVA_RATES,
+        string='Taux TVA'
+    )
+
+    @api.constrains('match_type', 'pattern')
+    def _check_pattern(self):
+        for rule in self.filtered(lambda r: r.match_type == 'regex'):
+            try:
+                re.compile(rule.pattern, re.IGNORECASE)
+            except re.error as e:
+                raise ValidationError(_("Expression régulière invalide (%s): %s") % (rule.name, e))
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        rules = super(BankCategorizationRule, self).create(vals_list)
+        self.env.registry.clear_cache()
+        return rules
+
+    def write(self, vals):
+        res = super(BankCategorizationRule, self).write(vals)
+        self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super(BankCategorizationRule, self).unlink()
+        self.env.registry.clear_cache()
+        return res
+
+    @api.model
+    @tools.ormcache('company_id')
+    def _get_compiled_rules(self, company_id):
+        """Jeu de règles compilé du client : règles du client puis règles du cabinet"""
+        rules = self.sudo().search([('company_id', 'in', [company_id, False])])
+        rules = rules.sorted(lambda r: (not r.company_id, r.sequence, r.id))
+        return CompiledRuleSet(
+            Rule(rule.id, rule.match_type, rule.pattern, rule.amount_type,
+                 rule.account_code, rule.tva_rate or None, bool(rule.company_id))
+            for rule in rules
+        )
+
+    @api.model
+    def _categorize_statement_lines(self, line_ids=None):
+        """Catégorise les opérations bancaires par lots (toutes si line_ids n'est pas fourni)
+
+        Les libellés sont lus et les propositions écrites en SQL, par pagination
+        sur l'identifiant, afin de traiter un historique complet en une passe.
+        """
+        StatementLine = self.env['account.bank.statement.line']
+        StatementLine.flush_model()
+        cr = self.env.cr
+        last_id = 0
+        stats = {'read': 0, 'categorized': 0, 'updated': 0}
+
+        while True:
+            query = """
+                SELECT st.id, move.company_id, st.payment_ref, st.amount
+                  FROM account_bank_statement_line st
+                  JOIN account_move move ON move.id = st.move_id
+                 WHERE st.id > %s
+            """
+            params = [last_id]
+            if line_ids is not None:
+                query += " AND st.id = ANY(%s)"
+                params.append(list(line_ids))
+            cr.execute(query + " ORDER BY st.id LIMIT %s", params + [CATEGORIZATION_BATCH_SIZE])
+            rows = cr.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+
+            columns = ([], [], [], [], [])
+            for line_id, company_id, label, amount in rows:
+                result = self._get_compiled_rules(company_id).classify(label, amount)
+                if result:
+                    stats['categorized'] += 1
+                else:
+                    result = UNCATEGORIZED
+                columns[0].append(line_id)
+                columns[1].append(result.rule_id)
+                columns[2].append(result.account_code)
+                columns[3].append(result.tva_rate)
+                columns[4].append(result.confidence)
+
+            cr.execute("""
+                UPDATE account_bank_statement_line st
+                   SET categorization_rule_id = v.rule_id,
+                       proposed_account_code = v.account_code,
+                       proposed_tva_rate = v.tva_rate,
+                       categorization_confidence = v.confidence
+                  FROM unnest(%s::int[], %s::int[], %s::varchar[], %s::varchar[], %s::float8[])
+                       AS v(id, rule_id, account_code, tva_rate, confidence)
+                 WHERE st.id = v.id
+                   AND (st.categorization_rule_id IS DISTINCT FROM v.rule_id
+                        OR st.proposed_account_code IS DISTINCT FROM v.account_code
+                        OR st.proposed_tva_rate IS DISTINCT FROM v.tva_rate
+                        OR st.categorization_confidence IS DISTINCT FROM v.confidence)
+            """, list(columns))
+            stats['read'] += len(rows)
+            stats['updated'] += cr.rowcount
+
+        StatementLine.invalidate_model([
+            'categorization_rule_id', 'proposed_account_code',
+            'proposed_tva_rate', 'categorization_confidence',
+        ])
+        _logger.info(
+            f"Catégorisation: {stats['categorized']}/{stats['read']} opérations catégorisées, "
+            f"{stats['updated']} mises à jour"
+        )
+        return stats
+
+    @api.model
+    def _cron_categorize_statement_lines(self):
+        """Recatégorise chaque nuit l'ensemble de l'historique bancaire"""
+        self._categorize_statement_lines()
+
+    def action_apply_rules(self):
+        """Relance la catégorisation sur toutes les opérations"""
+        stats = self._categorize_statement_lines()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Catégorisation terminée'),
+                'message': _('%s opérations catégorisées sur %s') % (stats['categorized'], stats['read']),
+                'type': 'success',
+                'sticky': False,
+            }
+        }
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, _
+from odoo.exceptions import ValidationError
+from odoo.tools import config
+from ..banking.sync import SyncJob, fetch_all
+from datetime import timedelta
+import asyncio
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Lignes de relevé créées par appel à create
+SYNC_BATCH_SIZE = 1000
+
+
+class BankConnection(models.Model):
+    _name = 'bank.connection'
+    _description = 'Connexion bancaire agrégateur'
+    _order = 'company_id, name'
+
+    name = fields.Char(
+        string='Nom',
+        required=True
+    )
+
+    active = fields.Boolean(
+        string='Actif',
+        default=True
+    )
+
+    company_id = fields.Many2one(
+        'res.company',
+        string='Société',
+        required=True,
+        default=lambda self: self.env.company
+    )
+
+    journal_id = fields.Many2one(
+        'account.journal',
+        string='Journal de banque',
+        required=True,
+        domain="[('type', '=', 'bank'), ('company_id', '=', company_id)]"
+    )
+
+    provider = fields.Selection([
+        ('budget_insight', 'Budget Insight'),
+        ('bridge', 'Bridge'),
+    ], string='Fournisseur', required=True, default='budget_insight')
+
+    external_account_id = fields.Char(
+        related='journal_id.bank_aggregator_account_id',
+        readonly=False,
+        string='ID compte agrégateur'
+    )
+
+    external_user = fields.Char(
+        string='Utilisateur agrégateur',
+        help="Budget Insight : identifiant utilisateur. Bridge : e-mail de l'utilisateur."
+    )
+
+    external_secret = fields.Char(
+        string='Jeton / mot de passe',
+        groups='base.group_system',
+        help="Budget Insight : jeton utilisateur permanent. Bridge : mot de passe de l'utilisateur."
+    )
+
+    sync_days = fields.Integer(
+        string='Jours synchronisés',
+        default=7,
+        help="Profondeur de chaque synchronisation (les doublons sont ignorés)"
+    )
+
+    state = fields.Selection([
+        ('active', 'Active'),
+        ('error', 'En erreur'),
+    ], string='État', default='active', required=True, readonly=True)
+
+    last_sync_date = fields.Datetime(
+        string='Dernière synchronisation',
+        readonly=True
+    )
+
+    last_imported_count = fields.Integer(
+        string='Opérations importées',
+        readonly=True
+    )
+
+    last_error = fields.Text(
+        string='Dernière erreur',
+        readonly=True
+    )
+
+    def action_sync(self):
+        """Synchronise les connexions sélectionnées"""
+        stats = self._sync_connections()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Synchronisation terminée'),
+                'message': _('%s opérations importées, %s connexions en erreur') % (
+                    stats['imported'], stats['errors']),
+                'type': 'warning' if stats['errors'] else 'success',
+                'sticky': False,
+            }
+        }
+
+    @api.model
+    def _cron_sync_connections(self):
+        """Synchronisation quotidienne de toutes les connexions actives"""
+        self.search([])._sync_connections()
+
+    def _sync_connections(self):
+        """Récupère en parallèle les opérations de toutes les connexions puis les importe
+
+        Phase réseau : asyncio, sans ORM, bornée par le quota de chaque
+        fournisseur et par `integrations.bank_sync_concurrency`.
+        Phase base : import connexion par connexion, chacune dans un savepoint.
+        """
+        connections = self.filtered(lambda c: c.journal_id.bank_aggregator_account_id)
+        if not connections:
+            return {'imported': 0, 'errors': 0}
+
+        params = self.env['ir.config_parameter'].sudo()
+        concurrency = int(params.get_param('integrations.bank_sync_concurrency', '20'))
+        transport = None
+        if params.get_param('integrations.bank_sync_mock'):
+            from ..common.mock_server import MockAggregator
+            transport = MockAggregator().transport()
+
+        today = fields.Date.context_today(self)
+        jobs = [
+            SyncJob(
+                connection.id,
+                connection.provider,
+                {'id': connection.external_user, 'token': connection.sudo().external_secret},
+                connection.journal_id.bank_aggregator_account_id,
+                today - timedelta(days=connection.sync_days or 7),
+            )
+            for connection in connections
+        ]
+        results = asyncio.run(fetch_all(
+            jobs,
+            self._get_provider_credentials(),
+            concurrency=concurrency,
+            transport=transport,
+            base_urls=self._get_provider_urls(),
+        ))
+
+        stats = {'imported': 0, 'errors': 0}
+        now = fields.Datetime.now()
+        for connection, result in zip(connections, results):
+            if isinstance(result, Exception):
+                _logger.warning(f"Synchronisation {connection.name} en échec: {str(result)}")
+                connection.write({'state': 'error', 'last_error': str(result), 'last_sync_date': now})
+                stats['errors'] += 1
+                continue
+            try:
+                with self.env.cr.savepoint():
+                    imported = connection._import_transactions(result)
+                    connection.write({
+                        'state': 'active',
+                        'last_error': False,
+                        'last_sync_date': now,
+                        'last_imported_count': imported,
+                    })
+                stats['imported'] += imported
+            except Exception as e:
+                _logger.error(f"Import {connection.name} en échec: {str(e)}", exc_info=True)
+                connection.write({'state': 'error', 'last_error': str(e), 'last_sync_date': now})
+                stats['errors'] += 1
+
+        _logger.info(
+            f"Synchronisation bancaire: {len(connections)} connexions, "
+            f"{stats['imported']} opérations importées, {stats['errors']} erreurs"
+        )
+        return stats
+
+    def _import_transactions(self, transactions):
+        """Crée les opérations absentes du journal (clé : fournisseur + identifiant)"""
+        self.ensure_one()
+        if not transactions:
+            return 0
+        keys = [f"{self.provider}-{transaction['transaction_id']}" for transaction in transactions]
+        StatementLine = self.env['account.bank.statement.line']
+        StatementLine.flush_model(['unique_import_id'])
+        self.env.cr.execute("""
+            SELECT unique_import_id
+              FROM account_bank_statement_line
+             WHERE unique_import_id = ANY(%s)
+        """, [keys])
+        existing = {row[0] for row in self.env.cr.fetchall()}
+
+        vals_list = []
+        for key, transaction in zip(keys, transactions):
+            if key in existing:
+                continue
+            existing.add(key)
+            vals_list.append({
+                'journal_id': self.journal_id.id,
+                'date': transaction['date'],
+                'amount': transaction['amount'],
+                'payment_ref': transaction['payment_ref'],
+                'unique_import_id': key,
+            })
+
+        line_ids = []
+        for start in range(0, len(vals_list), SYNC_BATCH_SIZE):
+            line_ids += StatementLine.create(vals_list[start:start + SYNC_BATCH_SIZE]).ids
+        if line_ids:
+            self.env['bank.categorization.rule']._categorize_statement_lines(line_ids)
+        return len(line_ids)
+
+    @api.model
+    def _get_provider_credentials(self):
+        """Identifiants applicatifs des fournisseurs (odoo.conf, jamais en base)"""
+        return {
+            provider: {
+                'client_id': config.get(f'{provider}_client_id'),
+                'client_secret': config.get(f'{provider}_client_secret'),
+            }
+            for provider in ('budget_insight', 'bridge')
+        }
+
+    @api.model
+    def _get_provider_urls(self):
+        return {
+            provider: config.get(f'{provider}_api_url')
+            for provider in ('budget_insight', 'bridge')
+            if config.get(f'{provider}_api_url')
+        }
+
+    @api.constrains('journal_id', 'company_id')
+    def _check_journal_company(self):
+        for connection in self:
+            if connection.journal_id.company_id != connection.company_id:
+                raise ValidationError(_("Le journal de la connexion %s doit appartenir à la même société.") % connection.name)
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, _
+from ..banking.reconciliation import OpenItem, StatementItem, extract_tokens, match_statement_lines
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Nombre de lignes de relevé traitées par passe du cron
+MATCH_BATCH_SIZE = 50000
+
+
+class BankReconcileProposal(models.Model):
+    _name = 'bank.reconcile.proposal'
+    _description = 'Proposition de rapprochement bancaire'
+    _order = 'score desc, id'
+
+    statement_line_id = fields.Many2one(
+        'account.bank.statement.line',
+        string='Opération bancaire',
+        required=True,
+        ondelete='cascade',
+        index=True
+    )
+
+    move_line_id = fields.Many2one(
+        'account.move.line',
+        string='Pièce à lettrer',
+        required=True,
+        ondelete='cascade',
+        index=True
+    )
+
+    move_id = fields.Many2one(
+        related='move_line_id.move_id',
+        string='Facture'
+    )
+
+    partner_id = fields.Many2one(
+        related='move_line_id.partner_id',
+        string='Partenaire'
+    )
+
+    company_id = fields.Many2one(
+        related='statement_line_id.company_id',
+        store=True,
+        string='Société'
+    )
+
+    currency_id = fields.Many2one(
+        related='company_id.currency_id',
+        string='Devise'
+    )
+
+    amount = fields.Monetary(
+        related='statement_line_id.amount',
+        string='Montant opération',
+        currency_field='currency_id'
+    )
+
+    amount_residual = fields.Monetary(
+        related='move_line_id.amount_residual',
+        string='Reste dû',
+        currency_field='currency_id'
+    )
+
+    method = fields.Selection([
+        ('amount', 'Montant exact'),
+        ('reference', 'Référence'),
+        ('tolerance', 'Montant approchant'),
+    ], string='Méthode', required=True)
+
+    score = fields.Float(
+        string='Confiance',
+        help="1.0 = correspondance certaine"
+    )
+
+    state = fields.Selection([
+        ('proposed', 'Proposé'),
+        ('applied', 'Lettré'),
+        ('rejected', 'Rejeté'),
+    ], string='État', default='proposed', required=True, index=True)
+
+    @api.model
+    def _generate_proposals(self, st_lines, auto_apply=True):
+        """Rapproche les lignes de relevé contre les pièces ouvertes de leur société"""
+        st_lines = st_lines.filtered(lambda line: not line.is_reconciled)
+        self.search([
+            ('statement_line_id', 'in', st_lines.ids),
+            ('state', '=', 'proposed'),
+        ]).unlink()
+
+        rejected = {
+            (proposal.statement_line_id.id, proposal.move_line_id.id)
+            for proposal in self.search([
+                ('statement_line_id', 'in', st_lines.ids),
+                ('state', '=', 'rejected'),
+            ])
+        }
+
+        params = self.env['ir.config_parameter'].sudo()
+        tolerance = float(params.get_param('integrations.reconcile_tolerance', '1.0'))
+        threshold = float(params.get_param('integrations.reconcile_auto_apply_threshold', '0.95'))
+
+        proposals = self.browse()
+        for company in st_lines.company_id:
+            company_lines = st_lines.filtered(lambda line: line.company_id == company)
+            open_items, partner_names = self._get_open_items(company)
+            statement_items = self._get_statement_items(company_lines, partner_names)
+
+            matches = match_statement_lines(
+                open_items, statement_items, tolerance_cents=int(round(tolerance * 100))
+            )
+            proposals |= self.create([{
+                'statement_line_id': match.statement_id,
+                'move_line_id': match.item_id,
+                'method': match.method,
+                'score': match.score,
+            } for match in matches if (match.statement_id, match.item_id) not in rejected])
+
+            _logger.info(
+                f"Rapprochement {company.name}: {len(matches)} propositions "
+                f"pour {len(statement_items)} opérations et {len(open_items)} pièces ouvertes"
+            )
+
+        if auto_apply:
+            proposals.filtered(lambda proposal: proposal.score >= threshold).action_apply()
+        return proposals
+
+    @api.model
+    def _get_open_items(self, company):
+        """Charge en une requête les lignes clients/fournisseurs non lettrées"""
+        self.env['account.move.line'].flush_model()
+        self.env.cr.execute("""
+            SELECT aml.id, aml.partner_id, aml.amount_residual,
+                   move.name, move.ref, move.payment_reference, partner.name
+              FROM account_move_line aml
+              JOIN account_move move ON move.id = aml.move_id
+              JOIN account_account account ON account.id = aml.account_id
+         LEFT JOIN res_partner partner ON partner.id = aml.partner_id
+             WHERE aml.company_id = %s
+               AND aml.parent_state = 'posted'
+               AND account.account_type IN ('asset_receivable', 'liability_payable')
+               AND NOT aml.reconciled
+               AND aml.amount_residual != 0
+        """, [company.id])
+
+        open_items = []
+        partner_names = {}
+        for line_id, partner_id, residual, name, ref, payment_reference, partner_name in self.env.cr.fetchall():
+            open_items.append(OpenItem(
+                line_id, partner_id, residual, extract_tokens(name, ref, payment_reference)
+            ))
+            if partner_name:
+                key = partner_name.strip().upper()
+                # Nom ambigu (homonymes) : pas de résolution par nom
+                partner_names[key] = partner_id if partner_names.get(key, partner_id) == partner_id else False
+        return open_items, partner_names
+
+    @api.model
+    def _get_statement_items(self, st_lines, partner_names):
+        self.env['account.bank.statement.line'].flush_model()
+        self.env.cr.execute("""
+            SELECT st.id, move.partner_id, st.amount, st.payment_ref, move.ref, st.partner_name
+              FROM account_bank_statement_line st
+              JOIN account_move move ON move.id = st.move_id
+             WHERE st.id = ANY(%s)
+        """, [st_lines.ids])
+        return [
+            StatementItem(
+                line_id,
+                partner_id or partner_names.get((partner_name or '').strip().upper()) or None,
+                amount,
+                ' '.join(filter(None, [payment_ref, ref])),
+            )
+            for line_id, partner_id, amount, payment_ref, ref, partner_name in self.env.cr.fetchall()
+        ]
+
+    def action_apply(self):
+        """Lettre les opérations bancaires avec les pièces proposées"""
+        applied = self.browse()
+        for proposal in self.filtered(lambda p: p.state == 'proposed'):
+            if proposal._apply_reconciliation():
+                applied |= proposal
+        applied.write({'state': 'applied'})
+        # Une opération ne peut être lettrée qu'une fois : écarter les autres propositions
+        self.search([
+            ('statement_line_id', 'in', applied.statement_line_id.ids),
+            ('state', '=', 'proposed'),
+        ]).write({'state': 'rejected'})
+        return True
+
+    def action_reject(self):
+        self.filtered(lambda p: p.state == 'proposed').write({'state': 'rejected'})
+        return True
+
+    def _apply_reconciliation(self):
+        """Remplace la ligne d'attente de l'opération par la contrepartie puis lettre"""
+        self.ensure_one()
+        st_line = self.statement_line_id
+        counterpart = self.move_line_id
+        if st_line.is_reconciled or counterpart.reconciled:
+            return False
+
+        _liquidity_lines, suspense_lines, _other_lines = st_line._seek_for_lines()
+        if len(suspense_lines) != 1:
+            return False
+
+        move = st_line.move_id
+        move.button_draft()
+        suspense_lines.write({
+            'account_id': counterpart.account_id.id,
+            'partner_id': counterpart.partner_id.id,
+        })
+        move.action_post()
+        (suspense_lines + counterpart).reconcile()
+        return True
+
+    @api.model
+    def _cron_match_statement_lines(self):
+        """Rapproche les opérations bancaires non lettrées sans proposition en cours
+
+        Parcourt l'arriéré par lots de MATCH_BATCH_SIZE dans l'ordre (date, id),
+        en reprenant après la dernière ligne traitée ; le curseur revient au
+        début une fois la fin atteinte, pour retenter les lignes restées sans
+        correspondance contre les nouvelles pièces.
+        """
+        params = self.env['ir.config_parameter'].sudo()
+        cursor = params.get_param('integrations.reconcile_cron_cursor') or ''
+        last_date, _sep, last_id = cursor.partition(',')
+
+        self.env['account.bank.statement.line'].flush_model()
+        self.flush_model(['statement_line_id', 'state'])
+        self.env.cr.execute("""
+            SELECT st.id, move.date
+              FROM account_bank_statement_line st
+              JOIN account_move move ON move.id = st.move_id
+             WHERE NOT st.is_reconciled
+               AND move.state = 'posted'
+               AND (move.date, st.id) > (%s::date, %s)
+               AND NOT EXISTS (
+                    SELECT 1
+                      FROM bank_reconcile_proposal proposal
+                     WHERE proposal.statement_line_id = st.id
+                       AND proposal.state = 'proposed'
+               )
+             ORDER BY move.date, st.id
+             LIMIT %s
+        """, [last_date or '0001-01-01', int(last_id or 0), MATCH_BATCH_SIZE])
+        rows = self.env.cr.fetchall()
+
+        if len(rows) < MATCH_BATCH_SIZE:
+            params.set_param('integrations.reconcile_cron_cursor', '')
+        else:
+            params.set_param('integrations.reconcile_cron_cursor', f"{rows[-1][1]},{rows[-1][0]}")
+        if rows:
+            self._generate_proposals(self.env['account.bank.statement.line'].browse([row[0] for row in rows]))
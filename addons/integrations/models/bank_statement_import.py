@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from ..banking.statement_parsers import detect_format, parse_statement
+from collections import defaultdict
+import hashlib
+import io
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Nombre de lignes de relevé créées par appel à create
+IMPORT_BATCH_SIZE = 1000
+
+
+class BankStatementImport(models.Model):
+    _name = 'bank.statement.import'
+    _description = 'Import de relevé bancaire'
+    _order = 'create_date desc'
+
+    name = fields.Char(
+        string='Nom',
+        required=True,
+        default=lambda self: _('Import du %s') % fields.Date.today().strftime('%d/%m/%Y')
+    )
+
+    company_id = fields.Many2one(
+        'res.company',
+        string='Société',
+        required=True,
+        default=lambda self: self.env.company
+    )
+
+    journal_id = fields.Many2one(
+        'account.journal',
+        string='Journal de banque',
+        required=True,
+        domain="[('type', '=', 'bank'), ('company_id', '=', company_id)]"
+    )
+
+    file = fields.Binary(
+        string='Fichier relevé',
+        required=True,
+        attachment=True
+    )
+
+    filename = fields.Char(string='Nom du fichier')
+
+    file_format = fields.Selection([
+        ('auto', 'Détection automatique'),
+        ('camt053', 'CAMT.053 (XML ISO 20022)'),
+        ('ofx', 'OFX'),
+        ('csv', 'CSV bancaire'),
+    ], string='Format', default='auto', required=True)
+
+    state = fields.Selection([
+        ('draft', 'Brouillon'),
+        ('done', 'Importé'),
+        ('error', 'Erreur'),
+    ], string='État', default='draft', required=True)
+
+    line_count = fields.Integer(
+        string='Lignes lues',
+        readonly=True
+    )
+
+    imported_count = fields.Integer(
+        string='Lignes importées',
+        readonly=True
+    )
+
+    duplicate_count = fields.Integer(
+        string='Doublons ignorés',
+        readonly=True
+    )
+
+    date_from = fields.Date(
+        string='Première opération',
+        readonly=True
+    )
+
+    date_to = fields.Date(
+        string='Dernière opération',
+        readonly=True
+    )
+
+    error_message = fields.Text(
+        string='Message d\'erreur',
+        readonly=True
+    )
+
+    statement_line_ids = fields.One2many(
+        'account.bank.statement.line',
+        'statement_import_id',
+        string='Opérations importées',
+        readonly=True
+    )
+
+    def action_import(self):
+        """Importe le relevé en flux et crée les lignes par lots"""
+        self.ensure_one()
+
+        try:
+            stats = self._import_statement_lines()
+            self.write(dict(stats, state='done', error_message=False))
+            self.env['bank.categorization.rule']._categorize_statement_lines(self.statement_line_ids.ids)
+
+            _logger.info(
+                f"Relevé {self.filename} importé: {stats['imported_count']} lignes, "
+                f"{stats['duplicate_count']} doublons ignorés"
+            )
+
+            return {
+                'type': 'ir.actions.client',
+                'tag': 'display_notification',
+                'params': {
+                    'title': _('Import terminé'),
+                    'message': _('%s opérations importées, %s doublons ignorés') % (
+                        stats['imported_count'], stats['duplicate_count']),
+                    'type': 'success',
+                    'sticky': False,
+                }
+            }
+
+        except Exception as e:
+            _logger.error(f"Erreur lors de l'import du relevé: {str(e)}", exc_info=True)
+            self.write({
+                'state': 'error',
+                'error_message': str(e),
+            })
+            raise UserError(_("Erreur lors de l'import du relevé:\n%s") % str(e))
+
+    def _import_statement_lines(self):
+        """Parse le fichier, écarte les doublons via l'index d'empreintes et insère par lots"""
+        index = self._get_existing_import_ids()
+        occurrences = defaultdict(int)
+        batch = []
+        stats = {
+            'line_count': 0,
+            'imported_count': 0,
+            'duplicate_count': 0,
+            'date_from': False,
+            'date_to': False,
+        }
+
+        with self._open_file() as stream:
+            for values in parse_statement(stream, self._get_file_format(stream)):
+                stats['line_count'] += 1
+                unique_import_id = self._get_unique_import_id(values, occurrences)
+                if unique_import_id in index:
+                    stats['duplicate_count'] += 1
+                    continue
+                index.add(unique_import_id)
+
+                self._check_currency(values)
+                batch.append(self._prepare_statement_line_vals(values, unique_import_id))
+                stats['date_from'] = min(stats['date_from'] or values['date'], values['date'])
+                stats['date_to'] = max(stats['date_to'] or values['date'], values['date'])
+
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    stats['imported_count'] += self._create_statement_lines(batch)
+                    batch = []
+
+        if batch:
+            stats['imported_count'] += self._create_statement_lines(batch)
+        return stats
+
+    def _open_file(self):
+        """Ouvre le fichier depuis le filestore sans passer par le base64 de l'ORM"""
+        attachment = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name),
+            ('res_field', '=', 'file'),
+            ('res_id', '=', self.id),
+        ], limit=1)
+        if not attachment:
+            raise UserError(_("Aucun fichier à importer."))
+        if attachment.store_fname:
+            return open(attachment._full_path(attachment.store_fname), 'rb')
+        return io.BytesIO(attachment.raw)
+
+    def _get_file_format(self, stream):
+        if self.file_format != 'auto':
+            return self.file_format
+        head = stream.read(4096)
+        stream.seek(0)
+        file_format = detect_format(self.filename, head)
+        if not file_format:
+            raise UserError(_("Format du relevé non reconnu, veuillez le préciser."))
+        return file_format
+
+    def _get_existing_import_ids(self):
+        """Charge l'index des empreintes déjà importées sur le journal"""
+        self.env['account.bank.statement.line'].flush_model(['unique_import_id'])
+        self.env.cr.execute("""
+            SELECT st.unique_import_id
+              FROM account_bank_statement_line st
+              JOIN account_move move ON move.id = st.move_id
+             WHERE move.journal_id = %s
+               AND st.unique_import_id IS NOT NULL
+        """, [self.journal_id.id])
+        return {row[0] for row in self.env.cr.fetchall()}
+
+    def _get_unique_import_id(self, values, occurrences):
+        """Empreinte stable d'une opération (identique d'un fichier à l'autre)"""
+        if values['transaction_id']:
+            key = f"{self.journal_id.id}|id|{values['transaction_id']}"
+        else:
+            key = "|".join([
+                str(self.journal_id.id),
+                values['date'].isoformat(),
+                f"{values['amount']:.2f}",
+                values['payment_ref'],
+                values['ref'],
+            ])
+            # Opérations identiques le même jour : numéro d'occurrence dans le fichier
+            occurrences[key] += 1
+            key = f"{key}|{occurrences[key]}"
+        return 'iseb-' + hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def _check_currency(self, values):
+        currency = self.journal_id.currency_id or self.company_id.currency_id
+        if values['currency'] and values['currency'] != currency.name:
+            raise UserError(_(
+                "Le relevé est en %s alors que le journal %s est en %s."
+            ) % (values['currency'], self.journal_id.name, currency.name))
+
+    def _prepare_statement_line_vals(self, values, unique_import_id):
+        return {
+            'journal_id': self.journal_id.id,
+            'date': values['date'],
+            'amount': values['amount'],
+            'payment_ref': values['payment_ref'],
+            'partner_name': values['partner_name'] or False,
+            'account_number': values['account_number'] or False,
+            'ref': values['ref'] or False,
+            'unique_import_id': unique_import_id,
+            'statement_import_id': self.id,
+        }
+
+    def _create_statement_lines(self, vals_list):
+        """Crée un lot de lignes puis vide le cache pour garder une mémoire constante"""
+        self.env['account.bank.statement.line'].create(vals_list)
+        self.env.invalidate_all(flush=True)
+        return len(vals_list)
+
+    def action_reconcile(self):
+        """Propose (et applique si certain) le lettrage des opérations importées"""
+        self.ensure_one()
+        proposals = self.env['bank.reconcile.proposal']._generate_proposals(self.statement_line_ids)
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Propositions de rapprochement'),
+            'res_model': 'bank.reconcile.proposal',
+            'view_mode': 'tree',
+            'domain': [('id', 'in', proposals.ids)],
+            'target': 'current',
+        }
+
+    def action_view_statement_lines(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Opérations importées'),
+            'res_model': 'account.bank.statement.line',
+            'view_mode': 'tree,form',
+            'domain': [('statement_import_id', '=', self.id)],
+            'target': 'current',
+        }
+
+    def unlink(self):
+        """Empêche la suppression des imports terminés"""
+        for record in self:
+            if record.state == 'done':
+                raise UserError(_("Impossible de supprimer un import de relevé terminé."))
+        return super(BankStatementImport, self).unlink()
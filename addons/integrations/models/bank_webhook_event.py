@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, tools, _
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+import json
+import logging
+import random
+import time
+
+_logger = logging.getLogger(__name__)
+
+# Événements réservés par transaction de traitement
+WEBHOOK_BATCH_SIZE = 200
+
+# Nombre maximal de tentatives avant abandon (état 'dead')
+WEBHOOK_MAX_ATTEMPTS = 8
+
+# Délai de base du backoff exponentiel (secondes) et plafond
+WEBHOOK_RETRY_BASE = 30
+WEBHOOK_RETRY_MAX = 6 * 3600
+
+# Un événement resté 'processing' au-delà de ce délai est considéré comme abandonné
+WEBHOOK_STALE_AFTER = 15 * 60
+
+
+class BankWebhookEvent(models.Model):
+    _name = 'bank.webhook.event'
+    _description = 'Événement webhook agrégateur bancaire'
+    _order = 'id desc'
+    _log_access = False
+
+    provider = fields.Char(
+        string='Fournisseur',
+        required=True,
+        readonly=True
+    )
+
+    idempotency_key = fields.Char(
+        string="Clé d'idempotence",
+        required=True,
+        readonly=True,
+        help="Identifiant de l'événement chez le fournisseur : un même événement n'est stocké qu'une fois"
+    )
+
+    event_type = fields.Char(
+        string='Type',
+        readonly=True
+    )
+
+    payload = fields.Text(
+        string='Contenu brut',
+        readonly=True
+    )
+
+    received_at = fields.Datetime(
+        string='Reçu le',
+        readonly=True,
+        default=fields.Datetime.now
+    )
+
+    state = fields.Selection([
+        ('pending', 'En attente'),
+        ('processing', 'En cours'),
+        ('done', 'Traité'),
+        ('failed', 'En échec (nouvel essai prévu)'),
+        ('dead', 'Abandonné'),
+    ], string='État', default='pending', required=True, readonly=True)
+
+    attempts = fields.Integer(
+        string='Tentatives',
+        readonly=True
+    )
+
+    next_attempt_at = fields.Datetime(
+        string='Prochaine tentative',
+        readonly=True,
+        default=fields.Datetime.now
+    )
+
+    locked_at = fields.Datetime(
+        string='Réservé le',
+        readonly=True
+    )
+
+    processed_at = fields.Datetime(
+        string='Traité le',
+        readonly=True
+    )
+
+    error_message = fields.Text(
+        string='Dernière erreur',
+        readonly=True
+    )
+
+    _sql_constraints = [
+        ('idempotency_key_uniq', 'unique(provider, idempotency_key)',
+         "Cet événement a déjà été reçu."),
+    ]
+
+    def init(self):
+        # Index partiel de la file : seuls les événements à traiter y figurent
+        tools.create_index(
+            self._cr, 'bank_webhook_event_queue_idx', self._table,
+            ['next_attempt_at', 'id'], where="state IN ('pending', 'failed', 'processing')"
+        )
+
+    @api.model
+    def _enqueue(self, provider, idempotency_key, event_type, payload):
+        """Ajoute un événement brut à la file (sans ORM, ignoré s'il est déjà connu)
+
+        Appelé par le contrôleur webhook : une seule requête INSERT, aucun
+        traitement métier. Retourne True si l'événement est nouveau.
+        """
+        self.env.cr.execute("""
+            INSERT INTO bank_webhook_event
+                   (provider, idempotency_key, event_type, payload, received_at,
+                    state, attempts, next_attempt_at)
+            VALUES (%s, %s, %s, %s, now() AT TIME ZONE 'UTC', 'pending', 0, now() AT TIME ZONE 'UTC')
+            ON CONFLICT (provider, idempotency_key) DO NOTHING
+        """, [provider, idempotency_key, event_type, payload])
+        return bool(self.env.cr.rowcount)
+
+    @api.model
+    def _claim_batch(self, limit=WEBHOOK_BATCH_SIZE):
+        """Réserve un lot d'événements échus ; les workers concurrents s'ignorent (SKIP LOCKED)"""
+        self.env.cr.execute("""
+            UPDATE bank_webhook_event
+               SET state = 'processing',
+                   attempts = attempts + 1,
+                   locked_at = now() AT TIME ZONE 'UTC'
+             WHERE id IN (
+                    SELECT id
+                      FROM bank_webhook_event
+                     WHERE (state IN ('pending', 'failed')
+                            AND next_attempt_at <= now() AT TIME ZONE 'UTC')
+                        OR (state = 'processing'
+                            AND locked_at < now() AT TIME ZONE 'UTC' - %s * interval '1 second')
+                     ORDER BY next_attempt_at, id
+                     LIMIT %s
+                       FOR UPDATE SKIP LOCKED
+             )
+         RETURNING id
+        """, [WEBHOOK_STALE_AFTER, limit])
+        return self.browse(sorted(row[0] for row in self.env.cr.fetchall()))
+
+    def _process_events(self):
+        """Traite les événements réservés, chacun dans son propre savepoint"""
+        handlers = self._get_event_handlers()
+        for event in self:
+            try:
+                with self.env.cr.savepoint():
+                    payload = json.loads(event.payload or '{}')
+                    event_type = event.event_type or payload.get('type') or ''
+                    handler = handlers.get(event_type)
+                    if handler:
+                        handler(event, payload)
+                    else:
+                        _logger.debug(f"Webhook {event.provider}: type d'événement ignoré '{event_type}'")
+                    event.write({
+                        'state': 'done',
+                        'event_type': event_type,
+                        'processed_at': fields.Datetime.now(),
+                        'locked_at': False,
+                        'error_message': False,
+                    })
+            except Exception as e:
+                _logger.warning(f"Webhook {event.provider} #{event.id} en échec: {str(e)}")
+                event._schedule_retry(str(e))
+
+    def _schedule_retry(self, error):
+        """Backoff exponentiel avec gigue, abandon après WEBHOOK_MAX_ATTEMPTS"""
+        self.ensure_one()
+        if self.attempts >= WEBHOOK_MAX_ATTEMPTS:
+            self.write({'state': 'dead', 'locked_at': False, 'error_message': error})
+            return
+        delay = min(WEBHOOK_RETRY_BASE * 2 ** (self.attempts - 1), WEBHOOK_RETRY_MAX)
+        delay = random.uniform(delay / 2, delay)
+        self.write({
+            'state': 'failed',
+            'locked_at': False,
+            'next_attempt_at': fields.Datetime.now() + timedelta(seconds=delay),
+            'error_message': error,
+        })
+
+    def _get_event_handlers(self):
+        """Traitements par type d'événement (à étendre par les connecteurs)"""
+        return {
+            'transaction.created': self._handle_transaction_created,
+            'connection.error': self._handle_connection_error,
+        }
+
+    def _handle_transaction_created(self, event, payload):
+        """Crée l'opération bancaire sur le journal rattaché au compte de l'agrégateur"""
+        transaction = payload.get('transaction') or {}
+        account_ref = str(transaction.get('id_account') or transaction.get('account_id') or '')
+        journal = self.env['account.journal'].search([
+            ('type', '=', 'bank'),
+            ('bank_aggregator_account_id', '=', account_ref),
+        ], limit=1) if account_ref else False
+        if not journal:
+            raise ValueError(_("Aucun journal de banque lié au compte agrégateur %s") % account_ref)
+
+        unique_import_id = f"{event.provider}-{transaction['id']}"
+        StatementLine = self.env['account.bank.statement.line']
+        if StatementLine.search_count([('unique_import_id', '=', unique_import_id)], limit=1):
+            return
+        StatementLine.create({
+            'journal_id': journal.id,
+            'date': transaction.get('date'),
+            'amount': float(transaction.get('value') or 0.0),
+            'payment_ref': transaction.get('original_wording') or transaction.get('wording') or '/',
+            'unique_import_id': unique_import_id,
+        })
+
+    def _handle_connection_error(self, event, payload):
+        _logger.warning(
+            f"Webhook {event.provider}: erreur de connexion bancaire {payload.get('connection_id')}"
+        )
+
+    @api.model
+    def _cron_process_events(self, time_limit=50):
+        """Vide la file avec un pool de workers indépendants des workers HTTP
+
+        Chaque worker ouvre son propre curseur et réserve des lots jusqu'à
+        épuisement de la file ou du temps imparti ; SKIP LOCKED garantit
+        qu'un événement n'est traité que par un seul worker.
+        """
+        workers = int(self.env['ir.config_parameter'].sudo().get_param('integrations.webhook_workers', '2'))
+        deadline = time.monotonic() + time_limit
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            counts = list(executor.map(lambda _i: self._drain_queue(deadline), range(workers)))
+        if sum(counts):
+            _logger.info(f"Webhooks: {sum(counts)} événements traités par {workers} workers")
+
+    def _drain_queue(self, deadline):
+        processed = 0
+        with self.pool.cursor() as cr:
+            env = api.Environment(cr, self.env.uid, self.env.context)
+            Event = env[self._name]
+            while time.monotonic() < deadline:
+                events = Event._claim_batch()
+                if not events:
+                    break
+                cr.commit()
+                events._process_events()
+                cr.commit()
+                env.invalidate_all()
+                processed += len(events)
+        return processed
+
+    def action_retry(self):
+        """Remet les événements sélectionnés dans la file"""
+        self.filtered(lambda e: e.state in ('failed', 'dead')).write({
+            'state': 'pending',
+            'attempts': 0,
+            'next_attempt_at': fields.Datetime.now(),
+        })
+        return True
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from ..einvoicing.facturx import CIIWriter
+from ..einvoicing.pdf import create_pool, embed_many
+import io
+import logging
+import os
+import time
+
+_logger = logging.getLogger(__name__)
+
+# Factures traitées (rendu PDF, XML, intégration) puis validées par transaction
+FACTURX_CHUNK_SIZE = 500
+
+# Factures rendues par appel au moteur de rapport
+FACTURX_RENDER_SIZE = 50
+
+
+class FacturxBatch(models.Model):
+    _name = 'facturx.batch'
+    _description = 'Lot de génération Factur-X'
+    _order = 'create_date desc'
+
+    name = fields.Char(
+        string='Nom',
+        required=True,
+        default=lambda self: _('Factur-X du %s') % fields.Date.today().strftime('%d/%m/%Y')
+    )
+
+    company_id = fields.Many2one(
+        'res.company',
+        string='Société',
+        required=True,
+        default=lambda self: self.env.company
+    )
+
+    date_from = fields.Date(
+        string='Du',
+        required=True
+    )
+
+    date_to = fields.Date(
+        string='Au',
+        required=True
+    )
+
+    profile = fields.Selection([
+        ('basic', 'BASIC'),
+        ('en16931', 'EN 16931 (COMFORT)'),
+    ], string='Profil', default='en16931', required=True)
+
+    regenerate = fields.Boolean(
+        string='Régénérer',
+        help="Inclure les factures ayant déjà un PDF Factur-X"
+    )
+
+    move_ids = fields.Many2many(
+        'account.move',
+        string='Factures',
+        readonly=True
+    )
+
+    state = fields.Selection([
+        ('draft', 'Brouillon'),
+        ('queued', 'En file'),
+        ('running', 'En cours'),
+        ('done', 'Terminé'),
+        ('error', 'Erreur'),
+    ], string='État', default='draft', required=True, readonly=True)
+
+    total_count = fields.Integer(
+        string='Factures',
+        readonly=True
+    )
+
+    done_count = fields.Integer(
+        string='Générées',
+        readonly=True
+    )
+
+    error_count = fields.Integer(
+        string='En erreur',
+        readonly=True
+    )
+
+    progress = fields.Float(
+        string='Progression (%)',
+        compute='_compute_progress'
+    )
+
+    duration = fields.Float(
+        string='Durée (s)',
+        readonly=True
+    )
+
+    last_error = fields.Text(
+        string='Dernière erreur',
+        readonly=True
+    )
+
+    @api.depends('total_count', 'done_count', 'error_count')
+    def _compute_progress(self):
+        for batch in self:
+            processed = batch.done_count + batch.error_count
+            batch.progress = 100.0 * processed / batch.total_count if batch.total_count else 0.0
+
+    def action_generate(self):
+        """Sélectionne les factures et confie le lot au cron (traitement hors requête HTTP)"""
+        for batch in self:
+            if batch.date_from > batch.date_to:
+                raise UserError(_("La date de début doit précéder la date de fin."))
+            domain = [
+                ('company_id', '=', batch.company_id.id),
+                ('move_type', 'in', ('out_invoice', 'out_refund')),
+                ('state', '=', 'posted'),
+                ('invoice_date', '>=', batch.date_from),
+                ('invoice_date', '<=', batch.date_to),
+            ]
+            if not batch.regenerate:
+                domain.append(('facturx_attachment_id', '=', False))
+            moves = self.env['account.move'].search(domain, order='id')
+            if not moves:
+                raise UserError(_("Aucune facture à traiter sur la période."))
+            batch.write({
+                'move_ids': [(6, 0, moves.ids)],
+                'total_count': len(moves),
+                'done_count': 0,
+                'error_count': 0,
+                'duration': 0.0,
+                'last_error': False,
+                'state': 'queued',
+            })
+        self.env.ref('integrations.ir_cron_facturx_batch')._trigger()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Génération planifiée'),
+                'message': _('%s factures en file de génération Factur-X') % sum(self.mapped('total_count')),
+                'type': 'info',
+                'sticky': False,
+            }
+        }
+
+    @api.model
+    def _cron_process_batches(self, time_limit=600):
+        """Traite les lots en file par tranches validées une à une
+
+        Un lot interrompu (délai dépassé, arrêt du serveur) reprend à la
+        tranche suivante au prochain passage du cron.
+        """
+        deadline = time.monotonic() + time_limit
+        for batch in self.search([('state', 'in', ('queued', 'running'))], order='id'):
+            if not batch._process(deadline):
+                self.env.ref('integrations.ir_cron_facturx_batch')._trigger()
+                return
+
+    def _process(self, deadline):
+        """Génère les tranches restantes du lot ; retourne False si le temps est écoulé"""
+        self.ensure_one()
+        self.state = 'running'
+        self.env.cr.commit()
+        writer = CIIWriter(self.profile)
+        move_ids = sorted(self.move_ids.ids)
+        executor = create_pool(self._get_workers())
+        try:
+            return self._process_chunks(move_ids, writer, executor, deadline)
+        finally:
+            if executor:
+                executor.shutdown()
+
+    def _process_chunks(self, move_ids, writer, executor, deadline):
+        while True:
+            position = self.done_count + self.error_count
+            if position >= len(move_ids):
+                self.state = 'error' if self.error_count and not self.done_count else 'done'
+                self.env.cr.commit()
+                _logger.info(
+                    f"Lot Factur-X {self.name}: {self.done_count} factures générées, "
+                    f"{self.error_count} erreurs en {self.duration:.0f}s"
+                )
+                return True
+            if time.monotonic() >= deadline:
+                return False
+
+            started = time.monotonic()
+            moves = self.env['account.move'].browse(move_ids[position:position + FACTURX_CHUNK_SIZE])
+            try:
+                done, errors = self._generate_chunk(moves, writer, executor)
+            except Exception as e:
+                self.env.cr.rollback()
+                _logger.error(f"Lot Factur-X {self.name}: tranche en échec: {str(e)}", exc_info=True)
+                done, errors = 0, [(move, str(e)) for move in moves]
+            self.write({
+                'done_count': self.done_count + done,
+                'error_count': self.error_count + len(errors),
+                'duration': self.duration + time.monotonic() - started,
+                'last_error': errors[-1][1] if errors else self.last_error,
+            })
+            self.env.cr.commit()
+            self.env.invalidate_all()
+
+    def _generate_chunk(self, moves, writer, executor=None):
+        """Rend les PDF, écrit le XML, intègre et enregistre une tranche de factures"""
+        values = moves._get_facturx_values()
+        pdfs = self._get_invoice_pdfs(moves)
+
+        items = []
+        errors = []
+        for move in moves:
+            if move.id not in pdfs:
+                errors.append((move, _("PDF de la facture introuvable")))
+                continue
+            output = io.BytesIO()
+            writer.write(output, values[move.id])
+            items.append((move.id, pdfs[move.id], output.getvalue(), self.profile))
+
+        results = embed_many(items, executor)
+
+        attachment_vals = []
+        generated = self.env['account.move']
+        for move_id, content, error in results:
+            move = moves.browse(move_id)
+            if error:
+                errors.append((move, error))
+                continue
+            generated |= move
+            attachment_vals.append({
+                'name': f"Factur-X_{move.name.replace('/', '_')}.pdf",
+                'res_model': 'account.move',
+                'res_id': move_id,
+                'raw': content,
+                'mimetype': 'application/pdf',
+            })
+        attachments = self.env['ir.attachment'].create(attachment_vals)
+        for move, attachment in zip(generated, attachments):
+            move.facturx_attachment_id = attachment
+
+        for move, error in errors:
+            _logger.warning(f"Factur-X {move.name}: {error}")
+        return len(generated), errors
+
+    def _get_invoice_pdfs(self, moves):
+        """PDF des factures : celui déjà archivé par Odoo, sinon rendu par lots"""
+        pdfs = {}
+        to_render = []
+        for move in moves:
+            if move.invoice_pdf_report_id:
+                pdfs[move.id] = move.invoice_pdf_report_id.raw
+            else:
+                to_render.append(move.id)
+
+        Report = self.env['ir.actions.report']
+        for start in range(0, len(to_render), FACTURX_RENDER_SIZE):
+            streams = Report._render_qweb_pdf_prepare_streams(
+                'account.account_invoices', None, res_ids=to_render[start:start + FACTURX_RENDER_SIZE]
+            )
+            for move_id, stream_data in streams.items():
+                pdfs[move_id] = stream_data['stream'].getvalue()
+                stream_data['stream'].close()
+        return pdfs
+
+    def _get_workers(self):
+        """Processus d'intégration PDF (`integrations.facturx_workers`, 0 = automatique)"""
+        workers = int(self.env['ir.config_parameter'].sudo().get_param('integrations.facturx_workers', '0'))
+        return workers or min(4, os.cpu_count() or 1)
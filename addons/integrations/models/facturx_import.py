@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from ..einvoicing.facturx import TYPE_CREDIT_NOTE, parse_cii
+from ..einvoicing.pdf import extract_facturx
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class FacturxImportWizard(models.TransientModel):
+    _name = 'facturx.import.wizard'
+    _description = 'Import de factures fournisseurs Factur-X'
+
+    company_id = fields.Many2one(
+        'res.company',
+        string='Société',
+        required=True,
+        default=lambda self: self.env.company
+    )
+
+    journal_id = fields.Many2one(
+        'account.journal',
+        string="Journal d'achats",
+        required=True,
+        domain="[('type', '=', 'purchase'), ('company_id', '=', company_id)]"
+    )
+
+    attachment_ids = fields.Many2many(
+        'ir.attachment',
+        string='Fichiers',
+        help="PDF Factur-X / ZUGFeRD ou XML CII"
+    )
+
+    @api.onchange('company_id')
+    def _onchange_company_id(self):
+        self.journal_id = self.env['account.journal'].search([
+            ('type', '=', 'purchase'),
+            ('company_id', '=', self.company_id.id),
+        ], limit=1)
+
+    def action_import(self):
+        """Crée une facture fournisseur brouillon par fichier Factur-X reçu"""
+        self.ensure_one()
+        if not self.attachment_ids:
+            raise UserError(_("Ajoutez au moins un fichier Factur-X."))
+
+        invoices = []
+        rejected = []
+        for attachment in self.attachment_ids:
+            try:
+                invoices.append((attachment, self._read_facturx(attachment)))
+            except Exception as e:
+                _logger.warning(f"Factur-X {attachment.name} illisible: {str(e)}")
+                rejected.append(attachment.name)
+        if not invoices:
+            raise UserError(_("Aucun fichier Factur-X lisible : %s") % ', '.join(rejected))
+
+        partners = {}
+        taxes = {}
+        vals_list = [
+            self._prepare_move_vals(invoice, partners, taxes)
+            for _attachment, invoice in invoices
+        ]
+        moves = self.env['account.move'].create(vals_list)
+
+        for (attachment, _invoice), move in zip(invoices, moves):
+            attachment.write({'res_model': 'account.move', 'res_id': move.id})
+
+        if rejected:
+            _logger.info(f"Import Factur-X: {len(moves)} factures créées, {len(rejected)} fichiers rejetés")
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Factures Factur-X importées'),
+            'res_model': 'account.move',
+            'view_mode': 'tree,form',
+            'domain': [('id', 'in', moves.ids)],
+            'context': {'default_move_type': 'in_invoice'},
+        }
+
+    def _read_facturx(self, attachment):
+        content = attachment.raw
+        if content[:4] == b'%PDF':
+            content = extract_facturx(content)
+            if not content:
+                raise UserError(_("Le PDF %s ne contient pas de XML Factur-X.") % attachment.name)
+        return parse_cii(content)
+
+    def _prepare_move_vals(self, invoice, partners, taxes):
+        move_type = 'in_refund' if invoice['type_code'] == TYPE_CREDIT_NOTE else 'in_invoice'
+        currency = self.env['res.currency'].search([('name', '=', invoice['currency'])], limit=1) \
+            if invoice['currency'] else self.company_id.currency_id
+        return {
+            'move_type': move_type,
+            'company_id': self.company_id.id,
+            'journal_id': self.journal_id.id,
+            'partner_id': self._find_partner(invoice['seller'], partners).id,
+            'ref': invoice['number'],
+            'invoice_date': invoice['issue_date'],
+            'invoice_date_due': invoice['due_date'] or invoice['issue_date'],
+            'currency_id': (currency or self.company_id.currency_id).id,
+            'invoice_line_ids': [(0, 0, {
+                'name': line['name'],
+                'quantity': line['quantity'],
+                'price_unit': line['subtotal'] / line['quantity'],
+                'tax_ids': [(6, 0, self._find_tax(line['tax_rate'], taxes).ids)],
+            }) for line in invoice['lines']],
+        }
+
+    def _find_partner(self, seller, cache):
+        """Fournisseur par n° de TVA puis SIREN ; créé s'il est inconnu"""
+        key = seller.get('vat') or seller.get('siren') or seller.get('name')
+        if key in cache:
+            return cache[key]
+        Partner = self.env['res.partner']
+        partner = Partner
+        if seller.get('vat'):
+            partner = Partner.search([('vat', '=', seller['vat'])], limit=1)
+        if not partner and seller.get('siren'):
+            partner = Partner.search([('company_registry', '=like', seller['siren'] + '%')], limit=1)
+        if not partner:
+            country = self.env['res.country'].search([('code', '=', seller.get('country') or 'FR')], limit=1)
+            partner = Partner.create({
+                'name': seller.get('name') or _('Fournisseur Factur-X'),
+                'is_company': True,
+                'vat': seller.get('vat') or False,
+                'company_registry': seller.get('siren') or False,
+                'street': seller.get('street') or False,
+                'zip': seller.get('zip') or False,
+                'city': seller.get('city') or False,
+                'country_id': country.id,
+            })
+        cache[key] = partner
+        return partner
+
+    def _find_tax(self, rate, cache):
+        """Taxe d'achat au taux indiqué (aucune si le taux est inconnu)"""
+        if rate not in cache:
+            cache[rate] = self.env['account.tax'].search([
+                ('type_tax_use', '=', 'purchase'),
+                ('amount_type', '=', 'percent'),
+                ('amount', '=', rate),
+                ('company_id', '=', self.company_id.id),
+                ('price_include', '=', False),
+            ], limit=1)
+        return cache[rate]
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+{
+    'name': 'Monitoring - ISEB',
+    'version': '17.0.1.0.0',
+    'category': 'Hidden/Tools',
+    'summary': 'Métriques Prometheus des opérations comptables ISEB',
+    'description': """
+Monitoring - ISEB Platform
+==========================
+
+Exposition des métriques métier de la plateforme ISEB au format Prometheus.
+
+Fonctionnalités principales
+----------------------------
+* Endpoint /metrics agrégeant tous les workers Odoo (mode multiprocess de prometheus_client)
+* Génération FEC : durée et débit (lignes par seconde)
+* Calcul des déclarations de TVA : durée
+* Dashboards clients : durée de calcul par indicateur, taux de réutilisation des valeurs stockées
+* Synchronisation bancaire et webhooks : durée, débit, erreurs
+* OCR : débit des documents traités
+* Anomalies de conformité FEC par type
+* Profilage opt-in des opérations coûteuses : durée, requêtes SQL, enregistrements lus, mémoire,
+  rapport cProfile / pyinstrument au-delà d'un seuil
+
+Auteur
+------
+ISEB Dev Team
+
+License
+-------
+AGPL-3
+    """,
+    'author': 'ISEB',
+    'website': 'https://www.iseb-accounting.fr',
+    'license': 'AGPL-3',
+    'depends': [
+        'base',
+        'web',
+        'french_accounting',
+        'client_portal',
+        'integrations',
+    ],
+    'external_dependencies': {
+        'python': ['prometheus_client'],
+    },
+    'data': [
+        'security/ir.model.access.csv',
+        'views/profile_sample_views.xml',
+    ],
+    'installable': True,
+    'application': False,
+    'auto_install': False,
+}
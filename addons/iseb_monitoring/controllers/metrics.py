@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+
+from odoo import http
+from odoo.http import request
+from odoo.tools import config
+import hmac
+
+from .. import metrics
+
+
+class MetricsController(http.Controller):
+
+    @http.route('/metrics', type='http', auth='none', methods=['GET'], csrf=False, save_session=False)
+    def metrics(self, **kwargs):
+        """Exposition Prometheus, sans session ni accès base
+
+        Si `metrics_token` est défini dans odoo.conf, la requête doit porter
+        l'en-tête « Authorization: Bearer <token> ».
+        """
+        token = config.get('metrics_token')
+        if token:
+            authorization = request.httprequest.headers.get('Authorization', '')
+            if not hmac.compare_digest(authorization.encode(), f'Bearer {token}'.encode()):
+                return request.make_response('Unauthorized', status=401)
+        body, content_type = metrics.render()
+        return request.make_response(body, headers=[('Content-Type', content_type)])
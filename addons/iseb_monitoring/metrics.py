@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Métriques Prometheus de la plateforme ISEB
+
+Avec PROMETHEUS_MULTIPROC_DIR, chaque processus (workers HTTP, workers cron,
+conteneur odoo-worker) écrit ses valeurs dans des fichiers mmap de ce
+répertoire ; l'endpoint /metrics les agrège à la lecture. Une observation
+coûte une écriture en mémoire partagée, sans verrou inter-processus.
+
+Les fichiers sont nommés d'après le conteneur et le pid : plusieurs
+conteneurs peuvent partager le même répertoire sans collision de pid.
+"""
+
+import os
+import socket
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CollectorRegistry, Counter, Histogram, REGISTRY, CONTENT_TYPE_LATEST, generate_latest, multiprocess, values,
+)
+
+MULTIPROC_DIR = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+
+if MULTIPROC_DIR:
+    _hostname = socket.gethostname()
+    values.ValueClass = values.MultiProcessValue(process_identifier=lambda: f"{_hostname}-{os.getpid()}")
+
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+FAST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+RATE_BUCKETS = (10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000, 500000)
+
+# FEC
+FEC_GENERATION_SECONDS = Histogram(
+    'iseb_fec_generation_seconds', "Durée de génération d'un FEC", buckets=DURATION_BUCKETS,
+)
+FEC_LINES_PER_SECOND = Histogram(
+    'iseb_fec_lines_per_second', "Débit de génération FEC (lignes par seconde)", buckets=RATE_BUCKETS,
+)
+FEC_GENERATIONS = Counter(
+    'iseb_fec_generations_total', "Générations FEC par résultat", ['status'],
+)
+
+# Conformité
+COMPLIANCE_FAILURES = Counter(
+    'iseb_fec_compliance_failures_total', "Écritures détectées non conformes FEC, par anomalie", ['error'],
+)
+FEC_EXPORTS_BLOCKED = Counter(
+    'iseb_fec_exports_blocked_total', "Exports FEC refusés pour écritures non conformes",
+)
+
+# TVA
+TVA_COMPUTE_SECONDS = Histogram(
+    'iseb_tva_compute_seconds', "Durée de calcul d'une déclaration de TVA", buckets=DURATION_BUCKETS,
+)
+
+# Dashboards clients
+DASHBOARD_COMPUTE_SECONDS = Histogram(
+    'iseb_dashboard_compute_seconds', "Durée de calcul d'un indicateur de dashboard (par lot)",
+    ['field'], buckets=FAST_BUCKETS,
+)
+DASHBOARD_READS = Counter(
+    'iseb_dashboard_reads_total', "Dashboards lus : valeurs stockées réutilisées (hit) ou recalculées (miss)",
+    ['result'],
+)
+
+# Banque
+BANK_SYNC_SECONDS = Histogram(
+    'iseb_bank_sync_seconds', "Durée d'une synchronisation bancaire", buckets=DURATION_BUCKETS,
+)
+BANK_SYNC_TRANSACTIONS_PER_SECOND = Histogram(
+    'iseb_bank_sync_transactions_per_second', "Débit de la synchronisation bancaire (opérations par seconde)",
+    buckets=RATE_BUCKETS,
+)
+BANK_SYNC_TRANSACTIONS = Counter(
+    'iseb_bank_sync_transactions_total', "Opérations bancaires importées par synchronisation",
+)
+BANK_SYNC_ERRORS = Counter(
+    'iseb_bank_sync_errors_total', "Connexions bancaires en erreur lors d'une synchronisation",
+)
+BANK_WEBHOOK_EVENTS = Counter(
+    'iseb_bank_webhook_events_total', "Événements webhook bancaires traités",
+)
+
+# OCR
+OCR_DOCUMENTS = Counter(
+    'iseb_ocr_documents_total', "Documents traités par l'OCR, par résultat", ['status'],
+)
+OCR_SECONDS = Histogram(
+    'iseb_ocr_seconds', "Durée de reconnaissance d'un document", buckets=DURATION_BUCKETS,
+)
+
+
+@contextmanager
+def timer(histogram, *labels):
+    """Observe la durée du bloc dans `histogram` (même en cas d'exception)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metric = histogram.labels(*labels) if labels else histogram
+        metric.observe(time.perf_counter() - start)
+
+
+def observe_ocr(duration, success=True):
+    """Point d'entrée des traitements OCR : un document reconnu en `duration` secondes"""
+    OCR_DOCUMENTS.labels('success' if success else 'error').inc()
+    OCR_SECONDS.observe(duration)
+
+
+def render():
+    """(contenu, type MIME) de l'exposition Prometheus"""
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
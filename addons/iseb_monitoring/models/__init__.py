@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+
+from . import base
+from . import profile_sample
+from . import fec_export
+from . import account_move
+from . import tva_declaration
+from . import client_dashboard
+from . import bank_connection
+from . import bank_webhook_event
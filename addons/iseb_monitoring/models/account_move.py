@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models
+from collections import Counter
+
+from .. import metrics
+
+
+class AccountMove(models.Model):
+    _inherit = 'account.move'
+
+    def _compute_field_value(self, field):
+        super(AccountMove, self)._compute_field_value(field)
+        if field.name == 'fec_compliance_state':
+            errors = Counter(
+                move.fec_compliance_error for move in self if move.fec_compliance_state == 'non_compliant'
+            )
+            for error, count in errors.items():
+                metrics.COMPLIANCE_FAILURES.labels(error or 'unknown').inc(count)
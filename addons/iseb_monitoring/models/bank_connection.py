@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models
+import time
+
+from .. import metrics, profiling
+
+
+class BankConnection(models.Model):
+    _inherit = 'bank.connection'
+
+    @profiling.profiled()
+    def _sync_connections(self):
+        start = time.perf_counter()
+        stats = super(BankConnection, self)._sync_connections()
+        duration = time.perf_counter() - start
+        metrics.BANK_SYNC_SECONDS.observe(duration)
+        metrics.BANK_SYNC_TRANSACTIONS.inc(stats['imported'])
+        metrics.BANK_SYNC_ERRORS.inc(stats['errors'])
+        if stats['imported'] and duration > 0:
+            metrics.BANK_SYNC_TRANSACTIONS_PER_SECOND.observe(stats['imported'] / duration)
+        return stats
@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models
+
+from .. import metrics
+
+
+class BankWebhookEvent(models.Model):
+    _inherit = 'bank.webhook.event'
+
+    def _process_events(self):
+        result = super(BankWebhookEvent, self)._process_events()
+        metrics.BANK_WEBHOOK_EVENTS.inc(len(self))
+        return result
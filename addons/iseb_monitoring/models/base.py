@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models
+
+from .. import profiling
+
+
+class Base(models.AbstractModel):
+    _inherit = 'base'
+
+    def _fetch_query(self, query, fields):
+        fetched = super(Base, self)._fetch_query(query, fields)
+        profiling.count_fetched(len(fetched))
+        return fetched
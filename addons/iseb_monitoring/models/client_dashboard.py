@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models
+
+from .. import metrics, profiling
+
+
+class ClientDashboard(models.Model):
+    _inherit = 'client.dashboard'
+
+    def _compute_field_value(self, field):
+        """Durée de chaque méthode de calcul (un lot de dashboards par appel)"""
+        name = field.compute if isinstance(field.compute, str) else field.name
+        with metrics.timer(metrics.DASHBOARD_COMPUTE_SECONDS, name.removeprefix('_compute_')), \
+                profiling.profile_operation(self.env, f'{self._name}.{name}', len(self)):
+            return super(ClientDashboard, self)._compute_field_value(field)
+
+    def read(self, fields=None, load='_classic_read'):
+        """Compte les dashboards servis depuis les valeurs stockées (hit) ou à recalculer (miss)"""
+        pending = self.browse()
+        for name in fields or self._fields:
+            field = self._fields.get(name)
+            if field and field.compute and field.store:
+                pending |= self.env.records_to_compute(field) & self
+        if pending:
+            metrics.DASHBOARD_READS.labels('miss').inc(len(pending))
+        if len(self) > len(pending):
+            metrics.DASHBOARD_READS.labels('hit').inc(len(self) - len(pending))
+        return super(ClientDashboard, self).read(fields, load)
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models
+from odoo.exceptions import UserError
+import time
+
+from .. import metrics, profiling
+
+
+class FecExport(models.Model):
+    _inherit = 'fec.export'
+
+    @profiling.profiled()
+    def action_generate_fec(self):
+        start = time.perf_counter()
+        try:
+            result = super(FecExport, self).action_generate_fec()
+        except Exception:
+            metrics.FEC_GENERATIONS.labels('error').inc()
+            raise
+        duration = time.perf_counter() - start
+        metrics.FEC_GENERATIONS.labels('success').inc()
+        metrics.FEC_GENERATION_SECONDS.observe(duration)
+        if duration > 0:
+            metrics.FEC_LINES_PER_SECOND.observe(self.line_count / duration)
+        return result
+
+    def _check_moves_compliance(self, moves):
+        try:
+            return super(FecExport, self)._check_moves_compliance(moves)
+        except UserError:
+            metrics.FEC_EXPORTS_BLOCKED.inc()
+            raise
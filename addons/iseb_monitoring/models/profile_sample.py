@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, _
+
+
+class IsebProfileSample(models.Model):
+    _name = 'iseb.profile.sample'
+    _description = 'Échantillon de profilage'
+    _order = 'id desc'
+
+    name = fields.Char(
+        string='Opération',
+        required=True,
+        index=True,
+        readonly=True
+    )
+
+    record_count = fields.Integer(
+        string='Enregistrements traités',
+        readonly=True,
+        help="Taille du recordset sur lequel l'opération a été appelée"
+    )
+
+    duration = fields.Float(
+        string='Durée (ms)',
+        digits=(16, 1),
+        group_operator='avg',
+        readonly=True
+    )
+
+    query_count = fields.Integer(
+        string='Requêtes SQL',
+        group_operator='avg',
+        readonly=True
+    )
+
+    query_time = fields.Float(
+        string='Temps SQL (ms)',
+        digits=(16, 1),
+        group_operator='avg',
+        readonly=True
+    )
+
+    records_fetched = fields.Integer(
+        string='Enregistrements lus',
+        group_operator='avg',
+        readonly=True,
+        help="Enregistrements chargés depuis la base par l'ORM"
+    )
+
+    memory_growth = fields.Integer(
+        string='Croissance mémoire (Ko)',
+        readonly=True,
+        help="Augmentation du pic de mémoire résidente du processus pendant l'opération"
+    )
+
+    memory_peak = fields.Integer(
+        string='Pic mémoire processus (Mo)',
+        readonly=True
+    )
+
+    slow = fields.Boolean(
+        string='Lente',
+        readonly=True,
+        help="Durée supérieure au seuil iseb_monitoring.profiling_threshold_ms"
+    )
+
+    error = fields.Char(
+        string='Exception',
+        readonly=True
+    )
+
+    profiler = fields.Selection([
+        ('cprofile', 'cProfile'),
+        ('pyinstrument', 'pyinstrument'),
+    ], string='Profileur', readonly=True)
+
+    profile = fields.Text(
+        string='Rapport de profilage',
+        readonly=True
+    )
+
+    @api.model
+    def _record(self, values):
+        """Ajoute un échantillon et ne conserve que les plus récents (tampon circulaire)"""
+        sample = self.create(values)
+        size = int(self.env['ir.config_parameter'].get_param('iseb_monitoring.profiling_buffer_size', '2000'))
+        self.env.cr.execute("DELETE FROM iseb_profile_sample WHERE id <= %s", [sample.id - size])
+        return sample
+
+    @api.model
+    def action_clear(self):
+        self.env.cr.execute("DELETE FROM iseb_profile_sample")
+        self.invalidate_model()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Profilage'),
+                'message': _('Échantillons supprimés.'),
+                'type': 'success',
+                'next': {'type': 'ir.actions.client', 'tag': 'reload'},
+            }
+        }
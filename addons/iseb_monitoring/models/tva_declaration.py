@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models
+
+from .. import metrics, profiling
+
+
+class TvaDeclaration(models.Model):
+    _inherit = 'tva.declaration'
+
+    @profiling.profiled()
+    def action_compute_tva(self):
+        with metrics.timer(metrics.TVA_COMPUTE_SECONDS):
+            return super(TvaDeclaration, self).action_compute_tva()
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Profilage des opérations coûteuses (opt-in)
+
+Activé par le paramètre système `iseb_monitoring.profiling` ; sans lui, une
+méthode instrumentée ne coûte qu'une lecture de paramètre (en cache).
+
+Chaque opération profilée enregistre un échantillon (iseb.profile.sample) :
+durée, nombre et durée des requêtes SQL (compteurs du thread tenus par le
+curseur Odoo), enregistrements lus par l'ORM et croissance du pic mémoire du
+processus. L'échantillon est écrit dans un curseur séparé : il survit à
+l'annulation de la transaction et ses requêtes ne sont pas comptées.
+
+Une opération plus lente que `iseb_monitoring.profiling_threshold_ms` est
+armée : sa prochaine exécution dans le même processus tourne sous profileur
+(pyinstrument s'il est installé, cProfile sinon) et le rapport est joint à
+l'échantillon.
+"""
+
+import cProfile
+import functools
+import io
+import logging
+import pstats
+import resource
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    from pyinstrument import Profiler
+except ImportError:
+    Profiler = None
+
+_logger = logging.getLogger(__name__)
+
+PROFILE_STATS_LINES = 60
+
+_local = threading.local()
+_armed = set()
+
+
+def count_fetched(count):
+    """Enregistrements lus par l'ORM pendant les opérations profilées du thread"""
+    if getattr(_local, 'depth', 0):
+        _local.records_fetched += count
+
+
+def _start_capture():
+    if Profiler is not None:
+        profiler = Profiler()
+        profiler.start()
+        return 'pyinstrument', profiler
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return 'cprofile', profiler
+
+
+def _stop_capture(kind, profiler):
+    if kind == 'pyinstrument':
+        profiler.stop()
+        return profiler.output_text(unicode=True, color=False)
+    profiler.disable()
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(PROFILE_STATS_LINES)
+    return stream.getvalue()
+
+
+def _record(env, values):
+    thread = threading.current_thread()
+    query_count, query_time = thread.query_count, thread.query_time
+    try:
+        with env.registry.cursor() as cr:
+            env(cr=cr, su=True)['iseb.profile.sample']._record(values)
+    except Exception:
+        _logger.exception(f"Profilage: échantillon {values['name']} non enregistré")
+    finally:
+        thread.query_count, thread.query_time = query_count, query_time
+
+
+@contextmanager
+def profile_operation(env, name, record_count=0):
+    """Mesure le bloc et enregistre un échantillon si le profilage est actif"""
+    params = env['ir.config_parameter'].sudo()
+    if not params.get_param('iseb_monitoring.profiling'):
+        yield
+        return
+    threshold = float(params.get_param('iseb_monitoring.profiling_threshold_ms', '2000'))
+
+    thread = threading.current_thread()
+    if not hasattr(thread, 'query_count'):
+        # Threads hors requête HTTP (crons, workers) : le curseur ne compte que si l'attribut existe
+        thread.query_count = 0
+        thread.query_time = 0
+    depth = getattr(_local, 'depth', 0)
+    if not depth:
+        _local.records_fetched = 0
+    _local.depth = depth + 1
+
+    capture = None
+    if name in _armed and not getattr(_local, 'capturing', False):
+        _armed.discard(name)
+        try:
+            capture = _start_capture()
+            _local.capturing = True
+        except ValueError:
+            # Un autre profileur est déjà actif dans le processus (cProfile est global depuis Python 3.12)
+            _armed.add(name)
+
+    fetched_start = _local.records_fetched
+    query_count, query_time = thread.query_count, thread.query_time
+    rss_start = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except Exception as e:
+        error = type(e).__name__
+        raise
+    finally:
+        duration = (time.perf_counter() - start) * 1000
+        rss_end = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        _local.depth = depth
+        values = {
+            'name': name,
+            'record_count': record_count,
+            'duration': duration,
+            'query_count': thread.query_count - query_count,
+            'query_time': (thread.query_time - query_time) * 1000,
+            'records_fetched': _local.records_fetched - fetched_start,
+            'memory_growth': rss_end - rss_start,
+            'memory_peak': rss_end // 1024,
+            'slow': duration >= threshold,
+            'error': error,
+        }
+        if capture:
+            _local.capturing = False
+            values['profiler'] = capture[0]
+            values['profile'] = _stop_capture(*capture)
+        elif values['slow']:
+            _armed.add(name)
+        _record(env, values)
+
+
+def profiled(name=None):
+    """Décorateur de méthode de modèle : profile_operation sous « modèle.méthode »"""
+    def decorator(method):
+        operation = name or method.__name__
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with profile_operation(self.env, f'{self._name}.{operation}', len(self)):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
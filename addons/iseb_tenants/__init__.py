@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+
+import logging
+
+from odoo.tools import config
+
+from . import tenant_registry
+
+_logger = logging.getLogger(__name__)
+
+
+def post_load():
+    """Liste des bases depuis le registre des tenants quand `tenants_file` est configuré
+
+    La liste de pg_database ne couvre que le serveur du hub : les bases des
+    autres serveurs ne seraient ni sélectionnables (db_filter) ni listées.
+    """
+    path = config.get('tenants_file')
+    if not path:
+        return
+
+    from odoo.exceptions import AccessDenied
+    from odoo.service import db
+
+    def list_dbs(force=False):
+        if not config['list_db'] and not force:
+            raise AccessDenied()
+        return tenant_registry.load_cached(path).databases()
+
+    db.list_dbs = list_dbs
+    _logger.info(f"Bases servies depuis le registre des tenants {path}")
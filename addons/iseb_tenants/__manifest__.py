@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+{
+    'name': 'Tenants - ISEB',
+    'version': '17.0.1.0.0',
+    'category': 'Hidden/Tools',
+    'summary': 'Bases clientes réparties sur plusieurs serveurs PostgreSQL via PgBouncer',
+    'description': """
+Tenants - ISEB Platform
+=======================
+
+Module serveur (server_wide_modules) : Odoo liste les bases clientes depuis le
+registre des tenants (option tenants_file) et non depuis pg_database, pour que
+les bases réparties sur plusieurs serveurs PostgreSQL derrière PgBouncer soient
+toutes servies.
+
+Fonctionnalités principales
+----------------------------
+* Registre des bases iseb_* : serveur, pool PgBouncer, plafond de connexions, état
+* Génération de pgbouncer.ini et contrôle des budgets de connexions par serveur
+* Ajout d'une base et migration d'une base vers un autre serveur (scripts/tenants.py)
+* Répartition stable des crons des bases entre les workers (ISEB_CRON_SHARD)
+
+Auteur
+------
+ISEB Dev Team
+
+License
+-------
+AGPL-3
+    """,
+    'author': 'ISEB',
+    'website': 'https://www.iseb-accounting.fr',
+    'license': 'AGPL-3',
+    'depends': [
+        'base',
+    ],
+    'data': [],
+    'post_load': 'post_load',
+    'installable': True,
+    'application': False,
+    'auto_install': False,
+}
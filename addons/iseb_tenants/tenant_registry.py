@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+Registre des bases clientes (tenants) et de leurs serveurs PostgreSQL
+
+Fichier INI (voir config/tenants.conf.example) :
+
+    [pgbouncer]        paramètres recopiés dans la section [pgbouncer] de pgbouncer.ini
+    [defaults]         pool_size, max_connections des bases ; hub_pool_size
+    [host pg1]         address, port, max_connections (budget de connexions des
+                       bases de ce serveur), hub = true sur un seul serveur,
+                       admin_address / admin_port pour les outils d'exploitation
+    [tenant iseb_x]    host, pool_size, max_connections, state (active / disabled),
+                       cron_shard (facultatif)
+
+Odoo se connecte à PgBouncer, qui route chaque base iseb_* vers son serveur
+avec ses limites : ajouter un serveur ou y déplacer une base ne change que
+ce fichier. Le hub porte la base postgres (bus et réveil des crons par
+LISTEN / NOTIFY, en mode session).
+
+Sans dépendance Odoo : utilisé par le hook post_load d'iseb_tenants, par
+scripts/tenants.py, et par l'entrypoint du conteneur Odoo :
+
+    python3 tenant_registry.py /etc/iseb/tenants.conf cron-databases 2/3
+"""
+
+import configparser
+import os
+import re
+import sys
+import zlib
+
+TENANT_PATTERN = re.compile(r'^iseb_[a-z0-9_]+$')
+
+STATES = ('active', 'disabled')
+
+DEFAULTS = {
+    'pool_size': 4,
+    'max_connections': 10,
+    'hub_pool_size': 20,
+}
+
+
+class RegistryError(Exception):
+    pass
+
+
+class Host:
+
+    def __init__(self, name, section):
+        self.name = name
+        self.address = section.get('address', name)
+        self.port = section.getint('port', 5432)
+        self.max_connections = section.getint('max_connections', 90)
+        self.hub = section.getboolean('hub', False)
+        self.admin_address = section.get('admin_address', self.address)
+        self.admin_port = section.getint('admin_port', self.port)
+
+
+class Tenant:
+
+    def __init__(self, name, section, defaults):
+        self.name = name
+        self.host = section.get('host')
+        self.pool_size = section.getint('pool_size', defaults['pool_size'])
+        self.max_connections = section.getint('max_connections', defaults['max_connections'])
+        self.state = section.get('state', 'active')
+        self.cron_shard = section.getint('cron_shard', 0)
+
+    @property
+    def active(self):
+        return self.state == 'active'
+
+
+class TenantRegistry:
+
+    def __init__(self, path):
+        self.path = path
+        parser = configparser.ConfigParser(inline_comment_prefixes=(';', '#'))
+        try:
+            with open(path, encoding='utf-8') as handle:
+                parser.read_file(handle)
+        except (OSError, configparser.Error) as e:
+            raise RegistryError(f"Registre des tenants illisible ({path}) : {e}")
+
+        self.pgbouncer = dict(parser['pgbouncer']) if parser.has_section('pgbouncer') else {}
+        self.defaults = dict(DEFAULTS)
+        if parser.has_section('defaults'):
+            for key in DEFAULTS:
+                self.defaults[key] = parser['defaults'].getint(key, DEFAULTS[key])
+
+        self.hosts = {}
+        self.tenants = {}
+        for section in parser.sections():
+            kind, _sep, name = section.partition(' ')
+            if kind == 'host' and name:
+                self.hosts[name] = Host(name, parser[section])
+            elif kind == 'tenant' and name:
+                self.tenants[name] = Tenant(name, parser[section], self.defaults)
+
+    @property
+    def hub(self):
+        hubs = [host for host in self.hosts.values() if host.hub]
+        return hubs[0] if hubs else next(iter(self.hosts.values()), None)
+
+    def databases(self):
+        """Bases actives, triées"""
+        return sorted(name for name, tenant in self.tenants.items() if tenant.active)
+
+    def usage(self, host_name):
+        """Connexions réservées sur un serveur : bases actives (max_connections) et hub"""
+        used = sum(
+            tenant.max_connections for tenant in self.tenants.values()
+            if tenant.host == host_name and tenant.active
+        )
+        if self.hub and self.hub.name == host_name:
+            used += self.defaults['hub_pool_size']
+        return used
+
+    def check(self):
+        """Erreurs du registre (liste vide si utilisable)"""
+        errors = []
+        if not self.hosts:
+            errors.append("aucun serveur [host ...] déclaré")
+        if len([host for host in self.hosts.values() if host.hub]) > 1:
+            errors.append("plusieurs serveurs ont hub = true")
+        for name, tenant in sorted(self.tenants.items()):
+            if not TENANT_PATTERN.match(name):
+                errors.append(f"{name} : le nom doit correspondre à {TENANT_PATTERN.pattern} (db_filter)")
+            if tenant.host not in self.hosts:
+                errors.append(f"{name} : serveur inconnu {tenant.host!r}")
+            if tenant.state not in STATES:
+                errors.append(f"{name} : état inconnu {tenant.state!r} ({', '.join(STATES)})")
+            if tenant.pool_size > tenant.max_connections:
+                errors.append(f"{name} : pool_size ({tenant.pool_size}) supérieur à max_connections ({tenant.max_connections})")
+        for name, host in sorted(self.hosts.items()):
+            used = self.usage(name)
+            if used > host.max_connections:
+                errors.append(f"{name} : {used} connexions réservées pour un budget de {host.max_connections}")
+        return errors
+
+    def cron_shard(self, tenant, shards):
+        """Shard (1 à `shards`) des crons d'une base : cron_shard du registre, sinon stable par nom"""
+        if tenant.cron_shard:
+            return (tenant.cron_shard - 1) % shards + 1
+        return zlib.crc32(tenant.name.encode()) % shards + 1
+
+    def cron_databases(self, shard, shards):
+        """Bases actives dont les crons sont exécutés par le worker `shard` sur `shards`"""
+        return [
+            name for name in self.databases()
+            if self.cron_shard(self.tenants[name], shards) == shard
+        ]
+
+    def render_pgbouncer(self):
+        """pgbouncer.ini : une entrée par base active vers son serveur, la base postgres vers le hub"""
+        hub = self.hub
+        hub_pool_size = self.defaults['hub_pool_size']
+        lines = [
+            f";; Généré par scripts/tenants.py depuis {os.path.basename(self.path)} : ne pas modifier",
+            "[databases]",
+            f"postgres = host={hub.address} port={hub.port} dbname=postgres pool_mode=session "
+            f"pool_size={hub_pool_size} max_db_connections={hub_pool_size}",
+        ]
+        for name in self.databases():
+            tenant = self.tenants[name]
+            host = self.hosts[tenant.host]
+            lines.append(
+                f"{name} = host={host.address} port={host.port} dbname={name} "
+                f"pool_size={tenant.pool_size} max_db_connections={tenant.max_connections}"
+            )
+        lines += ["", "[pgbouncer]"]
+        lines += [f"{key} = {value}" for key, value in self.pgbouncer.items()]
+        return '\n'.join(lines) + '\n'
+
+
+_cache = {}
+
+
+def load_cached(path):
+    """Registre relu si le fichier a changé ; le dernier registre valide si la relecture échoue"""
+    mtime = os.stat(path).st_mtime
+    cached = _cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    try:
+        registry = TenantRegistry(path)
+    except RegistryError:
+        if cached:
+            return cached[1]
+        raise
+    _cache[path] = (mtime, registry)
+    return registry
+
+
+def main(argv):
+    """Requêtes en lecture seule pour les conteneurs : databases, cron-databases N/TOTAL"""
+    if len(argv) < 2 or argv[1] not in ('databases', 'cron-databases'):
+        sys.exit("usage: tenant_registry.py FICHIER databases | cron-databases N/TOTAL")
+    registry = TenantRegistry(argv[0])
+    if argv[1] == 'databases':
+        print(','.join(registry.databases()))
+        return
+    shard, _sep, shards = argv[2].partition('/')
+    print(','.join(registry.cron_databases(int(shard), int(shards))))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+Opérations mesurées
+
+Chaque cas prépare ses données (non mesuré), puis exécute l'opération sur
+un cache ORM vide. Le runner annule la transaction après chaque exécution :
+toutes les répétitions partent du même état.
+"""
+
+import datetime
+from collections import namedtuple
+
+# setup(env, context) -> état ; run(env, état) -> {compteur: valeur} pour les débits
+Case = namedtuple('Case', ['name', 'description', 'setup', 'run'])
+
+
+def _year_bounds(context):
+    year = context['year']
+    return datetime.date(year, 1, 1), datetime.date(year, 12, 31)
+
+
+def _fec_export(env, context):
+    date_from, date_to = _year_bounds(context)
+    return env['fec.export'].create({
+        'name': 'Benchmark',
+        'company_id': context['company'].id,
+        'date_from': date_from,
+        'date_to': date_to,
+    })
+
+
+def _top_customers(env, context):
+    """Clients les plus facturés de la société (dashboards les plus lourds)"""
+    env.cr.execute("""
+        SELECT partner_id
+          FROM account_move
+         WHERE company_id = %s AND move_type IN ('out_invoice', 'out_refund') AND state = 'posted'
+         GROUP BY partner_id
+         ORDER BY COUNT(*) DESC, partner_id
+         LIMIT %s
+    """, [context['company'].id, context['dashboards']])
+    return [row[0] for row in env.cr.fetchall()]
+
+
+def _dashboard_values(env, context):
+    year = context['year']
+    return [{
+        'partner_id': partner_id,
+        'company_id': context['company'].id,
+        'period_start': datetime.date(year, 12, 1),
+        'period_end': datetime.date(year, 12, 31),
+    } for partner_id in _top_customers(env, context)]
+
+
+# FEC ---------------------------------------------------------------------
+
+def setup_fec_export(env, context):
+    return _fec_export(env, context)
+
+
+def run_fec_export(env, export):
+    export.action_generate_fec()
+    return {'lines': export.line_count, 'moves': export.move_count}
+
+
+def setup_fec_compliance_check(env, context):
+    export = _fec_export(env, context)
+    return export, export._get_account_moves()
+
+
+def run_fec_compliance_check(env, state):
+    export, moves = state
+    export._check_moves_compliance(moves)
+    return {'moves': len(moves)}
+
+
+def setup_fec_compliance_summary(env, context):
+    return (context['company'].id,) + _year_bounds(context)
+
+
+def run_fec_compliance_summary(env, arguments):
+    env['account.move'].get_fec_compliance_summary(*arguments)
+    return {}
+
+
+def setup_fec_compliance_fill(env, context):
+    env.cr.execute("SELECT COUNT(*) FROM account_move")
+    return env.cr.fetchone()[0]
+
+
+def run_fec_compliance_fill(env, move_count):
+    env['account.move']._fill_fec_compliance()
+    return {'moves': move_count}
+
+
+# TVA ---------------------------------------------------------------------
+
+def setup_tva_ca3(env, context):
+    year = context['year']
+    return env['tva.declaration'].create({
+        'name': 'Benchmark CA3',
+        'company_id': context['company'].id,
+        'declaration_type': 'ca3',
+        'period_type': 'monthly',
+        'period_start': datetime.date(year, 6, 1),
+        'period_end': datetime.date(year, 6, 30),
+    })
+
+
+def setup_tva_ca12(env, context):
+    date_from, date_to = _year_bounds(context)
+    return env['tva.declaration'].create({
+        'name': 'Benchmark CA12',
+        'company_id': context['company'].id,
+        'regime_tva': 'reel_simplifie',
+        'declaration_type': 'ca12',
+        'period_type': 'annual',
+        'period_start': date_from,
+        'period_end': date_to,
+    })
+
+
+def run_tva(env, declaration):
+    declaration.action_compute_tva()
+    return {}
+
+
+# Dashboards --------------------------------------------------------------
+
+def setup_dashboard_compute(env, context):
+    return _dashboard_values(env, context)
+
+
+def run_dashboard_compute(env, values):
+    dashboards = env['client.dashboard'].create(values)
+    env.flush_all()
+    return {'dashboards': len(dashboards)}
+
+
+def setup_dashboard_refresh(env, context):
+    dashboards = env['client.dashboard'].create(_dashboard_values(env, context))
+    env.flush_all()
+    return dashboards
+
+
+def run_dashboard_refresh(env, dashboards):
+    for dashboard in dashboards:
+        dashboard.action_refresh_dashboard()
+    env.flush_all()
+    return {'dashboards': len(dashboards)}
+
+
+CASES = [
+    Case('fec_export', "Génération du FEC de l'exercice", setup_fec_export, run_fec_export),
+    Case('fec_compliance_check', "Contrôle de conformité avant export FEC",
+         setup_fec_compliance_check, run_fec_compliance_check),
+    Case('fec_compliance_summary', "Synthèse des anomalies FEC de l'exercice",
+         setup_fec_compliance_summary, run_fec_compliance_summary),
+    Case('fec_compliance_fill', "Recalcul SQL de la conformité de toutes les écritures",
+         setup_fec_compliance_fill, run_fec_compliance_fill),
+    Case('tva_ca3', "Calcul d'une déclaration CA3 mensuelle", setup_tva_ca3, run_tva),
+    Case('tva_ca12', "Calcul d'une déclaration CA12 annuelle", setup_tva_ca12, run_tva),
+    Case('dashboard_compute', "Création et calcul des dashboards des principaux clients",
+         setup_dashboard_compute, run_dashboard_compute),
+    Case('dashboard_refresh', "Rafraîchissement des dashboards des principaux clients",
+         setup_dashboard_refresh, run_dashboard_refresh),
+]
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Compare deux fichiers de résultats (référence puis candidat)
+
+    python -m benchmarks.compare results/base.json results/head.json --threshold 10
+
+Code de sortie 1 si un cas ralentit de plus de `threshold` % (médianes) ou
+si une requête fréquente n'utilise plus son index (index_checks).
+Sans dépendance à Odoo.
+"""
+
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path, encoding='utf-8') as handle:
+        return json.load(handle)
+
+
+def delta(base, head):
+    return (head - base) / base * 100 if base else 0.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('base')
+    parser.add_argument('head')
+    parser.add_argument('--threshold', type=float, default=10.0, help="Ralentissement toléré en %%")
+    args = parser.parse_args(argv)
+
+    base, head = load(args.base), load(args.head)
+    if base['dataset'].get('options') != head['dataset'].get('options'):
+        print("Attention : jeux de données différents, comparaison non significative", file=sys.stderr)
+
+    print(f"{(base['git']['commit'] or '?')[:10]} -> {(head['git']['commit'] or '?')[:10]}")
+    print(f"{'cas':<26} {'référence':>11} {'candidat':>11} {'écart':>8} {'requêtes':>17}")
+    regressions = []
+    for name, result in head['results'].items():
+        reference = base['results'].get(name)
+        if not reference or 'error' in reference or 'error' in result:
+            status = result.get('error') or (reference or {}).get('error') or 'absent de la référence'
+            print(f"{name:<26} {status}")
+            continue
+        change = delta(reference['median'], result['median'])
+        queries = f"{reference['queries']} -> {result['queries']}"
+        print(f"{name:<26} {reference['median']:>10.3f}s {result['median']:>10.3f}s {change:>+7.1f}% {queries:>17}")
+        if change > args.threshold:
+            regressions.append(name)
+
+    for check in head.get('index_checks', []):
+        if not check['ok']:
+            print(f"{check['query']:<26} index {check['index']} non utilisé ({', '.join(check['used']) or 'aucun index'})")
+            regressions.append(check['query'])
+
+    if regressions:
+        print(f"Régressions au-delà de {args.threshold:g} % : {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+Vérifie par EXPLAIN que les requêtes ISEB fréquentes utilisent leurs index
+
+    python -m benchmarks.explain -c bench.conf -d bench [--company 1] [--year 2024]
+
+Requêtes et index attendus : french_accounting/indexes.py. Code de sortie 1
+si une requête n'utilise pas son index.
+"""
+
+import argparse
+import datetime
+import sys
+
+
+def check_indexes(registry, company_id=None, year=None):
+    """Résultats de check_hot_queries pour une société (la première ayant des écritures par défaut)"""
+    from odoo import api, SUPERUSER_ID
+    from odoo.addons.french_accounting.indexes import check_hot_queries
+
+    with registry.cursor() as cr:
+        env = api.Environment(cr, SUPERUSER_ID, {})
+        if not company_id:
+            cr.execute("SELECT company_id FROM account_move WHERE state = 'posted' ORDER BY id LIMIT 1")
+            row = cr.fetchone()
+            company_id = row[0] if row else env.ref('base.main_company').id
+        cr.execute("""
+            SELECT partner_id FROM account_move
+             WHERE company_id = %s AND partner_id IS NOT NULL AND state = 'posted'
+             GROUP BY partner_id ORDER BY COUNT(*) DESC, partner_id LIMIT 1
+        """, [company_id])
+        row = cr.fetchone()
+        partner = env['res.partner'].browse(row[0]) if row else env['res.company'].browse(company_id).partner_id
+        year = year or datetime.date.today().year
+        return check_hot_queries(
+            env, env['res.company'].browse(company_id), partner,
+            datetime.date(year, 1, 1), datetime.date(year, 12, 31),
+        )
+
+
+def main(argv=None):
+    from .run import open_registry
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('-c', '--config', help="Fichier de configuration Odoo")
+    parser.add_argument('-d', '--database', required=True)
+    parser.add_argument('--company', type=int, help="Société (id)")
+    parser.add_argument('--year', type=int, help="Exercice des requêtes (année en cours par défaut)")
+    args = parser.parse_args(argv)
+
+    results = check_indexes(open_registry(args.config, args.database), args.company, args.year)
+    for result in results:
+        status = 'ok' if result['ok'] else 'ÉCHEC'
+        print(f"{status:<6} {result['query']:<24} {result['index']:<44} utilisés : {', '.join(result['used']) or '-'}")
+    return 0 if all(result['ok'] for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
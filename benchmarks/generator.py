@@ -0,0 +1,630 @@
+# -*- coding: utf-8 -*-
+"""
+Générateur déterministe d'un grand livre français synthétique
+
+Deux étapes par société :
+
+1. Modèle, par l'ORM : extrait du PCG, journaux à codes de 3 caractères au
+   plus, taxes 20 / 10 / 5,5 / 2,1 %, clients et fournisseurs, factures et
+   avoirs (10 % en USD), règlements bancaires lettrés totalement ou
+   partiellement (avec écarts de change), paies et frais bancaires. Les
+   écritures passent par la validation standard : tous les champs calculés
+   sont cohérents.
+2. Volume, en SQL : le modèle est dupliqué jusqu'au nombre de lignes demandé
+   (INSERT ... SELECT). Chaque copie renumérote les écritures dans leur
+   séquence, fait tourner les partenaires et recâble lettrages, taxes et
+   écarts de change vers ses propres lignes.
+
+Le même germe produit les mêmes écritures : les mesures sont comparables
+d'un commit à l'autre.
+"""
+
+import datetime
+import json
+import logging
+import math
+import random
+
+from odoo import Command
+
+from .pcg import ACCOUNTS, JOURNALS, TAX_RATES, SALE_ACCOUNTS, PURCHASE_ACCOUNTS
+
+_logger = logging.getLogger(__name__)
+
+DATASET_PARAM = 'benchmarks.dataset'
+
+# Lignes insérées par requête de duplication
+CLONE_BATCH_LINES = 1000000
+
+# Colonnes d'écriture remises à zéro dans les copies
+MOVE_RESET_COLUMNS = [
+    'fec_match_hash', 'fec_export_date', 'access_token', 'message_main_attachment_id',
+    'reversed_entry_id', 'auto_post_origin_id', 'tax_cash_basis_origin_move_id', 'statement_line_id',
+    'payment_id', 'liasse_fiscale_id',
+]
+LINE_RESET_COLUMNS = ['statement_line_id', 'payment_id', 'reconcile_model_id']
+
+# Tables de liaison des lignes d'écriture (taxes, grilles de taxes)
+LINE_RELATIONS = ['account_move_line_account_tax_rel', 'account_account_tag_account_move_line_rel']
+
+
+class LedgerGenerator:
+    """Jeu de données de benchmark : `companies` sociétés, `lines` lignes au total"""
+
+    def __init__(self, env, seed=42, companies=1, lines=10000, year=2024, years=2,
+                 invoices=1500, customers=200, suppliers=60):
+        self.env = env
+        self.seed = seed
+        self.company_count = companies
+        self.lines = lines
+        self.year = year
+        self.years = years
+        self.invoices = invoices
+        self.customers = customers
+        self.suppliers = suppliers
+        self.date_from = datetime.date(year - years + 1, 1, 1)
+        self.date_to = datetime.date(year, 12, 31)
+
+    def generate(self):
+        """Crée le jeu de données et retourne sa description (enregistrée en paramètre système)"""
+        cr = self.env.cr
+        cr.execute("SET synchronous_commit TO off")
+        usd = self.env.ref('base.USD')
+        usd.active = True
+
+        companies = self.env['res.company']
+        target = math.ceil(self.lines / self.company_count)
+        template_lines = 0
+        copies = 0
+        for index in range(self.company_count):
+            rng = random.Random(f'{self.seed}-{index}')
+            company = self._create_company(index)
+            self._create_template(company, usd, rng)
+            cr.commit()
+
+            cr.execute("SELECT COUNT(*) FROM account_move_line WHERE company_id = %s", [company.id])
+            company_lines = cr.fetchone()[0]
+            company_copies = max(0, math.ceil(target / company_lines) - 1)
+            _logger.info(f"Benchmark: {company.name} - modèle de {company_lines} lignes, {company_copies} copies")
+            self._clone(company, company_copies)
+            cr.commit()
+
+            companies |= company
+            template_lines += company_lines
+            copies = max(copies, company_copies)
+
+        self.env['account.move']._fill_fec_match_hash()
+        cr.execute("ANALYZE account_move, account_move_line, account_partial_reconcile, account_full_reconcile")
+        cr.execute("SELECT COUNT(*) FROM account_move WHERE company_id = ANY(%s)", [companies.ids])
+        move_count = cr.fetchone()[0]
+        cr.execute("SELECT COUNT(*) FROM account_move_line WHERE company_id = ANY(%s)", [companies.ids])
+        line_count = cr.fetchone()[0]
+
+        dataset = {
+            'seed': self.seed,
+            'company_ids': companies.ids,
+            'year': self.year,
+            'years': self.years,
+            'invoices_per_company': self.invoices,
+            'customers': self.customers,
+            'suppliers': self.suppliers,
+            'template_lines': template_lines,
+            'copies': copies,
+            'moves': move_count,
+            'lines': line_count,
+        }
+        self.env['ir.config_parameter'].set_param(DATASET_PARAM, json.dumps(dataset))
+        self.env.invalidate_all()
+        cr.commit()
+        _logger.info(f"Benchmark: {line_count} lignes, {move_count} écritures, {len(companies)} sociétés")
+        return dataset
+
+    # ------------------------------------------------------------------
+    # Société : plan comptable, journaux, taxes, partenaires
+    # ------------------------------------------------------------------
+
+    def _create_company(self, index):
+        france = self.env.ref('base.fr')
+        company = self.env['res.company'].create({
+            'name': f'Benchmark {index + 1:03d}',
+            'currency_id': self.env.ref('base.EUR').id,
+            'country_id': france.id,
+        })
+        self.env.user.company_ids |= company
+        env = self.env(context=dict(self.env.context, allowed_company_ids=[company.id]))
+
+        self.accounts = {
+            account.code: account
+            for account in env['account.account'].create([{
+                'code': code,
+                'name': name,
+                'account_type': account_type,
+                'reconcile': reconcile,
+                'company_id': company.id,
+            } for code, name, account_type, reconcile in ACCOUNTS])
+        }
+
+        journal_defaults = {
+            'sale': self.accounts['706000'],
+            'purchase': self.accounts['607000'],
+            'bank': self.accounts['512000'],
+            'general': self.env['account.account'],
+        }
+        self.journals = {}
+        for code, name, journal_type in JOURNALS:
+            values = {
+                'code': code,
+                'name': name,
+                'type': journal_type,
+                'company_id': company.id,
+                'default_account_id': journal_defaults[journal_type].id,
+            }
+            if journal_type == 'bank':
+                values['suspense_account_id'] = self.accounts['471000'].id
+            self.journals[journal_type] = env['account.journal'].create(values)
+
+        company.write({
+            'account_journal_suspense_account_id': self.accounts['471000'].id,
+            'transfer_account_id': self.accounts['580000'].id,
+            'currency_exchange_journal_id': self.journals['general'].id,
+            'income_currency_exchange_account_id': self.accounts['766000'].id,
+            'expense_currency_exchange_account_id': self.accounts['666000'].id,
+        })
+        Property = env['ir.property']
+        Property._set_default('property_account_receivable_id', 'res.partner', self.accounts['411000'], company)
+        Property._set_default('property_account_payable_id', 'res.partner', self.accounts['401000'], company)
+
+        group = env['account.tax.group'].create({'name': 'TVA', 'company_id': company.id, 'country_id': france.id})
+        self.taxes = {}
+        for rate, collected, deductible in TAX_RATES:
+            for use, account_code, label in (('sale', collected, 'collectée'), ('purchase', deductible, 'déductible')):
+                self.taxes[use, rate] = env['account.tax'].create({
+                    'name': f'TVA {label} {rate:g} %',
+                    'amount': rate,
+                    'amount_type': 'percent',
+                    'type_tax_use': use,
+                    'company_id': company.id,
+                    'country_id': france.id,
+                    'tax_group_id': group.id,
+                    'invoice_repartition_line_ids': self._tax_repartition(account_code),
+                    'refund_repartition_line_ids': self._tax_repartition(account_code),
+                })
+
+        Partner = env['res.partner']
+        self.customer_ids = Partner.create([{
+            'name': f'Client {index + 1:03d}-{number:05d}',
+            'ref': f'C{number:05d}',
+            'is_company': True,
+            'company_id': company.id,
+            'country_id': france.id,
+        } for number in range(1, self.customers + 1)]).ids
+        self.supplier_ids = Partner.create([{
+            'name': f'Fournisseur {index + 1:03d}-{number:05d}',
+            'ref': f'F{number:05d}',
+            'is_company': True,
+            'company_id': company.id,
+            'country_id': france.id,
+        } for number in range(1, self.suppliers + 1)]).ids
+        return company
+
+    def _tax_repartition(self, account_code):
+        return [
+            Command.create({'repartition_type': 'base'}),
+            Command.create({'repartition_type': 'tax', 'account_id': self.accounts[account_code].id}),
+        ]
+
+    # ------------------------------------------------------------------
+    # Modèle : écritures créées et validées par l'ORM
+    # ------------------------------------------------------------------
+
+    def _create_template(self, company, usd, rng):
+        Move = self.env['account.move'].with_company(company)
+        self._create_rates(company, usd, rng)
+
+        invoice_values = sorted(
+            (self._invoice_values(usd, rng) for _index in range(self.invoices)),
+            key=lambda values: values['invoice_date'],
+        )
+        invoices = Move.browse()
+        for start in range(0, len(invoice_values), 200):
+            batch = Move.create(invoice_values[start:start + 200])
+            batch.sorted(lambda move: (move.date, move.id))._post(soft=False)
+            invoices |= batch
+        _logger.info(f"Benchmark: {company.name} - {len(invoices)} factures")
+
+        self._create_payments(Move, invoices, usd, rng)
+        self._create_payroll(Move, rng)
+        # Libellés de ligne obligatoires en FEC : une ligne générée sans
+        # libellé prend le numéro de pièce
+        self.env.flush_all()
+        self.env.cr.execute("""
+            UPDATE account_move_line
+               SET name = move_name
+             WHERE company_id = %s AND (name IS NULL OR name = '')
+         RETURNING move_id
+        """, [company.id])
+        moves = Move.browse({row[0] for row in self.env.cr.fetchall()})
+        self.env.invalidate_all()
+        moves._compute_fec_compliance()
+        moves.flush_recordset()
+
+    def _create_rates(self, company, usd, rng):
+        rate = 1.08
+        values = []
+        month = self.date_from
+        while month <= self.date_to:
+            rate = round(rate * (1 + rng.uniform(-0.02, 0.02)), 6)
+            values.append({'name': month, 'rate': rate, 'currency_id': usd.id, 'company_id': company.id})
+            month = (month + datetime.timedelta(days=32)).replace(day=1)
+        self.env['res.currency.rate'].create(values)
+
+    def _random_date(self, rng):
+        return self.date_from + datetime.timedelta(days=rng.randrange((self.date_to - self.date_from).days + 1))
+
+    def _invoice_values(self, usd, rng):
+        draw = rng.random()
+        if draw < 0.62:
+            move_type, use = 'out_invoice', 'sale'
+        elif draw < 0.67:
+            move_type, use = 'out_refund', 'sale'
+        elif draw < 0.96:
+            move_type, use = 'in_invoice', 'purchase'
+        else:
+            move_type, use = 'in_refund', 'purchase'
+        sale = use == 'sale'
+        partner_id = rng.choice(self.customer_ids if sale else self.supplier_ids)
+        accounts = SALE_ACCOUNTS if sale else PURCHASE_ACCOUNTS
+        date = self._random_date(rng)
+        number = rng.randrange(100000, 999999)
+
+        lines = []
+        for _index in range(rng.choices([1, 2, 3, 4], weights=[5, 3, 2, 1])[0]):
+            account_code = rng.choices([code for code, _weight in accounts], weights=[w for _code, w in accounts])[0]
+            rate = rng.choices([20.0, 10.0, 5.5, 2.1], weights=[14, 3, 2, 1])[0]
+            lines.append(Command.create({
+                'name': f"{self.accounts[account_code].name} - réf. {rng.randrange(1000, 9999)}",
+                'account_id': self.accounts[account_code].id,
+                'quantity': rng.randint(1, 10),
+                'price_unit': round(min(rng.lognormvariate(5.5, 1.1), 20000.0), 2),
+                'tax_ids': [Command.set([self.taxes[use, rate].id])],
+            }))
+
+        return {
+            'move_type': move_type,
+            'journal_id': self.journals[use].id,
+            'partner_id': partner_id,
+            'invoice_date': date,
+            'date': date,
+            'invoice_date_due': date + datetime.timedelta(days=rng.choice([0, 30, 30, 45, 60])),
+            'currency_id': usd.id if rng.random() < 0.1 else self.env.ref('base.EUR').id,
+            'ref': f"{'CMD' if sale else 'FAC'}-{number}",
+            'payment_reference': f"{'CMD' if sale else 'FAC'}-{number}",
+            'invoice_line_ids': lines,
+        }
+
+    def _create_payments(self, Move, invoices, usd, rng):
+        """Règlements bancaires lettrés : 80 % des pièces, dont un sur dix partiel"""
+        pairs = []
+        for invoice in invoices:
+            if rng.random() >= 0.8:
+                continue
+            date = max(invoice.invoice_date_due + datetime.timedelta(days=rng.randint(-10, 40)), invoice.invoice_date)
+            if date > self.date_to:
+                continue
+            term_line = invoice.line_ids.filtered(lambda l: l.display_type == 'payment_term')[:1]
+            fraction = 0.5 if rng.random() < 0.1 else 1.0
+            # Contrepartie de l'échéance : montant de signe opposé, converti au cours du règlement
+            amount_currency = invoice.currency_id.round(-term_line.amount_currency * fraction)
+            if invoice.currency_id == usd:
+                balance = invoice.company_id.currency_id.round(
+                    usd._convert(amount_currency, invoice.company_id.currency_id, invoice.company_id, date)
+                )
+            else:
+                balance = amount_currency
+            label = f"Règlement {invoice.name}"
+            pairs.append((term_line, {
+                'journal_id': self.journals['bank'].id,
+                'date': date,
+                'ref': label,
+                'line_ids': [
+                    Command.create({
+                        'name': label,
+                        'account_id': self.accounts['512000'].id,
+                        'balance': -balance,
+                    }),
+                    Command.create({
+                        'name': label,
+                        'account_id': term_line.account_id.id,
+                        'partner_id': invoice.partner_id.id,
+                        'currency_id': invoice.currency_id.id,
+                        'amount_currency': amount_currency,
+                        'balance': balance,
+                    }),
+                ],
+            }))
+
+        pairs.sort(key=lambda pair: pair[1]['date'])
+        for start in range(0, len(pairs), 200):
+            batch = pairs[start:start + 200]
+            payments = Move.create([values for _line, values in batch])
+            payments._post(soft=False)
+            for (term_line, _values), payment in zip(batch, payments):
+                counterpart = payment.line_ids.filtered(lambda l: l.account_id == term_line.account_id)
+                (term_line | counterpart).reconcile()
+        _logger.info(f"Benchmark: {len(pairs)} règlements lettrés")
+
+    def _create_payroll(self, Move, rng):
+        """Paie mensuelle, règlements des salaires et de l'URSSAF, frais bancaires"""
+        employees = rng.randint(3, 25)
+        month = self.date_from
+        while month <= self.date_to:
+            end = (month + datetime.timedelta(days=32)).replace(day=1) - datetime.timedelta(days=1)
+            gross = round(employees * rng.uniform(2200, 3400), 2)
+            employee_charges = round(gross * 0.22, 2)
+            employer_charges = round(gross * 0.42, 2)
+            net = round(gross - employee_charges, 2)
+            label = f"Paie {end.strftime('%m/%Y')}"
+            payroll = Move.create({
+                'journal_id': self.journals['general'].id,
+                'date': end,
+                'ref': label,
+                'line_ids': [
+                    Command.create({'name': label, 'account_id': self.accounts['641000'].id, 'balance': gross}),
+                    Command.create({
+                        'name': label, 'account_id': self.accounts['645100'].id, 'balance': employer_charges,
+                    }),
+                    Command.create({'name': label, 'account_id': self.accounts['421000'].id, 'balance': -net}),
+                    Command.create({
+                        'name': label, 'account_id': self.accounts['431000'].id,
+                        'balance': -(employee_charges + employer_charges),
+                    }),
+                ],
+            })
+            fees = round(rng.uniform(15, 120), 2)
+            settlement = Move.create([{
+                'journal_id': self.journals['bank'].id,
+                'date': end,
+                'ref': f"Virement salaires {end.strftime('%m/%Y')}",
+                'line_ids': [
+                    Command.create({'name': f'Salaires {label}', 'account_id': self.accounts['421000'].id, 'balance': net}),
+                    Command.create({'name': f'Salaires {label}', 'account_id': self.accounts['512000'].id, 'balance': -net}),
+                ],
+            }, {
+                'journal_id': self.journals['bank'].id,
+                'date': end,
+                'ref': f"URSSAF {end.strftime('%m/%Y')}",
+                'line_ids': [
+                    Command.create({
+                        'name': f'URSSAF {label}', 'account_id': self.accounts['431000'].id,
+                        'balance': employee_charges + employer_charges,
+                    }),
+                    Command.create({
+                        'name': f'URSSAF {label}', 'account_id': self.accounts['512000'].id,
+                        'balance': -(employee_charges + employer_charges),
+                    }),
+                ],
+            }, {
+                'journal_id': self.journals['bank'].id,
+                'date': end,
+                'ref': f"Frais bancaires {end.strftime('%m/%Y')}",
+                'line_ids': [
+                    Command.create({'name': 'Frais de tenue de compte', 'account_id': self.accounts['627000'].id, 'balance': fees}),
+                    Command.create({'name': 'Frais de tenue de compte', 'account_id': self.accounts['512000'].id, 'balance': -fees}),
+                ],
+            }])
+            (payroll | settlement)._post(soft=False)
+            for code in ('421000', '431000'):
+                (payroll | settlement).line_ids.filtered(lambda l: l.account_id.code == code).reconcile()
+            month = end + datetime.timedelta(days=1)
+
+    # ------------------------------------------------------------------
+    # Volume : duplication SQL du modèle
+    # ------------------------------------------------------------------
+
+    def _columns(self, table):
+        self.env.cr.execute("""
+            SELECT column_name
+              FROM information_schema.columns
+             WHERE table_schema = current_schema() AND table_name = %s
+             ORDER BY ordinal_position
+        """, [table])
+        return [row[0] for row in self.env.cr.fetchall()]
+
+    def _table_exists(self, table):
+        self.env.cr.execute("SELECT to_regclass(%s)", [table])
+        return self.env.cr.fetchone()[0] is not None
+
+    def _select_list(self, table, overrides, reset=()):
+        columns = self._columns(table)
+        expressions = [
+            overrides.get(column) or ('NULL' if column in reset else f't.{column}')
+            for column in columns
+        ]
+        return ', '.join(f'"{column}"' for column in columns), ', '.join(expressions)
+
+    def _prepare_maps(self, company):
+        """Tables temporaires : rang de chaque enregistrement du modèle dans sa table"""
+        cr = self.env.cr
+        cr.execute("""
+            DROP TABLE IF EXISTS bench_move, bench_line, bench_partial, bench_full, bench_partner;
+
+            CREATE TEMP TABLE bench_move AS
+            SELECT id AS src,
+                   ROW_NUMBER() OVER (ORDER BY id) AS rn,
+                   COALESCE(MAX(sequence_number) OVER (PARTITION BY journal_id, sequence_prefix), 0) AS seq_span,
+                   LENGTH(name) - LENGTH(sequence_prefix) AS width
+              FROM account_move
+             WHERE company_id = %(company_id)s;
+
+            CREATE TEMP TABLE bench_line AS
+            SELECT id AS src, ROW_NUMBER() OVER (ORDER BY id) AS rn
+              FROM account_move_line
+             WHERE company_id = %(company_id)s;
+
+            CREATE TEMP TABLE bench_partial AS
+            SELECT id AS src, ROW_NUMBER() OVER (ORDER BY id) AS rn
+              FROM account_partial_reconcile
+             WHERE company_id = %(company_id)s;
+
+            CREATE TEMP TABLE bench_full AS
+            SELECT src, ROW_NUMBER() OVER (ORDER BY src) AS rn
+              FROM (SELECT DISTINCT full_reconcile_id AS src
+                      FROM account_move_line
+                     WHERE company_id = %(company_id)s AND full_reconcile_id IS NOT NULL) fulls;
+
+            CREATE TEMP TABLE bench_partner AS
+            SELECT id,
+                   LEFT(ref, 1) AS kind,
+                   ROW_NUMBER() OVER (PARTITION BY LEFT(ref, 1) ORDER BY id) - 1 AS idx,
+                   COUNT(*) OVER (PARTITION BY LEFT(ref, 1)) AS size
+              FROM res_partner
+             WHERE id = ANY(%(partner_ids)s);
+
+            CREATE UNIQUE INDEX ON bench_move (src);
+            CREATE UNIQUE INDEX ON bench_line (src);
+            CREATE UNIQUE INDEX ON bench_partial (src);
+            CREATE UNIQUE INDEX ON bench_full (src);
+            CREATE UNIQUE INDEX ON bench_partner (id);
+            CREATE UNIQUE INDEX ON bench_partner (kind, idx);
+        """, {'company_id': company.id, 'partner_ids': self.customer_ids + self.supplier_ids})
+        counts = {}
+        for table in ('bench_move', 'bench_line', 'bench_partial', 'bench_full'):
+            cr.execute(f"SELECT COUNT(*) FROM {table}")
+            counts[table] = cr.fetchone()[0]
+        return counts
+
+    def _next_ids(self):
+        ids = {}
+        for table in ('account_move', 'account_move_line', 'account_partial_reconcile', 'account_full_reconcile'):
+            self.env.cr.execute(f"SELECT COALESCE(MAX(id), 0), pg_get_serial_sequence('{table}', 'id') FROM {table}")
+            ids[table] = self.env.cr.fetchone()
+        return ids
+
+    def _clone(self, company, copies):
+        """Duplique `copies` fois les écritures de la société, par lots d'environ CLONE_BATCH_LINES lignes"""
+        if not copies:
+            return
+        cr = self.env.cr
+        counts = self._prepare_maps(company)
+
+        # Nouvel identifiant : base + (copie - première copie du lot) x taille du modèle + rang
+        def new_id(table, count, alias):
+            return f"%({table}_base)s::integer + (c.n - %(first)s) * {count} + {alias}.rn::integer"
+
+        def remap(column, table, map_table, count):
+            return f"(SELECT {new_id(table, count, 'r')} FROM {map_table} r WHERE r.src = t.{column})"
+
+        # Numéro de pièce : la copie n décale la séquence de n fois son étendue dans le modèle
+        def move_name(alias):
+            sequence = f"({alias}.sequence_number + c.n * bm.seq_span)"
+            return (
+                f"CASE WHEN {alias}.sequence_prefix IS NULL OR {alias}.sequence_number IS NULL "
+                f"THEN {alias}.name || '-' || c.n "
+                f"ELSE {alias}.sequence_prefix || LPAD({sequence}::text, GREATEST(bm.width, LENGTH({sequence}::text)), '0') END"
+            )
+
+        # Partenaire : rotation parmi les clients (ou les fournisseurs) de la société
+        def partner(column):
+            return (
+                f"COALESCE((SELECT dp.id FROM bench_partner sp "
+                f"JOIN bench_partner dp ON dp.kind = sp.kind AND dp.idx = (sp.idx + c.n) %% sp.size "
+                f"WHERE sp.id = t.{column}), t.{column})"
+            )
+
+        moves, lines = counts['bench_move'], counts['bench_line']
+        partials, fulls = counts['bench_partial'], counts['bench_full']
+        batch = max(1, CLONE_BATCH_LINES // max(lines, 1))
+        move_columns, move_select = self._select_list('account_move', {
+            'id': new_id('account_move', moves, 'bm'),
+            'name': move_name('t'),
+            'sequence_number': "(t.sequence_number + c.n * bm.seq_span)",
+            'partner_id': partner('partner_id'),
+            'commercial_partner_id': partner('commercial_partner_id'),
+        }, MOVE_RESET_COLUMNS)
+        full_columns, full_select = self._select_list('account_full_reconcile', {
+            'id': new_id('account_full_reconcile', fulls, 'bf'),
+            'exchange_move_id': remap('exchange_move_id', 'account_move', 'bench_move', moves),
+        })
+        line_columns, line_select = self._select_list('account_move_line', {
+            'id': new_id('account_move_line', lines, 'bl'),
+            'move_id': new_id('account_move', moves, 'bm'),
+            'move_name': move_name('m'),
+            'partner_id': partner('partner_id'),
+            'full_reconcile_id': remap('full_reconcile_id', 'account_full_reconcile', 'bench_full', fulls),
+            # Lettrage : « P<id> » pour un lettrage partiel, id du lettrage complet sinon
+            'matching_number': (
+                f"CASE WHEN t.matching_number ~ '^P[0-9]+$' THEN 'P' || ("
+                f"SELECT {new_id('account_partial_reconcile', partials, 'r')} FROM bench_partial r "
+                f"WHERE r.src = SUBSTRING(t.matching_number FROM 2)::integer) "
+                f"WHEN t.matching_number ~ '^[0-9]+$' THEN ("
+                f"SELECT {new_id('account_full_reconcile', fulls, 'r')} FROM bench_full r "
+                f"WHERE r.src = t.matching_number::integer)::text "
+                f"ELSE t.matching_number END"
+            ),
+        }, LINE_RESET_COLUMNS)
+        partial_columns, partial_select = self._select_list('account_partial_reconcile', {
+            'id': new_id('account_partial_reconcile', partials, 'bp'),
+            'debit_move_id': remap('debit_move_id', 'account_move_line', 'bench_line', lines),
+            'credit_move_id': remap('credit_move_id', 'account_move_line', 'bench_line', lines),
+            'full_reconcile_id': remap('full_reconcile_id', 'account_full_reconcile', 'bench_full', fulls),
+            'exchange_move_id': remap('exchange_move_id', 'account_move', 'bench_move', moves),
+        })
+
+        statements = [
+            ('account_move', moves, f"""
+                INSERT INTO account_move ({move_columns})
+                SELECT {move_select}
+                  FROM account_move t
+                  JOIN bench_move bm ON bm.src = t.id
+                 CROSS JOIN generate_series(%(first)s, %(last)s) AS c(n)
+            """),
+            ('account_full_reconcile', fulls, f"""
+                INSERT INTO account_full_reconcile ({full_columns})
+                SELECT {full_select}
+                  FROM account_full_reconcile t
+                  JOIN bench_full bf ON bf.src = t.id
+                 CROSS JOIN generate_series(%(first)s, %(last)s) AS c(n)
+            """),
+            ('account_move_line', lines, f"""
+                INSERT INTO account_move_line ({line_columns})
+                SELECT {line_select}
+                  FROM account_move_line t
+                  JOIN bench_line bl ON bl.src = t.id
+                  JOIN account_move m ON m.id = t.move_id
+                  JOIN bench_move bm ON bm.src = t.move_id
+                 CROSS JOIN generate_series(%(first)s, %(last)s) AS c(n)
+            """),
+            ('account_partial_reconcile', partials, f"""
+                INSERT INTO account_partial_reconcile ({partial_columns})
+                SELECT {partial_select}
+                  FROM account_partial_reconcile t
+                  JOIN bench_partial bp ON bp.src = t.id
+                 CROSS JOIN generate_series(%(first)s, %(last)s) AS c(n)
+            """),
+        ]
+        relations = [
+            (relation, [column for column in self._columns(relation) if column != 'account_move_line_id'][0])
+            for relation in LINE_RELATIONS if self._table_exists(relation)
+        ]
+
+        for first in range(1, copies + 1, batch):
+            last = min(first + batch - 1, copies)
+            ids = self._next_ids()
+            params = {'first': first, 'last': last}
+            params.update({f'{table}_base': base for table, (base, _sequence) in ids.items()})
+            for table, count, query in statements:
+                cr.execute(query, params)
+                base, sequence_name = ids[table]
+                cr.execute("SELECT setval(%s, %s)", [sequence_name, max(base + (last - first + 1) * count, 1)])
+            for relation, other in relations:
+                cr.execute(f"""
+                    INSERT INTO {relation} (account_move_line_id, {other})
+                    SELECT {new_id('account_move_line', lines, 'bl')}, t.{other}
+                      FROM {relation} t
+                      JOIN bench_line bl ON bl.src = t.account_move_line_id
+                     CROSS JOIN generate_series(%(first)s, %(last)s) AS c(n)
+                """, params)
+            cr.commit()
+            _logger.info(f"Benchmark: {company.name} - copies {first} à {last} sur {copies}")
+
+        cr.execute("DROP TABLE bench_move, bench_line, bench_partial, bench_full, bench_partner")
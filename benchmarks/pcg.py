@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Extrait du Plan Comptable Général utilisé par le générateur
+
+Comptes les plus mouvementés d'une PME française : (code, libellé, type de
+compte Odoo, lettrable).
+"""
+
+ACCOUNTS = [
+    # Classe 1 - Capitaux
+    ('101300', 'Capital souscrit - appelé, versé', 'equity', False),
+    ('106100', 'Réserve légale', 'equity', False),
+    ('110000', 'Report à nouveau (solde créditeur)', 'equity', False),
+    ('120000', "Résultat de l'exercice", 'equity_unaffected', False),
+    ('164000', 'Emprunts auprès des établissements de crédit', 'liability_non_current', False),
+    # Classe 2 - Immobilisations
+    ('205000', 'Concessions, brevets, licences, logiciels', 'asset_non_current', False),
+    ('215400', 'Matériel industriel', 'asset_fixed', False),
+    ('218200', 'Matériel de transport', 'asset_fixed', False),
+    ('218300', 'Matériel de bureau et matériel informatique', 'asset_fixed', False),
+    ('281830', 'Amortissements du matériel de bureau et informatique', 'asset_fixed', False),
+    # Classe 3 - Stocks
+    ('370000', 'Stocks de marchandises', 'asset_current', False),
+    # Classe 4 - Tiers
+    ('401000', 'Fournisseurs', 'liability_payable', True),
+    ('404000', "Fournisseurs d'immobilisations", 'liability_payable', True),
+    ('411000', 'Clients', 'asset_receivable', True),
+    ('421000', 'Personnel - Rémunérations dues', 'liability_current', True),
+    ('431000', 'Sécurité sociale', 'liability_current', True),
+    ('437000', 'Autres organismes sociaux', 'liability_current', True),
+    ('445510', 'TVA à décaisser', 'liability_current', False),
+    ('445620', 'TVA déductible sur immobilisations', 'asset_current', False),
+    ('445660', 'TVA déductible sur autres biens et services', 'asset_current', False),
+    ('445710', 'TVA collectée', 'liability_current', False),
+    ('455000', 'Associés - Comptes courants', 'liability_current', False),
+    ('471000', "Compte d'attente", 'asset_current', True),
+    ('486000', "Charges constatées d'avance", 'asset_prepayments', False),
+    # Classe 5 - Financiers
+    ('512000', 'Banque', 'asset_cash', False),
+    ('530000', 'Caisse', 'asset_cash', False),
+    ('580000', 'Virements internes', 'asset_current', True),
+    # Classe 6 - Charges
+    ('601000', 'Achats stockés - Matières premières', 'expense_direct_cost', False),
+    ('606100', 'Fournitures non stockables (eau, énergie)', 'expense', False),
+    ('606400', 'Fournitures administratives', 'expense', False),
+    ('607000', 'Achats de marchandises', 'expense_direct_cost', False),
+    ('613200', 'Locations immobilières', 'expense', False),
+    ('615000', 'Entretien et réparations', 'expense', False),
+    ('616000', "Primes d'assurances", 'expense', False),
+    ('622600', 'Honoraires', 'expense', False),
+    ('623000', 'Publicité, publications, relations publiques', 'expense', False),
+    ('625100', 'Voyages et déplacements', 'expense', False),
+    ('626000', 'Frais postaux et de télécommunications', 'expense', False),
+    ('627000', 'Services bancaires et assimilés', 'expense', False),
+    ('635110', 'Cotisation foncière des entreprises', 'expense', False),
+    ('641000', 'Rémunérations du personnel', 'expense', False),
+    ('645100', "Cotisations à l'URSSAF", 'expense', False),
+    ('661100', 'Intérêts des emprunts et dettes', 'expense', False),
+    ('666000', 'Pertes de change', 'expense', False),
+    ('681120', 'Dotations aux amortissements des immobilisations corporelles', 'expense_depreciation', False),
+    # Classe 7 - Produits
+    ('701000', 'Ventes de produits finis', 'income', False),
+    ('706000', 'Prestations de services', 'income', False),
+    ('707000', 'Ventes de marchandises', 'income', False),
+    ('708500', 'Ports et frais accessoires facturés', 'income', False),
+    ('758000', 'Produits divers de gestion courante', 'income_other', False),
+    ('766000', 'Gains de change', 'income_other', False),
+]
+
+# Journaux : (code, libellé, type) - codes de 3 caractères au plus (norme FEC,
+# voir account.journal._check_code_length)
+JOURNALS = [
+    ('VT', 'Ventes', 'sale'),
+    ('AC', 'Achats', 'purchase'),
+    ('BQ', 'Banque', 'bank'),
+    ('OD', 'Opérations diverses', 'general'),
+]
+
+# Taux de TVA français : (taux, compte de TVA collectée, compte de TVA déductible)
+TAX_RATES = [
+    (20.0, '445710', '445660'),
+    (10.0, '445710', '445660'),
+    (5.5, '445710', '445660'),
+    (2.1, '445710', '445660'),
+]
+
+# Comptes de ventes et d'achats courants, avec leur poids relatif
+SALE_ACCOUNTS = [('706000', 6), ('707000', 3), ('701000', 1), ('708500', 1)]
+PURCHASE_ACCOUNTS = [
+    ('607000', 8), ('601000', 4), ('606100', 2), ('606400', 2), ('613200', 1), ('615000', 1),
+    ('616000', 1), ('622600', 1), ('623000', 1), ('625100', 2), ('626000', 1), ('218300', 1),
+]
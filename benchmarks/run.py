@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks ISEB : génère le jeu de données si besoin, mesure, écrit le JSON
+
+    python -m benchmarks.run -c bench.conf -d bench --lines 1000000 -o results.json
+
+La base doit avoir french_accounting et client_portal installés (voir
+run.sh, qui prépare une base PostgreSQL jetable). Le jeu de données est
+généré au premier lancement puis réutilisé ; les options de génération
+doivent rester les mêmes pour une base donnée.
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from .cases import CASES
+
+_logger = logging.getLogger('benchmarks')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Options qui définissent le jeu de données (comparées d'un lancement à l'autre)
+DATASET_OPTIONS = ['seed', 'companies', 'lines', 'year', 'years', 'invoices', 'customers', 'suppliers']
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('-c', '--config', help="Fichier de configuration Odoo")
+    parser.add_argument('-d', '--database', required=True, help="Base de benchmark (jetable)")
+    parser.add_argument('-o', '--output', help="Fichier JSON de résultats (sortie standard par défaut)")
+
+    dataset = parser.add_argument_group('jeu de données')
+    dataset.add_argument('--seed', type=int, default=42)
+    dataset.add_argument('--companies', type=int, default=1)
+    dataset.add_argument('--lines', type=int, default=10000, help="Lignes d'écriture au total (10k à 10M)")
+    dataset.add_argument('--year', type=int, default=2024, help="Dernier exercice généré (exercice mesuré)")
+    dataset.add_argument('--years', type=int, default=2, help="Nombre d'exercices générés")
+    dataset.add_argument('--invoices', type=int, default=1500, help="Factures du modèle, par société")
+    dataset.add_argument('--customers', type=int, default=200)
+    dataset.add_argument('--suppliers', type=int, default=60)
+
+    measure = parser.add_argument_group('mesures')
+    measure.add_argument('--cases', help="Cas à exécuter, séparés par des virgules (tous par défaut)")
+    measure.add_argument('--repeat', type=int, default=5)
+    measure.add_argument('--warmup', type=int, default=1, help="Exécutions préalables non mesurées")
+    measure.add_argument('--dashboards', type=int, default=50, help="Dashboards calculés par cas")
+    return parser.parse_args(argv)
+
+
+def git_revision():
+    def git(*args):
+        result = subprocess.run(['git', *args], cwd=ROOT, capture_output=True, text=True)
+        return result.stdout.strip() if result.returncode == 0 else None
+    return {'commit': git('rev-parse', 'HEAD'), 'dirty': bool(git('status', '--porcelain', '--untracked-files=no'))}
+
+
+def open_registry(config_path, database):
+    import odoo
+    from odoo.tools import config
+
+    config.parse_config((['-c', config_path] if config_path else []) + ['-d', database])
+    return odoo.modules.registry.Registry(database)
+
+
+def ensure_dataset(registry, args):
+    """Description du jeu de données, généré s'il n'existe pas encore"""
+    from odoo import api, SUPERUSER_ID
+    from .generator import DATASET_PARAM, LedgerGenerator
+
+    requested = {option: getattr(args, option) for option in DATASET_OPTIONS}
+    with registry.cursor() as cr:
+        env = api.Environment(cr, SUPERUSER_ID, {})
+        existing = env['ir.config_parameter'].get_param(DATASET_PARAM)
+        if existing:
+            dataset = json.loads(existing)
+            if dataset.get('options') != requested:
+                sys.exit(
+                    f"La base {args.database} contient un jeu de données généré avec d'autres options "
+                    f"({dataset.get('options')}) : utilisez une base neuve."
+                )
+            return dataset
+
+        _logger.info(f"Génération du jeu de données : {requested}")
+        start = time.perf_counter()
+        generator = LedgerGenerator(
+            env, seed=args.seed, companies=args.companies, lines=args.lines, year=args.year,
+            years=args.years, invoices=args.invoices, customers=args.customers, suppliers=args.suppliers,
+        )
+        dataset = generator.generate()
+        dataset['options'] = requested
+        dataset['generation_seconds'] = round(time.perf_counter() - start, 1)
+        env['ir.config_parameter'].set_param(DATASET_PARAM, json.dumps(dataset))
+        return dataset
+
+
+def measure(env, case, state):
+    """Une exécution : durée, requêtes SQL (compteurs du thread tenus par le curseur), pic mémoire"""
+    thread = threading.current_thread()
+    thread.query_count = 0
+    thread.query_time = 0
+    start = time.perf_counter()
+    counters = case.run(env, state)
+    env.flush_all()
+    return {
+        'seconds': time.perf_counter() - start,
+        'queries': thread.query_count,
+        'query_seconds': thread.query_time,
+        'rss_peak_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024,
+        'counters': counters,
+    }
+
+
+def run_case(registry, case, context, repeat, warmup):
+    from odoo import api, SUPERUSER_ID
+
+    runs = []
+    with registry.cursor() as cr:
+        env = api.Environment(cr, SUPERUSER_ID, {})
+        context = dict(context, company=env['res.company'].browse(context['company_id']))
+        for iteration in range(warmup + repeat):
+            state = case.setup(env, context)
+            env.flush_all()
+            env.invalidate_all()
+            try:
+                result = measure(env, case, state)
+            except Exception as e:
+                _logger.exception(f"{case.name}: échec")
+                return {'description': case.description, 'error': f"{type(e).__name__}: {e}"}
+            finally:
+                cr.rollback()
+                env.invalidate_all()
+            if iteration >= warmup:
+                runs.append(result)
+            _logger.info(f"{case.name}: {result['seconds']:.3f} s, {result['queries']} requêtes")
+
+    seconds = [run['seconds'] for run in runs]
+    median = statistics.median(seconds)
+    counters = runs[-1]['counters']
+    return {
+        'description': case.description,
+        'runs': [round(value, 4) for value in seconds],
+        'median': round(median, 4),
+        'min': round(min(seconds), 4),
+        'max': round(max(seconds), 4),
+        'stdev': round(statistics.stdev(seconds), 4) if len(seconds) > 1 else 0.0,
+        'queries': int(statistics.median(run['queries'] for run in runs)),
+        'query_seconds': round(statistics.median(run['query_seconds'] for run in runs), 4),
+        'rss_peak_mb': max(run['rss_peak_mb'] for run in runs),
+        'counters': counters,
+        'throughput': {
+            f'{name}_per_second': round(value / median, 1)
+            for name, value in counters.items() if median > 0
+        },
+    }
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    import odoo
+    from .explain import check_indexes
+
+    registry = open_registry(args.config, args.database)
+    dataset = ensure_dataset(registry, args)
+    cases = CASES
+    if args.cases:
+        names = args.cases.split(',')
+        cases = [case for case in CASES if case.name in names]
+
+    context = {
+        'company_id': dataset['company_ids'][0],
+        'year': dataset['year'],
+        'dashboards': args.dashboards,
+    }
+    with registry.cursor() as cr:
+        cr.execute("SHOW server_version")
+        postgres = cr.fetchone()[0]
+
+    results = {
+        'schema': 1,
+        'date': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'git': git_revision(),
+        'environment': {
+            'python': platform.python_version(),
+            'odoo': odoo.release.version,
+            'postgres': postgres,
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'dataset': dataset,
+        'settings': {'repeat': args.repeat, 'warmup': args.warmup, 'dashboards': args.dashboards},
+        'results': {},
+        'index_checks': check_indexes(registry, dataset['company_ids'][0], dataset['year']),
+    }
+    for case in cases:
+        results['results'][case.name] = run_case(registry, case, context, args.repeat, args.warmup)
+
+    output = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            handle.write(output + '\n')
+        _logger.info(f"Résultats écrits dans {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
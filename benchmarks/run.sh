@@ -0,0 +1,64 @@
+#!/bin/bash
+# Benchmarks ISEB sur une base PostgreSQL jetable (conteneur Docker sur tmpfs)
+#
+#   ./benchmarks/run.sh --lines 1000000 --repeat 5
+#
+# Les options sont transmises à benchmarks/run.py. Variables :
+#   ODOO_BIN          odoo-bin d'une installation Odoo 17 (défaut : odoo-bin du PATH)
+#   ODOO_ADDONS_PATH  addons standard d'Odoo (défaut : addons/ à côté d'odoo-bin)
+#   PYTHON            interpréteur ayant accès au paquet odoo (défaut : python3)
+#   PG_IMAGE, PG_PORT image et port local de PostgreSQL (postgres:15-alpine, 55432)
+#   OUTPUT            fichier de résultats (benchmarks/results/<commit>.json)
+
+set -euo pipefail
+
+ROOT="$(cd "$(dirname "$0")/.." && pwd)"
+ODOO_BIN="${ODOO_BIN:-$(command -v odoo-bin || true)}"
+PYTHON="${PYTHON:-python3}"
+PG_IMAGE="${PG_IMAGE:-postgres:15-alpine}"
+PG_PORT="${PG_PORT:-55432}"
+DATABASE=bench
+CONTAINER="iseb-bench-$$"
+
+if [ -z "$ODOO_BIN" ]; then
+    echo "odoo-bin introuvable : définissez ODOO_BIN" >&2
+    exit 1
+fi
+ODOO_ADDONS_PATH="${ODOO_ADDONS_PATH:-$(dirname "$ODOO_BIN")/addons}"
+OUTPUT="${OUTPUT:-$ROOT/benchmarks/results/$(git -C "$ROOT" rev-parse --short HEAD).json}"
+CONFIG="$(mktemp)"
+
+cleanup() {
+    docker stop "$CONTAINER" >/dev/null 2>&1 || true
+    rm -f "$CONFIG"
+}
+trap cleanup EXIT
+
+# PostgreSQL jetable : données en mémoire, durabilité désactivée
+docker run -d --rm --name "$CONTAINER" \
+    -e POSTGRES_USER=odoo -e POSTGRES_PASSWORD=odoo \
+    -p "127.0.0.1:$PG_PORT:5432" \
+    --tmpfs /var/lib/postgresql/data \
+    "$PG_IMAGE" -c fsync=off -c synchronous_commit=off -c full_page_writes=off \
+    -c shared_buffers=1GB -c work_mem=64MB -c maintenance_work_mem=512MB >/dev/null
+
+until docker exec "$CONTAINER" pg_isready -U odoo -q; do
+    sleep 1
+done
+
+cat > "$CONFIG" <<EOF
+[options]
+db_host = 127.0.0.1
+db_port = $PG_PORT
+db_user = odoo
+db_password = odoo
+addons_path = $ODOO_ADDONS_PATH,$ROOT/addons
+without_demo = all
+EOF
+
+echo "Installation des modules dans la base $DATABASE..."
+"$ODOO_BIN" -c "$CONFIG" -d "$DATABASE" -i french_accounting,client_portal --stop-after-init --log-level=warn
+
+cd "$ROOT"
+"$PYTHON" -m benchmarks.run -c "$CONFIG" -d "$DATABASE" -o "$OUTPUT" "$@"
+echo "Résultats : $OUTPUT"
@@ -3,16 +3,25 @@
 
 set -e
 
+STARTUP_START=$EPOCHREALTIME
+
 # Fonction pour logger
 log() {
     echo "[$(date '+%Y-%m-%d %H:%M:%S')] $1"
 }
 
+# Secondes coules depuis le dmarrage du conteneur
+elapsed() {
+    awk -v start="$STARTUP_START" -v now="$EPOCHREALTIME" 'BEGIN { printf "%.3f", now - start }'
+}
+
 log "Starting ISEB Odoo container..."
 
-# Attendre que PostgreSQL soit prt
+# Attendre que PostgreSQL soit prt (niveau requis : WAIT_PSQL_REQUIRE,
+# server / database / modules, voir wait-for-psql.py)
 log "Waiting for PostgreSQL to be ready..."
 python3 /usr/local/bin/wait-for-psql.py
+log "PostgreSQL ready after $(elapsed)s"
 
 # Attendre que Redis soit prt
 log "Waiting for Redis to be ready..."
@@ -27,13 +36,21 @@ until redis-cli -h ${REDIS_HOST:-redis} -p ${REDIS_PORT:-6379} -a ${REDIS_PASSWO
     log "Redis is unavailable - sleeping (attempt $counter/$timeout)"
     sleep 1
 done
-log "Redis is up and running!"
+log "Redis is up and running! ($(elapsed)s)"
 
 # Crer les rpertoires ncessaires s'ils n'existent pas
 mkdir -p /var/lib/odoo/sessions
 mkdir -p /var/lib/odoo/filestore
 mkdir -p /var/log/odoo
 
+# Mtriques Prometheus multiprocess : rpertoire partag entre conteneurs,
+# seuls les fichiers de ce conteneur (prfixs par son hostname) sont purgs
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+    mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+    rm -f "$PROMETHEUS_MULTIPROC_DIR"/*_"$(hostname)"-*.db
+    chown odoo:odoo "$PROMETHEUS_MULTIPROC_DIR"
+fi
+
 # Configuration des permissions
 chown -R odoo:odoo /var/lib/odoo
 chown -R odoo:odoo /var/log/odoo
@@ -98,5 +115,32 @@ log "  - Custom: /mnt/custom-addons"
 # Afficher la version d'Odoo
 odoo --version
 
+# Profil de dmarrage : imports des addons ISEB et chargement du registre
+if [ -n "$ODOO_STARTUP_PROFILE" ]; then
+    log "Profiling Odoo startup..."
+    python3 /usr/local/bin/startup-profile.py --config=/etc/odoo/odoo.conf \
+        --json="${ODOO_STARTUP_PROFILE_FILE:-/var/log/odoo/startup-profile.json}" \
+        || log "WARNING: startup profiling failed"
+fi
+
+# Worker cron d'une flotte multi-serveurs (ISEB_CRON_SHARD=N/TOTAL) : seules
+# les bases de son shard, lues dans le registre des tenants, sont charges
+if [ -n "$ISEB_CRON_SHARD" ]; then
+    TENANTS_FILE="${ISEB_TENANTS_FILE:-/etc/iseb/tenants.conf}"
+    if [ ! -f "$TENANTS_FILE" ]; then
+        log "ERROR: ISEB_CRON_SHARD is set but $TENANTS_FILE does not exist"
+        exit 1
+    fi
+    CRON_DATABASES="$(python3 /mnt/custom-addons/iseb_tenants/tenant_registry.py "$TENANTS_FILE" cron-databases "$ISEB_CRON_SHARD")"
+    if [ -z "$CRON_DATABASES" ]; then
+        log "WARNING: no database in cron shard $ISEB_CRON_SHARD"
+    else
+        log "Cron shard $ISEB_CRON_SHARD: $CRON_DATABASES"
+        set -- "$@" --database="$CRON_DATABASES"
+    fi
+fi
+
+log "Entrypoint done in $(elapsed)s"
+
 # Lancer Odoo avec la configuration
 exec "$@" --config=/etc/odoo/odoo.conf
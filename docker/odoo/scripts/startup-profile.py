@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Profil de démarrage à froid d'Odoo pour les addons ISEB
+
+    python3 /usr/local/bin/startup-profile.py -c /etc/odoo/odoo.conf -d odoo \
+        [--addons-dir /mnt/custom-addons] [--json profile.json] [--cprofile registry.prof]
+
+Mesures, dans l'ordre du démarrage :
+  import odoo         : import du serveur
+  dépendances         : import des addons Odoo dont dépendent les addons ISEB
+  import <addon>      : import Python de chaque addon ISEB (dans l'ordre des
+                        dépendances ; un module partagé est compté au premier
+                        addon qui l'importe)
+  registre            : Registry.new(db) complet, avec le détail par module de
+                        Registry.load (construction des classes de modèles) et
+                        les totaux de setup_models / init_models
+
+Lancé par l'entrypoint quand ODOO_STARTUP_PROFILE est défini, avant le
+démarrage d'Odoo (un chargement du registre de plus : à réserver aux mesures
+après un déploiement). `--cprofile` écrit les statistiques cProfile du
+chargement du registre (à lire avec snakeviz ou pstats).
+"""
+
+import argparse
+import ast
+import cProfile
+import json
+import os
+import time
+from collections import defaultdict
+
+
+def log(message):
+    """Logger avec timestamp"""
+    timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
+    print(f"[{timestamp}] {message}", flush=True)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('-c', '--config', default=os.environ.get('ODOO_RC', '/etc/odoo/odoo.conf'))
+    parser.add_argument('-d', '--database', default=os.environ.get('DATABASE'), required=not os.environ.get('DATABASE'))
+    parser.add_argument('--addons-dir', default=os.environ.get('ODOO_CUSTOM_ADDONS', '/mnt/custom-addons'),
+                        help="Répertoire des addons ISEB")
+    parser.add_argument('--json', help="Fichier JSON du profil")
+    parser.add_argument('--cprofile', help="Statistiques cProfile du chargement du registre")
+    return parser.parse_args(argv)
+
+
+def iseb_addons(addons_dir):
+    """Addons du répertoire ISEB triés dans l'ordre des dépendances : {nom: dépendances}"""
+    manifests = {}
+    for name in sorted(os.listdir(addons_dir)):
+        path = os.path.join(addons_dir, name, '__manifest__.py')
+        if os.path.isfile(path):
+            with open(path, 'rb') as handle:
+                manifests[name] = ast.literal_eval(handle.read().decode('utf-8', 'replace')).get('depends', [])
+
+    ordered = {}
+
+    def visit(name):
+        if name in ordered:
+            return
+        for depend in manifests[name]:
+            if depend in manifests:
+                visit(depend)
+        ordered[name] = manifests[name]
+
+    for name in manifests:
+        visit(name)
+    return ordered
+
+
+def external_dependencies(addons):
+    """Addons Odoo (hors ISEB) requis par les addons ISEB, dépendances comprises"""
+    from odoo.modules.module import get_manifest
+
+    result = []
+    pending = [depend for depends in addons.values() for depend in depends if depend not in addons]
+    while pending:
+        name = pending.pop()
+        if name in result:
+            continue
+        result.append(name)
+        pending.extend(get_manifest(name).get('depends', []))
+    return result
+
+
+class Timer:
+    """Durées cumulées par clé"""
+
+    def __init__(self):
+        self.seconds = defaultdict(float)
+        self.calls = defaultdict(int)
+
+    def wrap(self, cls, method, key):
+        original = getattr(cls, method)
+        timer = self
+
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                name = key(*args, **kwargs)
+                timer.seconds[name] += time.perf_counter() - start
+                timer.calls[name] += 1
+
+        setattr(cls, method, wrapper)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    profile = {'database': args.database, 'imports': {}, 'registry': {}}
+
+    start = time.perf_counter()
+    import odoo
+    from odoo.modules.module import initialize_sys_path, load_openerp_module
+    from odoo.modules.registry import Registry
+    profile['import_odoo'] = round(time.perf_counter() - start, 3)
+
+    odoo.tools.config.parse_config(['-c', args.config, '-d', args.database])
+    initialize_sys_path()
+    addons = iseb_addons(args.addons_dir)
+
+    start = time.perf_counter()
+    for name in external_dependencies(addons):
+        load_openerp_module(name)
+    profile['import_dependencies'] = round(time.perf_counter() - start, 3)
+
+    for name in addons:
+        start = time.perf_counter()
+        load_openerp_module(name)
+        profile['imports'][name] = round(time.perf_counter() - start, 3)
+
+    timer = Timer()
+    timer.wrap(Registry, 'load', lambda registry, cr, package: f'load {package.name}')
+    timer.wrap(Registry, 'setup_models', lambda registry, cr: 'setup_models')
+    timer.wrap(Registry, 'init_models', lambda registry, cr, *args, **kwargs: 'init_models')
+    profiler = cProfile.Profile() if args.cprofile else None
+
+    start = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    Registry.new(args.database)
+    if profiler:
+        profiler.disable()
+        profiler.dump_stats(args.cprofile)
+    profile['registry_total'] = round(time.perf_counter() - start, 3)
+    profile['registry'] = {
+        name: {'seconds': round(seconds, 3), 'calls': timer.calls[name]}
+        for name, seconds in sorted(timer.seconds.items(), key=lambda item: -item[1])
+    }
+
+    log(f"import odoo: {profile['import_odoo']:.3f}s")
+    log(f"import dependencies: {profile['import_dependencies']:.3f}s")
+    for name, seconds in profile['imports'].items():
+        log(f"import {name}: {seconds:.3f}s")
+    log(f"registry {args.database}: {profile['registry_total']:.3f}s")
+    for name, values in list(profile['registry'].items())[:15]:
+        log(f"  {name}: {values['seconds']:.3f}s ({values['calls']} calls)")
+
+    if args.json:
+        with open(args.json, 'w') as handle:
+            json.dump(profile, handle, indent=2)
+            handle.write('\n')
+        log(f"Profile written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,26 @@
 #!/usr/bin/env python3
 """
 Wait for PostgreSQL to be ready before starting Odoo
+
+Niveaux de disponibilité, du plus faible au plus fort :
+  server   : le serveur accepte les connexions (base de maintenance)
+  database : la base DATABASE existe
+  modules  : les modules ISEB (WAIT_PSQL_MODULES) sont installés dans la base,
+             donc leurs tables créées (l'état installed est posé en fin
+             d'installation, dans la même transaction)
+
+Le script attend le niveau WAIT_PSQL_REQUIRE (server par défaut) avec un
+backoff exponentiel (WAIT_PSQL_INITIAL_DELAY doublé à chaque tentative,
+plafonné à WAIT_PSQL_MAX_DELAY, avec gigue) jusqu'à WAIT_PSQL_TIMEOUT
+secondes, puis rapporte le niveau atteint et la durée de chaque étape. Les
+mesures sont écrites en JSON dans WAIT_PSQL_TIMING_FILE si défini.
+
+Codes de sortie : 0 prêt, 1 délai dépassé.
 """
 
+import json
 import os
+import random
 import sys
 import time
 import psycopg2
@@ -14,10 +31,18 @@ DB_HOST = os.environ.get('HOST', 'postgres')
 DB_PORT = int(os.environ.get('PORT', 5432))
 DB_USER = os.environ.get('USER', 'odoo')
 DB_PASSWORD = os.environ.get('PASSWORD', 'odoo')
-DB_NAME = os.environ.get('DATABASE', 'postgres')  # Utiliser 'postgres' pour le test de connexion
+DB_NAME = os.environ.get('DATABASE', 'postgres')
+MAINTENANCE_DB = os.environ.get('WAIT_PSQL_MAINTENANCE_DB', 'postgres')
+MODULES = [name.strip() for name in os.environ.get('WAIT_PSQL_MODULES', 'french_accounting').split(',') if name.strip()]
+REQUIRE = os.environ.get('WAIT_PSQL_REQUIRE', 'server')
+TIMING_FILE = os.environ.get('WAIT_PSQL_TIMING_FILE')
 
-TIMEOUT = 60  # Timeout en secondes
-RETRY_INTERVAL = 1  # Intervalle entre les tentatives en secondes
+TIMEOUT = float(os.environ.get('WAIT_PSQL_TIMEOUT', 60))  # Délai maximal en secondes
+INITIAL_DELAY = float(os.environ.get('WAIT_PSQL_INITIAL_DELAY', 0.1))  # Première attente en secondes
+MAX_DELAY = float(os.environ.get('WAIT_PSQL_MAX_DELAY', 5))  # Attente maximale entre deux tentatives
+CONNECT_TIMEOUT = 5  # Délai de connexion en secondes
+
+LEVELS = ['server', 'database', 'modules']
 
 
 def log(message):
@@ -26,59 +51,118 @@ def log(message):
     print(f"[{timestamp}] {message}", flush=True)
 
 
+def connect(dbname):
+    return psycopg2.connect(
+        host=DB_HOST,
+        port=DB_PORT,
+        user=DB_USER,
+        password=DB_PASSWORD,
+        dbname=dbname,
+        connect_timeout=CONNECT_TIMEOUT,
+        application_name='wait-for-psql',
+    )
+
+
+def probe():
+    """
+    Une tentative : (niveau atteint ou None, détail)
+    """
+    conn = connect(MAINTENANCE_DB)
+    try:
+        with conn.cursor() as cr:
+            cr.execute("SELECT EXISTS(SELECT 1 FROM pg_database WHERE datname = %s)", [DB_NAME])
+            database_exists = cr.fetchone()[0]
+    finally:
+        conn.close()
+    if not database_exists:
+        return 'server', f"database {DB_NAME} does not exist"
+    if DB_NAME == MAINTENANCE_DB or not MODULES:
+        return 'modules', "no module check"
+
+    conn = connect(DB_NAME)
+    try:
+        with conn.cursor() as cr:
+            cr.execute("SELECT to_regclass('ir_module_module') IS NOT NULL")
+            if not cr.fetchone()[0]:
+                return 'database', f"database {DB_NAME} is not initialized"
+            cr.execute("""
+                SELECT name FROM ir_module_module
+                 WHERE name = ANY(%s) AND state IN ('installed', 'to upgrade')
+            """, [MODULES])
+            installed = {row[0] for row in cr.fetchall()}
+    finally:
+        conn.close()
+    missing = [name for name in MODULES if name not in installed]
+    if missing:
+        return 'database', f"modules not installed: {', '.join(missing)}"
+    return 'modules', f"modules installed: {', '.join(MODULES)}"
+
+
+def next_delay(attempt, remaining):
+    """Backoff exponentiel avec gigue, sans dépasser le délai restant"""
+    delay = min(MAX_DELAY, INITIAL_DELAY * 2 ** (attempt - 1))
+    return max(0, min(remaining, random.uniform(delay / 2, delay)))
+
+
+def write_timing(timing):
+    if not TIMING_FILE:
+        return
+    with open(TIMING_FILE, 'w') as handle:
+        json.dump(timing, handle, indent=2)
+        handle.write('\n')
+
+
 def wait_for_postgres():
     """
-    Attendre que PostgreSQL soit prt  accepter des connexions
+    Attendre que PostgreSQL atteigne le niveau requis
     """
-    log(f"Waiting for PostgreSQL at {DB_HOST}:{DB_PORT}...")
-    log(f"Database: {DB_NAME}, User: {DB_USER}")
+    required = LEVELS.index(REQUIRE)
+    log(f"Waiting for PostgreSQL at {DB_HOST}:{DB_PORT} (require: {REQUIRE}, timeout: {TIMEOUT:g}s)...")
+    log(f"Database: {DB_NAME}, User: {DB_USER}, Modules: {', '.join(MODULES) or '-'}")
 
-    start_time = time.time()
+    start_time = time.monotonic()
+    reached = {}  # niveau -> secondes écoulées à la première atteinte
     attempt = 0
+    level = None
 
     while True:
         attempt += 1
-        elapsed_time = time.time() - start_time
-
-        # Vrifier le timeout
-        if elapsed_time > TIMEOUT:
-            log(f"ERROR: Timeout after {TIMEOUT} seconds waiting for PostgreSQL")
-            sys.exit(1)
-
         try:
-            # Tentative de connexion
-            log(f"Connection attempt {attempt} (elapsed: {int(elapsed_time)}s / {TIMEOUT}s)...")
-
-            conn = psycopg2.connect(
-                host=DB_HOST,
-                port=DB_PORT,
-                user=DB_USER,
-                password=DB_PASSWORD,
-                database=DB_NAME,
-                connect_timeout=5
-            )
-
-            # Test de la connexion avec une requte simple
-            cursor = conn.cursor()
-            cursor.execute('SELECT 1')
-            cursor.close()
-            conn.close()
-
-            log("PostgreSQL is ready! Connection successful.")
-            return True
-
+            level, detail = probe()
         except OperationalError as e:
-            log(f"PostgreSQL not ready yet: {str(e)}")
-            log(f"Retrying in {RETRY_INTERVAL} second(s)...")
-            time.sleep(RETRY_INTERVAL)
-
+            level, detail = None, str(e).strip().splitlines()[0]
         except Exception as e:
-            log(f"Unexpected error while connecting to PostgreSQL: {str(e)}")
-            log(f"Retrying in {RETRY_INTERVAL} second(s)...")
-            time.sleep(RETRY_INTERVAL)
+            level, detail = None, f"unexpected error: {e}"
+        elapsed_time = time.monotonic() - start_time
+
+        if level is not None:
+            for name in LEVELS[:LEVELS.index(level) + 1]:
+                reached.setdefault(name, round(elapsed_time, 3))
+            if LEVELS.index(level) >= required:
+                break
+
+        remaining = TIMEOUT - elapsed_time
+        if remaining <= 0:
+            log(f"ERROR: Timeout after {TIMEOUT:g} seconds waiting for PostgreSQL ({detail})")
+            write_timing({'ready': False, 'require': REQUIRE, 'attempts': attempt,
+                          'seconds': round(elapsed_time, 3), 'reached': reached})
+            sys.exit(1)
+        delay = next_delay(attempt, remaining)
+        log(f"PostgreSQL not ready yet (attempt {attempt}, {elapsed_time:.1f}s): {detail} - retrying in {delay:.2f}s")
+        time.sleep(delay)
+
+    log(f"PostgreSQL is ready ({level}: {detail}) in {elapsed_time:.3f}s after {attempt} attempt(s)")
+    for name, seconds in reached.items():
+        log(f"  {name}: {seconds:.3f}s")
+    write_timing({'ready': True, 'require': REQUIRE, 'level': level, 'attempts': attempt,
+                  'seconds': round(elapsed_time, 3), 'reached': reached})
+    return True
 
 
 if __name__ == "__main__":
+    if REQUIRE not in LEVELS:
+        log(f"ERROR: WAIT_PSQL_REQUIRE must be one of {', '.join(LEVELS)}")
+        sys.exit(1)
     try:
         wait_for_postgres()
         sys.exit(0)
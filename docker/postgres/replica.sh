@@ -0,0 +1,28 @@
+#!/bin/sh
+# Réplica en streaming du service postgres (profil compose « replica »)
+#
+# Au premier démarrage, copie le primaire par pg_basebackup (-R : standby.signal
+# et primary_conninfo), puis démarre PostgreSQL en hot standby.
+
+set -e
+
+if [ ! -s "$PGDATA/PG_VERSION" ]; then
+    until pg_isready -h "$PRIMARY_HOST" -p "${PRIMARY_PORT:-5432}" -q; do
+        echo "Attente du primaire $PRIMARY_HOST..."
+        sleep 2
+    done
+    mkdir -p "$PGDATA"
+    chown postgres:postgres "$PGDATA"
+    chmod 700 "$PGDATA"
+    echo "Copie initiale du primaire $PRIMARY_HOST..."
+    PGPASSWORD="$REPLICATION_PASSWORD" su-exec postgres pg_basebackup \
+        -h "$PRIMARY_HOST" -p "${PRIMARY_PORT:-5432}" -U replicator \
+        -D "$PGDATA" -X stream -R -c fast
+fi
+
+# hot_standby_feedback : les longues lectures (FEC, grand livre) ne sont pas
+# annulées par le rejeu du VACUUM du primaire
+exec docker-entrypoint.sh postgres \
+    -c hot_standby=on \
+    -c hot_standby_feedback=on \
+    -c max_standby_streaming_delay=30s
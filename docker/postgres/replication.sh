@@ -0,0 +1,17 @@
+#!/bin/bash
+# Rôle et accès de réplication pour le réplica de lecture (profil compose « replica »)
+# Exécuté par l'image postgres à la création du volume, après init.sql
+
+set -e
+
+psql -v ON_ERROR_STOP=1 --username "$POSTGRES_USER" --dbname "$POSTGRES_DB" <<EOSQL
+DO \$\$
+BEGIN
+    IF NOT EXISTS (SELECT FROM pg_roles WHERE rolname = 'replicator') THEN
+        CREATE ROLE replicator WITH REPLICATION LOGIN PASSWORD '${REPLICATION_PASSWORD:-replicator}';
+    END IF;
+END
+\$\$;
+EOSQL
+
+echo "host replication replicator all scram-sha-256" >> "$PGDATA/pg_hba.conf"
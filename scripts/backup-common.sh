@@ -0,0 +1,82 @@
+#!/bin/bash
+# Configuration et requêtes communes à backup.sh et backup-verify.sh
+#
+# Paramètres (variables d'environnement, ou docker/.env) :
+#   BACKUP_DIR          répertoire des sauvegardes (/var/backups/iseb)
+#   BACKUP_JOBS         connexions parallèles de pg_dump / pg_restore (4)
+#   BACKUP_KEEP_DAYS    rétention des sauvegardes complètes (7)
+#   FILESTORE_DIR       filestore Odoo de la base (volume odoo-data par défaut)
+#   PGHOST / PGPORT     serveur PostgreSQL (localhost:5432, port publié par docker-compose)
+#   POSTGRES_DB / POSTGRES_USER / POSTGRES_PASSWORD   comme docker-compose
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+DOCKER_DIR="$SCRIPT_DIR/../docker"
+
+if [ -f "$DOCKER_DIR/.env" ]; then
+    set -a
+    # shellcheck disable=SC1091
+    . "$DOCKER_DIR/.env"
+    set +a
+fi
+
+BACKUP_DIR="${BACKUP_DIR:-/var/backups/iseb}"
+BACKUP_JOBS="${BACKUP_JOBS:-4}"
+BACKUP_KEEP_DAYS="${BACKUP_KEEP_DAYS:-7}"
+POSTGRES_DB="${POSTGRES_DB:-odoo}"
+
+export PGHOST="${PGHOST:-localhost}"
+export PGPORT="${PGPORT:-5432}"
+export PGUSER="${PGUSER:-${POSTGRES_USER:-odoo}}"
+export PGPASSWORD="${PGPASSWORD:-${POSTGRES_PASSWORD:-odoo}}"
+
+# Filestore de la base : data_dir/filestore/<base> dans le volume odoo-data
+if [ -z "${FILESTORE_DIR:-}" ]; then
+    volume="${COMPOSE_PROJECT_NAME:-docker}_odoo-data"
+    FILESTORE_DIR="$(docker volume inspect -f '{{ .Mountpoint }}' "$volume" 2>/dev/null || true)/filestore/$POSTGRES_DB"
+fi
+
+# Données régénérables, non sauvegardées (structure conservée) : lignes des
+# rapports transitoires, échantillons de profilage, bus de notifications
+EXCLUDE_TABLE_DATA="french_trial_balance_line account_aging_report_line iseb_profile_sample bus_bus"
+
+# Tables dont le nombre de lignes est vérifié à la restauration
+COUNTED_TABLES="res_company res_partner account_account account_journal account_move account_move_line
+account_partial_reconcile fec_export tva_declaration liasse_fiscale account_period_close
+account_period_close_balance ir_attachment"
+
+log() {
+    echo "[$(date '+%Y-%m-%d %H:%M:%S')] $1"
+}
+
+# Secondes écoulées depuis $1 (valeur de $EPOCHREALTIME)
+elapsed() {
+    awk -v start="$1" -v now="$EPOCHREALTIME" 'BEGIN { printf "%.1f", now - start }'
+}
+
+# Requête du nombre de lignes des tables présentes : "table<TAB>nombre"
+counts_query() {
+    local tables
+    tables="$(printf "'%s'," $COUNTED_TABLES)"
+    cat <<SQL
+SELECT format('SELECT %L, count(*) FROM %I', relname, relname)
+  FROM pg_class
+ WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace AND relname IN (${tables%,})
+ ORDER BY relname
+\gexec
+SQL
+}
+
+# Empreinte du grand livre validé par société et exercice : "société<TAB>exercice<TAB>lignes<TAB>md5"
+# (toute écriture modifiée, perdue ou dupliquée change l'empreinte de son exercice)
+ledger_query() {
+    cat <<'SQL'
+SELECT l.company_id, m.french_fiscal_year, count(*),
+       md5(string_agg(concat_ws('|', l.id, m.name, l.date, l.account_id, l.partner_id, l.debit, l.credit,
+                                l.amount_currency, l.matching_number), E'\n' ORDER BY l.id))
+  FROM account_move_line l
+  JOIN account_move m ON m.id = l.move_id
+ WHERE m.state = 'posted'
+ GROUP BY l.company_id, m.french_fiscal_year
+ ORDER BY l.company_id, m.french_fiscal_year;
+SQL
+}
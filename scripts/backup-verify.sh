@@ -0,0 +1,82 @@
+#!/bin/bash
+# Vérification d'une sauvegarde ISEB par restauration complète
+#
+#   ./scripts/backup-verify.sh [répertoire de sauvegarde]   (la dernière par défaut)
+#   (cron : 0 4 * * * /opt/iseb/scripts/backup-verify.sh)
+#
+# Restaure la base dans une base temporaire (pg_restore, $BACKUP_JOBS tables
+# en parallèle, sur VERIFY_PGHOST / VERIFY_PGPORT, le serveur de la
+# sauvegarde par défaut), puis compare aux contrôles pris à la sauvegarde :
+#   - nombre de lignes des tables comptables (counts.tsv) ;
+#   - empreinte du grand livre par société et exercice (ledger.tsv) ;
+#   - SHA-1 des fichiers FEC du filestore sauvegardé avec ir_attachment.checksum.
+# La base temporaire est supprimée à la fin. Résultat dans VERIFIED (avec la
+# durée de restauration) ou VERIFY_FAILED ; code de sortie 1 en cas d'écart.
+
+set -euo pipefail
+
+. "$(dirname "$0")/backup-common.sh"
+
+BACKUP="$(readlink -f "${1:-$BACKUP_DIR/latest}")"
+if [ ! -f "$BACKUP/COMPLETE" ]; then
+    log "ERREUR: $BACKUP n'est pas une sauvegarde complète"
+    exit 1
+fi
+
+export PGHOST="${VERIFY_PGHOST:-$PGHOST}"
+export PGPORT="${VERIFY_PGPORT:-$PGPORT}"
+SCRATCH="${POSTGRES_DB}_verify_$$"
+START=$EPOCHREALTIME
+rm -f "$BACKUP/VERIFIED" "$BACKUP/VERIFY_FAILED"
+exec > >(tee "$BACKUP/verify.log") 2>&1
+
+log "Vérification de $BACKUP dans la base temporaire $SCRATCH ($PGHOST:$PGPORT)"
+createdb "$SCRATCH"
+trap 'dropdb --if-exists "$SCRATCH"' EXIT
+
+RESTORE_START=$EPOCHREALTIME
+pg_restore -j "$BACKUP_JOBS" --no-owner --exit-on-error -d "$SCRATCH" "$BACKUP/db"
+RESTORE_SECONDS="$(elapsed "$RESTORE_START")"
+log "Base restaurée en ${RESTORE_SECONDS}s"
+
+errors=0
+
+# check <nom> <requête> : compare le résultat de la requête à <nom>.tsv
+check() {
+    local name=$1
+    psql -X -q -At -F $'\t' -v ON_ERROR_STOP=1 -d "$SCRATCH" <<< "$2" > "$BACKUP/verify-$name.tsv"
+    if diff "$BACKUP/$name.tsv" "$BACKUP/verify-$name.tsv" > "$BACKUP/verify-$name.diff"; then
+        log "$name : conforme ($(wc -l < "$BACKUP/$name.tsv") lignes)"
+        rm -f "$BACKUP/verify-$name.diff"
+    else
+        log "ÉCART $name (attendu < > restauré) :"
+        cat "$BACKUP/verify-$name.diff"
+        errors=$((errors + 1))
+    fi
+}
+
+check counts "$(counts_query)"
+check ledger "$(ledger_query)"
+
+# Fichiers FEC : contenu du filestore sauvegardé contre l'empreinte de la pièce jointe
+fec_files=0
+while IFS=$'\t' read -r store_fname checksum; do
+    fec_files=$((fec_files + 1))
+    actual="$(sha1sum "$BACKUP/filestore/$store_fname" 2>/dev/null | cut -d' ' -f1)" || actual=
+    if [ "$actual" != "$checksum" ]; then
+        log "ÉCART fichier FEC $store_fname : ${actual:-absent} au lieu de $checksum"
+        errors=$((errors + 1))
+    fi
+done < <(psql -X -q -At -F $'\t' -v ON_ERROR_STOP=1 -d "$SCRATCH" -c "
+    SELECT store_fname, checksum FROM ir_attachment
+     WHERE res_model = 'fec.export' AND store_fname IS NOT NULL
+     ORDER BY id")
+log "Fichiers FEC contrôlés : $fec_files"
+
+if [ "$errors" -gt 0 ]; then
+    log "Sauvegarde NON CONFORME : $errors écart(s), vérification en $(elapsed "$START")s"
+    date '+%Y-%m-%d %H:%M:%S' > "$BACKUP/VERIFY_FAILED"
+    exit 1
+fi
+printf '%s\trestore_seconds=%s\n' "$(date '+%Y-%m-%d %H:%M:%S')" "$RESTORE_SECONDS" > "$BACKUP/VERIFIED"
+log "Sauvegarde conforme, vérification en $(elapsed "$START")s"
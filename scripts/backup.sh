@@ -0,0 +1,92 @@
+#!/bin/bash
+# Sauvegarde ISEB : base PostgreSQL et filestore Odoo
+#
+#   ./scripts/backup.sh          (cron : 0 2 * * * /opt/iseb/scripts/backup.sh)
+#
+# Chaque sauvegarde est un répertoire $BACKUP_DIR/<date> :
+#   db/         pg_dump en format répertoire, $BACKUP_JOBS tables en parallèle
+#   filestore/  copie du filestore ; les fichiers inchangés depuis la
+#               sauvegarde précédente sont des liens physiques vers celle-ci
+#               (rsync --link-dest) : seuls les nouveaux fichiers sont copiés
+#   counts.tsv  nombre de lignes des tables comptables
+#   ledger.tsv  empreinte du grand livre par société et exercice
+#   COMPLETE    écrit en dernier : la sauvegarde est utilisable
+#
+# Le dump et les contrôles sont faits sur le même instantané de la base
+# (pg_export_snapshot), le filestore est synchronisé pendant le dump.
+# backup-verify.sh restaure une sauvegarde et compare ces contrôles.
+
+set -euo pipefail
+
+. "$(dirname "$0")/backup-common.sh"
+
+START=$EPOCHREALTIME
+NAME="$(date '+%Y-%m-%d_%H%M%S')"
+TARGET="$BACKUP_DIR/$NAME"
+PREVIOUS="$(readlink -f "$BACKUP_DIR/latest" 2>/dev/null || true)"
+
+mkdir -p "$TARGET"
+exec > >(tee -a "$TARGET/backup.log") 2>&1
+
+log "Sauvegarde de $POSTGRES_DB ($PGHOST:$PGPORT) dans $TARGET"
+
+# Instantané exporté : la session reste ouverte pendant le dump
+coproc SNAPSHOT { psql -X -q -At -F $'\t' -v ON_ERROR_STOP=1 -d "$POSTGRES_DB"; }
+trap 'echo "ROLLBACK;" >&"${SNAPSHOT[1]}" 2>/dev/null || true' EXIT
+
+snapshot_query() {
+    printf '%s\n\\echo __END__\n' "$1" >&"${SNAPSHOT[1]}"
+    local line
+    while IFS= read -r line <&"${SNAPSHOT[0]}"; do
+        [ "$line" = "__END__" ] && return 0
+        printf '%s\n' "$line"
+    done
+    return 1
+}
+
+SNAPSHOT_ID="$(snapshot_query "BEGIN ISOLATION LEVEL REPEATABLE READ READ ONLY; SELECT pg_export_snapshot();")"
+log "Instantané $SNAPSHOT_ID"
+
+# Filestore en parallèle du dump
+FILESTORE_START=$EPOCHREALTIME
+if [ -d "$FILESTORE_DIR" ]; then
+    link_dest=()
+    if [ -n "$PREVIOUS" ] && [ -d "$PREVIOUS/filestore" ]; then
+        link_dest=(--link-dest="$PREVIOUS/filestore")
+    fi
+    rsync -a --delete "${link_dest[@]}" "$FILESTORE_DIR/" "$TARGET/filestore/" &
+    RSYNC_PID=$!
+else
+    log "ATTENTION: filestore introuvable ($FILESTORE_DIR), base seule"
+    RSYNC_PID=
+fi
+
+DUMP_START=$EPOCHREALTIME
+exclude=()
+for table in $EXCLUDE_TABLE_DATA; do
+    exclude+=(--exclude-table-data="$table")
+done
+pg_dump -Fd -j "$BACKUP_JOBS" -Z 5 --snapshot="$SNAPSHOT_ID" "${exclude[@]}" -f "$TARGET/db" "$POSTGRES_DB"
+log "Base sauvegardée en $(elapsed "$DUMP_START")s ($(du -sh "$TARGET/db" | cut -f1))"
+
+snapshot_query "$(counts_query)" > "$TARGET/counts.tsv"
+snapshot_query "$(ledger_query)" > "$TARGET/ledger.tsv"
+snapshot_query "ROLLBACK;" > /dev/null
+log "Contrôles enregistrés : $(wc -l < "$TARGET/counts.tsv") tables, $(wc -l < "$TARGET/ledger.tsv") exercices"
+
+if [ -n "$RSYNC_PID" ]; then
+    wait "$RSYNC_PID"
+    log "Filestore synchronisé en $(elapsed "$FILESTORE_START")s ($(find "$TARGET/filestore" -type f -links 1 | wc -l) fichiers copiés, les autres liés)"
+fi
+
+date '+%Y-%m-%d %H:%M:%S' > "$TARGET/COMPLETE"
+ln -sfn "$NAME" "$BACKUP_DIR/latest"
+log "Sauvegarde terminée en $(elapsed "$START")s"
+
+# Rotation : sauvegardes complètes de plus de $BACKUP_KEEP_DAYS jours, jamais la dernière
+# (les liens physiques gardent les fichiers encore utilisés par les suivantes)
+find "$BACKUP_DIR" -mindepth 1 -maxdepth 1 -type d -mtime +"$BACKUP_KEEP_DAYS" ! -name "$NAME" -print |
+while read -r old; do
+    log "Suppression de $old"
+    rm -rf "$old"
+done
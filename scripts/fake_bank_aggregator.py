@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Faux agrégateur bancaire : envoie des rafales d'événements webhook signés
+
+Simule une fenêtre de synchronisation Budget Insight / Bridge contre
+l'endpoint /webhook/bank/<provider> d'une instance ISEB locale et affiche
+la latence d'acquittement (p50 / p95 / p99).
+
+Exemple :
+
+    python scripts/fake_bank_aggregator.py --url http://localhost:8069 \\
+        --secret s3cret --account 4242 --events 5000 --concurrency 50
+
+L'instance doit servir une seule base, sinon --db désigne la base cliente
+(endpoint /webhook/bank/<provider>/<base>). Le secret
+doit correspondre à `bank_webhook_secret_<provider>` (odoo.conf) ou au
+paramètre système `integrations.webhook_secret.<provider>`, et le journal
+de banque cible doit avoir l'ID compte agrégateur `--account`.
+Avec --duplicates, une partie des événements est renvoyée à l'identique
+pour vérifier l'idempotence.
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+import random
+import statistics
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+WORDINGS = [
+    'CB AMAZON EU SARL', 'PRLV SEPA EDF', 'VIR URSSAF', 'CB SNCF INTERNET',
+    'VIR CLIENT FACTURE {ref}', 'PRLV SEPA ORANGE', 'CB TOTAL ENERGIES', 'LOYER BUREAU',
+]
+
+
+def build_event(account, index):
+    event_id = str(uuid.uuid4())
+    payload = {
+        'type': 'transaction.created',
+        'id': event_id,
+        'transaction': {
+            'id': f'fake-{event_id}',
+            'id_account': account,
+            'date': (date.today() - timedelta(days=random.randint(0, 7))).isoformat(),
+            'value': round(random.uniform(-2500, 2500), 2),
+            'original_wording': random.choice(WORDINGS).format(ref=f'FAC{index:06d}'),
+            'type': 'card',
+            'state': 'done',
+        },
+    }
+    return event_id, json.dumps(payload).encode()
+
+
+def send(url, secret, event_id, body):
+    signature = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    req = urllib.request.Request(url, data=body, method='POST', headers={
+        'Content-Type': 'application/json',
+        'X-Event-Id': event_id,
+        'X-Event-Type': 'transaction.created',
+        'X-Webhook-Signature': f'sha256={signature}',
+    })
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=30) as response:
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except OSError:
+        # Connexion refusée ou réinitialisée : comptée comme statut 0
+        status = 0
+    return status, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Faux agrégateur bancaire (webhooks signés)")
+    parser.add_argument('--url', default='http://localhost:8069')
+    parser.add_argument('--provider', default='budget_insight')
+    parser.add_argument('--db', help="Base cliente (déploiement multi-bases)")
+    parser.add_argument('--secret', required=True)
+    parser.add_argument('--account', required=True, help="ID compte agrégateur du journal de banque")
+    parser.add_argument('--events', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--duplicates', type=float, default=0.0,
+                        help="Proportion d'événements renvoyés une seconde fois (0 à 1)")
+    args = parser.parse_args()
+
+    url = f"{args.url.rstrip('/')}/webhook/bank/{args.provider}"
+    if args.db:
+        url = f"{url}/{args.db}"
+
+    events = [build_event(args.account, index) for index in range(args.events)]
+    events += random.sample(events, int(len(events) * args.duplicates))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(lambda event: send(url, args.secret, *event), events))
+    elapsed = time.perf_counter() - start
+
+    statuses = {}
+    for status, _latency in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    latencies = sorted(latency for _status, latency in results)
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+
+    print(f"{len(results)} requêtes en {elapsed:.2f}s ({len(results) / elapsed:.0f} req/s)")
+    print(f"Statuts HTTP : {dict(sorted(statuses.items()))}")
+    print(f"Latence (ms) : p50={quantiles[49]:.1f} p95={quantiles[94]:.1f} p99={quantiles[98]:.1f}")
+
+
+if __name__ == '__main__':
+    main()
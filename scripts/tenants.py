@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Exploitation des bases clientes réparties sur plusieurs serveurs PostgreSQL
+
+    ./scripts/tenants.py list                      bases par serveur et budgets de connexions
+    ./scripts/tenants.py check                     contrôle du registre (code 1 en cas d'erreur)
+    ./scripts/tenants.py render [--reload]         génère pgbouncer.ini (et recharge PgBouncer)
+    ./scripts/tenants.py add iseb_x --host pg2     crée la base sur le serveur et l'enregistre
+    ./scripts/tenants.py migrate iseb_x --to pg2   déplace une base vers un autre serveur
+    ./scripts/tenants.py cron-databases 2/3        bases du worker cron 2 sur 3
+
+Registre : config/tenants.conf (--registry), format dans config/tenants.conf.example.
+Accès PostgreSQL : PGUSER / PGPASSWORD, ou POSTGRES_USER / POSTGRES_PASSWORD
+de docker/.env ; console d'administration PgBouncer sur PGBOUNCER_HOST
+(localhost) et le listen_port du registre.
+
+Migration : PgBouncer suspend la base (PAUSE : les transactions en cours se
+terminent, les nouvelles attendent), la base est copiée par pg_dump /
+pg_restore parallèles, les nombres de lignes comparés, puis le registre et
+PgBouncer basculent vers le nouveau serveur et la base reprend (RESUME).
+L'ancienne base est renommée <base>_migrated_<date>, à supprimer après
+contrôle. Le filestore est partagé par les conteneurs Odoo : rien à déplacer.
+"""
+
+import argparse
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'addons', 'iseb_tenants'))
+
+from tenant_registry import TENANT_PATTERN, RegistryError, TenantRegistry  # noqa: E402
+
+DEFAULT_REGISTRY = os.path.join(ROOT, 'config', 'tenants.conf')
+DEFAULT_OUTPUT = os.path.join(ROOT, 'config', 'tenants', 'pgbouncer.ini')
+
+# Tables dont le nombre de lignes doit être identique avant et après migration
+MIGRATION_CHECK_TABLES = ['account_move', 'account_move_line', 'ir_attachment', 'res_partner', 'fec_export']
+
+
+def log(message):
+    """Logger avec timestamp"""
+    timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
+    print(f"[{timestamp}] {message}", flush=True)
+
+
+def load_env():
+    """Identifiants PostgreSQL de docker/.env pour les outils clients"""
+    path = os.path.join(ROOT, 'docker', '.env')
+    values = {}
+    if os.path.isfile(path):
+        with open(path, encoding='utf-8', errors='replace') as handle:
+            for line in handle:
+                key, sep, value = line.strip().partition('=')
+                if sep and not key.startswith('#'):
+                    values[key] = value.strip('"\'')
+    os.environ.setdefault('PGUSER', values.get('POSTGRES_USER', 'odoo'))
+    os.environ.setdefault('PGPASSWORD', values.get('POSTGRES_PASSWORD', 'odoo'))
+
+
+def load(path):
+    registry = TenantRegistry(path)
+    errors = registry.check()
+    if errors:
+        raise RegistryError("Registre invalide :\n  " + "\n  ".join(errors))
+    return registry
+
+
+def run(host, *command, capture=False):
+    """Commande client PostgreSQL vers l'accès d'administration d'un serveur"""
+    env = dict(os.environ, PGHOST=host.admin_address, PGPORT=str(host.admin_port))
+    result = subprocess.run(command, env=env, check=True, text=True, capture_output=capture)
+    return result.stdout if capture else None
+
+
+def psql(host, database, query):
+    return run(host, 'psql', '-X', '-q', '-At', '-v', 'ON_ERROR_STOP=1', '-d', database, '-c', query, capture=True)
+
+
+def pgbouncer_admin(registry, command):
+    """Commande de la console d'administration PgBouncer (PAUSE, RESUME, RELOAD)"""
+    env = dict(
+        os.environ,
+        PGHOST=os.environ.get('PGBOUNCER_HOST', 'localhost'),
+        PGPORT=registry.pgbouncer.get('listen_port', '6432'),
+    )
+    subprocess.run(['psql', '-X', '-q', '-d', 'pgbouncer', '-c', command], env=env, check=True)
+
+
+def write_checked(path, content):
+    """Écrit le registre modifié s'il reste valide ; retourne le nouveau registre"""
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=os.path.dirname(path), delete=False) as handle:
+        handle.write(content)
+    try:
+        registry = load(handle.name)
+    except RegistryError:
+        os.unlink(handle.name)
+        raise
+    registry.path = path
+    return handle.name, registry
+
+
+def render(registry, output, reload):
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as handle:
+        handle.write(registry.render_pgbouncer())
+    log(f"{output} : {len(registry.databases())} bases actives")
+    if reload:
+        pgbouncer_admin(registry, 'RELOAD')
+        log("PgBouncer rechargé")
+
+
+def row_counts(host, database):
+    query = "SELECT string_agg(format('%s=%s', t, c), ' ' ORDER BY t) FROM (" + " UNION ALL ".join(
+        f"SELECT '{table}' AS t, (SELECT count(*) FROM {table}) AS c WHERE to_regclass('{table}') IS NOT NULL"
+        for table in MIGRATION_CHECK_TABLES
+    ) + ") counts"
+    return psql(host, database, query).strip()
+
+
+# ----------------------------------------------------------------------
+# Commandes
+# ----------------------------------------------------------------------
+
+def cmd_list(args):
+    registry = TenantRegistry(args.registry)
+    for name, host in sorted(registry.hosts.items()):
+        tenants = [tenant for tenant in registry.tenants.values() if tenant.host == name]
+        hub = ' (hub)' if registry.hub is host else ''
+        print(f"{name}{hub}  {host.address}:{host.port}  {registry.usage(name)}/{host.max_connections} connexions")
+        for tenant in sorted(tenants, key=lambda tenant: tenant.name):
+            print(f"    {tenant.name:<40} pool {tenant.pool_size:>3}  max {tenant.max_connections:>3}  {tenant.state}")
+    for error in registry.check():
+        print(f"ERREUR: {error}")
+
+
+def cmd_check(args):
+    errors = TenantRegistry(args.registry).check()
+    for error in errors:
+        print(f"ERREUR: {error}")
+    if errors:
+        sys.exit(1)
+    print("Registre conforme")
+
+
+def cmd_render(args):
+    render(load(args.registry), args.output, args.reload)
+
+
+def cmd_cron_databases(args):
+    shard, _sep, shards = args.shard.partition('/')
+    print(','.join(TenantRegistry(args.registry).cron_databases(int(shard), int(shards))))
+
+
+def cmd_add(args):
+    registry = load(args.registry)
+    if not TENANT_PATTERN.match(args.name):
+        raise RegistryError(f"Le nom doit correspondre à {TENANT_PATTERN.pattern}")
+    if args.name in registry.tenants:
+        raise RegistryError(f"{args.name} est déjà enregistrée")
+
+    section = f"\n[tenant {args.name}]\nhost = {args.host}\n"
+    if args.pool_size:
+        section += f"pool_size = {args.pool_size}\n"
+    if args.max_connections:
+        section += f"max_connections = {args.max_connections}\n"
+    with open(args.registry, encoding='utf-8') as handle:
+        content = handle.read()
+    staged, registry = write_checked(args.registry, content.rstrip('\n') + '\n' + section)
+
+    try:
+        run(registry.hosts[args.host], 'createdb', '-T', 'template0', '-E', 'UTF8', args.name)
+    except subprocess.CalledProcessError:
+        os.unlink(staged)
+        raise
+    os.replace(staged, args.registry)
+    log(f"{args.name} créée sur {args.host} et enregistrée")
+    render(registry, args.output, args.reload)
+    log(f"Installer les modules : odoo -d {args.name} -i french_accounting,client_portal --stop-after-init")
+
+
+def cmd_migrate(args):
+    registry = load(args.registry)
+    tenant = registry.tenants.get(args.name)
+    if not tenant:
+        raise RegistryError(f"{args.name} n'est pas enregistrée")
+    if tenant.host == args.to:
+        raise RegistryError(f"{args.name} est déjà sur {args.to}")
+
+    with open(args.registry, encoding='utf-8') as handle:
+        content = handle.read()
+    pattern = re.compile(rf'(^\[tenant {re.escape(args.name)}\][^\[]*?^host\s*=\s*)\S+', re.M | re.S)
+    content, count = pattern.subn(rf'\g<1>{args.to}', content)
+    if count != 1:
+        raise RegistryError(f"Ligne host de [tenant {args.name}] introuvable")
+    staged, migrated = write_checked(args.registry, content)
+
+    source, target = registry.hosts[tenant.host], migrated.hosts[args.to]
+    dump_dir = tempfile.mkdtemp(prefix=f'{args.name}-', dir=args.work_dir)
+    log(f"Migration de {args.name} : {tenant.host} -> {args.to}")
+    start = time.monotonic()
+    pgbouncer_admin(registry, f'PAUSE {args.name}')
+    try:
+        expected = row_counts(source, args.name)
+        run(source, 'pg_dump', '-Fd', '-j', str(args.jobs), '-f', os.path.join(dump_dir, 'db'), args.name)
+        log(f"Copiée en {time.monotonic() - start:.1f}s")
+        run(target, 'createdb', '-T', 'template0', '-E', 'UTF8', args.name)
+        run(target, 'pg_restore', '-j', str(args.jobs), '--no-owner', '--exit-on-error',
+            '-d', args.name, os.path.join(dump_dir, 'db'))
+        actual = row_counts(target, args.name)
+        if actual != expected:
+            run(target, 'dropdb', args.name)
+            raise RegistryError(f"Nombres de lignes différents, migration annulée : {expected} / {actual}")
+        log(f"Restaurée et contrôlée ({actual})")
+
+        os.replace(staged, args.registry)
+        render(migrated, args.output, reload=True)
+    except BaseException:
+        if os.path.exists(staged):
+            os.unlink(staged)
+        raise
+    finally:
+        pgbouncer_admin(registry, f'RESUME {args.name}')
+        shutil.rmtree(dump_dir, ignore_errors=True)
+    log(f"{args.name} servie par {args.to}, interruption de {time.monotonic() - start:.1f}s")
+
+    archive = f"{args.name}_migrated_{time.strftime('%Y%m%d')}"
+    try:
+        psql(source, 'postgres', f'ALTER DATABASE "{args.name}" RENAME TO "{archive}"')
+        log(f"Ancienne base renommée {archive} sur {tenant.host} : à supprimer après contrôle")
+    except subprocess.CalledProcessError as e:
+        log(f"ATTENTION: ancienne base non renommée sur {tenant.host} ({e}), à traiter manuellement")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--registry', default=os.environ.get('ISEB_TENANTS_FILE', DEFAULT_REGISTRY))
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="pgbouncer.ini généré")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commands.add_parser('list').set_defaults(func=cmd_list)
+    commands.add_parser('check').set_defaults(func=cmd_check)
+
+    command = commands.add_parser('render')
+    command.add_argument('--reload', action='store_true', help="Recharger PgBouncer")
+    command.set_defaults(func=cmd_render)
+
+    command = commands.add_parser('cron-databases')
+    command.add_argument('shard', help="N/TOTAL")
+    command.set_defaults(func=cmd_cron_databases)
+
+    command = commands.add_parser('add')
+    command.add_argument('name')
+    command.add_argument('--host', required=True)
+    command.add_argument('--pool-size', type=int)
+    command.add_argument('--max-connections', type=int)
+    command.add_argument('--no-reload', dest='reload', action='store_false')
+    command.set_defaults(func=cmd_add)
+
+    command = commands.add_parser('migrate')
+    command.add_argument('name')
+    command.add_argument('--to', required=True)
+    command.add_argument('--jobs', type=int, default=4, help="Connexions parallèles de pg_dump / pg_restore")
+    command.add_argument('--work-dir', default=None, help="Répertoire du dump temporaire")
+    command.set_defaults(func=cmd_migrate)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    load_env()
+    try:
+        args.func(args)
+    except (RegistryError, subprocess.CalledProcessError) as e:
+        log(f"ERREUR: {e}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()